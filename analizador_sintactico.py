@@ -1,283 +1,568 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, scrolledtext
+except ImportError:  # uso sin interfaz gráfica (validar.py, CI)
+    tk = None
+from array import array
 from datetime import datetime
+from functools import lru_cache
+import gc
+import os
+import pickle
 import re
+import shutil
+import unicodedata
+
+from completado import TrieNombres
+from diagnosticos import formatear
+from documento import Documento
+from lenguaje import LENGUAJE_BASE, ROLES
+from lineas import IndiceLineas
 
 class Token:
-    def __init__(self, tipo, valor, linea, columna):
+    # sin __dict__ por token: en archivos grandes los tokens son la mayor parte de la memoria
+    __slots__ = ('tipo', 'valor', 'linea', 'columna', 'clave')
+
+    def __init__(self, tipo, valor, linea, columna, clave=None):
         self.tipo = tipo
         self.valor = valor
         self.linea = linea
         self.columna = columna
+        self.clave = clave  # rol de la palabra reservada (ver lenguaje.ROLES), None en otros tokens
     
     def __repr__(self):
         return f"Token({self.tipo}, '{self.valor}', L{self.linea}:C{self.columna})"
 
+class ListaTokens(list):
+    """
+    Tokens del análisis léxico (comentarios incluidos, como los muestra la interfaz).
+    El léxico anota además en 'comentarios' la posición de cada comentario, para que
+    el análisis sintáctico los salte sin copiar la lista.
+    """
+    def __init__(self, tokens=()):
+        super().__init__(tokens)
+        self.comentarios = array('i', (i for i, t in enumerate(self) if t.tipo == 'COMENTARIO'))
+
+
+class VistaTokens:
+    """
+    Vista de solo lectura de una lista de tokens sin sus comentarios: guarda las
+    posiciones de los demás tokens (4 bytes por token) y comparte los objetos Token.
+    """
+    __slots__ = ('_tokens', '_indices')
+
+    def __init__(self, tokens, indices):
+        self._tokens = tokens
+        self._indices = indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, i):
+        try:
+            return self._tokens[self._indices[i]]
+        except TypeError:  # rebanada
+            return list(map(self._tokens.__getitem__, self._indices[i]))
+
+    def __iter__(self):
+        return map(self._tokens.__getitem__, self._indices)
+
+
+def sin_comentarios(tokens):
+    """
+    Los tokens sin comentarios, sin copiarlos: la misma lista si no hay comentarios,
+    o una VistaTokens sobre ella. Acepta listas comunes (se buscan los comentarios).
+    """
+    comentarios = getattr(tokens, 'comentarios', None)
+    if comentarios is None:
+        comentarios = [i for i, t in enumerate(tokens) if t.tipo == 'COMENTARIO']
+    if not comentarios:
+        return tokens
+    indices = array('i')
+    inicio = 0
+    for i in comentarios:
+        indices.extend(range(inicio, i))
+        inicio = i + 1
+    indices.extend(range(inicio, len(tokens)))
+    return VistaTokens(tokens, indices)
+
+
 class Error:
-    def __init__(self, linea, columna, mensaje, tipo='lexico'):
+    """
+    Diagnóstico: ubicación, código estable (ver diagnosticos.py), tipo y los argumentos
+    del mensaje. El texto se arma recién al leer 'mensaje', así los análisis que solo
+    cuentan o agrupan errores no formatean ninguno.
+    """
+    __slots__ = ('linea', 'columna', 'codigo', 'tipo', 'argumentos')
+
+    def __init__(self, linea, columna, codigo, tipo='lexico', *argumentos):
         self.linea = linea
         self.columna = columna
-        self.mensaje = mensaje
+        self.codigo = codigo
         self.tipo = tipo
+        self.argumentos = argumentos
+    
+    @property
+    def mensaje(self):
+        return formatear(self.codigo, self.argumentos)
     
     def __repr__(self):
         return f"Error({self.tipo}, L{self.linea}:C{self.columna}, {self.mensaje})"
 
-class AnalizadorLexico:
+class TablaNombres:
+    """
+    Nombres de un análisis (palabras reservadas e identificadores), cada uno guardado una
+    sola vez: todas las apariciones de 'contador' comparten el mismo str (su hash ya está
+    calculado y las búsquedas en diccionarios se resuelven por identidad) y cada nombre
+    tiene un número. Las palabras reservadas son los primeros números, en el orden de
+    lenguaje.ROLES, así 'es reservada' es comparar el número con 'reservadas'. La llena
+    el bucle del léxico, que usa 'ids' y 'nombres' directamente.
+    """
+    __slots__ = ('ids', 'nombres', 'reservadas')
+
+    def __init__(self, lenguaje=LENGUAJE_BASE):
+        self.nombres = [lenguaje.palabra_de_rol[rol] for rol in ROLES if rol in lenguaje.palabra_de_rol]
+        self.reservadas = len(self.nombres)
+        self.ids = {nombre: i for i, nombre in enumerate(self.nombres)}
+
+class ContextoAnalisis:
+    """Estado de una ejecución de análisis; los analizadores no guardan estado propio."""
     def __init__(self):
-        # ALFABETO: Palabras reservadas EXACTAS (solo estas son válidas)
-        self.palabras_reservadas = {
-            'si', 'sino', 'mientras', 'para', 'entero', 'flotante', 
-            'cadena', 'retornar', 'funcion', 'verdadero', 'falso', 
-            'imprimir', 'leer'
-        }
-        
-        # ALFABETO: Operadores válidos
-        self.operadores = {
-            '==', '!=', '<=', '>=', '&&', '||',
-            '+', '-', '*', '/', '%', '<', '>', '!', '='
-        }
-        
-        # set de caracteres que pueden formar operadores
-        self.operador_chars = set('=!<>+-*/%&|')
-
-        # ALFABETO: Delimitadores
-        self.delimitadores = {'(', ')', '{', '}', ';', ','}
-        
-        # Para validaciones de tipo léxicas inmediatas
-        self.tipos_datos = {'entero', 'flotante', 'cadena'}
-        # contexto_tipos se llenará tras tokenizar (declaraciones detectadas)
-        self.contexto_tipos = {}  # nombre -> (tipo, linea)
-        
-    def _es_operador_valido(self, seq):
-        """Verifica si la secuencia exacta seq es un operador permitido."""
-        return seq in self.operadores
-    
-    def _inferir_tipo_literal_token(self, token):
-        """Devuelve 'entero','flotante','cadena' o None para un token literal."""
-        if token.tipo == 'LITERAL_ENTERO':
-            return 'entero'
-        if token.tipo == 'LITERAL_FLOTANTE':
-            return 'flotante'
-        if token.tipo == 'LITERAL_CADENA':
-            return 'cadena'
-        if token.tipo == 'PALABRA_RESERVADA' and token.valor in ('verdadero','falso'):
-            return 'entero'
-        return None
+        self.contexto_tipos = {}  # nombre -> (tipo, linea), declaraciones vistas por el léxico
+        self.variables_declaradas = {}  # {nombre: (tipo, linea_declaracion)}
+        self.funciones_declaradas = {}
+        self.alcance_actual = []  # Stack de alcances
+        self.expresiones = {}  # posición inicial -> Expresion (tipos ya inferidos)
+        self.segmentos = None  # (linea, columna) -> sentencia, para la recuperación de errores
+        self.segmentos_con_error = set()  # sentencias que ya reportaron un error
+        self.usos_variables = {}  # nombre -> veces que se menciona fuera de su declaración
+        self.informe_optimizacion = None  # InformeOptimizacion, si se compiló optimizando
+        self.lineas = None  # IndiceLineas del código, lo arma el análisis léxico
+        self.nombres = None  # TablaNombres de los identificadores, también del léxico
+        # True si las sentencias 'importar' ya las resolvió modulos.Proyecto; en el análisis
+        # de un archivo solo cada una es el error M005
+        self.importaciones_resueltas = False
+
+class LimiteErrores(Exception):
+    """Se alcanzó el máximo de errores configurado; el análisis se detiene."""
+
+class RecolectorErrores(list):
+    """
+    Lista de errores con recuperación en modo pánico y tope opcional.
+    Con recuperacion=True cada sentencia (tramo hasta un token de sincronización ';', '{' o '}')
+    reporta solo su primer error; los errores derivados se cuentan en 'suprimidos'.
+    Con max_errores, al llegar al tope se lanza LimiteErrores y 'truncado' queda en True.
+    """
+    SINCRONIZACION = frozenset((';', '{', '}'))
+
+    def __init__(self, contexto, max_errores=None, recuperacion=False):
+        super().__init__()
+        self.contexto = contexto
+        self.max_errores = max_errores
+        self.recuperacion = recuperacion
+        self.suprimidos = 0
+        self.truncado = False
+
+    def sincronizar(self, tokens):
+        """Asigna cada posición de token a su sentencia (una sola vez por contexto)."""
+        if not self.recuperacion or self.contexto.segmentos is not None:
+            return
+        segmentos = {}
+        segmento = 0
+        for tk in tokens:
+            segmentos[(tk.linea, tk.columna)] = segmento
+            if tk.tipo == 'DELIMITADOR' and tk.valor in self.SINCRONIZACION:
+                segmento += 1
+        self.contexto.segmentos = segmentos
+
+    def append(self, error):
+        if self.recuperacion and self.contexto.segmentos is not None:
+            segmento = self.contexto.segmentos.get((error.linea, error.columna))
+            if segmento is not None:
+                if segmento in self.contexto.segmentos_con_error:
+                    self.suprimidos += 1
+                    return
+                self.contexto.segmentos_con_error.add(segmento)
+        list.append(self, error)
+        if self.max_errores is not None and len(self) >= self.max_errores:
+            self.truncado = True
+            raise LimiteErrores()
+
+    def extend(self, errores):
+        for error in errores:
+            self.append(error)
+
+class Expresion:
+    """
+    Nodo de expresión: rango [inicio, fin) de la lista de tokens y su tipo inferido.
+    'completa' es False si algún identificador no estaba declarado al inferirla, y
+    'mezcla' la posición del operando donde se reportó T011 (None si no hubo).
+    """
+    __slots__ = ('inicio', 'fin', 'tipo', 'completa', 'mezcla')
+
+    def __init__(self, inicio, fin, tipo=None, completa=True, mezcla=None):
+        self.inicio = inicio
+        self.fin = fin
+        self.tipo = tipo
+        self.completa = completa
+        self.mezcla = mezcla
+
+    def __repr__(self):
+        return f"Expresion({self.inicio}:{self.fin}, {self.tipo})"
+
+class InferenciaTipos:
+    """
+    Motor de inferencia de tipos de expresiones.
+    Las expresiones se recorren sin copiar tokens y su nodo queda memorizado por posición
+    inicial: las validaciones de declaraciones, asignaciones y condiciones reutilizan el
+    mismo resultado. Los tipos de identificadores salen de contexto_tipos, cuyas entradas
+    nunca se sobrescriben: una expresión con todos sus identificadores declarados tiene
+    siempre el mismo tipo. Si le faltaba alguno (se declara más adelante) se vuelve a
+    inferir con el contexto de ahora.
+    """
+    def __init__(self, tokens, contexto, booleanos):
+        self.tokens = tokens
+        self.contexto_tipos = contexto.contexto_tipos
+        self.expresiones = contexto.expresiones
+        self.booleanos = booleanos
+
+    def fin_sentencia(self, inicio):
+        """Posición del primer ';', '{' o '}' desde inicio (fin de la expresión)."""
+        tokens = self.tokens
+        tlen = len(tokens)
+        k = inicio
+        while k < tlen and tokens[k].valor != ';' and tokens[k].valor != '{' and tokens[k].valor != '}':
+            k += 1
+        return k
+
+    def inferir(self, inicio, fin, errores):
+        """
+        Devuelve el nodo de la expresión, con su tipo en el contexto de ahora. Al volver a
+        inferir una expresión solo se reportan los errores que no reportó antes.
+        """
+        nodo = self.expresiones.get(inicio)
+        if nodo is not None and nodo.fin == fin:
+            if nodo.completa:
+                return nodo
+        else:
+            nodo = None
+        nodo = self._inferir(inicio, fin, errores, nodo)
+        self.expresiones[inicio] = nodo
+        return nodo
 
-    def _validar_expresion_tipos(self, tokens_segmento, errores):
+    def _inferir(self, inicio, fin, errores, anterior=None):
         """
         Inferir tipos de los operandos en la expresión y validar mezclas inválidas.
-        - Retorna tipo resultante ('entero','flotante','cadena') o None si no se pudo inferir.
+        - Retorna el nodo con el tipo resultante ('entero','flotante','cadena') o None si no se pudo inferir.
         - Añade errores a la lista 'errores' cuando detecta mezclas inválidas.
+        - Con la inferencia anterior de la misma expresión, no repite sus errores: T009 no
+          depende del contexto y los identificadores sin declarar ahora ya lo estaban antes.
         """
-        operand_types = []
+        tokens = self.tokens
+        contexto_tipos = self.contexto_tipos
+        repetir = anterior is None
+        completa = True
+        hay_entero = False
+        hay_flotante = False
+        primera_cadena = None  # posición del primer operando de tipo 'cadena' (para ubicar el error)
         last_was_operator = True  # iniciar True para detectar operadores dobles al inicio
-        i = 0
-        while i < len(tokens_segmento):
-            tk = tokens_segmento[i]
-            if tk.tipo == 'DELIMITADOR' and tk.valor in ('(',')',','):
+        for i in range(inicio, fin):
+            tk = tokens[i]
+            tipo = tk.tipo
+            if tipo == 'DELIMITADOR' and tk.valor in ('(',')',','):
                 last_was_operator = False
-                i += 1
                 continue
 
-            if tk.tipo == 'OPERADOR':
-                if last_was_operator and tk.valor != '!':  # '!' puede ser unario
-                    errores.append(Error(tk.linea, tk.columna,
-                                         f"secuencia inválida de operadores cerca de '{tk.valor}'", 'lexico'))
+            if tipo == 'OPERADOR':
+                if last_was_operator and tk.valor != '!' and repetir:  # '!' puede ser unario
+                    errores.append(Error(tk.linea, tk.columna, 'T009', 'lexico', tk.valor))
                 last_was_operator = True
-                i += 1
-                continue
-
-            if tk.tipo in ('LITERAL_ENTERO','LITERAL_FLOTANTE','LITERAL_CADENA'):
-                tp = self._inferir_tipo_literal_token(tk)
-                if tp:
-                    operand_types.append((tp, tk))
-                last_was_operator = False
-                i += 1
                 continue
 
-            if tk.tipo == 'PALABRA_RESERVADA' and tk.valor in ('verdadero','falso'):
-                operand_types.append(('entero', tk))
-                last_was_operator = False
-                i += 1
-                continue
-
-            if tk.tipo == 'IDENTIFICADOR':
-                if tk.valor in self.contexto_tipos:
-                    declared_type = self.contexto_tipos[tk.valor][0]
-                    operand_types.append((declared_type, tk))
+            if tipo == 'LITERAL_ENTERO' or tk.clave in self.booleanos:
+                hay_entero = True
+            elif tipo == 'LITERAL_FLOTANTE':
+                hay_flotante = True
+            elif tipo == 'LITERAL_CADENA':
+                if primera_cadena is None:
+                    primera_cadena = i
+            elif tipo == 'IDENTIFICADOR':
+                declarado = contexto_tipos.get(tk.valor)
+                if declarado is None:
+                    completa = False
+                    if repetir:
+                        errores.append(Error(tk.linea, tk.columna, 'T010', 'lexico', tk.valor))
+                elif declarado[0] == 'cadena':
+                    if primera_cadena is None:
+                        primera_cadena = i
+                elif declarado[0] == 'flotante':
+                    hay_flotante = True
                 else:
-                    errores.append(Error(tk.linea, tk.columna,
-                                         f"uso de identificador '{tk.valor}' sin declaración previa (para validar tipos)", 'lexico'))
-                last_was_operator = False
-                i += 1
-                continue
-
+                    hay_entero = True
             last_was_operator = False
-            i += 1
-
-        tipos_presentes = set([t for t, _ in operand_types])
-        if not operand_types:
-            return None
 
         # Cadena mezclada con numérico -> error
-        if 'cadena' in tipos_presentes and len(tipos_presentes) > 1:
-            for t, tk in operand_types:
-                if t == 'cadena':
-                    errores.append(Error(tk.linea, tk.columna, "mezcla de tipo 'cadena' con tipo numérico en la misma expresión", 'lexico'))
-                    break
-            return None
+        if primera_cadena is not None:
+            if hay_entero or hay_flotante:
+                if repetir or anterior.mezcla != primera_cadena:
+                    tk = tokens[primera_cadena]
+                    errores.append(Error(tk.linea, tk.columna, 'T011', 'lexico'))
+                return Expresion(inicio, fin, None, completa, primera_cadena)
+            return Expresion(inicio, fin, 'cadena', completa)
+
+        if hay_flotante:
+            return Expresion(inicio, fin, 'flotante', completa)
+        if hay_entero:
+            return Expresion(inicio, fin, 'entero', completa)
+        return Expresion(inicio, fin, None, completa)
+
+# Clases de carácter del análisis léxico. Los caracteres ASCII se clasifican con una tabla
+# que arma cada analizador; los demás, con las reglas Unicode explícitas de más abajo
+_DIGITO, _OPERADOR, _DELIMITADOR, _LETRA, _OTRO = range(5)
+
+# Identificadores fuera de ASCII: empiezan con una letra de cualquier escritura y siguen
+# con letras, marcas combinantes (acentos escritos aparte) o dígitos decimales. Los
+# números son solo de dígitos ASCII: '²', '٣' o '１' no forman literales.
+_INICIO_UNICODE = frozenset({'Lu', 'Ll', 'Lt', 'Lm', 'Lo'})
+_CONTINUACION_UNICODE = _INICIO_UNICODE | {'Mn', 'Mc', 'Nd'}
+
+# Tramos ASCII de identificadores y números, consumidos de una vez
+_PALABRA_ASCII = re.compile(r'[A-Za-z0-9_]*')
+_NUMERO_ASCII = re.compile(r'[0-9.,]*')
+_TEXTO_CADENA = {'"': re.compile(r'[^"\\\n]*'), "'": re.compile(r"[^'\\\n]*")}
+
+
+# Cachés de las categorías Unicode, acotadas (los analizadores viven toda la sesión)
+_MAX_CATEGORIAS = 4096
+
+
+@lru_cache(maxsize=_MAX_CATEGORIAS)
+def _inicio_identificador(char):
+    if char < '\x80':
+        return char == '_' or char.isalpha()
+    return unicodedata.category(char) in _INICIO_UNICODE
+
+
+@lru_cache(maxsize=_MAX_CATEGORIAS)
+def _continua_identificador(char):
+    """Si un carácter no ASCII puede seguir dentro de un identificador."""
+    return unicodedata.category(char) in _CONTINUACION_UNICODE
+
+
+def _continua_palabra(char):
+    """Si 'char' puede estar dentro de un identificador (después de su primer carácter)."""
+    if char < '\x80':
+        return char == '_' or char.isalnum()
+    return _continua_identificador(char)
+
+
+def _fin_identificador(codigo, i):
+    """Posición donde termina el identificador que empieza en codigo[i]."""
+    n = len(codigo)
+    while True:
+        i = _PALABRA_ASCII.match(codigo, i).end()
+        if i < n and codigo[i] >= '\x80' and _continua_identificador(codigo[i]):
+            i += 1
+        else:
+            return i
 
-        if tipos_presentes == {'entero'}:
-            return 'entero'
-        if tipos_presentes <= {'entero','flotante'}:
-            return 'flotante' if 'flotante' in tipos_presentes else 'entero'
 
-        return None
-
-    def analizar(self, codigo):
-        tokens = []
-        errores = []
+class AnalizadorLexico:
+    def __init__(self, lenguaje=LENGUAJE_BASE, max_errores=None, recuperacion=False, memo=None):
+        # ALFABETO compartido (inmutable, precalculado una sola vez)
+        self.lenguaje = lenguaje
+        self.max_errores = max_errores
+        self.recuperacion = recuperacion
+        # MemoSentencias (sentencias.py) para reutilizar los chequeos de sentencias repetidas
+        self.memo = memo
+        self.palabras_reservadas = lenguaje.palabras_reservadas
+        self.rol_de_palabra = lenguaje.rol_de_palabra
+        self.operadores = lenguaje.operadores
+        self.operadores_simples = lenguaje.operadores_simples
+        self.operador_chars = lenguaje.operador_chars
+        self.delimitadores = lenguaje.delimitadores
+        self.tipos_datos = lenguaje.tipos_datos
+        self.booleanos = lenguaje.booleanos
+        self.operadores_condicion = lenguaje.operadores_condicion
+        # rol de cada palabra reservada, por su número en TablaNombres
+        self.roles_reservadas = [rol for rol in ROLES if rol in lenguaje.palabra_de_rol]
+        # Clase de cada carácter ASCII, en el orden en que el análisis prueba las ramas;
+        # los demás se clasifican cada vez (ver _clase_unicode): la tabla no crece con
+        # lo que analiza un analizador que vive toda la sesión
+        self.clases = {}
+        for char in map(chr, range(128)):
+            if '0' <= char <= '9':
+                self.clases[char] = _DIGITO
+            elif char in self.operador_chars:
+                self.clases[char] = _OPERADOR
+            elif char in self.delimitadores:
+                self.clases[char] = _DELIMITADOR
+            elif char.isalpha() or char == '_':
+                self.clases[char] = _LETRA
+            else:
+                self.clases[char] = _OTRO
+    
+    def _clase_unicode(self, char):
+        if char in self.operador_chars:
+            clase = _OPERADOR
+        elif char in self.delimitadores:
+            clase = _DELIMITADOR
+        elif unicodedata.category(char) in _INICIO_UNICODE:
+            clase = _LETRA
+        else:
+            clase = _OTRO
+        return clase
+        
+    def _es_operador_valido(self, seq):
+        """Verifica si la secuencia exacta seq es un operador permitido."""
+        return seq in self.operadores
+    
+    def analizar(self, codigo, contexto=None):
+        # el contexto_tipos es propio de cada análisis
+        if contexto is None:
+            contexto = ContextoAnalisis()
+        tokens = ListaTokens()
+        errores = RecolectorErrores(contexto, self.max_errores, self.recuperacion)
+        try:
+            self._tokenizar(codigo, contexto, tokens, errores)
+            self._pasadas(tokens, contexto, errores)
+        except LimiteErrores:
+            pass
+        return tokens, errores
+    
+    def tokenizar(self, codigo):
+        """Solo los tokens, sin las pasadas de chequeo (para mirar la forma del programa)."""
+        contexto = ContextoAnalisis()
+        tokens = ListaTokens()
+        try:
+            self._tokenizar(codigo, contexto, tokens, RecolectorErrores(contexto, self.max_errores, self.recuperacion))
+        except LimiteErrores:
+            pass
+        return tokens
+    
+    def _tokenizar(self, codigo, contexto, tokens, errores):
         i = 0
+        n = len(codigo)
+        # Solo se siguen posiciones: la columna de cada token sale de su posición menos
+        # el inicio de su línea, que queda anotado en el índice de líneas
         linea = 1
-        columna = 1
-        
-        # reset contexto_tipos para cada análisis
-        self.contexto_tipos = {}
+        inicio_linea = 0
+        lineas = contexto.lineas = IndiceLineas()
+        nueva_linea = lineas.inicios.append
+        clases = self.clases
+        nombres = contexto.nombres = TablaNombres(self.lenguaje)
+        ids, lista_nombres, reservadas = nombres.ids, nombres.nombres, nombres.reservadas
+        roles_reservadas = self.roles_reservadas
 
         # --- TOKENIZACIÓN ---
-        while i < len(codigo):
+        while i < n:
             char = codigo[i]
             
             # Espacios y saltos de línea
             if char == '\n':
                 linea += 1
-                columna = 1
                 i += 1
+                inicio_linea = i
+                nueva_linea(i)
                 continue
             elif char == ' ' or char == '\t' or char == '\r':
-                columna += 1
                 i += 1
                 continue
             
             # Comentarios de línea //
-            if i + 1 < len(codigo) and codigo[i:i+2] == '//':
-                col_inicio = columna
-                comentario = '//'
-                i += 2
-                columna += 2
-                while i < len(codigo) and codigo[i] != '\n':
-                    comentario += codigo[i]
-                    i += 1
-                tokens.append(Token('COMENTARIO', comentario, linea, col_inicio))
+            if char == '/' and codigo.startswith('//', i):
+                fin = codigo.find('\n', i)
+                if fin == -1:
+                    fin = n
+                tokens.comentarios.append(len(tokens))
+                tokens.append(Token('COMENTARIO', codigo[i:fin], linea, i - inicio_linea + 1))
+                i = fin
                 continue
             
             # Comentarios de bloque /* */
-            if i + 1 < len(codigo) and codigo[i:i+2] == '/*':
-                col_inicio = columna
+            if char == '/' and codigo.startswith('/*', i):
+                col_inicio = i - inicio_linea + 1
                 linea_inicio = linea
-                comentario = '/*'
-                i += 2
-                columna += 2
-                cerrado = False
-                
-                while i + 1 < len(codigo):
-                    if codigo[i:i+2] == '*/':
-                        comentario += '*/'
-                        i += 2
-                        columna += 2
-                        cerrado = True
-                        break
-                    if codigo[i] == '\n':
-                        linea += 1
-                        columna = 1
-                    else:
-                        columna += 1
-                    comentario += codigo[i]
-                    i += 1
+                inicio = i
+                cierre = codigo.find('*/', i + 2)
+                if cierre != -1:
+                    i = cierre + 2
+                else:
+                    # sin cerrar: se consume hasta el penúltimo carácter
+                    i = max(i + 2, n - 1)
+                salto = codigo.find('\n', inicio, i)
+                while salto != -1:
+                    linea += 1
+                    inicio_linea = salto + 1
+                    nueva_linea(inicio_linea)
+                    salto = codigo.find('\n', inicio_linea, i)
                 
-                if cerrado:
-                    tokens.append(Token('COMENTARIO', comentario, linea_inicio, col_inicio))
+                if cierre != -1:
+                    tokens.comentarios.append(len(tokens))
+                    tokens.append(Token('COMENTARIO', codigo[inicio:i], linea_inicio, col_inicio))
                 else:
-                    errores.append(Error(linea_inicio, col_inicio, 
-                                       "comentario de bloque sin cerrar", 'lexico'))
+                    errores.append(Error(linea_inicio, col_inicio, 'L001', 'lexico'))
                 continue
             
             # Cadenas de texto
             if char == '"' or char == "'":
-                col_inicio = columna
+                col_inicio = i - inicio_linea + 1
                 linea_inicio = linea
-                comilla = char
-                cadena = char
+                inicio = i
+                texto_cadena = _TEXTO_CADENA[char]
                 i += 1
-                columna += 1
                 cerrada = False
                 
-                while i < len(codigo):
+                while True:
+                    # tramo sin comillas, escapes ni saltos de línea
+                    i = texto_cadena.match(codigo, i).end()
+                    if i >= n or codigo[i] == '\n':
+                        break
                     if codigo[i] == '\\':
-                        cadena += codigo[i]
                         i += 1
-                        columna += 1
-                        if i < len(codigo):
-                            cadena += codigo[i]
+                        if i < n:
                             i += 1
-                            columna += 1
+                            if codigo[i - 1] == '\n':  # salto de línea escapado
+                                linea += 1
+                                inicio_linea = i
+                                nueva_linea(i)
                         continue
-                    
-                    if codigo[i] == comilla:
-                        cadena += codigo[i]
-                        i += 1
-                        columna += 1
-                        cerrada = True
-                        break
-                    
-                    if codigo[i] == '\n':
-                        break
-                    
-                    cadena += codigo[i]
+                    # la comilla de cierre
                     i += 1
-                    columna += 1
+                    cerrada = True
+                    break
                 
                 if cerrada:
-                    tokens.append(Token('LITERAL_CADENA', cadena, linea_inicio, col_inicio))
+                    tokens.append(Token('LITERAL_CADENA', codigo[inicio:i], linea_inicio, col_inicio))
                 else:
-                    errores.append(Error(linea_inicio, col_inicio,
-                                       f"cadena literal sin cerrar", 'lexico'))
+                    errores.append(Error(linea_inicio, col_inicio, 'L002', 'lexico'))
                 continue
             
-            # Números
-            if char.isdigit():
-                col_inicio = columna
-                numero = ''
-                puntos = 0
-                tiene_coma = False
-                
-                while i < len(codigo) and (codigo[i].isdigit() or codigo[i] in ['.',',']):
-                    if codigo[i] == '.':
-                        puntos += 1
-                    elif codigo[i] == ',':
-                        tiene_coma = True
-                    numero += codigo[i]
-                    i += 1
-                    columna += 1
+            clase = clases.get(char)
+            if clase is None:
+                clase = self._clase_unicode(char)
+            
+            # Números (solo dígitos ASCII)
+            if clase == _DIGITO:
+                col_inicio = i - inicio_linea + 1
+                fin = _NUMERO_ASCII.match(codigo, i).end()
+                numero = codigo[i:fin]
+                i = fin
+                puntos = numero.count('.')
+                tiene_coma = ',' in numero
                 #error si tiene coma
                 if tiene_coma:
-                    errores.append(Error(linea, col_inicio, f"numero mal formado '{numero}' (no se permiten comas dentro de un numero)", 'lexico'))
+                    errores.append(Error(linea, col_inicio, 'L003', 'lexico', numero))
                     continue
                 # error si tiene más de un punto decimal
                 if puntos > 1:
-                    errores.append(Error(linea, col_inicio, f"número mal formado '{numero}' (demasiados puntos decimales)", 'lexico'))
+                    errores.append(Error(linea, col_inicio, 'L004', 'lexico', numero))
                     continue
                 # Verificar si continúa con letras (ERROR)
-                if i < len(codigo) and (codigo[i].isalpha() or codigo[i] == '_'):
-                    invalido = numero  
-                    while i < len(codigo) and (codigo[i].isalnum() or codigo[i] == '_'):
-                        numero += codigo[i]
-                        i += 1
-                        columna += 1
-                    errores.append(Error(linea, col_inicio,
-                                       f"token invalido '{invalido}' - no pertenece al alfabeto", 'lexico'))
+                if i < n and _inicio_identificador(codigo[i]):
+                    invalido = numero
+                    i = _fin_identificador(codigo, i)
+                    errores.append(Error(linea, col_inicio, 'L005', 'lexico', invalido))
                     continue
 
                 elif puntos == 1:
@@ -287,11 +572,11 @@ class AnalizadorLexico:
                 continue
             
             # Operadores: capturar secuencia completa de caracteres operadores (ej: '>>==', '===', '+', '&&')
-            if char in self.operador_chars:
-                col_inicio = columna
+            if clase == _OPERADOR:
+                col_inicio = i - inicio_linea + 1
                 seq = ''
                 j = i
-                while j < len(codigo) and codigo[j] in self.operador_chars:
+                while j < n and codigo[j] in self.operador_chars:
                     seq += codigo[j]
                     j += 1
                 # Intentar descomponer seq en operadores válidos; solo aceptamos si resulta en EXACTAMENTE 1 operador válido
@@ -304,7 +589,7 @@ class AnalizadorLexico:
                     if k+2 <= len(seq) and seq[k:k+2] in self.operadores:
                         matched = seq[k:k+2]
                         k += 2
-                    elif seq[k] in {o for o in self.operadores if len(o) == 1}:
+                    elif seq[k] in self.operadores_simples:
                         matched = seq[k]
                         k += 1
                     else:
@@ -313,143 +598,148 @@ class AnalizadorLexico:
                     operadores_encontrados.append(matched)
 
                 if fallo or len(operadores_encontrados) != 1 or not self._es_operador_valido(operadores_encontrados[0]):
-                    errores.append(Error(linea, col_inicio,
-                                         f"secuencia de operadores inválida o no permitida '{seq}'", 'lexico'))
+                    errores.append(Error(linea, col_inicio, 'L006', 'lexico', seq))
                     i = j
-                    columna += len(seq)
                     continue
                 else:
                     op = operadores_encontrados[0]
                     tokens.append(Token('OPERADOR', op, linea, col_inicio))
                     i = j
-                    columna += len(op)
                     continue
 
             # Delimitadores
-            if char in self.delimitadores:
-                tokens.append(Token('DELIMITADOR', char, linea, columna))
+            if clase == _DELIMITADOR:
+                tokens.append(Token('DELIMITADOR', char, linea, i - inicio_linea + 1))
                 i += 1
-                columna += 1
                 continue
             
             # Identificadores y palabras reservadas
-            if char.isalpha() or char == '_':
-                col_inicio = columna
-                palabra = ''
+            if clase == _LETRA:
+                col_inicio = i - inicio_linea + 1
+                fin = _fin_identificador(codigo, i)
+                palabra = codigo[i:fin]
+                i = fin
                 
-                while i < len(codigo) and (codigo[i].isalnum() or codigo[i] == '_'):
-                    palabra += codigo[i]
-                    i += 1
-                    columna += 1
+                # Una sola búsqueda clasifica la palabra y la reemplaza por el str compartido
+                ident = ids.get(palabra)
+                if ident is None:
+                    ids[palabra] = len(lista_nombres)
+                    lista_nombres.append(palabra)
+                else:
+                    palabra = lista_nombres[ident]
                 
-                if palabra in self.palabras_reservadas:
-                    tokens.append(Token('PALABRA_RESERVADA', palabra, linea, col_inicio))
+                if ident is not None and ident < reservadas:
+                    tokens.append(Token('PALABRA_RESERVADA', palabra, linea, col_inicio,
+                                        roles_reservadas[ident]))
                 else:
                     tokens.append(Token('IDENTIFICADOR', palabra, linea, col_inicio))
                 continue
             
             # Carácter no reconocido
-            errores.append(Error(linea, columna,
-                               f"carácter '{char}' no pertenece al alfabeto", 'lexico'))
+            errores.append(Error(linea, i - inicio_linea + 1, 'L007', 'lexico', char))
             i += 1
-            columna += 1
         
         # --- FIN TOKENIZACIÓN ---
+        errores.sincronizar(tokens)
+
+    def _pasadas(self, tokens, contexto, errores):
+        if self.memo is not None:
+            self.memo.pasadas_lexico(self, tokens, contexto, errores)
+            return
+        motor_tipos = InferenciaTipos(tokens, contexto, self.booleanos)
+        self.pasada_declaraciones(tokens, contexto, motor_tipos, errores)
+        self.pasada_estructuras(tokens, motor_tipos, errores)
+        self.pasada_asignaciones(tokens, contexto, motor_tipos, errores)
+        self.pasada_operadores(tokens, errores)
 
+    # Las pasadas de chequeo sobre los tokens: recorren las posiciones [inicio, fin) y las
+    # que saltan sentencias devuelven dónde quedaron (puede ser después de fin)
+
+    def pasada_declaraciones(self, tokens, contexto, motor_tipos, errores, inicio=0, fin=None):
         # 1) PRIMERA PASADA: Construir contexto de tipos (declaraciones) y validar declaraciones con inicialización
+        contexto_tipos = contexto.contexto_tipos
         tlen = len(tokens)
-        idx = 0
-        while idx < tlen:
+        fin = tlen if fin is None else fin
+        idx = inicio
+        while idx < fin:
             tk = tokens[idx]
-            if tk.tipo == 'PALABRA_RESERVADA' and tk.valor in self.tipos_datos:
-                tipo_decl = tk.valor
+            if tk.clave in self.tipos_datos:
+                tipo_decl = tk.clave
                 if idx + 1 < tlen and tokens[idx+1].tipo == 'IDENTIFICADOR':
                     nombre = tokens[idx+1].valor
-                    if nombre in self.contexto_tipos:
-                        errores.append(Error(tokens[idx+1].linea, tokens[idx+1].columna,
-                                             f"variable '{nombre}' ya declarada en línea {self.contexto_tipos[nombre][1]}", 'lexico'))
+                    if nombre in contexto_tipos:
+                        errores.append(Error(tokens[idx+1].linea, tokens[idx+1].columna, 'T001', 'lexico',
+                                             nombre, contexto_tipos[nombre][1]))
                     else:
                         # Declaración OBLIGATORIA CON = según tus reglas
                         j = idx + 2
                         if j < tlen and tokens[j].tipo == 'OPERADOR' and tokens[j].valor == '=':
-                            # recoger expresión hasta ';'
-                            expr = []
-                            k = j + 1
-                            while k < tlen and tokens[k].valor != ';' and tokens[k].valor != '{' and tokens[k].valor != '}':
-                                expr.append(tokens[k])
-                                k += 1
-                            inferred = self._validar_expresion_tipos(expr, errores)
+                            # expresión hasta ';'
+                            k = motor_tipos.fin_sentencia(j + 1)
+                            inferred = motor_tipos.inferir(j + 1, k, errores).tipo
                             # si inferimos tipo, comparar con tipo_decl
                             if inferred:
                                 if tipo_decl == 'entero' and inferred == 'flotante':
-                                    errores.append(Error(tk.linea, tk.columna,
-                                                         f"declaración de tipo 'entero' con expresión 'flotante' -> mezcla de tipos no permitida", 'lexico'))
+                                    errores.append(Error(tk.linea, tk.columna, 'T002', 'lexico'))
                                 elif tipo_decl == 'cadena' and inferred in ('entero','flotante'):
-                                    errores.append(Error(tk.linea, tk.columna,
-                                                         f"declaración de tipo 'cadena' con expresión numérica -> mezcla de tipos no permitida", 'lexico'))
+                                    errores.append(Error(tk.linea, tk.columna, 'T003', 'lexico'))
                             # registrar declaración (correcta o con error semántico)
-                            self.contexto_tipos[nombre] = (tipo_decl, tokens[idx+1].linea)
+                            contexto_tipos[nombre] = (tipo_decl, tokens[idx+1].linea)
                             idx = k
                             continue
                         else:
-                            errores.append(Error(tokens[idx+1].linea, tokens[idx+1].columna,
-                                               f"declaración de '{tipo_decl}' debe incluir asignación (ej: {tipo_decl} var = ...;)", 'lexico'))
+                            errores.append(Error(tokens[idx+1].linea, tokens[idx+1].columna, 'T004', 'lexico', tk.valor))
                             # aún así registramos para evitar cascada de errores en validaciones posteriores
-                            self.contexto_tipos[nombre] = (tipo_decl, tokens[idx+1].linea)
+                            contexto_tipos[nombre] = (tipo_decl, tokens[idx+1].linea)
                             idx += 2
                             continue
                 else:
-                    errores.append(Error(tk.linea, tk.columna,
-                                         f"se esperaba identificador después de '{tk.valor}'", 'lexico'))
+                    errores.append(Error(tk.linea, tk.columna, 'T005', 'lexico', tk.valor))
             idx += 1
-
-        # 2) Validaciones estructurales y de expresiones (ahora que contexto_tipos está poblado)
-        for idx, token in enumerate(tokens):
+        return idx
+
+    def pasada_estructuras(self, tokens, motor_tipos, errores, inicio=0, fin=None, si_previo=None):
+        # 2) Validaciones estructurales y de expresiones (ahora que contexto_tipos está poblado).
+        # si_previo: si hay un 'si' antes de inicio (None: se busca); un 'sino' necesita uno
+        if si_previo is None:
+            si_previo = any(tokens[k].clave == 'si' for k in range(inicio))
+        for idx, token in enumerate(_tramo(tokens, inicio, fin), inicio):
             # 'mientras'
-            if token.tipo == 'PALABRA_RESERVADA' and token.valor == 'mientras':
+            if token.clave == 'mientras':
                 if idx + 1 >= len(tokens) or tokens[idx + 1].valor != '(':
-                    errores.append(Error(token.linea, token.columna,
-                                       "estructura 'mientras' debe abrir con '(' después de 'mientras'", 'sintactico'))
+                    errores.append(Error(token.linea, token.columna, 'E001', 'sintactico', token.valor))
                     continue
 
-                condicion_tokens = []
                 j = idx + 2
                 parentesis_cerrado = False
                 while j < len(tokens):
                     if tokens[j].valor == ')':
                         parentesis_cerrado = True
                         break
-                    condicion_tokens.append(tokens[j])
                     j += 1
 
                 if not parentesis_cerrado:
-                    errores.append(Error(token.linea, token.columna,
-                                 "estructura 'mientras' sin paréntesis de cierre ')'", 'sintactico'))
+                    errores.append(Error(token.linea, token.columna, 'E002', 'sintactico', token.valor))
                     continue
 
-                if len(condicion_tokens) == 0:
-                    errores.append(Error(token.linea, token.columna,
-                                 "condición vacía en 'mientras'", 'sintactico'))
+                if j == idx + 2:
+                    errores.append(Error(token.linea, token.columna, 'E003', 'sintactico', token.valor))
                 else:
-                    cond_str = ''.join([t.valor for t in condicion_tokens])
-                    if '==' not in cond_str and '<' not in cond_str and '>' not in cond_str and '<=' not in cond_str and '>=' not in cond_str and '!=' not in cond_str and '&&' not in cond_str and '||' not in cond_str:
-                        errores.append(Error(token.linea, token.columna,
-                                     f"condición inválida en 'mientras' → falta operador lógico o relacional", 'sintactico'))
+                    cond_str = ''.join([tokens[c].valor for c in range(idx + 2, j)])
+                    if not any(op in cond_str for op in self.operadores_condicion):
+                        errores.append(Error(token.linea, token.columna, 'E004', 'sintactico', token.valor))
                     if '====' in cond_str or '<<' in cond_str or '>>' in cond_str or '=<=' in cond_str:
-                        errores.append(Error(token.linea, token.columna,
-                                     f"operador repetido o mal formado en 'mientras' → '{cond_str}'", 'sintactico'))
+                        errores.append(Error(token.linea, token.columna, 'E005', 'sintactico', token.valor, cond_str))
 
                 if j + 1 >= len(tokens) or tokens[j + 1].valor != '{':
-                    errores.append(Error(token.linea, token.columna,
-                                 "estructura 'mientras' debe abrir con llave '{' después de ')'", 'sintactico'))
+                    errores.append(Error(token.linea, token.columna, 'E006', 'sintactico', token.valor))
 
             # 'si'
-            if token.tipo == 'PALABRA_RESERVADA' and token.valor == 'si':
+            if token.clave == 'si':
+                si_previo = True
                 if idx + 1 >= len(tokens) or tokens[idx + 1].valor != '(':
-                    errores.append(Error(token.linea, token.columna,
-                                       "se esperaba '(' después de 'si'", 'sintactico'))
+                    errores.append(Error(token.linea, token.columna, 'E007', 'sintactico', token.valor))
                 else:
-                    condicion_tokens = []
                     j = idx + 2
                     nivel = 0
                     parentesis_cerrado = False
@@ -462,48 +752,37 @@ class AnalizadorLexico:
                                 break
                             else:
                                 nivel -= 1
-                        condicion_tokens.append(tokens[j])
                         j += 1
 
                     if not parentesis_cerrado:
-                        errores.append(Error(token.linea, token.columna,
-                                             "estructura 'si' sin paréntesis de cierre ')'", 'sintactico'))
+                        errores.append(Error(token.linea, token.columna, 'E002', 'sintactico', token.valor))
                     else:
-                        if len(condicion_tokens) == 0:
-                            errores.append(Error(token.linea, token.columna,
-                                                 "condición vacía en 'si'", 'sintactico'))
+                        if j == idx + 2:
+                            errores.append(Error(token.linea, token.columna, 'E003', 'sintactico', token.valor))
                         else:
-                            cond_str = ''.join([t.valor for t in condicion_tokens])
-                            if '==' not in cond_str and '<' not in cond_str and '>' not in cond_str and '<=' not in cond_str and '>=' not in cond_str and '!=' not in cond_str and '&&' not in cond_str and '||' not in cond_str:
-                                errores.append(Error(token.linea, token.columna,
-                                                     f"condición inválida en 'si' → falta operador lógico o relacional", 'sintactico'))
+                            cond_str = ''.join([tokens[c].valor for c in range(idx + 2, j)])
+                            if not any(op in cond_str for op in self.operadores_condicion):
+                                errores.append(Error(token.linea, token.columna, 'E004', 'sintactico', token.valor))
                             # Validar mezcla de tipos dentro de la condición
-                            self._validar_expresion_tipos(condicion_tokens, errores)
+                            motor_tipos.inferir(idx + 2, j, errores)
 
                     if j + 1 >= len(tokens) or tokens[j + 1].valor != '{':
                         errores.append(Error(tokens[j].linea if j < len(tokens) else token.linea, 
                                              tokens[j].columna if j < len(tokens) else token.columna,
-                                               f"se esperaba '{{' después de ')'", 'sintactico'))
+                                             'E008', 'sintactico'))
 
             # 'sino'
-            if token.tipo == 'PALABRA_RESERVADA' and token.valor == 'sino':
+            if token.clave == 'sino':
                 if idx + 1 >= len(tokens) or tokens[idx + 1].valor != '{':
-                    errores.append(Error(token.linea, token.columna,
-                                         "estructura 'sino' no debe llevar paréntesis; debe seguir '{'", 'sintactico'))
-                found_si_previo = False
-                for k in range(0, idx):
-                    if tokens[k].tipo == 'PALABRA_RESERVADA' and tokens[k].valor == 'si':
-                        found_si_previo = True
-                        break
-                if not found_si_previo:
-                    errores.append(Error(token.linea, token.columna,
-                                         "'sino' debe ir después de un 'si' previamente declarado", 'sintactico'))
+                    errores.append(Error(token.linea, token.columna, 'E009', 'sintactico', token.valor))
+                if not si_previo:
+                    errores.append(Error(token.linea, token.columna, 'E010', 'sintactico',
+                                         token.valor, self.lenguaje.palabra_de_rol['si']))
 
             # 'para'
-            if token.tipo == 'PALABRA_RESERVADA' and token.valor == 'para':
+            if token.clave == 'para':
                 if idx + 1 >= len(tokens) or tokens[idx + 1].valor != '(':
-                    errores.append(Error(token.linea, token.columna,
-                                       "se esperaba '(' después de 'para'", 'sintactico'))
+                    errores.append(Error(token.linea, token.columna, 'E007', 'sintactico', token.valor))
                 else:
                     j = idx + 2
                     nivel = 0
@@ -519,121 +798,221 @@ class AnalizadorLexico:
                                 nivel -= 1
                         j += 1
                     if pos_cierre == -1:
-                        errores.append(Error(token.linea, token.columna,
-                                             "estructura 'para' sin paréntesis de cierre ')'", 'sintactico'))
+                        errores.append(Error(token.linea, token.columna, 'E002', 'sintactico', token.valor))
                     else:
                         count_puntos = sum(1 for t in tokens[idx+2:pos_cierre] if t.valor == ';')
                         if count_puntos != 2:
                             errores.append(Error(tokens[idx+2].linea if idx+2 < len(tokens) else token.linea,
                                                  tokens[idx+2].columna if idx+2 < len(tokens) else token.columna,
-                                                 "estructura 'para' debe tener dos ';' en la cabecera", 'sintactico'))
+                                                 'E011', 'sintactico', token.valor))
                         if pos_cierre + 1 >= len(tokens) or tokens[pos_cierre + 1].valor != '{':
                             errores.append(Error(tokens[pos_cierre].linea, tokens[pos_cierre].columna,
-                                                 "se esperaba '{' después de ')' en 'para'", 'sintactico'))
+                                                 'E012', 'sintactico', token.valor))
 
+    def pasada_asignaciones(self, tokens, contexto, motor_tipos, errores, inicio=0, fin=None):
         # 3) Revisar asignaciones posteriores y validar mezclas en expresiones complejas (B)
-        i = 0
-        while i < len(tokens):
+        contexto_tipos = contexto.contexto_tipos
+        fin = len(tokens) if fin is None else fin
+        i = inicio
+        while i < fin:
             tk = tokens[i]
             if tk.tipo == 'IDENTIFICADOR' and i+1 < len(tokens) and tokens[i+1].tipo == 'OPERADOR' and tokens[i+1].valor == '=':
                 var_name = tk.valor
-                if var_name not in self.contexto_tipos:
-                    errores.append(Error(tk.linea, tk.columna,
-                                         f"variable '{var_name}' no declarada antes de la asignación", 'lexico'))
-                j = i + 2
-                expr_tokens = []
-                while j < len(tokens) and tokens[j].valor != ';' and tokens[j].valor != '{' and tokens[j].valor != '}':
-                    expr_tokens.append(tokens[j])
-                    j += 1
-                inferred = self._validar_expresion_tipos(expr_tokens, errores)
-                if inferred and var_name in self.contexto_tipos:
-                    declared_type = self.contexto_tipos[var_name][0]
+                if var_name not in contexto_tipos:
+                    errores.append(Error(tk.linea, tk.columna, 'T006', 'lexico', var_name))
+                j = motor_tipos.fin_sentencia(i + 2)
+                # la inicialización de una declaración ya se infirió en la primera pasada: sus
+                # errores no se repiten, pero el tipo se compara igual con el de la variable
+                inferred = motor_tipos.inferir(i + 2, j, errores).tipo
+                if inferred and var_name in contexto_tipos:
+                    declared_type = contexto_tipos[var_name][0]
                     if declared_type == 'entero' and inferred == 'flotante':
-                        errores.append(Error(tk.linea, tk.columna,
-                                             f"asignación inválida: variable 'entero' recibe expresión 'flotante'", 'lexico'))
+                        errores.append(Error(tk.linea, tk.columna, 'T007', 'lexico'))
                     if declared_type == 'cadena' and inferred in ('entero','flotante'):
-                        errores.append(Error(tk.linea, tk.columna,
-                                             f"asignación inválida: variable 'cadena' recibe expresión numérica", 'lexico'))
+                        errores.append(Error(tk.linea, tk.columna, 'T008', 'lexico'))
                 i = j
                 continue
             i += 1
+        return i
 
+    def pasada_operadores(self, tokens, errores, inicio=0, fin=None):
         # 4) Validar secuencias inválidas de operadores entre tokens
-        for idx in range(len(tokens)-1):
+        for idx in range(inicio, min(len(tokens) if fin is None else fin, len(tokens) - 1)):
             t1 = tokens[idx]
             t2 = tokens[idx+1]
             if t1.tipo == 'OPERADOR' and t2.tipo == 'OPERADOR':
                 if not (t1.valor == '!' and (t2.valor == '(' or t2.tipo in ('IDENTIFICADOR','LITERAL_ENTERO','LITERAL_FLOTANTE','LITERAL_CADENA'))):
-                    errores.append(Error(t2.linea, t2.columna,
-                                         f"secuencia inválida de operadores '{t1.valor}{t2.valor}'", 'lexico'))
-
-        return tokens, errores
-    
+                    errores.append(Error(t2.linea, t2.columna, 'L008', 'lexico', t1.valor, t2.valor))
+
+
+def _tramo(tokens, inicio, fin):
+    """tokens[inicio:fin] para recorrer (la misma lista si es completa, sin copiarla)."""
+    if not inicio and (fin is None or fin >= len(tokens)):
+        return tokens
+    return tokens[inicio:fin]
+
+
+def _en_proceso_hijo(funcion):
+    """Corre funcion() en un proceso hijo (fork: comparte los tokens sin copiarlos ni serializarlos)."""
+    lectura, escritura = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        codigo = 1
+        try:
+            os.close(lectura)
+            with os.fdopen(escritura, 'wb') as f:
+                pickle.dump(funcion(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            codigo = 0
+        finally:
+            os._exit(codigo)
+    os.close(escritura)
+    return pid, lectura
+
+
+def _resultado_hijo(pid, lectura):
+    """Lo que devolvió la función del hijo, o None si el hijo falló."""
+    try:
+        with os.fdopen(lectura, 'rb') as f:
+            return pickle.load(f)
+    except (EOFError, pickle.UnpicklingError):
+        return None
+    finally:
+        os.waitpid(pid, 0)
 
 
 class AnalizadorSintactico:
-    def __init__(self):
-        self.palabras_reservadas = {
-            'si', 'sino', 'mientras', 'para', 'entero', 'flotante', 
-            'cadena', 'retornar', 'funcion', 'verdadero', 'falso', 
-            'imprimir', 'leer'
-        }
-        self.estructuras_control = {'si', 'mientras', 'para'}
-        self.tipos_datos = {'entero', 'flotante', 'cadena'}
-        self.variables_declaradas = {}  # {nombre: (tipo, linea_declaracion)}
-        self.funciones_declaradas = {}
-        self.alcance_actual = []  # Stack de alcances
+    # Chequeos de analizar, en el orden en que reportan sus errores: (método, del que depende).
+    # Los de CON_CONTEXTO escriben en el ContextoAnalisis; los demás solo leen los tokens
+    CHEQUEOS = (
+        ('verificar_delimitadores', None),
+        ('recolectar_declaraciones', None),
+        ('verificar_uso_variables', 'recolectar_declaraciones'),
+        ('verificar_estructuras', None),
+        ('verificar_puntos_coma', None),
+    )
+    CON_CONTEXTO = frozenset({'recolectar_declaraciones', 'verificar_uso_variables'})
+    # Chequeos que aceptan un tramo de tokens (inicio, fin): sus errores dependen solo de
+    # los tokens cercanos, así se pueden correr por unidad (ver unidades.py)
+    POR_TRAMO = ('verificar_uso_variables', 'verificar_estructuras', 'verificar_puntos_coma')
+
+    def __init__(self, lenguaje=LENGUAJE_BASE, max_errores=None, recuperacion=False, procesos=1, memo=None):
+        self.lenguaje = lenguaje
+        self.max_errores = max_errores
+        self.recuperacion = recuperacion
+        # procesos > 1: los chequeos que solo leen tokens corren en procesos hijos (donde hay fork)
+        self.procesos = procesos if hasattr(os, 'fork') else 1
+        # MemoSentencias (sentencias.py) compartida entre análisis; con memo no se usan procesos
+        self.memo = memo
+        self.palabras_reservadas = lenguaje.palabras_reservadas
+        self.estructuras_control = lenguaje.estructuras_control
+        self.tipos_datos = lenguaje.tipos_datos
+        self.llamadas = lenguaje.llamadas
     
-    def analizar(self, tokens):
-        errores = []
-        tokens_sin_comentarios = [t for t in tokens if t.tipo != 'COMENTARIO']
-        
-        # Reiniciar estado
-        self.variables_declaradas = {}
-        self.funciones_declaradas = {}
-        self.alcance_actual = []
-        
-        # 1. Verificar delimitadores balanceados
-        errores.extend(self.verificar_delimitadores(tokens_sin_comentarios))
-        
-        # 2. Primera pasada: recolectar declaraciones
-        errores.extend(self.recolectar_declaraciones(tokens_sin_comentarios))
-        
-        # 3. Segunda pasada: verificar uso de variables
-        errores.extend(self.verificar_uso_variables(tokens_sin_comentarios))
-        
-        # 4. Verificar estructuras de control
-        errores.extend(self.verificar_estructuras(tokens_sin_comentarios))
-        
-        # 5. Verificar punto y coma
-        errores.extend(self.verificar_puntos_coma(tokens_sin_comentarios))
+    def analizar(self, tokens, contexto=None):
+        tokens_sin_comentarios = sin_comentarios(tokens)
+        
+        # Estado propio de esta ejecución
+        if contexto is None:
+            contexto = ContextoAnalisis()
+        errores = RecolectorErrores(contexto, self.max_errores, self.recuperacion)
+        errores.sincronizar(tokens_sin_comentarios)
+        
+        try:
+            if self.memo is not None:
+                self.memo.chequeos_sintactico(self, tokens_sin_comentarios, contexto, errores)
+            elif self.procesos > 1:
+                self._chequear_en_procesos(tokens_sin_comentarios, contexto, errores)
+            else:
+                for nombre in self.orden_chequeos():
+                    self._chequear(nombre, tokens_sin_comentarios, contexto, errores)
+        except LimiteErrores:
+            pass
         
         return errores
     
-    def recolectar_declaraciones(self, tokens):
+    def orden_chequeos(self):
+        """Nombres de los chequeos en el orden de sus errores (cada uno después del que depende)."""
+        orden = [nombre for nombre, _ in self.CHEQUEOS]
+        # En modo recuperación los errores estructurales (causa) van antes que los de
+        # uso de variables, que suelen ser consecuencia de una sentencia mal cerrada
+        if self.recuperacion:
+            orden.remove('verificar_uso_variables')
+            orden.append('verificar_uso_variables')
+        return orden
+    
+    def _chequear(self, nombre, tokens, contexto, errores):
+        if nombre in self.CON_CONTEXTO:
+            getattr(self, nombre)(tokens, contexto, errores)
+        else:
+            getattr(self, nombre)(tokens, errores)
+    
+    def _chequear_en_procesos(self, tokens, contexto, errores):
+        """
+        Los chequeos que solo leen tokens (y de los que nadie depende) se reparten entre
+        procesos hijos; los que usan el contexto corren acá mientras tanto. Cada chequeo
+        junta sus errores aparte y al final se pasan al recolector en orden_chequeos(),
+        así el resultado (tope, errores derivados omitidos) es el mismo que en secuencia.
+        """
+        orden = self.orden_chequeos()
+        dependencias = {dep for _, dep in self.CHEQUEOS if dep}
+        remotos = [n for n in orden if n not in self.CON_CONTEXTO and n not in dependencias]
+        grupos = [remotos[k::self.procesos - 1] for k in range(min(self.procesos - 1, len(remotos)))]
+        
+        def correr(nombres):
+            encontrados = {}
+            for nombre in nombres:
+                encontrados[nombre] = []
+                self._chequear(nombre, tokens, contexto, encontrados[nombre])
+            return encontrados
+        
+        # Los objetos ya creados no los recorre el recolector de ciclos de los hijos
+        # (si no, cada hijo tocaría y copiaría todas las páginas de los tokens)
+        gc.freeze()
+        try:
+            hijos = [(grupo, _en_proceso_hijo(lambda grupo=grupo: correr(grupo))) for grupo in grupos]
+        finally:
+            gc.unfreeze()
+        resultados = correr([n for n in orden if n not in remotos])
+        for grupo, (pid, lectura) in hijos:
+            recibido = _resultado_hijo(pid, lectura)
+            resultados.update(recibido if recibido is not None else correr(grupo))
+        
+        for nombre in orden:
+            for error in resultados[nombre]:
+                errores.append(error)
+    
+    def recolectar_declaraciones(self, tokens, contexto, errores=None):
         """Primera pasada: recolectar todas las declaraciones de variables"""
-        errores = []
-        i = 0
+        if errores is None:
+            errores = []
+        self.registrar_declaraciones(self.declaraciones(tokens), contexto, errores)
+        return errores
+    
+    def declaraciones(self, tokens, inicio=0, fin=None, base=0):
+        """
+        Declaraciones de tokens[inicio:fin], en orden, como (clase, texto, dato, linea, columna):
+        ('variable', nombre, tipo, ...), ('funcion', nombre, None, ...), ('importacion', ruta,
+        None, ...) y ('error', código, argumentos, ...) para las mal formadas. Las líneas
+        quedan restadas de 'base'.
+        No miran el contexto: las repetidas se detectan en registrar_declaraciones.
+        """
+        declaraciones = []
+        agregar = declaraciones.append
+        tlen = len(tokens)
+        fin = tlen if fin is None else fin
+        i = inicio
         
-        while i < len(tokens):
+        while i < fin:
             token = tokens[i]
             
             # Declaración de variable: tipo identificador
-            if token.tipo == 'PALABRA_RESERVADA' and token.valor in self.tipos_datos:
-                if i + 1 < len(tokens) and tokens[i + 1].tipo == 'IDENTIFICADOR':
-                    var_nombre = tokens[i + 1].valor
-                    var_tipo = token.valor
-                    
-                    # Verificar si ya fue declarada
-                    if var_nombre in self.variables_declaradas:
-                        errores.append(Error(tokens[i + 1].linea, tokens[i + 1].columna,
-                                           f"variable '{var_nombre}' ya declarada en línea {self.variables_declaradas[var_nombre][1]}", 
-                                           'semantico'))
-                    else:
-                        self.variables_declaradas[var_nombre] = (var_tipo, tokens[i + 1].linea)
+            if token.clave in self.tipos_datos:
+                if i + 1 < tlen and tokens[i + 1].tipo == 'IDENTIFICADOR':
+                    nombre = tokens[i + 1]
+                    agregar(('variable', nombre.valor, token.clave, nombre.linea - base, nombre.columna))
                     
                     # Verificar punto y coma o asignación
-                    if i + 2 < len(tokens):
+                    if i + 2 < tlen:
                         if tokens[i + 2].valor == ';':
                             i += 3
                             continue
@@ -642,112 +1021,167 @@ class AnalizadorSintactico:
                             i += 3
                             continue
                     
-                    errores.append(Error(tokens[i + 1].linea, tokens[i + 1].columna,
-                                       "declaración incompleta o sin ';'", 'sintactico'))
+                    agregar(('error', 'S001', (), nombre.linea - base, nombre.columna))
                     i += 2
                     continue
                 else:
-                    errores.append(Error(token.linea, token.columna,
-                                       f"se esperaba identificador después de '{token.valor}'", 'sintactico'))
+                    agregar(('error', 'T005', (token.valor,), token.linea - base, token.columna))
             
             # Declaración de función
-            elif token.tipo == 'PALABRA_RESERVADA' and token.valor == 'funcion':
-                if i + 1 < len(tokens) and tokens[i + 1].tipo == 'IDENTIFICADOR':
-                    func_nombre = tokens[i + 1].valor
-                    if func_nombre in self.funciones_declaradas:
-                        errores.append(Error(tokens[i + 1].linea, tokens[i + 1].columna,
-                                           f"función '{func_nombre}' ya declarada", 'semantico'))
-                    else:
-                        self.funciones_declaradas[func_nombre] = tokens[i + 1].linea
+            elif token.clave == 'funcion':
+                if i + 1 < tlen and tokens[i + 1].tipo == 'IDENTIFICADOR':
+                    nombre = tokens[i + 1]
+                    agregar(('funcion', nombre.valor, None, nombre.linea - base, nombre.columna))
+            
+            # importar "ruta"; (la resuelve modulos.Proyecto)
+            elif token.clave == 'importar':
+                if i + 2 < tlen and tokens[i + 1].tipo == 'LITERAL_CADENA' and tokens[i + 2].valor == ';':
+                    agregar(('importacion', tokens[i + 1].valor[1:-1], None, token.linea - base, token.columna))
+                else:
+                    agregar(('error', 'M001', (token.valor,), token.linea - base, token.columna))
             
             i += 1
         
-        return errores
+        return declaraciones
     
-    def verificar_uso_variables(self, tokens):
+    def registrar_declaraciones(self, declaraciones, contexto, errores, base=0):
+        """Pasa al contexto el resultado de declaraciones(); las repetidas son errores."""
+        variables_declaradas = contexto.variables_declaradas
+        funciones_declaradas = contexto.funciones_declaradas
+        for clase, texto, dato, linea, columna in declaraciones:
+            linea += base
+            if clase == 'variable':
+                # Verificar si ya fue declarada
+                if texto in variables_declaradas:
+                    errores.append(Error(linea, columna, 'T001', 'semantico',
+                                         texto, variables_declaradas[texto][1]))
+                else:
+                    variables_declaradas[texto] = (dato, linea)
+            elif clase == 'funcion':
+                if texto in funciones_declaradas:
+                    errores.append(Error(linea, columna, 'T012', 'semantico', texto))
+                else:
+                    funciones_declaradas[texto] = linea
+            elif clase == 'importacion':
+                if not contexto.importaciones_resueltas:
+                    errores.append(Error(linea, columna, 'M005', 'modulo', texto))
+            else:
+                errores.append(Error(linea, columna, texto, 'sintactico', *dato))
+    
+    def verificar_uso_variables(self, tokens, contexto, errores=None, inicio=0, fin=None):
         """Verificar que las variables se usen después de declararse"""
-        errores = []
-        i = 0
-        
-        while i < len(tokens):
-            token = tokens[i]
-            
+        if errores is None:
+            errores = []
+        variables_declaradas = contexto.variables_declaradas
+        funciones_declaradas = contexto.funciones_declaradas
+        usos_variables = contexto.usos_variables
+        anterior = tokens[inicio - 1] if inicio else None
+        
+        for token in _tramo(tokens, inicio, fin):
             # Si encontramos un identificador
             if token.tipo == 'IDENTIFICADOR':
                 # Verificar contexto para determinar si es uso o declaración
                 es_declaracion = False
                 
                 # Caso 1: Es una declaración (tipo identificador)
-                if i > 0 and tokens[i - 1].tipo == 'PALABRA_RESERVADA' and tokens[i - 1].valor in self.tipos_datos:
+                if anterior is not None and anterior.clave in self.tipos_datos:
                     es_declaracion = True
                 
                 # Caso 2: Es una declaración de función
-                if i > 0 and tokens[i - 1].tipo == 'PALABRA_RESERVADA' and tokens[i - 1].valor == 'funcion':
+                if anterior is not None and anterior.clave == 'funcion':
+                    es_declaracion = True
+                
+                # Caso 3: la ruta mal escrita de un 'importar' (ya es el error M001)
+                if anterior is not None and anterior.clave == 'importar':
                     es_declaracion = True
                 
                 # Si NO es declaración, verificar que exista
                 if not es_declaracion:
-                    if token.valor not in self.variables_declaradas and token.valor not in self.funciones_declaradas:
-                        errores.append(Error(token.linea, token.columna,
-                                           f"variable o función '{token.valor}' no declarada", 'semantico'))
+                    if token.valor in variables_declaradas:
+                        usos_variables[token.valor] = usos_variables.get(token.valor, 0) + 1
+                    elif token.valor not in funciones_declaradas:
+                        errores.append(Error(token.linea, token.columna, 'T013', 'semantico', token.valor))
             
-            i += 1
+            anterior = token
         
         return errores
     
-    def verificar_delimitadores(self, tokens):
-        errores = []
+    def verificar_delimitadores(self, tokens, errores=None):
+        if errores is None:
+            errores = []
+        self.unir_delimitadores([self.balance_delimitadores(tokens)], errores)
+        return errores
+    
+    def balance_delimitadores(self, tokens, inicio=0, fin=None, base=0):
+        """
+        (cierres sin apertura, '(' sin cerrar, '{' sin cerrar) de tokens[inicio:fin], cada uno
+        una lista de (valor, linea, columna) con la línea restada de 'base'. Con los balances
+        de tramos consecutivos, unir_delimitadores da los errores del texto completo.
+        """
+        sin_apertura = []
         pila_parentesis = []
         pila_llaves = []
         
-        for token in tokens:
+        for token in _tramo(tokens, inicio, fin):
             if token.tipo == 'DELIMITADOR':
-                if token.valor == '(':
-                    pila_parentesis.append(token)
-                elif token.valor == ')':
+                valor = token.valor
+                if valor == '(':
+                    pila_parentesis.append((valor, token.linea - base, token.columna))
+                elif valor == ')':
                     if not pila_parentesis:
-                        errores.append(Error(token.linea, token.columna,
-                                           "')' sin '(' correspondiente", 'sintactico'))
+                        sin_apertura.append((valor, token.linea - base, token.columna))
                     else:
                         pila_parentesis.pop()
-                elif token.valor == '{':
-                    pila_llaves.append(token)
-                elif token.valor == '}':
+                elif valor == '{':
+                    pila_llaves.append((valor, token.linea - base, token.columna))
+                elif valor == '}':
                     if not pila_llaves:
-                        errores.append(Error(token.linea, token.columna,
-                                           "'}' sin '{' correspondiente", 'sintactico'))
+                        sin_apertura.append((valor, token.linea - base, token.columna))
                     else:
                         pila_llaves.pop()
         
-        for token in pila_parentesis:
-            errores.append(Error(token.linea, token.columna,
-                               "'(' sin cerrar", 'sintactico'))
+        return sin_apertura, pila_parentesis, pila_llaves
+    
+    def unir_delimitadores(self, balances, errores, bases=None):
+        """Errores de delimitadores de los tramos (balance, línea base) en orden."""
+        pila_parentesis = []
+        pila_llaves = []
+        
+        for k, (sin_apertura, parentesis, llaves) in enumerate(balances):
+            base = bases[k] if bases else 0
+            for valor, linea, columna in sin_apertura:
+                pila = pila_parentesis if valor == ')' else pila_llaves
+                if pila:
+                    pila.pop()
+                else:
+                    errores.append(Error(linea + base, columna, 'S002', 'sintactico',
+                                         valor, '(' if valor == ')' else '{'))
+            pila_parentesis.extend((linea + base, columna) for _, linea, columna in parentesis)
+            pila_llaves.extend((linea + base, columna) for _, linea, columna in llaves)
         
-        for token in pila_llaves:
-            errores.append(Error(token.linea, token.columna,
-                               "'{' sin cerrar", 'sintactico'))
+        for linea, columna in pila_parentesis:
+            errores.append(Error(linea, columna, 'S003', 'sintactico', '('))
         
-        return errores
+        for linea, columna in pila_llaves:
+            errores.append(Error(linea, columna, 'S003', 'sintactico', '{'))
     
-    def verificar_estructuras(self, tokens):
-        errores = []
-        i = 0
+    def verificar_estructuras(self, tokens, errores=None, inicio=0, fin=None):
+        if errores is None:
+            errores = []
+        tlen = len(tokens)
         
-        while i < len(tokens):
-            token = tokens[i]
-            
-            if token.tipo == 'PALABRA_RESERVADA' and token.valor in self.estructuras_control:
+        for i, token in enumerate(_tramo(tokens, inicio, fin), inicio):
+            if token.clave in self.estructuras_control:
                 # Debe seguir '('
-                if i + 1 >= len(tokens) or tokens[i + 1].valor != '(':
-                    errores.append(Error(token.linea, token.columna,
-                                       f"se esperaba '(' después de '{token.valor}'", 'sintactico'))
+                if i + 1 >= tlen or tokens[i + 1].valor != '(':
+                    errores.append(Error(token.linea, token.columna, 'E007', 'sintactico', token.valor))
                 else:
                     # Buscar ')' y verificar '{'
                     nivel = 0
                     j = i + 1
                     pos_cierre = -1
                     
-                    while j < len(tokens):
+                    while j < tlen:
                         if tokens[j].valor == '(':
                             nivel += 1
                         elif tokens[j].valor == ')':
@@ -757,30 +1191,34 @@ class AnalizadorSintactico:
                                 break
                         j += 1
                     
-                    if pos_cierre != -1 and pos_cierre + 1 < len(tokens):
+                    if pos_cierre != -1 and pos_cierre + 1 < tlen:
                         if tokens[pos_cierre + 1].valor != '{':
-                            errores.append(Error(tokens[pos_cierre].linea, 
-                                               tokens[pos_cierre].columna,
-                                               f"se esperaba '{{' después de ')'", 'sintactico'))
-            i += 1
+                            errores.append(Error(tokens[pos_cierre].linea, tokens[pos_cierre].columna,
+                                                 'E008', 'sintactico'))
         
         return errores
     
-    def verificar_puntos_coma(self, tokens):
-        errores = []
-        i = 0
-        
-        while i < len(tokens):
-            token = tokens[i]
+    def verificar_puntos_coma(self, tokens, errores=None, inicio=0, fin=None):
+        if errores is None:
+            errores = []
+        tlen = len(tokens)
+        ultimo_para = -100  # posición del último 'para' visto
+        for k in range(max(inicio - 15, 0), inicio):
+            if tokens[k].clave == 'para':
+                ultimo_para = k
+        
+        for i, token in enumerate(_tramo(tokens, inicio, fin), inicio):
+            if token.clave == 'para':
+                ultimo_para = i
             
             # Declaraciones de variables
-            if token.tipo == 'PALABRA_RESERVADA' and token.valor in self.tipos_datos:
-                if i + 1 < len(tokens) and tokens[i + 1].tipo == 'IDENTIFICADOR':
+            if token.clave in self.tipos_datos:
+                if i + 1 < tlen and tokens[i + 1].tipo == 'IDENTIFICADOR':
                     # Buscar ; después de la declaración
                     j = i + 2
                     encontrado_puntocoma = False
                     
-                    while j < len(tokens) and j < i + 20:
+                    while j < tlen and j < i + 20:
                         if tokens[j].valor == ';':
                             encontrado_puntocoma = True
                             break
@@ -789,24 +1227,19 @@ class AnalizadorSintactico:
                         j += 1
                     
                     if not encontrado_puntocoma:
-                        errores.append(Error(tokens[i + 1].linea, tokens[i + 1].columna,
-                                           "falta ';' al final de la declaración", 'sintactico'))
+                        errores.append(Error(tokens[i + 1].linea, tokens[i + 1].columna, 'S004', 'sintactico'))
             
             # Asignaciones
-            if token.tipo == 'IDENTIFICADOR' and i + 1 < len(tokens):
+            if token.tipo == 'IDENTIFICADOR' and i + 1 < tlen:
                 if tokens[i + 1].tipo == 'OPERADOR' and tokens[i + 1].valor == '=':
-                    # Verificar si está en un for
-                    es_for = False
-                    for k in range(max(0, i - 15), i):
-                        if tokens[k].tipo == 'PALABRA_RESERVADA' and tokens[k].valor == 'para':
-                            es_for = True
-                            break
+                    # Verificar si está en un for (un 'para' en los 15 tokens anteriores)
+                    es_for = i - ultimo_para <= 15
                     
                     if not es_for:
                         j = i + 2
                         encontrado_puntocoma = False
                         
-                        while j < len(tokens) and j < i + 20:
+                        while j < tlen and j < i + 20:
                             if tokens[j].valor == ';':
                                 encontrado_puntocoma = True
                                 break
@@ -817,46 +1250,83 @@ class AnalizadorSintactico:
                             j += 1
                         
                         if not encontrado_puntocoma:
-                            errores.append(Error(token.linea, token.columna,
-                                               "falta ';' después de la asignación", 'sintactico'))
+                            errores.append(Error(token.linea, token.columna, 'S005', 'sintactico'))
             
             # Llamadas a funciones (imprimir, leer)
-            if token.tipo == 'PALABRA_RESERVADA' and token.valor in ['imprimir', 'leer']:
+            if token.clave in self.llamadas:
                 nivel = 0
                 j = i
                 encontrado_puntocoma = False
                 
-                while j < len(tokens) and j < i + 30:
+                while j < tlen and j < i + 30:
                     if tokens[j].valor == '(':
                         nivel += 1
                     elif tokens[j].valor == ')':
                         nivel -= 1
-                        if nivel == 0 and j + 1 < len(tokens):
+                        if nivel == 0 and j + 1 < tlen:
                             if tokens[j + 1].valor == ';':
                                 encontrado_puntocoma = True
                             break
                     j += 1
                 
                 if nivel == 0 and not encontrado_puntocoma:
-                    errores.append(Error(token.linea, token.columna,
-                                       f"falta ';' después de '{token.valor}()'", 'sintactico'))
-            
-            i += 1
+                    errores.append(Error(token.linea, token.columna, 'S006', 'sintactico', token.valor))
         
         return errores
 
 
 # Interfaz gráfica
+# Tope de errores por analizador en el editor (con recuperación de errores activada)
+MAX_ERRORES_GUI = 200
+# Después de una edición se espera esto (ms) antes de analizar, así una ráfaga de teclas
+# cuesta un solo análisis
+ESPERA_ANALISIS_MS = 150
+# Caracteres de identificador escritos seguidos a partir de los cuales se abre solo el
+# completado (con Ctrl+Espacio se abre siempre)
+MIN_PREFIJO_COMPLETADO = 2
+# Modo archivo grande (ver archivo_grande.py): líneas que tiene cargadas el editor, cada
+# cuánto (ms) se consulta el progreso del análisis y renglones por página de los paneles
+VENTANA_LINEAS = 400
+ESPERA_PROGRESO_MS = 200
+PAGINA_ERRORES = 100
+PAGINA_TOKENS = 500
+
 class AnalizadorApp:
-    def __init__(self, root):
+    def __init__(self, root, lenguaje=LENGUAJE_BASE):
         self.root = root
+        self.lenguaje = lenguaje
         self.root.title("Analizador Léxico y Sintáctico")
         self.root.geometry("1400x800")
         
+        # import local: unidades.py usa las clases de este módulo
+        from unidades import AnalizadorUnidades
+        
+        # Analizadores reutilizables (sin estado por ejecución); el sintáctico guarda lo
+        # analizado de cada función, así al editar una solo se vuelve a chequear esa
+        self.analizador_lexico = AnalizadorLexico(lenguaje, MAX_ERRORES_GUI, recuperacion=True)
+        self.analizador_sintactico = AnalizadorUnidades(lenguaje, MAX_ERRORES_GUI, recuperacion=True)
+        
         # Variables
         self.tokens = []
         self.errores_lexicos = []
         self.errores_sintacticos = []
+        self.advertencias_flujo = []
+        self.lineas = None
+        # Copia del contenido del editor, al día con cada insert/delete de Tk (ver _espejar_editor)
+        self.documento = Documento('\n')
+        self._analisis_pendiente = None
+        # Palabras reservadas y nombres declarados en el último análisis, para completar
+        self.completado = TrieNombres(lenguaje.palabras_reservadas)
+        self._sugerencias = []  # nombres de la lista de completado abierta
+        # Modo archivo grande: el archivo y su análisis, la primera línea y la cantidad de
+        # líneas que tiene cargadas el editor, y la página que muestra cada panel
+        self.grande = None
+        self.analisis_grande = None
+        self._ventana = 1
+        self._cargadas = 1
+        self._recentrar = None
+        self._seguimiento = None
+        self._paginas = {'errores': 0, 'tokens': 0}
         
         self.setup_ui()
         
@@ -869,7 +1339,7 @@ class AnalizadorApp:
                               font=("Arial", 24, "bold"), bg="#2563eb", fg="white")
         title_label.pack(pady=10)
         
-        subtitle = tk.Label(header, text="Lenguaje de Programación Proyecto Autómatas",
+        subtitle = tk.Label(header, text=self.lenguaje.nombre,
                            font=("Arial", 12), bg="#2563eb", fg="white")
         subtitle.pack()
         
@@ -913,7 +1383,22 @@ class AnalizadorApp:
                                                bg="#1e293b", fg="#10b981",
                                                insertbackground="white")
         self.editor.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        self.editor.bind('<KeyRelease>', lambda e: self.analizar_codigo())
+        self._espejar_editor()
+        self.editor.tag_config("error_actual", background="#7f1d1d", underline=True)
+        
+        # Lista de completado, sobre el editor debajo del cursor (ver mostrar_completado)
+        self.lista_completado = tk.Listbox(self.editor, height=8, font=("Consolas", 10),
+                                           bg="#0f172a", fg="#e2e8f0", selectbackground="#2563eb",
+                                           activestyle="none", exportselection=False)
+        self.lista_completado.bind("<ButtonRelease-1>", lambda e: self.aceptar_completado())
+        self.editor.bind("<Control-space>", lambda e: self.mostrar_completado(True) or "break")
+        self.editor.bind("<Escape>", lambda e: self._tecla_completado(self.cerrar_completado))
+        self.editor.bind("<Up>", lambda e: self._tecla_completado(self._mover_sugerencia, -1))
+        self.editor.bind("<Down>", lambda e: self._tecla_completado(self._mover_sugerencia, 1))
+        self.editor.bind("<Return>", lambda e: self._tecla_completado(self.aceptar_completado))
+        self.editor.bind("<Tab>", lambda e: self._tecla_completado(self.aceptar_completado))
+        for evento in ("<Button-1>", "<Left>", "<Right>"):
+            self.editor.bind(evento, lambda e: self.cerrar_completado(), add="+")
         
         # Panel de análisis
         analisis_frame = tk.LabelFrame(main_panel, text="Análisis",
@@ -921,8 +1406,9 @@ class AnalizadorApp:
         analisis_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5)
         
         # Notebook para tabs
-        notebook = ttk.Notebook(analisis_frame)
+        notebook = self.notebook = ttk.Notebook(analisis_frame)
         notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        notebook.bind("<<NotebookTabChanged>>", lambda e: self._mostrar_paginas())
         
         # Tab Errores
         errores_frame = tk.Frame(notebook)
@@ -952,6 +1438,15 @@ class AnalizadorApp:
         self.ref_text.pack(fill=tk.BOTH, expand=True)
         self.mostrar_referencia()
         
+        # Páginas de errores y tokens, solo en modo archivo grande (ver abrir_grande)
+        self.paginas_frame = tk.Frame(analisis_frame)
+        tk.Button(self.paginas_frame, text="◀", command=lambda: self.cambiar_pagina(-1),
+                 font=("Arial", 10), padx=10).pack(side=tk.LEFT)
+        tk.Button(self.paginas_frame, text="▶", command=lambda: self.cambiar_pagina(1),
+                 font=("Arial", 10), padx=10).pack(side=tk.RIGHT)
+        self.pagina_label = tk.Label(self.paginas_frame, text="", font=("Arial", 10))
+        self.pagina_label.pack(expand=True)
+        
         # Label de conteo
         self.token_count_label = tk.Label(analisis_frame, text="Total de tokens: 0",
                                          font=("Arial", 10, "bold"))
@@ -962,24 +1457,7 @@ class AnalizadorApp:
 
           ALFABETO DEL LENGUAJE FORMAL                
 
- PALABRAS RESERVADAS (solo estas son válidas):
-   • si, sino, mientras, para
-   • entero, flotante, cadena
-   • retornar, funcion
-   • verdadero, falso
-   • imprimir, leer
-
- OPERADORES:
-   • Aritméticos: +, -, *, /, %
-   • Relacionales: ==, !=, <, >, <=, >=
-   • Lógicos: &&, ||, !
-   • Asignación: =
-
- DELIMITADORES:
-   • Paréntesis: ( )
-   • Llaves: { }
-   • Punto y coma: ;
-   • Coma: ,
+""" + self.lenguaje.referencia() + """
 
  IDENTIFICADORES:
    • Inician con letra o guión bajo
@@ -1005,25 +1483,219 @@ class AnalizadorApp:
         self.ref_text.insert(1.0, referencia)
         self.ref_text.config(state=tk.DISABLED)
     
+    def _espejar_editor(self):
+        """
+        Pasa los comandos del widget del editor por _comando_editor: se renombra el comando
+        Tcl del widget y en su lugar queda uno de Python (como el redirector de IDLE). Así
+        cada insert/delete/replace, venga del teclado, de pegar o del código, se aplica
+        también a self.documento sin volver a leer el texto completo con get().
+        """
+        self._editor_tcl = self.editor._w + "_original"
+        self.root.tk.call("rename", self.editor._w, self._editor_tcl)
+        self.root.tk.createcommand(self.editor._w, self._comando_editor)
+    
+    def _comando_editor(self, *args):
+        llamar = self.root.tk.call
+        operacion = args[0] if args else None
+        if operacion not in ("insert", "delete", "replace") or self.grande is not None:
+            # en modo archivo grande el editor muestra una ventana del archivo: no se edita
+            return llamar((self._editor_tcl,) + args)
+        if (operacion == "insert" and len(args) >= 3 or operacion == "delete" and len(args) in (2, 3)
+                or operacion == "replace" and len(args) >= 4):
+            # Las posiciones se calculan antes de que Tk cambie el texto
+            posicion = lambda indice: self.documento.lineas.desde_tk(
+                llamar(self._editor_tcl, "index", indice))
+            if operacion == "insert":
+                borrado, desde, texto = None, posicion(args[1]), "".join(args[2::2])
+            elif operacion == "delete":
+                inicio = posicion(args[1])
+                fin = posicion(args[2]) if len(args) == 3 else inicio + 1
+                borrado, desde, texto = self._tramo_borrado(inicio, fin), None, ""
+            else:
+                inicio, fin = posicion(args[1]), posicion(args[2])
+                borrado, desde, texto = self._tramo_borrado(inicio, fin), inicio, "".join(args[3::2])
+            resultado = llamar((self._editor_tcl,) + args)
+            if borrado is not None and borrado[1] > borrado[0]:
+                self.documento.editar(borrado[0], borrado[1])
+            if texto:
+                # Tk no inserta después del salto de línea final, sino justo antes
+                desde = min(desde, len(self.documento) - 1)
+                self.documento.editar(desde, desde, texto)
+        else:  # forma poco común (delete con varios tramos): se vuelve a copiar el texto
+            resultado = llamar((self._editor_tcl,) + args)
+            self.documento = Documento(llamar(self._editor_tcl, "get", "1.0", "end"))
+            texto = ""
+        self._programar_analisis()
+        if self._sugerencias or len(texto) == 1 and _continua_palabra(texto):
+            # después de que la tecla termine de mover el cursor
+            self.root.after_idle(self.mostrar_completado)
+        return resultado
+    
+    def _tramo_borrado(self, inicio, fin):
+        """
+        Tramo que borra Tk al pedirle borrar [inicio, fin). El salto de línea final nunca
+        se borra: si el tramo lo incluye se corta antes, y si además empieza al comienzo de
+        una línea se corre un carácter hacia atrás (se borran líneas completas).
+        """
+        ultimo = len(self.documento) - 1
+        if fin > ultimo and inicio < fin:
+            fin = ultimo
+            if inicio and self.documento.lineas.posicion(inicio)[1] == 1:
+                inicio -= 1
+        return inicio, fin
+    
+    def _programar_analisis(self):
+        if self._analisis_pendiente is not None:
+            self.root.after_cancel(self._analisis_pendiente)
+        self._analisis_pendiente = self.root.after(ESPERA_ANALISIS_MS, self.analizar_codigo)
+    
+    def _prefijo_cursor(self):
+        """Parte del identificador que está antes del cursor (puede ser '')."""
+        linea, columna = map(int, self.editor.index(tk.INSERT).split('.'))
+        texto = self.documento.linea(linea)[:columna]
+        inicio = len(texto)
+        while inicio and _continua_palabra(texto[inicio - 1]):
+            inicio -= 1
+        return texto[inicio:]
+    
+    def mostrar_completado(self, pedido=False):
+        """
+        Abre (o actualiza) la lista de sugerencias para el identificador que se está
+        escribiendo. Solo consulta el árbol de nombres, no analiza nada: los nombres
+        declarados se actualizan al terminar cada análisis.
+        """
+        if self.grande is not None:  # no hay nombres: el archivo se analiza por tramos
+            return
+        prefijo = self._prefijo_cursor()
+        if prefijo and not _inicio_identificador(prefijo[0]):
+            prefijo = ''  # un número, no un identificador
+        if not pedido and not self._sugerencias and len(prefijo) < MIN_PREFIJO_COMPLETADO:
+            return
+        if not prefijo and not pedido:
+            self.cerrar_completado()
+            return
+        sugerencias = [s for s in self.completado.sugerencias(prefijo) if s[0] != prefijo or pedido]
+        if not sugerencias:
+            self.cerrar_completado()
+            return
+        lista = self.lista_completado
+        lista.delete(0, tk.END)
+        colores = {'reservada': "#c4b5fd", 'variable': "#67e8f9", 'funcion': "#fcd34d"}
+        for nombre, clase in sugerencias:
+            lista.insert(tk.END, f"{nombre}  ({clase})")
+            lista.itemconfig(tk.END, fg=colores.get(clase, "#e2e8f0"))
+        lista.selection_set(0)
+        self._sugerencias = [nombre for nombre, _ in sugerencias]
+        lugar = self.editor.bbox(f"{tk.INSERT} - {len(prefijo)} chars")
+        if lugar is not None:
+            x, y, _, alto = lugar
+            lista.configure(height=min(len(sugerencias), 8))
+            lista.place(x=x, y=y + alto)
+    
+    def cerrar_completado(self):
+        if self._sugerencias:
+            self._sugerencias = []
+            self.lista_completado.place_forget()
+    
+    def aceptar_completado(self):
+        """Reemplaza el prefijo escrito por la sugerencia elegida."""
+        elegidas = self.lista_completado.curselection()
+        if not self._sugerencias or not elegidas:
+            return
+        nombre = self._sugerencias[elegidas[0]]
+        prefijo = self._prefijo_cursor()
+        self.cerrar_completado()
+        self.editor.delete(f"{tk.INSERT} - {len(prefijo)} chars", tk.INSERT)
+        self.editor.insert(tk.INSERT, nombre)
+        self.editor.focus_set()
+    
+    def _mover_sugerencia(self, paso):
+        lista = self.lista_completado
+        actual = lista.curselection()
+        nueva = min(max((actual[0] if actual else 0) + paso, 0), len(self._sugerencias) - 1)
+        lista.selection_clear(0, tk.END)
+        lista.selection_set(nueva)
+        lista.see(nueva)
+    
+    def _tecla_completado(self, accion, *args):
+        """Las teclas de la lista solo se desvían mientras la lista está abierta."""
+        if not self._sugerencias:
+            return None
+        accion(*args)
+        return "break"
+    
     def analizar_codigo(self):
-        codigo = self.editor.get(1.0, tk.END)
+        if self._analisis_pendiente is not None:
+            self.root.after_cancel(self._analisis_pendiente)
+            self._analisis_pendiente = None
+        if self.grande is not None:  # lo analiza AnalisisPorTramos
+            return
+        codigo = self.documento.texto()
+        contexto = ContextoAnalisis()
         
         # Análisis léxico
-        analizador_lexico = AnalizadorLexico()
-        self.tokens, self.errores_lexicos = analizador_lexico.analizar(codigo)
+        self.tokens, self.errores_lexicos = self.analizador_lexico.analizar(codigo, contexto)
+        self.lineas = contexto.lineas
         
         # Análisis sintáctico y semántico
-        analizador_sintactico = AnalizadorSintactico()
-        self.errores_sintacticos = analizador_sintactico.analizar(self.tokens)
+        self.errores_sintacticos = self.analizador_sintactico.analizar(self.tokens, contexto)
+        
+        # Análisis de flujo (solo si el código no tiene errores)
+        self.advertencias_flujo = []
+        if not self.errores_lexicos and not self.errores_sintacticos:
+            self.advertencias_flujo = self.analizar_flujo(contexto)
+        
+        self.completado.actualizar('variable', contexto.variables_declaradas)
+        self.completado.actualizar('funcion', contexto.funciones_declaradas)
         
         # Actualizar interfaz
         self.actualizar_tokens()
         self.actualizar_errores()
         self.actualizar_status()
     
+    def ir_a(self, linea, columna):
+        """Lleva el cursor del editor a (linea, columna) y marca la palabra que empieza ahí."""
+        if self.grande is not None:
+            if not self._ventana <= linea < self._ventana + self._cargadas:
+                self._mostrar_linea_grande(linea)
+            inicio = f"{linea - self._ventana + 1}.{max(columna - 1, 0)}"
+        else:
+            try:
+                inicio = self.lineas.indice_tk(self.lineas.desplazamiento(linea, columna))
+            except (AttributeError, IndexError):  # sin análisis todavía, o error sin ubicación
+                return
+        self.editor.tag_remove("error_actual", 1.0, tk.END)
+        self.editor.tag_add("error_actual", inicio, f"{inicio} wordend")
+        self.editor.mark_set(tk.INSERT, inicio)
+        self.editor.see(inicio)
+        self.editor.focus_set()
+    
+    def _insertar_ubicacion(self, n, item):
+        """Línea '📍 Línea X, Columna Y' del panel de errores; con un clic se va a esa posición."""
+        tag = f"ir_{n}"
+        self.errores_text.insert(tk.END, f"📍 Línea {item.linea}, Columna {item.columna}\n",
+                                 ("ubicacion", tag))
+        self.errores_text.tag_bind(tag, "<Button-1>",
+                                   lambda e, l=item.linea, c=item.columna: self.ir_a(l, c))
+    
+    def analizar_flujo(self, contexto):
+        # import local: flujo.py usa la clase Error de este módulo
+        from arbol import ErrorCompilacion
+        from flujo import analizar_flujo
+        try:
+            return analizar_flujo(self.tokens, contexto)
+        except ErrorCompilacion:
+            return []
+    
     def actualizar_tokens(self):
         self.tokens_text.delete(1.0, tk.END)
+        self._estilos_tokens()
+        for i, token in enumerate(self.tokens, 1):
+            self._insertar_token(i, token)
         
+        self.token_count_label.config(text=f"Total de tokens: {len(self.tokens)}")
+    
+    def _estilos_tokens(self):
         # Configurar tags para colores según tipo de token
         self.tokens_text.tag_config("comentario", foreground="#059669", font=("Consolas", 9, "italic"))
         self.tokens_text.tag_config("palabra_reservada", foreground="#7c3aed", font=("Consolas", 9, "bold"))
@@ -1034,33 +1706,26 @@ class AnalizadorApp:
         self.tokens_text.tag_config("operador", foreground="#059669", font=("Consolas", 9, "bold"))
         self.tokens_text.tag_config("delimitador", foreground="#ea580c", font=("Consolas", 9, "bold"))
         self.tokens_text.tag_config("numero", foreground="#6b7280", font=("Consolas", 9))
+    
+    def _insertar_token(self, i, token):
+        # Número de línea
+        self.tokens_text.insert(tk.END, f"{i}:{token.linea}  ", "numero")
         
-        for i, token in enumerate(self.tokens, 1):
-            # Número de línea
-            self.tokens_text.insert(tk.END, f"{i}:{token.linea}  ", "numero")
-            
-            # Tipo de token entre corchetes con color
-            tipo_tag = token.tipo.lower()
-            self.tokens_text.insert(tk.END, f"[{token.tipo}]", tipo_tag)
-            
-            # Espaciado
-            espacios = " " * (25 - len(token.tipo))
-            self.tokens_text.insert(tk.END, espacios)
-            
-            # Valor del token
-            self.tokens_text.insert(tk.END, f"{token.valor}\n", tipo_tag)
+        # Tipo de token entre corchetes con color
+        tipo_tag = token.tipo.lower()
+        self.tokens_text.insert(tk.END, f"[{token.tipo}]", tipo_tag)
         
-        self.token_count_label.config(text=f"Total de tokens: {len(self.tokens)}")
+        # Espaciado
+        espacios = " " * (25 - len(token.tipo))
+        self.tokens_text.insert(tk.END, espacios)
+        
+        # Valor del token
+        self.tokens_text.insert(tk.END, f"{token.valor}\n", tipo_tag)
     
     def actualizar_errores(self):
         self.errores_text.delete(1.0, tk.END)
-        
-        # Configurar tags para colores
-        self.errores_text.tag_config("titulo_lexico", foreground="#dc2626", font=("Arial", 11, "bold"))
-        self.errores_text.tag_config("titulo_sintactico", foreground="#ea580c", font=("Arial", 11, "bold"))
-        self.errores_text.tag_config("error_num", foreground="#000000", font=("Arial", 10, "bold"))
-        self.errores_text.tag_config("ubicacion", foreground="#dc2626", font=("Arial", 10, "bold"))
-        self.errores_text.tag_config("mensaje", foreground="#000000", font=("Arial", 10))
+        self.editor.tag_remove("error_actual", 1.0, tk.END)
+        self._estilos_errores()
         
         if not self.errores_lexicos and not self.errores_sintacticos:
             self.errores_text.insert(tk.END, "✅ ¡Código correcto! No se encontraron errores.\n\n")
@@ -1069,6 +1734,12 @@ class AnalizadorApp:
             self.errores_text.insert(tk.END, "  • Variables declaradas antes de usarse\n")
             self.errores_text.insert(tk.END, "  • Sintaxis correcta\n")
             self.errores_text.insert(tk.END, "  • Delimitadores balanceados\n")
+            if self.advertencias_flujo:
+                self.errores_text.insert(tk.END, "\n💡 ADVERTENCIAS DE FLUJO:\n\n", "titulo_sintactico")
+                for i, advertencia in enumerate(self.advertencias_flujo, 1):
+                    self.errores_text.insert(tk.END, f"Advertencia {i}:\n", "error_num")
+                    self._insertar_ubicacion(f"a{i}", advertencia)
+                    self.errores_text.insert(tk.END, f"{advertencia.mensaje}\n\n", "mensaje")
             return
         
         # ERRORES LÉXICOS
@@ -1079,7 +1750,7 @@ class AnalizadorApp:
                 # Error N:
                 self.errores_text.insert(tk.END, f"Error {i}:\n", "error_num")
                 # 📍 Línea X, Columna Y
-                self.errores_text.insert(tk.END, f"📍 Línea {error.linea}, Columna {error.columna}\n", "ubicacion")
+                self._insertar_ubicacion(f"l{i}", error)
                 # Mensaje del error
                 self.errores_text.insert(tk.END, f"{error.mensaje}\n\n", "mensaje")
         
@@ -1091,9 +1762,24 @@ class AnalizadorApp:
                 # Error N:
                 self.errores_text.insert(tk.END, f"Error {i}:\n", "error_num")
                 # 📍 Línea X, Columna Y
-                self.errores_text.insert(tk.END, f"📍 Línea {error.linea}, Columna {error.columna}\n", "ubicacion")
+                self._insertar_ubicacion(f"s{i}", error)
                 # Mensaje del error
                 self.errores_text.insert(tk.END, f"{error.mensaje}\n\n", "mensaje")
+        
+        # Recuperación de errores: derivados omitidos y análisis detenido por el tope
+        suprimidos = getattr(self.errores_lexicos, 'suprimidos', 0) + getattr(self.errores_sintacticos, 'suprimidos', 0)
+        if suprimidos:
+            self.errores_text.insert(tk.END, f"({suprimidos} errores derivados omitidos)\n", "mensaje")
+        if getattr(self.errores_lexicos, 'truncado', False) or getattr(self.errores_sintacticos, 'truncado', False):
+            self.errores_text.insert(tk.END, f"Análisis detenido al alcanzar {MAX_ERRORES_GUI} errores.\n", "mensaje")
+    
+    def _estilos_errores(self):
+        # Configurar tags para colores
+        self.errores_text.tag_config("titulo_lexico", foreground="#dc2626", font=("Arial", 11, "bold"))
+        self.errores_text.tag_config("titulo_sintactico", foreground="#ea580c", font=("Arial", 11, "bold"))
+        self.errores_text.tag_config("error_num", foreground="#000000", font=("Arial", 10, "bold"))
+        self.errores_text.tag_config("ubicacion", foreground="#dc2626", font=("Arial", 10, "bold"))
+        self.errores_text.tag_config("mensaje", foreground="#000000", font=("Arial", 10))
     
     def actualizar_status(self):
         num_lexicos = len(self.errores_lexicos)
@@ -1105,13 +1791,200 @@ class AnalizadorApp:
         else:
             self.status_label.config(text=f"⚠️ {num_lexicos}L + {num_sintacticos}S errores", fg="#ef4444")
     
+    # Modo archivo grande: el editor muestra VENTANA_LINEAS líneas del archivo (sin editar)
+    # y la barra de desplazamiento va por todo el archivo; el análisis corre en otro hilo y
+    # los paneles de errores y tokens se muestran por páginas
+    
+    def abrir_grande(self, ruta):
+        # import local: archivo_grande.py usa los analizadores de este módulo
+        from archivo_grande import AnalisisPorTramos, ArchivoGrande
+        self._cerrar_grande()
+        self.cerrar_completado()
+        self.editor.delete(1.0, tk.END)
+        if self._analisis_pendiente is not None:  # el del texto anterior
+            self.root.after_cancel(self._analisis_pendiente)
+            self._analisis_pendiente = None
+        self.grande = ArchivoGrande(ruta)
+        self.analisis_grande = AnalisisPorTramos(self.grande, self.lenguaje)
+        # las listas del análisis, que crecen mientras corre (para el estado y el LOG)
+        self.tokens = []
+        self.errores_lexicos = self.analisis_grande.errores_lexicos
+        self.errores_sintacticos = self.analisis_grande.errores_sintacticos
+        self.advertencias_flujo = []
+        self.lineas = None
+        self.documento = Documento('\n')
+        self._paginas = dict.fromkeys(self._paginas, 0)
+        self.editor.configure(yscrollcommand=self._vista_grande)
+        self.editor.vbar.configure(command=self._barra_grande)
+        self._mostrar_linea_grande(1)
+        self.paginas_frame.pack(fill=tk.X, before=self.token_count_label)
+        self.analisis_grande.iniciar()
+        self._mostrar_paginas()
+        self._seguir_analisis_grande()
+    
+    def _cerrar_grande(self):
+        """Sale del modo archivo grande (si está): detiene el análisis y vacía el editor."""
+        if self.grande is None:
+            return
+        for pendiente in (self._seguimiento, self._recentrar):
+            if pendiente is not None:
+                self.root.after_cancel(pendiente)
+        self._seguimiento = self._recentrar = None
+        self.analisis_grande.cancelar()
+        self.editor.configure(state=tk.NORMAL, yscrollcommand=self.editor.vbar.set)
+        self.editor.vbar.configure(command=self.editor.yview)
+        self.editor.delete(1.0, tk.END)  # todavía sin pasar por self.documento
+        self.grande.cerrar()
+        self.grande = self.analisis_grande = None
+        self.documento = Documento('\n')
+        self.paginas_frame.pack_forget()
+        self.tokens_text.delete(1.0, tk.END)
+        self.errores_text.delete(1.0, tk.END)
+        self.tokens = []
+        self.errores_lexicos = []
+        self.errores_sintacticos = []
+    
+    def _mostrar_linea_grande(self, linea):
+        """Carga en el editor las líneas alrededor de 'linea' y la deja arriba de la vista."""
+        self._recentrar = None
+        linea = min(max(linea, 1), self.grande.total_lineas())
+        desde = max(linea - VENTANA_LINEAS // 2, 1)
+        self.editor.configure(state=tk.NORMAL)
+        self.editor.delete(1.0, tk.END)
+        self.editor.insert(1.0, self.grande.lineas(desde, VENTANA_LINEAS))
+        self.editor.configure(state=tk.DISABLED)
+        self._ventana = desde
+        self._cargadas = int(self.editor.index("end - 1 chars").split('.')[0])
+        self.editor.yview(f"{linea - desde + 1}.0")
+    
+    def _vista_grande(self, primera, ultima):
+        """
+        yscrollcommand del editor: pasa a la barra la fracción de todo el archivo y, cerca
+        de un borde de las líneas cargadas, vuelve a cargar alrededor de lo que se ve.
+        """
+        primera, ultima = float(primera), float(ultima)
+        total = self.grande.total_lineas()
+        arriba = self._ventana - 1 + primera * self._cargadas
+        abajo = self._ventana - 1 + ultima * self._cargadas
+        self.editor.vbar.set(arriba / total, abajo / total)
+        cerca = (primera < 0.1 and self._ventana > 1
+                 or ultima > 0.9 and self._ventana - 1 + self._cargadas < total)
+        # solo si así cambian las líneas cargadas (el total puede ser una estimación)
+        if cerca and self._recentrar is None and max(int(arriba) + 1 - VENTANA_LINEAS // 2, 1) != self._ventana:
+            # después de que Tk termine de dibujar
+            self._recentrar = self.root.after_idle(self._mostrar_linea_grande, int(arriba) + 1)
+    
+    def _barra_grande(self, *args):
+        """command de la barra: arrastrarla va a esa parte del archivo."""
+        if args and args[0] == "moveto":
+            self._mostrar_linea_grande(int(float(args[1]) * self.grande.total_lineas()) + 1)
+        else:  # de a líneas o páginas: se mueve el editor y _vista_grande recarga
+            self.editor.yview(*args)
+    
+    def _seguir_analisis_grande(self):
+        """Muestra el progreso del análisis y se vuelve a programar hasta que termina."""
+        self._seguimiento = None
+        analisis = self.analisis_grande
+        if analisis is None:
+            return
+        if not analisis.terminado:
+            self.status_label.config(
+                text=f"⏳ {analisis.progreso:.0%} - {len(self.errores_lexicos)}L + {len(self.errores_sintacticos)}S errores",
+                fg="#f59e0b")
+            self.token_count_label.config(text=f"Total de tokens: {analisis.tokens} (analizando)")
+            self._seguimiento = self.root.after(ESPERA_PROGRESO_MS, self._seguir_analisis_grande)
+            return
+        self.actualizar_status()
+        self._mostrar_paginas()
+        if analisis.falla is not None:
+            messagebox.showerror("Error", f"No se pudo terminar el análisis:\n{analisis.falla}")
+    
+    def _panel_actual(self):
+        """'errores' o 'tokens' según la pestaña elegida (None en Referencia)."""
+        return ('errores', 'tokens', None)[self.notebook.index("current")]
+    
+    def _total_paginas(self, panel):
+        analisis = self.analisis_grande
+        if panel == 'errores':
+            return max(-(-len(analisis.errores) // PAGINA_ERRORES), 1)
+        return max(-(-analisis.tokens // PAGINA_TOKENS), 1)
+    
+    def cambiar_pagina(self, paso):
+        panel = self._panel_actual() if self.analisis_grande is not None else None
+        if panel is None:
+            return
+        pagina = min(max(self._paginas[panel] + paso, 0), self._total_paginas(panel) - 1)
+        if pagina != self._paginas[panel]:
+            self._paginas[panel] = pagina
+            self._mostrar_paginas()
+    
+    def _mostrar_paginas(self):
+        """Muestra la página elegida del panel de la pestaña actual (en modo archivo grande)."""
+        if self.analisis_grande is None:
+            return
+        panel = self._panel_actual()
+        if panel is None:
+            self.pagina_label.config(text="")
+            return
+        if panel == 'errores':
+            self._pagina_errores()
+        else:
+            self._pagina_tokens()
+        self.pagina_label.config(text=f"Página {self._paginas[panel] + 1} de {self._total_paginas(panel)}")
+    
+    def _pagina_errores(self):
+        analisis = self.analisis_grande
+        desde = self._paginas['errores'] * PAGINA_ERRORES
+        errores = analisis.errores[desde:desde + PAGINA_ERRORES]
+        self.errores_text.delete(1.0, tk.END)
+        self._estilos_errores()
+        if not errores:
+            mensaje = "✅ No se encontraron errores.\n" if analisis.terminado else "Analizando...\n"
+            self.errores_text.insert(tk.END, mensaje, "mensaje")
+        if analisis.adelantados:
+            self.errores_text.insert(
+                tk.END, f"⚠️ {len(analisis.adelantados)} errores de uso sin declarar son de nombres que se "
+                        "declaran más adelante: cada tramo solo ve lo declarado antes, así que al analizar "
+                        "el archivo entero pueden no aparecer (marcados abajo).\n\n", "mensaje")
+        for k, error in enumerate(errores):
+            self.errores_text.insert(tk.END, f"Error {desde + k + 1}:\n", "error_num")
+            # los tags se reusan de una página a otra
+            self._insertar_ubicacion(f"p{k}", error)
+            self.errores_text.insert(tk.END, f"{error.mensaje}\n", "mensaje")
+            if error in analisis.adelantados:
+                self.errores_text.insert(
+                    tk.END, f"(posible falso positivo: se declara en la línea {analisis.adelantados[error]})\n",
+                    "mensaje")
+            self.errores_text.insert(tk.END, "\n", "mensaje")
+        if analisis.suprimidos:
+            self.errores_text.insert(tk.END, f"({analisis.suprimidos} errores derivados omitidos)\n", "mensaje")
+        if analisis.truncado:
+            self.errores_text.insert(tk.END, f"Se guardaron los primeros {analisis.max_errores} errores.\n", "mensaje")
+        if not analisis.terminado:
+            self.errores_text.insert(tk.END, "(el análisis sigue: las páginas se completan al terminar)\n", "mensaje")
+    
+    def _pagina_tokens(self):
+        analisis = self.analisis_grande
+        desde = self._paginas['tokens'] * PAGINA_TOKENS
+        self.tokens_text.delete(1.0, tk.END)
+        self._estilos_tokens()
+        for i, token in enumerate(analisis.pagina_tokens(desde, PAGINA_TOKENS), desde + 1):
+            self._insertar_token(i, token)
+        self.token_count_label.config(text=f"Total de tokens: {analisis.tokens}")
+    
     def cargar_archivo(self):
         filename = filedialog.askopenfilename(
             title="Seleccionar archivo",
             filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
         )
         if filename:
+            # import local: archivo_grande.py usa los analizadores de este módulo
+            from archivo_grande import UMBRAL_ARCHIVO_GRANDE
             try:
+                if os.path.getsize(filename) >= UMBRAL_ARCHIVO_GRANDE:
+                    self.abrir_grande(filename)
+                    return
+                self._cerrar_grande()
                 with open(filename, 'r', encoding='utf-8') as f:
                     contenido = f.read()
                     self.editor.delete(1.0, tk.END)
@@ -1128,9 +2001,11 @@ class AnalizadorApp:
         )
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    contenido = self.editor.get(1.0, tk.END)
-                    f.write(contenido)
+                if self.grande is not None:  # el editor no cambia el archivo: se copia
+                    shutil.copyfile(self.grande.ruta, filename)
+                else:
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        self.documento.escribir(f)
                 messagebox.showinfo("Éxito", "Archivo guardado correctamente")
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo guardar el archivo:\n{str(e)}")
@@ -1159,6 +2034,7 @@ mientras (contador < 5) {
     contador = contador + 1;
 }
 """
+        self._cerrar_grande()
         self.editor.delete(1.0, tk.END)
         self.editor.insert(1.0, codigo)
         self.analizar_codigo()
@@ -1197,17 +2073,25 @@ entero malNumero = 12.34.56;
 // ERROR: carácter no reconocido
 entero test @ 5;
 """
+        self._cerrar_grande()
         self.editor.delete(1.0, tk.END)
         self.editor.insert(1.0, codigo)
         self.analizar_codigo()
     
     def limpiar(self):
+        self._cerrar_grande()
         self.editor.delete(1.0, tk.END)
+        self.cerrar_completado()
+        if self._analisis_pendiente is not None:  # el editor vacío no se analiza
+            self.root.after_cancel(self._analisis_pendiente)
+            self._analisis_pendiente = None
         self.tokens_text.delete(1.0, tk.END)
         self.errores_text.delete(1.0, tk.END)
         self.tokens = []
         self.errores_lexicos = []
         self.errores_sintacticos = []
+        self.advertencias_flujo = []
+        self.lineas = None
         self.actualizar_status()
     
     def mostrar_log(self):
@@ -1221,6 +2105,14 @@ entero test @ 5;
         
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
+        # En modo archivo grande se listan solo los primeros tokens y errores (el resto
+        # está en los paneles, por páginas)
+        tokens, total_tokens, tope = self.tokens, len(self.tokens), None
+        if self.analisis_grande is not None:
+            tokens = self.analisis_grande.pagina_tokens(0, PAGINA_TOKENS)
+            total_tokens = self.analisis_grande.tokens
+            tope = PAGINA_ERRORES
+        
         log_content = f"""
 
               LOG DE ANÁLISIS - {timestamp}              
@@ -1229,7 +2121,7 @@ entero test @ 5;
 
 RESUMEN DEL ANÁLISIS
 
-Total de tokens encontrados: {len(self.tokens)}
+Total de tokens encontrados: {total_tokens}
 Errores léxicos: {len(self.errores_lexicos)}
 Errores sintácticos/semánticos: {len(self.errores_sintacticos)}
 Estado: {"✅ CORRECTO" if not (self.errores_lexicos or self.errores_sintacticos) else "❌ CON ERRORES"}
@@ -1239,8 +2131,10 @@ TOKENS IDENTIFICADOS
 
 """
         
-        for i, token in enumerate(self.tokens, 1):
+        for i, token in enumerate(tokens, 1):
             log_content += f"{i:3d}. L{token.linea}:C{token.columna:2d} | {token.tipo:20s} | {token.valor}\n"
+        if len(tokens) < total_tokens:
+            log_content += f"... y {total_tokens - len(tokens)} tokens más\n"
         
         if self.errores_lexicos or self.errores_sintacticos:
             log_content += """
@@ -1251,9 +2145,11 @@ ERRORES DETECTADOS
             todos_errores = self.errores_lexicos + self.errores_sintacticos
             todos_errores.sort(key=lambda e: (e.linea, e.columna))
             
-            for i, error in enumerate(todos_errores, 1):
+            for i, error in enumerate(todos_errores[:tope], 1):
                 tipo = error.tipo.upper()
                 log_content += f"{i:2d}. [{tipo:10s}] L{error.linea}:C{error.columna} - {error.mensaje}\n"
+            if tope is not None and len(todos_errores) > tope:
+                log_content += f"... y {len(todos_errores) - tope} errores más\n"
         
         log_content += """
 
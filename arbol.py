@@ -0,0 +1,447 @@
+"""Árbol sintáctico del programa, construido a partir de los tokens de un análisis sin errores.
+
+Los analizadores solo validan; este módulo arma la estructura (sentencias y expresiones)
+que usan el compilador a bytecode y las demás pasadas sobre el programa.
+"""
+from analizador_sintactico import sin_comentarios
+
+
+class ErrorCompilacion(Exception):
+    """El programa no se puede compilar (tiene errores de análisis o una construcción no soportada)."""
+    def __init__(self, mensaje, errores=None):
+        super().__init__(mensaje)
+        self.errores = errores or []
+
+
+# --- Expresiones ---
+
+class Literal:
+    __slots__ = ('valor', 'tipo', 'linea')
+
+    def __init__(self, valor, tipo, linea):
+        self.valor = valor
+        self.tipo = tipo  # 'entero', 'flotante' o 'cadena'
+        self.linea = linea
+
+    def __repr__(self):
+        return f"Literal({self.valor!r})"
+
+
+class Variable:
+    __slots__ = ('nombre', 'linea', 'columna')
+
+    def __init__(self, nombre, linea, columna=0):
+        self.nombre = nombre
+        self.linea = linea
+        self.columna = columna
+
+    def __repr__(self):
+        return f"Variable({self.nombre})"
+
+
+class Binaria:
+    __slots__ = ('operador', 'izquierda', 'derecha', 'linea')
+
+    def __init__(self, operador, izquierda, derecha, linea):
+        self.operador = operador
+        self.izquierda = izquierda
+        self.derecha = derecha
+        self.linea = linea
+
+    def __repr__(self):
+        return f"Binaria({self.izquierda!r} {self.operador} {self.derecha!r})"
+
+
+class Unaria:
+    __slots__ = ('operador', 'operando', 'linea')
+
+    def __init__(self, operador, operando, linea):
+        self.operador = operador
+        self.operando = operando
+        self.linea = linea
+
+    def __repr__(self):
+        return f"Unaria({self.operador}{self.operando!r})"
+
+
+class Llamada:
+    __slots__ = ('nombre', 'linea')
+
+    def __init__(self, nombre, linea):
+        self.nombre = nombre
+        self.linea = linea
+
+    def __repr__(self):
+        return f"Llamada({self.nombre})"
+
+
+# --- Sentencias ---
+
+class Declaracion:
+    __slots__ = ('tipo', 'nombre', 'valor', 'linea', 'columna')
+
+    def __init__(self, tipo, nombre, valor, linea, columna=0):
+        self.tipo = tipo
+        self.nombre = nombre
+        self.valor = valor  # expresión o None
+        self.linea = linea
+        self.columna = columna  # del nombre de la variable
+
+
+class Asignacion:
+    __slots__ = ('nombre', 'valor', 'linea', 'columna')
+
+    def __init__(self, nombre, valor, linea, columna=0):
+        self.nombre = nombre
+        self.valor = valor
+        self.linea = linea
+        self.columna = columna
+
+
+class Imprimir:
+    __slots__ = ('argumentos', 'linea')
+
+    def __init__(self, argumentos, linea):
+        self.argumentos = argumentos
+        self.linea = linea
+
+
+class Leer:
+    __slots__ = ('nombre', 'linea', 'columna')
+
+    def __init__(self, nombre, linea, columna=0):
+        self.nombre = nombre
+        self.linea = linea
+        self.columna = columna  # de la variable leída
+
+
+class Si:
+    __slots__ = ('condicion', 'entonces', 'sino', 'linea')
+
+    def __init__(self, condicion, entonces, sino, linea):
+        self.condicion = condicion
+        self.entonces = entonces  # Bloque
+        self.sino = sino  # Bloque o None
+        self.linea = linea
+
+
+class Mientras:
+    __slots__ = ('condicion', 'cuerpo', 'linea')
+
+    def __init__(self, condicion, cuerpo, linea):
+        self.condicion = condicion
+        self.cuerpo = cuerpo
+        self.linea = linea
+
+
+class Para:
+    __slots__ = ('inicio', 'condicion', 'paso', 'cuerpo', 'linea')
+
+    def __init__(self, inicio, condicion, paso, cuerpo, linea):
+        self.inicio = inicio  # Declaracion, Asignacion o None
+        self.condicion = condicion  # expresión o None (siempre verdadera)
+        self.paso = paso  # Asignacion o None
+        self.cuerpo = cuerpo
+        self.linea = linea
+
+
+class Funcion:
+    __slots__ = ('nombre', 'cuerpo', 'linea')
+
+    def __init__(self, nombre, cuerpo, linea):
+        self.nombre = nombre
+        self.cuerpo = cuerpo
+        self.linea = linea
+
+
+class Retornar:
+    __slots__ = ('valor', 'linea')
+
+    def __init__(self, valor, linea):
+        self.valor = valor  # expresión o None
+        self.linea = linea
+
+
+class SentenciaExpresion:
+    """Expresión usada como sentencia (llamada a función)."""
+    __slots__ = ('expresion', 'linea')
+
+    def __init__(self, expresion, linea):
+        self.expresion = expresion
+        self.linea = linea
+
+
+class Bloque:
+    __slots__ = ('sentencias', 'linea')
+
+    def __init__(self, sentencias, linea):
+        self.sentencias = sentencias
+        self.linea = linea
+
+
+class Programa:
+    __slots__ = ('sentencias', 'funciones')
+
+    def __init__(self, sentencias, funciones):
+        self.sentencias = sentencias  # sentencias de nivel superior (sin las funciones)
+        self.funciones = funciones  # nombre -> Funcion
+
+
+# Precedencia de operadores binarios (mayor número = se agrupa primero)
+PRECEDENCIA = {
+    '||': 1,
+    '&&': 2,
+    '==': 3, '!=': 3,
+    '<': 4, '>': 4, '<=': 4, '>=': 4,
+    '+': 5, '-': 5,
+    '*': 6, '/': 6, '%': 6,
+}
+
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', '"': '"', "'": "'", '0': '\0'}
+
+
+def valor_cadena(literal):
+    """Contenido de un literal de cadena (sin comillas y con las secuencias de escape resueltas)."""
+    contenido = literal[1:-1]
+    if '\\' not in contenido:
+        return contenido
+    partes = []
+    i = 0
+    while i < len(contenido):
+        c = contenido[i]
+        if c == '\\' and i + 1 < len(contenido):
+            siguiente = contenido[i + 1]
+            partes.append(ESCAPES.get(siguiente, siguiente))
+            i += 2
+            continue
+        partes.append(c)
+        i += 1
+    return ''.join(partes)
+
+
+class ConstructorArbol:
+    """Parser descendente recursivo: tokens (sin errores de análisis) -> Programa."""
+
+    def __init__(self, tokens):
+        self.tokens = sin_comentarios(tokens)
+        self.pos = 0
+
+    # --- utilidades ---
+
+    def _actual(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None
+
+    def _error(self, mensaje):
+        tk = self._actual()
+        if tk is None:
+            ubicacion = "al final del programa"
+        else:
+            ubicacion = f"en línea {tk.linea}, columna {tk.columna}"
+        raise ErrorCompilacion(f"{mensaje} ({ubicacion})")
+
+    def _es(self, valor):
+        tk = self._actual()
+        return tk is not None and tk.valor == valor and tk.tipo in ('DELIMITADOR', 'OPERADOR')
+
+    def _consumir(self, valor):
+        if not self._es(valor):
+            self._error(f"se esperaba '{valor}'")
+        tk = self.tokens[self.pos]
+        self.pos += 1
+        return tk
+
+    def _identificador(self):
+        tk = self._actual()
+        if tk is None or tk.tipo != 'IDENTIFICADOR':
+            self._error("se esperaba un identificador")
+        self.pos += 1
+        return tk
+
+    # --- sentencias ---
+
+    def construir(self):
+        sentencias = []
+        funciones = {}
+        while self.pos < len(self.tokens):
+            sentencia = self._sentencia()
+            if isinstance(sentencia, Funcion):
+                funciones[sentencia.nombre] = sentencia
+            else:
+                sentencias.append(sentencia)
+        return Programa(sentencias, funciones)
+
+    def _bloque(self):
+        inicio = self._consumir('{')
+        sentencias = []
+        while not self._es('}'):
+            if self._actual() is None:
+                self._error("bloque sin cerrar")
+            sentencias.append(self._sentencia())
+        self._consumir('}')
+        return Bloque(sentencias, inicio.linea)
+
+    def _sentencia(self):
+        tk = self._actual()
+        clave = tk.clave
+        if clave is not None:
+            if clave in ('entero', 'flotante', 'cadena'):
+                sentencia = self._declaracion()
+                self._consumir(';')
+                return sentencia
+            if clave == 'si':
+                return self._si()
+            if clave == 'mientras':
+                self.pos += 1
+                self._consumir('(')
+                condicion = self._expresion()
+                self._consumir(')')
+                return Mientras(condicion, self._bloque(), tk.linea)
+            if clave == 'para':
+                return self._para()
+            if clave == 'funcion':
+                self.pos += 1
+                nombre = self._identificador().valor
+                self._consumir('(')
+                self._consumir(')')
+                return Funcion(nombre, self._bloque(), tk.linea)
+            if clave == 'retornar':
+                self.pos += 1
+                valor = None if self._es(';') else self._expresion()
+                self._consumir(';')
+                return Retornar(valor, tk.linea)
+            if clave == 'imprimir':
+                self.pos += 1
+                self._consumir('(')
+                argumentos = []
+                if not self._es(')'):
+                    argumentos.append(self._expresion())
+                    while self._es(','):
+                        self.pos += 1
+                        argumentos.append(self._expresion())
+                self._consumir(')')
+                self._consumir(';')
+                return Imprimir(argumentos, tk.linea)
+            if clave == 'leer':
+                self.pos += 1
+                self._consumir('(')
+                variable = self._identificador()
+                self._consumir(')')
+                self._consumir(';')
+                return Leer(variable.valor, tk.linea, variable.columna)
+            self._error(f"sentencia no soportada que inicia con '{tk.valor}'")
+        if self._es('{'):
+            return self._bloque()
+        if tk.tipo == 'IDENTIFICADOR':
+            siguiente = self.tokens[self.pos + 1] if self.pos + 1 < len(self.tokens) else None
+            if siguiente is not None and siguiente.valor == '(':
+                expresion = self._expresion()
+                self._consumir(';')
+                return SentenciaExpresion(expresion, tk.linea)
+            sentencia = self._asignacion()
+            self._consumir(';')
+            return sentencia
+        self._error(f"sentencia inválida que inicia con '{tk.valor}'")
+
+    def _declaracion(self):
+        tk = self.tokens[self.pos]
+        self.pos += 1
+        variable = self._identificador()
+        valor = None
+        if self._es('='):
+            self.pos += 1
+            valor = self._expresion()
+        return Declaracion(tk.clave, variable.valor, valor, tk.linea, variable.columna)
+
+    def _asignacion(self):
+        tk = self._identificador()
+        self._consumir('=')
+        return Asignacion(tk.valor, self._expresion(), tk.linea, tk.columna)
+
+    def _si(self):
+        tk = self.tokens[self.pos]
+        self.pos += 1
+        self._consumir('(')
+        condicion = self._expresion()
+        self._consumir(')')
+        entonces = self._bloque()
+        sino = None
+        siguiente = self._actual()
+        if siguiente is not None and siguiente.clave == 'sino':
+            self.pos += 1
+            sino = self._bloque()
+        return Si(condicion, entonces, sino, tk.linea)
+
+    def _para(self):
+        tk = self.tokens[self.pos]
+        self.pos += 1
+        self._consumir('(')
+        inicio = None
+        if not self._es(';'):
+            actual = self._actual()
+            if actual.clave in ('entero', 'flotante', 'cadena'):
+                inicio = self._declaracion()
+            else:
+                inicio = self._asignacion()
+        self._consumir(';')
+        condicion = None if self._es(';') else self._expresion()
+        self._consumir(';')
+        paso = None if self._es(')') else self._asignacion()
+        self._consumir(')')
+        return Para(inicio, condicion, paso, self._bloque(), tk.linea)
+
+    # --- expresiones (precedencia ascendente) ---
+
+    def _expresion(self, precedencia_minima=1):
+        izquierda = self._unaria()
+        while True:
+            tk = self._actual()
+            if tk is None or tk.tipo != 'OPERADOR':
+                return izquierda
+            precedencia = PRECEDENCIA.get(tk.valor)
+            if precedencia is None or precedencia < precedencia_minima:
+                return izquierda
+            self.pos += 1
+            derecha = self._expresion(precedencia + 1)
+            izquierda = Binaria(tk.valor, izquierda, derecha, tk.linea)
+
+    def _unaria(self):
+        tk = self._actual()
+        if tk is not None and tk.tipo == 'OPERADOR' and tk.valor in ('!', '-'):
+            self.pos += 1
+            return Unaria(tk.valor, self._unaria(), tk.linea)
+        return self._primaria()
+
+    def _primaria(self):
+        tk = self._actual()
+        if tk is None:
+            self._error("se esperaba una expresión")
+        self.pos += 1
+        if tk.tipo == 'LITERAL_ENTERO':
+            return Literal(int(tk.valor), 'entero', tk.linea)
+        if tk.tipo == 'LITERAL_FLOTANTE':
+            return Literal(float(tk.valor), 'flotante', tk.linea)
+        if tk.tipo == 'LITERAL_CADENA':
+            return Literal(valor_cadena(tk.valor), 'cadena', tk.linea)
+        if tk.clave == 'verdadero':
+            return Literal(1, 'entero', tk.linea)
+        if tk.clave == 'falso':
+            return Literal(0, 'entero', tk.linea)
+        if tk.tipo == 'IDENTIFICADOR':
+            if self._es('('):
+                self.pos += 1
+                self._consumir(')')
+                return Llamada(tk.valor, tk.linea)
+            return Variable(tk.valor, tk.linea, tk.columna)
+        if tk.tipo == 'DELIMITADOR' and tk.valor == '(':
+            expresion = self._expresion()
+            self._consumir(')')
+            return expresion
+        self.pos -= 1
+        self._error(f"token inesperado '{tk.valor}' en una expresión")
+
+
+def construir_arbol(tokens):
+    """Construye el árbol del programa a partir de los tokens de un análisis sin errores."""
+    return ConstructorArbol(tokens).construir()
@@ -0,0 +1,326 @@
+"""Archivos demasiado grandes para el editor: lectura por ventanas y análisis por tramos.
+
+Un ArchivoGrande abre el archivo con mmap y no lo carga: se arma solo el índice de
+comienzos de línea (de a bloques, sin recorrer el texto carácter por carácter) y el
+editor pide las líneas que muestra con lineas(desde, cantidad).
+
+AnalisisPorTramos analiza el archivo en un hilo aparte, de a tramos de unos TAMANIO_TRAMO
+bytes cortados entre sentencias de nivel superior (después de una línea que termina en
+';' o '}' con todas las llaves del tramo cerradas, y antes de una que no es un 'sino').
+Las llaves se cuentan salteando cadenas y comentarios, como los separa el léxico.
+Los tokens de cada tramo se descartan al terminarlo: quedan los errores, la cantidad de
+tokens de cada tramo (para mostrar los tokens por páginas, volviendo a analizar el tramo
+que hace falta) y la fracción ya analizada, que la interfaz consulta para mostrar el
+progreso.
+
+Las declaraciones se acumulan de un tramo al siguiente en un mismo ContextoAnalisis, así
+las repetidas y los tipos de las variables se detectan en todo el archivo. Lo que no se ve
+es lo de tramos posteriores: una variable usada antes del tramo donde se declara se
+reporta como no declarada, cosa que en el análisis del archivo entero puede no pasar. Al
+terminar, esos errores quedan en 'adelantados' con la línea de la declaración, y el editor
+los marca como posibles falsos positivos. Las sentencias repetidas se chequean una sola
+vez (MemoSentencias).
+"""
+import mmap
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, islice
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from lenguaje import LENGUAJE_BASE
+from sentencias import MemoSentencias
+
+# Desde este tamaño (en bytes) el editor abre los archivos en modo archivo grande
+UMBRAL_ARCHIVO_GRANDE = 8 << 20
+# Tamaño aproximado (en bytes) de cada tramo del análisis
+TAMANIO_TRAMO = 256 << 10
+# Bytes que se indexan de una vez al buscar comienzos de línea
+BLOQUE_INDICE = 4 << 20
+# Errores que se guardan como máximo; después se sigue analizando sin guardarlos
+MAX_ERRORES_ARCHIVO = 100_000
+# Errores de uso de un nombre sin declarar (los que un tramo reporta por no ver los siguientes)
+USO_SIN_DECLARAR = frozenset(('T006', 'T010', 'T013'))
+
+# Lo que miran los cortes entre tramos: llaves y saltos de línea fuera de cadenas y
+# comentarios (una cadena sigue en la línea siguiente solo con el salto escapado; un
+# comentario de bloque sin cerrar llega hasta el final)
+_MARCAS_CORTE = re.compile(rb'"(?:[^"\\\n]|\\[\s\S])*"?'
+                           rb"|'(?:[^'\\\n]|\\[\s\S])*'?"
+                           rb'|//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)|[{}\n]')
+_ESPACIOS = re.compile(rb'\s*')
+
+
+class ArchivoGrande:
+    """Archivo de texto UTF-8 abierto con mmap, con su índice de líneas armado a pedido."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, 'rb') as f:
+            self.tamanio = os.fstat(f.fileno()).st_size
+            # mmap no acepta archivos vacíos
+            self.datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.tamanio else b''
+        self.inicios = array('q', [0])  # byte donde empieza cada línea
+        self.indexado = 0  # bytes ya recorridos por el índice
+        self._cerrojo = threading.Lock()  # el índice lo extienden la interfaz y el análisis
+
+    @property
+    def completo(self):
+        return self.indexado >= self.tamanio
+
+    def cerrar(self):
+        if isinstance(self.datos, mmap.mmap):
+            self.datos.close()
+
+    def indexar(self, linea=None, byte=None):
+        """
+        Extiende el índice hasta tener la línea 'linea' (y la siguiente) o hasta pasar el
+        byte 'byte'; sin argumentos, hasta el final del archivo.
+        """
+        inicios = self.inicios
+        while True:
+            # el cerrojo se toma por bloque: mientras el análisis indexa todo el archivo, la
+            # interfaz (lineas, rango) espera como mucho un bloque y no el archivo entero
+            with self._cerrojo:
+                if self.completo:
+                    return
+                if linea is not None and len(inicios) > linea:
+                    return
+                if byte is not None and self.indexado > byte:
+                    return
+                desde = self.indexado
+                hasta = min(desde + BLOQUE_INDICE, self.tamanio)
+                partes = self.datos[desde:hasta].split(b'\n')
+                # cada salto de línea del bloque abre una línea: su comienzo es el largo
+                # acumulado de las partes anteriores (más los saltos)
+                inicios.extend(islice(accumulate(map((1).__add__, map(len, partes[:-1])), initial=desde),
+                                      1, None))
+                self.indexado = hasta
+
+    def total_lineas(self):
+        """Cantidad de líneas; mientras el índice no está completo, estimada por lo indexado."""
+        if self.completo:
+            return len(self.inicios)
+        return max(len(self.inicios), round(len(self.inicios) * self.tamanio / max(self.indexado, 1)))
+
+    def linea_de_byte(self, byte):
+        """Número de línea (desde 1) del byte."""
+        self.indexar(byte=byte)
+        return bisect_right(self.inicios, byte)
+
+    def rango(self, desde, cantidad):
+        """(byte inicial, byte final) de 'cantidad' líneas desde la línea 'desde'."""
+        self.indexar(linea=desde + cantidad)
+        inicios = self.inicios
+        if desde > len(inicios):
+            return self.tamanio, self.tamanio
+        hasta = desde - 1 + cantidad
+        return inicios[desde - 1], inicios[hasta] if hasta < len(inicios) else self.tamanio
+
+    def lineas(self, desde, cantidad):
+        """Texto de 'cantidad' líneas desde la línea 'desde' (la última con su salto, si lo tiene)."""
+        inicio, fin = self.rango(desde, cantidad)
+        return self.datos[inicio:fin].decode('utf-8', errors='replace')
+
+
+class AnalisisPorTramos:
+    """Análisis léxico y sintáctico de un ArchivoGrande, de a tramos y en un hilo aparte."""
+
+    def __init__(self, archivo, lenguaje=LENGUAJE_BASE, max_errores=MAX_ERRORES_ARCHIVO):
+        self.archivo = archivo
+        self.lenguaje = lenguaje
+        self.max_errores = max_errores
+        self.tramos = []  # (byte inicial, byte final, primera línea), en orden
+        self.tokens_antes = [0]  # tokens de los tramos anteriores a cada tramo (y el total al final)
+        self.errores = []  # los de cada tramo en orden: léxicos y después sintácticos
+        self.errores_lexicos = []
+        self.errores_sintacticos = []
+        self.suprimidos = 0
+        self.truncado = False
+        # error -> línea de la declaración, de los usos sin declarar de un nombre que se
+        # declara más adelante en el archivo (se arma al terminar)
+        self.adelantados = {}
+        self.analizado = 0  # bytes analizados
+        self.terminado = False
+        self.falla = None  # excepción si el análisis no pudo terminar
+        self._cancelar = threading.Event()
+        self._hilo = None
+        self._pagina = None  # (tramo, tokens) del último tramo vuelto a analizar
+        self._lexico_paginas = None  # analizador para pagina_tokens (se usa desde la interfaz)
+        # nombres cuya línea de declaración ya es del archivo: en contexto_tipos,
+        # variables_declaradas y funciones_declaradas
+        self._convertidos = (set(), set(), set())
+
+    @property
+    def tokens(self):
+        return self.tokens_antes[-1]
+
+    @property
+    def progreso(self):
+        """Fracción del archivo ya analizada."""
+        return self.analizado / self.archivo.tamanio if self.archivo.tamanio else 1.0
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._correr, name="analisis-archivo-grande", daemon=True)
+        self._hilo.start()
+
+    def cancelar(self):
+        """Pide al hilo que termine al final del tramo actual y lo espera."""
+        self._cancelar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def _correr(self):
+        try:
+            self.analizar()
+        except Exception as e:  # se muestra en la interfaz; el hilo no tiene a quién avisar
+            self.falla = e
+        finally:
+            self.terminado = True
+
+    def cortes(self):
+        """(byte inicial, byte final) de cada tramo, en orden (ver la ayuda del módulo)."""
+        tamanio = self.archivo.tamanio
+        inicio = 0
+        while inicio < tamanio:
+            fin = tamanio if inicio + TAMANIO_TRAMO >= tamanio else self._corte(inicio)
+            yield inicio, fin
+            inicio = fin
+
+    def _corte(self, inicio):
+        """
+        Fin del tramo que empieza en inicio: el primer fin de línea entre sentencias desde
+        el tamaño buscado; si en 4 tramos no hay ninguno, la primera línea desde ahí.
+        """
+        datos = self.archivo.datos
+        tamanio = self.archivo.tamanio
+        sino = self.lenguaje.palabra_de_rol.get('sino', '').encode('utf-8')
+        buscado = inicio + TAMANIO_TRAMO
+        abiertas = 0  # llaves abiertas desde el comienzo del tramo
+        comienzo = inicio  # de la línea actual
+        for marca in _MARCAS_CORTE.finditer(datos, inicio, min(inicio + 4 * TAMANIO_TRAMO, tamanio)):
+            valor = datos[marca.start()]
+            if valor == 0x7b:  # '{'
+                abiertas += 1
+            elif valor == 0x7d:  # '}'
+                abiertas -= 1
+            elif valor == 0x0a:  # '\n'
+                fin = marca.end()
+                if fin > buscado and abiertas == 0 and datos[comienzo:fin].rstrip().endswith((b';', b'}')):
+                    siguiente = _ESPACIOS.match(datos, fin).end()
+                    if not (sino and datos[siguiente:siguiente + len(sino)] == sino):
+                        return fin
+                comienzo = fin
+        fin = datos.find(b'\n', buscado)
+        return tamanio if fin == -1 else fin + 1
+
+    def analizar(self):
+        """Analiza el archivo tramo por tramo (lo corre el hilo; se puede llamar directo)."""
+        lenguaje = self.lenguaje
+        memo = MemoSentencias()
+        lexico = AnalizadorLexico(lenguaje, recuperacion=True, memo=memo)
+        sintactico = AnalizadorSintactico(lenguaje, recuperacion=True, memo=memo)
+        contexto = ContextoAnalisis()
+        archivo = self.archivo
+        archivo.indexar()
+        for inicio, fin in self.cortes():
+            if self._cancelar.is_set():
+                return
+            base = archivo.linea_de_byte(inicio) - 1
+            texto = archivo.datos[inicio:fin].decode('utf-8', errors='replace')
+            # lo que depende de las posiciones es de cada tramo
+            contexto.expresiones = {}
+            contexto.segmentos = None
+            contexto.segmentos_con_error = set()
+            tokens, lexicos = lexico.analizar(texto, contexto)
+            sintacticos = sintactico.analizar(tokens, contexto)
+            self._absolutas(contexto, base, lexicos, sintacticos)
+            for errores, propios in ((lexicos, self.errores_lexicos), (sintacticos, self.errores_sintacticos)):
+                self.suprimidos += errores.suprimidos
+                for error in errores:
+                    if len(self.errores) >= self.max_errores:
+                        self.truncado = True
+                        break
+                    propios.append(error)
+                    self.errores.append(error)
+            self.tramos.append((inicio, fin, base + 1))
+            self.tokens_antes.append(self.tokens + len(tokens))
+            self.analizado = fin
+        self.adelantados = self._adelantados(contexto)
+
+    def _adelantados(self, contexto):
+        """
+        Segunda pasada, con las declaraciones de todo el archivo: los errores de uso sin
+        declarar de nombres que se declaran en una línea posterior (en otro tramo). En el
+        análisis del archivo entero pueden no aparecer; los de la inicialización de una
+        declaración sí aparecen, así que se marcan y no se descartan.
+        """
+        adelantados = {}
+        for error in self.errores:
+            if error.codigo not in USO_SIN_DECLARAR:
+                continue
+            nombre = error.argumentos[0]
+            lineas = [declarado[1] for declarado in (contexto.contexto_tipos.get(nombre),
+                                                     contexto.variables_declaradas.get(nombre))
+                      if declarado is not None]
+            if nombre in contexto.funciones_declaradas:
+                lineas.append(contexto.funciones_declaradas[nombre])
+            posteriores = [linea for linea in lineas if linea > error.linea]
+            if posteriores:
+                adelantados[error] = min(posteriores)
+        return adelantados
+
+    def pagina_tokens(self, desde, cantidad):
+        """
+        Tokens número desde .. desde+cantidad-1 (contando desde 0) de lo ya analizado, con
+        las líneas del archivo; los tramos donde están se vuelven a analizar.
+        """
+        tokens = []
+        k = bisect_right(self.tokens_antes, desde) - 1
+        while len(tokens) < cantidad and k < len(self.tramos):
+            propios = self._tokens_tramo(k)
+            salteados = max(desde - self.tokens_antes[k], 0)
+            tokens.extend(propios[salteados:salteados + cantidad - len(tokens)])
+            k += 1
+        return tokens
+
+    def _tokens_tramo(self, k):
+        if self._pagina is None or self._pagina[0] != k:
+            inicio, fin, linea = self.tramos[k]
+            if self._lexico_paginas is None:
+                self._lexico_paginas = AnalizadorLexico(self.lenguaje)
+            tokens, _ = self._lexico_paginas.analizar(self.archivo.datos[inicio:fin].decode('utf-8', errors='replace'))
+            for token in tokens:
+                token.linea += linea - 1
+            self._pagina = (k, tokens)
+        return self._pagina[1]
+
+    def _absolutas(self, contexto, base, lexicos, sintacticos):
+        """
+        Pasa a líneas del archivo las de los errores del tramo y las de las declaraciones
+        que se hicieron en él, que quedan en el contexto para los tramos siguientes.
+        """
+        contexto_tipos = contexto.contexto_tipos
+        variables = contexto.variables_declaradas
+        funciones = contexto.funciones_declaradas
+        convertidos = self._convertidos
+        nuevas = set()  # variables declaradas en este tramo (su línea era relativa al tramo)
+        # lo declarado en el tramo son nombres del tramo: se miran solo esos
+        for nombre in islice(contexto.nombres.nombres, contexto.nombres.reservadas, None):
+            for tabla, ya in ((contexto_tipos, convertidos[0]), (variables, convertidos[1])):
+                if nombre in tabla and nombre not in ya:
+                    tipo, linea = tabla[nombre]
+                    tabla[nombre] = (tipo, linea + base)
+                    ya.add(nombre)
+                    nuevas.add(nombre)
+            if nombre in funciones and nombre not in convertidos[2]:
+                funciones[nombre] += base
+                convertidos[2].add(nombre)
+        for errores in (lexicos, sintacticos):
+            for error in errores:
+                error.linea += base
+                # 'ya declarada en línea N': N es relativa si la primera declaración es de este tramo
+                if error.codigo == 'T001' and error.argumentos[0] in nuevas:
+                    error.argumentos = (error.argumentos[0], error.argumentos[1] + base)
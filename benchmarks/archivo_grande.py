@@ -0,0 +1,90 @@
+"""Modo archivo grande: apertura, índice de líneas y análisis por tramos.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.archivo_grande [megabytes] [semilla]
+
+Arma un archivo temporal de programas como los del lote 'plantillas' de
+benchmarks/sentencias.py, uno detrás del otro, y mide lo que espera el editor: abrirlo y
+leer las primeras VENTANA_LINEAS líneas, ir a la mitad del archivo, armar el índice
+completo, el primer tramo analizado (los primeros errores que se ven) y el análisis
+completo en el hilo. Con 4 MB o menos también analiza el archivo entero de una vez y
+verifica que los errores sean los mismos.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from analizador_sintactico import VENTANA_LINEAS, AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from archivo_grande import AnalisisPorTramos, ArchivoGrande
+from benchmarks.sentencias import lote_plantillas
+from lenguaje import LENGUAJE_BASE
+
+
+def armar(ruta, megabytes, rng):
+    escritos = 0
+    with open(ruta, 'w', encoding='utf-8') as f:
+        while escritos < megabytes << 20:
+            for codigo in lote_plantillas(rng, 100):
+                escritos += f.write(codigo)
+
+
+def errores_completo(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        codigo = f.read()
+    contexto = ContextoAnalisis()
+    tokens, lexicos = AnalizadorLexico(LENGUAJE_BASE, recuperacion=True).analizar(codigo, contexto)
+    sintacticos = AnalizadorSintactico(LENGUAJE_BASE, recuperacion=True).analizar(tokens, contexto)
+    return [(e.linea, e.columna, e.codigo, e.argumentos) for e in list(lexicos) + list(sintacticos)]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    megabytes = int(argv[0]) if argv else 32
+    rng = random.Random(int(argv[1]) if len(argv) > 1 else 0)
+    descriptor, ruta = tempfile.mkstemp(suffix='.txt')
+    os.close(descriptor)
+    try:
+        armar(ruta, megabytes, rng)
+        inicio = time.perf_counter()
+        archivo = ArchivoGrande(ruta)
+        archivo.lineas(1, VENTANA_LINEAS)
+        t_abrir = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        archivo.lineas(archivo.total_lineas() // 2, VENTANA_LINEAS)
+        t_mitad = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        archivo.indexar()
+        t_indice = time.perf_counter() - inicio
+
+        analisis = AnalisisPorTramos(archivo)
+        inicio = time.perf_counter()
+        analisis.iniciar()
+        while not analisis.tramos and not analisis.terminado:
+            time.sleep(0.001)
+        t_primero = time.perf_counter() - inicio
+        analisis._hilo.join()
+        t_total = time.perf_counter() - inicio
+        if analisis.falla is not None:
+            raise analisis.falla
+        print(f"{archivo.tamanio / (1 << 20):.1f} MB, {archivo.total_lineas()} líneas: "
+              f"abrir {t_abrir * 1000:.1f}ms, ir a la mitad {t_mitad * 1000:.1f}ms, índice {t_indice:.2f}s")
+        print(f"análisis: {len(analisis.tramos)} tramos, primero {t_primero:.2f}s, total {t_total:.2f}s; "
+              f"{analisis.tokens} tokens, {len(analisis.errores)} errores")
+
+        if megabytes <= 4:
+            esperados = errores_completo(ruta)
+            obtenidos = [(e.linea, e.columna, e.codigo, e.argumentos) for e in analisis.errores]
+            if sorted(obtenidos) != sorted(esperados):
+                print("ERRORES DISTINTOS del análisis del archivo entero")
+                return 1
+            print("mismos errores que el análisis del archivo entero")
+        archivo.cerrar()
+    finally:
+        os.remove(ruta)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Tiempo de AnalizadorSintactico.analizar con los chequeos en secuencia y repartidos en procesos.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.chequeos [sentencias] [procesos ...]
+
+Arma un programa grande con el generador de benchmarks.flujo, le mete algunos errores
+(para comparar también el orden de los errores) y mide analizar con procesos=1 y con
+cada cantidad de procesos pedida (por defecto 2 y 4). La ganancia depende de los núcleos
+disponibles: con uno solo, los procesos hijos solo suman el costo del fork.
+"""
+import os
+import sys
+import time
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from benchmarks.flujo import generar
+
+
+def _con_errores(texto):
+    """Cada 500 líneas, una sin ';' final y otra que usa una variable no declarada."""
+    lineas = texto.splitlines()
+    for i in range(250, len(lineas), 500):
+        lineas[i] = lineas[i].rstrip(' ;')
+        lineas[i + 1 if i + 1 < len(lineas) else i] += " no_declarada = 1 ;"
+    return "\n".join(lineas) + "\n"
+
+
+def _medir(tokens, procesos, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        analizador = AnalizadorSintactico(procesos=procesos)
+        inicio = time.perf_counter()
+        errores = analizador.analizar(tokens, ContextoAnalisis())
+        tiempo = time.perf_counter() - inicio
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor, errores
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sentencias = int(argv[0]) if argv else 200000
+    cantidades = [int(a) for a in argv[1:]] or [2, 4]
+    texto, _ = generar(sentencias)
+    tokens, _ = AnalizadorLexico().analizar(_con_errores(texto))
+    print(f"{len(tokens)} tokens, {os.cpu_count()} núcleos")
+
+    base, errores_base = _medir(tokens, 1)
+    referencia = [repr(e) for e in errores_base]
+    print(f"{'procesos':>8}  {'tiempo':>9}  {'aceleración':>11}")
+    print(f"{1:>8}  {base:>8.3f}s  {1.0:>10.2f}x   ({len(referencia)} errores)")
+    for procesos in cantidades:
+        tiempo, errores = _medir(tokens, procesos)
+        iguales = "mismos errores" if [repr(e) for e in errores] == referencia else "ERRORES DISTINTOS"
+        print(f"{procesos:>8}  {tiempo:>8.3f}s  {base / tiempo:>10.2f}x   ({iguales})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Diferencias token por token (comparar.py) entre versiones de un programa grande.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.comparar [tokens] [cambios] [semilla]
+
+La versión vieja son programas del lote 'plantillas' de benchmarks/sentencias.py uno
+detrás del otro, hasta tener unos 'tokens' tokens (por defecto un millón). De ella salen:
+  - una versión solo reformateada (otra sangría, líneas partidas y comentarios nuevos),
+    que tiene que dar cero cambios;
+  - una versión con 'cambios' líneas editadas, borradas o agregadas al azar (además del
+    mismo reformateo), cuyos cambios se verifican rearmando los tokens nuevos a partir
+    de los viejos.
+Se mide el análisis léxico de las dos versiones y la comparación por separado, y el
+listado de errores aparecidos y desaparecidos.
+"""
+import random
+import sys
+import time
+
+from benchmarks.sentencias import PLANTILLAS, lote_plantillas
+from comparar import Comparacion, diferencias, internar
+
+
+def version_vieja(rng, tokens):
+    lineas = []
+    while len(lineas) * 6 < tokens:  # unos 6 tokens por línea
+        for codigo in lote_plantillas(rng, 100):
+            lineas.extend(codigo.splitlines())
+    return lineas
+
+
+def reformatear(rng, lineas):
+    """Las mismas líneas con otra sangría, algunas partidas en dos y comentarios nuevos."""
+    salida = []
+    for linea in lineas:
+        linea = "  " * rng.randint(0, 3) + linea.strip()
+        if rng.random() < 0.05:
+            salida.append("// comentario agregado")
+        if rng.random() < 0.05 and ' = ' in linea:
+            izquierda, derecha = linea.split(' = ', 1)
+            salida.extend((izquierda + " =", "        " + derecha))
+            continue
+        if rng.random() < 0.02:
+            linea += "  /* otro comentario */"
+        salida.append(linea)
+    return salida
+
+
+def editar(rng, lineas, cambios):
+    lineas = list(lineas)
+    for _ in range(cambios):
+        i = rng.randrange(len(lineas))
+        accion = rng.random()
+        if accion < 0.3:
+            del lineas[i]
+        elif accion < 0.6:
+            lineas.insert(i, PLANTILLAS[rng.randrange(len(PLANTILLAS))].format(v="nueva", w="edad", n=7))
+        else:
+            lineas[i] = lineas[i].replace("1", "2").replace("edad", "total").replace("<", "<=")
+    return lineas
+
+
+def comparar(viejo, nuevo):
+    inicio = time.perf_counter()
+    comparacion = Comparacion(viejo, nuevo)
+    total = time.perf_counter() - inicio
+    # la comparación sola, con los tokens ya analizados
+    inicio = time.perf_counter()
+    diferencias(*internar(comparacion.viejos, comparacion.nuevos))
+    return comparacion, total, time.perf_counter() - inicio
+
+
+def verificar(comparacion):
+    """Rearma los tokens nuevos con los viejos y los cambios; True si coinciden."""
+    viejos = [t.valor for t in comparacion.viejos]
+    nuevos = [t.valor for t in comparacion.nuevos]
+    rearmados = []
+    anterior = 0
+    for cambio in comparacion.cambios:
+        rearmados += viejos[anterior:cambio.desde_viejo]
+        if len(rearmados) != cambio.desde_nuevo:
+            return False
+        rearmados += nuevos[cambio.desde_nuevo:cambio.hasta_nuevo]
+        anterior = cambio.hasta_viejo
+    rearmados += viejos[anterior:]
+    return rearmados == nuevos
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    tokens = int(argv[0]) if argv else 1_000_000
+    cambios = int(argv[1]) if len(argv) > 1 else 200
+    rng = random.Random(int(argv[2]) if len(argv) > 2 else 0)
+    lineas = version_vieja(rng, tokens)
+    viejo = '\n'.join(lineas) + '\n'
+    for nombre, nuevas in (('reformateada', reformatear(rng, lineas)),
+                           ('editada', reformatear(rng, editar(rng, lineas, cambios)))):
+        comparacion, total, sola = comparar(viejo, '\n'.join(nuevas) + '\n')
+        if not verificar(comparacion):
+            print(f"{nombre}: LOS CAMBIOS NO REARMAN LA VERSIÓN NUEVA")
+            return 1
+        if nombre == 'reformateada' and comparacion.cambios:
+            print(f"{nombre}: {len(comparacion.cambios)} cambios en una versión solo reformateada")
+            return 1
+        inicio = time.perf_counter()
+        desaparecidos, aparecidos = comparacion.diagnosticos()
+        t_diagnosticos = time.perf_counter() - inicio
+        print(f"{nombre}: {len(comparacion.viejos)} -> {len(comparacion.nuevos)} tokens, "
+              f"{len(comparacion.cambios)} cambios; total {total:.2f}s (comparación {sola:.2f}s); "
+              f"diagnósticos {t_diagnosticos:.2f}s ({len(desaparecidos)} desaparecidos, "
+              f"{len(aparecidos)} aparecidos)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
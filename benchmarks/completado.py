@@ -0,0 +1,71 @@
+"""Sugerencias del completado con muchos nombres declarados.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.completado [nombres]
+
+Llena un TrieNombres con las palabras reservadas y 'nombres' identificadores al azar,
+compara las sugerencias con las de una búsqueda lineal sobre la lista ordenada y mide el
+tiempo por consulta (prefijos de 1 a 4 caracteres) y el de actualizar() cuando cambian
+unos pocos nombres entre dos análisis.
+"""
+import random
+import string
+import sys
+import time
+
+from completado import MAX_SUGERENCIAS, TrieNombres
+from lenguaje import LENGUAJE_BASE
+
+
+def nombres_al_azar(cantidad, semilla=0):
+    azar = random.Random(semilla)
+    letras = string.ascii_lowercase + '_'
+    nombres = set()
+    while len(nombres) < cantidad:
+        nombres.add(azar.choice(string.ascii_letters) + ''.join(
+            azar.choice(letras + string.digits) for _ in range(azar.randint(0, 12))))
+    return sorted(nombres)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    cantidad = int(argv[0]) if argv else 100_000
+    variables = nombres_al_azar(cantidad)
+    trie = TrieNombres(LENGUAJE_BASE.palabras_reservadas)
+    inicio = time.perf_counter()
+    trie.actualizar('variable', variables)
+    print(f"{len(trie)} nombres; carga inicial {time.perf_counter() - inicio:.3f}s")
+
+    todos = sorted(set(variables) | LENGUAJE_BASE.palabras_reservadas)
+    azar = random.Random(1)
+    prefijos = [azar.choice(todos)[:azar.randint(1, 4)] for _ in range(2000)]
+    for prefijo in prefijos[:200]:
+        esperadas = [n for n in todos if n.startswith(prefijo)][:MAX_SUGERENCIAS]
+        if [n for n, _ in trie.sugerencias(prefijo)] != esperadas:
+            print(f"SUGERENCIAS DISTINTAS para '{prefijo}'")
+            return 1
+
+    peor = 0.0
+    inicio = time.perf_counter()
+    for prefijo in prefijos:
+        t = time.perf_counter()
+        trie.sugerencias(prefijo)
+        peor = max(peor, time.perf_counter() - t)
+    promedio = (time.perf_counter() - inicio) / len(prefijos)
+    print(f"por consulta: promedio {promedio * 1e6:.0f}µs, peor {peor * 1e6:.0f}µs")
+
+    # Un análisis nuevo: se renombran 20 variables
+    cambiadas = variables[:]
+    for k in range(20):
+        cambiadas[k * 997 % len(cambiadas)] += '_nuevo'
+    inicio = time.perf_counter()
+    trie.actualizar('variable', cambiadas)
+    print(f"actualizar con 20 nombres cambiados: {(time.perf_counter() - inicio) * 1e3:.1f}ms")
+    if any(n in trie for n in set(variables) - set(cambiadas)) or not all(n in trie for n in cambiadas):
+        print("ACTUALIZACIÓN INCORRECTA")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Consultas estructurales sobre miles de programas, con y sin el índice de tokens.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.consultas [archivos] [semilla]
+
+Genera programas al azar (los de diferencial.py, con mutaciones, así también hay código
+con errores), los indexa con Corpus y mide cada consulta de ejemplo contra la misma
+consulta probada en todas las posiciones de todos los archivos, sin usar el índice. Se
+verifica que las coincidencias sean las mismas.
+"""
+import random
+import sys
+import time
+
+from consultas import Consulta, Corpus, _fines
+from diferencial import GeneradorProgramas
+from lenguaje import LENGUAJE_BASE
+
+CONSULTAS = (
+    "mientras (sin @condicion)",
+    "cadena IDENTIFICADOR = [con LITERAL_ENTERO|LITERAL_FLOTANTE] ;",
+    "si (con @logicos) {...}",
+    "para (...) {sin IDENTIFICADOR}",
+    "IDENTIFICADOR = _ @aritmeticos _ ;",
+    "imprimir ( LITERAL_CADENA )",
+)
+
+
+def sin_indice(consulta, corpus):
+    """Las coincidencias probando cada posición de cada programa."""
+    encontradas = []
+    for ruta, indice in corpus.indices.items():
+        limite = len(indice.tokens)
+        for inicio in range(limite):
+            fin = next(_fines(consulta.elementos, 0, indice, inicio, limite), None)
+            if fin is not None:
+                encontradas.append((ruta, inicio, fin))
+    return encontradas
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    archivos = int(argv[0]) if argv else 3000
+    rng = random.Random(int(argv[1]) if len(argv) > 1 else 0)
+    generador = GeneradorProgramas(rng, LENGUAJE_BASE)
+    programas = []
+    for _ in range(archivos):
+        codigo = '\n'.join(generador.programa() for _ in range(6))
+        programas.append(generador.mutar(codigo) if rng.random() < 0.3 else codigo)
+
+    corpus = Corpus()
+    inicio = time.perf_counter()
+    for n, codigo in enumerate(programas):
+        corpus.agregar(f"p{n}.txt", codigo)
+    tokens = sum(len(i.tokens) for i in corpus.indices.values())
+    print(f"{archivos} archivos, {tokens} tokens; léxico + índice {time.perf_counter() - inicio:.2f}s")
+
+    for texto in CONSULTAS:
+        consulta = Consulta(texto)
+        inicio = time.perf_counter()
+        con_indice = [(ruta, i, f) for ruta, indice in corpus.indices.items()
+                      for i, f in consulta.buscar(indice)]
+        t_indice = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        esperadas = sin_indice(consulta, corpus)
+        t_todas = time.perf_counter() - inicio
+        if con_indice != esperadas:
+            print(f"COINCIDENCIAS DISTINTAS para {texto!r}")
+            return 1
+        print(f"{len(esperadas):6d} coincidencias  índice {t_indice * 1e3:7.1f}ms  "
+              f"todas las posiciones {t_todas * 1e3:7.1f}ms  {texto}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
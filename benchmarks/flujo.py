@@ -0,0 +1,99 @@
+"""Escalamiento del análisis de flujo (grafo + diagnósticos) con el tamaño del programa.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.flujo [sentencias_max]
+
+Genera programas de 1/4, 1/2 y el total de sentencias y mide el tiempo del análisis de
+flujo solo (el árbol se arma antes). Si el análisis es lineal, el tiempo por sentencia
+se mantiene parejo.
+"""
+import sys
+import time
+
+from analizador_sintactico import Token
+from arbol import construir_arbol
+from flujo import construir_grafos, diagnosticar
+from lenguaje import LENGUAJE_BASE
+
+# Variables del programa generado (un conjunto acotado que se reutiliza, como en el código real;
+# el costo de cada operación de conjuntos crece con la cantidad de variables)
+VARIABLES = 64
+
+
+def _tokens(texto):
+    """Tokens de un programa generado (ya válido), sin pasar por el análisis léxico completo."""
+    clave = LENGUAJE_BASE.rol_de_palabra
+    tokens = []
+    for linea, contenido in enumerate(texto.splitlines(), 1):
+        for columna, palabra in enumerate(contenido.split(), 1):
+            if palabra in clave:
+                tokens.append(Token('PALABRA_RESERVADA', palabra, linea, columna, clave[palabra]))
+            elif palabra.isdigit():
+                tokens.append(Token('LITERAL_ENTERO', palabra, linea, columna))
+            elif palabra[0].isalpha() or palabra[0] == '_':
+                tokens.append(Token('IDENTIFICADOR', palabra, linea, columna))
+            elif palabra in LENGUAJE_BASE.delimitadores:
+                tokens.append(Token('DELIMITADOR', palabra, linea, columna))
+            else:
+                tokens.append(Token('OPERADOR', palabra, linea, columna))
+    return tokens
+
+
+def generar(sentencias):
+    """
+    Programa de 'sentencias' sentencias con si/sino, mientras, para y funciones.
+    Devuelve (texto, variables declaradas {nombre: (tipo, linea)}).
+    """
+    palabra = LENGUAJE_BASE.palabra_de_rol
+    entero, si, sino = palabra['entero'], palabra['si'], palabra['sino']
+    mientras, para, funcion = palabra['mientras'], palabra['para'], palabra['funcion']
+    retornar, imprimir = palabra['retornar'], palabra['imprimir']
+    lineas = [f"{entero} v{i} = {i} ;" for i in range(VARIABLES)]
+    lineas += [f"{entero} t{i} = 0 ;" for i in range(VARIABLES)]
+    variables = {nombre: ('entero', i + 1)
+                 for i, nombre in enumerate([f"v{i}" for i in range(VARIABLES)]
+                                            + [f"t{i}" for i in range(VARIABLES)])}
+    total = len(lineas)
+    k = 0
+    while total < sentencias:
+        a, b, c = (f"v{(k * 7 + d) % VARIABLES}" for d in (0, 1, 2))
+        t = f"t{k % VARIABLES}"
+        forma = k % 5
+        if forma == 0:
+            lineas.append(f"{si} ( {a} < {b} ) {{ {c} = {a} + 1 ; }} {sino} {{ {c} = {b} ; }}")
+            total += 3
+        elif forma == 1:
+            lineas.append(f"{mientras} ( {a} > 0 ) {{ {a} = {a} - 1 ; {imprimir} ( {b} ) ; }}")
+            total += 3
+        elif forma == 2:
+            lineas.append(f"{para} ( {t} = 0 ; {t} < {a} ; {t} = {t} + 1 ) {{ {b} = {b} + {t} ; }}")
+            total += 4
+        elif forma == 3:
+            lineas.append(f"{funcion} f{k} ( ) {{ {si} ( {a} == 0 ) {{ {retornar} {b} ; }} "
+                          f"{c} = {a} * 2 ; {retornar} {c} ; }}")
+            total += 4
+        else:
+            lineas.append(f"{a} = {b} + {c} ; f{k - 1} ( ) ;")
+            total += 2
+        k += 1
+    lineas.append(f"{imprimir} ( " + " , ".join(f"v{i}" for i in range(VARIABLES)) + " ) ;")
+    return "\n".join(lineas) + "\n", variables
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    maximo = int(argv[0]) if argv else 100000
+    print(f"{'sentencias':>10}  {'bloques':>8}  {'tiempo':>9}  {'µs/sentencia':>12}")
+    for sentencias in (maximo // 4, maximo // 2, maximo):
+        texto, variables = generar(sentencias)
+        programa = construir_arbol(_tokens(texto))
+        bloques = sum(len(g.bloques) for g in construir_grafos(programa).values())
+        inicio = time.perf_counter()
+        advertencias = diagnosticar(programa, variables)
+        tiempo = time.perf_counter() - inicio
+        print(f"{sentencias:>10}  {bloques:>8}  {tiempo:>8.3f}s  {tiempo / sentencias * 1e6:>12.2f}"
+              f"   ({len(advertencias)} advertencias)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Velocidad del análisis léxico sobre código mayormente ASCII.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.lexico [lineas] [--referencia REVISION]
+
+Mide AnalizadorLexico.analizar sobre un programa ASCII con cadenas y comentarios en
+español ("Juan Pérez"). Con --referencia se mide también el léxico de esa revisión de
+git, para comparar. Las reglas Unicode del léxico se verifican en
+tests/test_lexico_unicode.py.
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+from analizador_sintactico import AnalizadorLexico
+
+
+def generar(lineas):
+    partes = []
+    for i in range(lineas // 4):
+        partes.append(f'cadena nombre{i} = "Juan Pérez {i}";\n'
+                      f'entero contador_total{i} = {i} * 12345 + 678;\n'
+                      f'// comentario número {i}: ¿qué pasa acá?\n'
+                      f'si (contador_total{i} > 100) {{ imprimir(nombre{i}); }}\n')
+    return ''.join(partes)
+
+
+def _medir(analizador, codigo, repeticiones=7):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        analizador.analizar(codigo)
+        tiempo = time.perf_counter() - inicio
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del análisis léxico.")
+    parser.add_argument('lineas', type=int, nargs='?', default=20000)
+    parser.add_argument('--referencia', metavar='REVISION',
+                        help="revisión de git con la que comparar")
+    args = parser.parse_args(argv)
+
+    codigo = generar(args.lineas)
+    analizadores = [('actual', AnalizadorLexico())]
+    if args.referencia:
+        from diferencial import cargar_modulo, extraer_revision
+        with tempfile.TemporaryDirectory(prefix='lexico-') as carpeta:
+            modulo = cargar_modulo(extraer_revision(args.referencia, carpeta))
+        analizadores.insert(0, (args.referencia, modulo.AnalizadorLexico()))
+    print(f"{args.lineas} líneas, {len(codigo) / 1e6:.2f} M caracteres")
+    for nombre, analizador in analizadores:
+        tiempo = _medir(analizador, codigo)
+        print(f"  {nombre:>10}: {tiempo:7.3f}s  {len(codigo) / tiempo / 1e6:6.2f} M caracteres/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Comparación de la máquina virtual contra un intérprete ingenuo que recorre el árbol.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.maquina_virtual [iteraciones] [repeticiones]
+
+Cada motor corre el programa 'repeticiones' veces (por defecto 7), alternados; se
+informa la mediana de los tiempos y la aceleración entre medianas, con el rango de las
+corridas para ver cuánto varía la máquina.
+"""
+import statistics
+import sys
+import time
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from arbol import (construir_arbol, Literal, Variable, Binaria, Unaria, Llamada, Declaracion,
+                   Asignacion, Imprimir, Leer, Si, Mientras, Para, Retornar,
+                   SentenciaExpresion, Bloque)
+from compilador import compilar
+from maquina_virtual import MaquinaVirtual, _dividir, _modulo
+
+PROGRAMA = """
+entero contador = 0;
+entero suma = 0;
+mientras (contador < {n}) {{
+    si (contador % 3 == 0) {{
+        suma = suma + contador;
+    }} sino {{
+        suma = suma - 1;
+    }}
+    contador = contador + 1;
+}}
+imprimir("suma:", suma);
+"""
+
+
+class _Retorno(Exception):
+    def __init__(self, valor):
+        self.valor = valor
+
+
+class InterpreteArbol:
+    """Intérprete ingenuo: evalúa el árbol directamente, con variables en un diccionario."""
+
+    BINARIAS = {
+        '+': lambda a, b: a + b, '-': lambda a, b: a - b, '*': lambda a, b: a * b,
+        '/': _dividir, '%': _modulo,
+        '==': lambda a, b: int(a == b), '!=': lambda a, b: int(a != b),
+        '<': lambda a, b: int(a < b), '>': lambda a, b: int(a > b),
+        '<=': lambda a, b: int(a <= b), '>=': lambda a, b: int(a >= b),
+    }
+
+    def __init__(self, programa, entrada=input, salida=print):
+        self.programa = programa
+        self.entrada = entrada
+        self.salida = salida
+        self.variables = {}
+
+    def ejecutar(self):
+        for sentencia in self.programa.sentencias:
+            self.sentencia(sentencia)
+        return self.variables
+
+    def sentencia(self, s):
+        if isinstance(s, (Asignacion, Declaracion)):
+            self.variables[s.nombre] = self.evaluar(s.valor) if s.valor is not None else 0
+        elif isinstance(s, Si):
+            if self.evaluar(s.condicion):
+                self.sentencia(s.entonces)
+            elif s.sino is not None:
+                self.sentencia(s.sino)
+        elif isinstance(s, Mientras):
+            while self.evaluar(s.condicion):
+                self.sentencia(s.cuerpo)
+        elif isinstance(s, Para):
+            if s.inicio is not None:
+                self.sentencia(s.inicio)
+            while s.condicion is None or self.evaluar(s.condicion):
+                self.sentencia(s.cuerpo)
+                if s.paso is not None:
+                    self.sentencia(s.paso)
+        elif isinstance(s, Bloque):
+            for interna in s.sentencias:
+                self.sentencia(interna)
+        elif isinstance(s, Imprimir):
+            self.salida(' '.join(str(self.evaluar(a)) for a in s.argumentos))
+        elif isinstance(s, Leer):
+            self.variables[s.nombre] = self.entrada()
+        elif isinstance(s, Retornar):
+            raise _Retorno(self.evaluar(s.valor) if s.valor is not None else 0)
+        elif isinstance(s, SentenciaExpresion):
+            self.evaluar(s.expresion)
+
+    def evaluar(self, e):
+        if isinstance(e, Literal):
+            return e.valor
+        if isinstance(e, Variable):
+            return self.variables[e.nombre]
+        if isinstance(e, Binaria):
+            if e.operador == '&&':
+                return int(bool(self.evaluar(e.izquierda)) and bool(self.evaluar(e.derecha)))
+            if e.operador == '||':
+                return int(bool(self.evaluar(e.izquierda)) or bool(self.evaluar(e.derecha)))
+            return self.BINARIAS[e.operador](self.evaluar(e.izquierda), self.evaluar(e.derecha))
+        if isinstance(e, Unaria):
+            valor = self.evaluar(e.operando)
+            return int(not valor) if e.operador == '!' else -valor
+        if isinstance(e, Llamada):
+            try:
+                self.sentencia(self.programa.funciones[e.nombre].cuerpo)
+            except _Retorno as r:
+                return r.valor
+            return 0
+        raise TypeError(type(e).__name__)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if argv else 300000
+    repeticiones = int(argv[1]) if len(argv) > 1 else 7
+    fuente = PROGRAMA.format(n=n)
+
+    contexto = ContextoAnalisis()
+    tokens, errores = AnalizadorLexico().analizar(fuente, contexto)
+    errores = list(errores) + list(AnalizadorSintactico().analizar(tokens, contexto))
+    if errores:
+        raise SystemExit(f"el programa de prueba tiene errores: {errores}")
+
+    programa = compilar(tokens, contexto)
+    arbol = construir_arbol(tokens)
+    tiempos_vm = []
+    tiempos_arbol = []
+    for _ in range(repeticiones):
+        salida_vm = []
+        vm = MaquinaVirtual(salida=salida_vm.append)
+        inicio = time.perf_counter()
+        vm.ejecutar(programa)
+        tiempos_vm.append(time.perf_counter() - inicio)
+
+        salida_arbol = []
+        interprete = InterpreteArbol(arbol, salida=salida_arbol.append)
+        inicio = time.perf_counter()
+        interprete.ejecutar()
+        tiempos_arbol.append(time.perf_counter() - inicio)
+        assert salida_vm == salida_arbol, (salida_vm, salida_arbol)
+
+    t_vm = statistics.median(tiempos_vm)
+    t_arbol = statistics.median(tiempos_arbol)
+    print(f"iteraciones del bucle: {n}, {repeticiones} corridas por motor (mediana, mín-máx)")
+    print(f"máquina virtual:   {t_vm:8.3f} s  ({min(tiempos_vm):.3f}-{max(tiempos_vm):.3f})  "
+          f"{vm.operaciones / t_vm / 1e6:.2f} M operaciones/s")
+    print(f"intérprete árbol:  {t_arbol:8.3f} s  ({min(tiempos_arbol):.3f}-{max(tiempos_arbol):.3f})")
+    print(f"aceleración:       {t_arbol / t_vm:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Proyectos de varios archivos (modulos.py): niveles en paralelo y caché por módulo.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.modulos [programas] [compartidos] [procesos] [semilla]
+
+Arma en una carpeta temporal 'compartidos' módulos con declaraciones y funciones, que se
+importan en cadena entre ellos, y 'programas' archivos que importan algunos al azar y
+siguen con código como el del lote 'plantillas' de benchmarks/sentencias.py. Mide:
+  - el análisis con un proceso y con 'procesos', que tienen que dar los mismos errores;
+  - la segunda corrida con la caché en disco (nada se vuelve a analizar);
+  - la corrida después de cambiar el cuerpo de una función compartida (solo ese módulo
+    se vuelve a analizar) y después de agregarle una declaración (también los que lo
+    importan).
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.sentencias import lote_plantillas
+from modulos import Proyecto
+
+
+def compartido(i):
+    lineas = [f'importar "comun{i - 1}.txt";'] if i else []
+    lineas += [f"entero valor{i} = {i};",
+               f"cadena nombre{i} = \"modulo {i}\";",
+               f"funcion calcular{i}(x) {{",
+               "    retornar x * 2;",
+               "}"]
+    return '\n'.join(lineas) + '\n'
+
+
+def armar(carpeta, programas, compartidos, rng):
+    os.makedirs(os.path.join(carpeta, 'comun'))
+    for i in range(compartidos):
+        with open(os.path.join(carpeta, 'comun', f'comun{i}.txt'), 'w', encoding='utf-8') as f:
+            f.write(compartido(i))
+    rutas = []
+    for k, codigo in enumerate(lote_plantillas(rng, programas)):
+        usados = rng.sample(range(compartidos), min(3, compartidos))
+        cabecera = ''.join(f'importar "comun/comun{i}.txt";\n' for i in usados)
+        uso = f"entero usado = valor{usados[0]} + 1;\n"
+        rutas.append(os.path.join(carpeta, f'programa{k}.txt'))
+        with open(rutas[-1], 'w', encoding='utf-8') as f:
+            f.write(cabecera + uso + codigo)
+    return rutas
+
+
+def correr(rutas, carpeta, procesos=1, cache=None):
+    proyecto = Proyecto(procesos=procesos, cache=cache, raiz=carpeta)
+    inicio = time.perf_counter()
+    for ruta in rutas:
+        proyecto.cargar(ruta)
+    proyecto.analizar()
+    errores = {m.nombre: [(e.linea, e.columna, e.codigo, e.argumentos) for e in m.errores]
+               for m in proyecto.modulos.values()}
+    return proyecto, errores, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    programas = int(argv[0]) if argv else 400
+    compartidos = int(argv[1]) if len(argv) > 1 else 20
+    procesos = int(argv[2]) if len(argv) > 2 else (os.cpu_count() or 1)
+    rng = random.Random(int(argv[3]) if len(argv) > 3 else 0)
+    carpeta = tempfile.mkdtemp()
+    cache = os.path.join(carpeta, 'cache')
+    try:
+        rutas = armar(carpeta, programas, compartidos, rng)
+        proyecto, esperados, t_uno = correr(rutas, carpeta)
+        print(f"{len(proyecto.modulos)} módulos en {len(proyecto.niveles())} niveles, "
+              f"{sum(map(len, esperados.values()))} errores; 1 proceso {t_uno:.2f}s")
+        _, errores, t_varios = correr(rutas, carpeta, procesos)
+        print(f"{procesos} procesos {t_varios:.2f}s")
+        if errores != esperados:
+            print("ERRORES DISTINTOS con varios procesos")
+            return 1
+
+        correr(rutas, carpeta, procesos, cache)
+        comun = os.path.join(carpeta, 'comun', 'comun0.txt')
+        for nombre, cambio in (('sin cambios', None),
+                               ('cuerpo de una función cambiado', ("x * 2", "x * 3")),
+                               ('declaración agregada', ("entero valor0 = 0;", "entero valor0 = 0;\nentero otro0 = 1;"))):
+            if cambio is not None:
+                with open(comun, encoding='utf-8') as f:
+                    codigo = f.read()
+                with open(comun, 'w', encoding='utf-8') as f:
+                    f.write(codigo.replace(*cambio))
+            proyecto, errores, t_cache = correr(rutas, carpeta, procesos, cache)
+            _, esperados, _ = correr(rutas, carpeta)
+            if errores != esperados:
+                print(f"{nombre}: ERRORES DISTINTOS con la caché")
+                return 1
+            print(f"con caché, {nombre}: {t_cache:.2f}s, {proyecto.analizados} analizados, "
+                  f"{proyecto.reutilizados} desde la caché")
+    finally:
+        shutil.rmtree(carpeta)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Análisis de muchos programas con sentencias repetidas, con y sin MemoSentencias.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.sentencias [archivos] [semilla]
+
+Dos lotes de programas:
+  - plantillas: sentencias sueltas como las de los ejemplos ('si (edad >= 18) {...} sino
+    {...}', 'mientras', declaraciones, asignaciones), algunas con errores, elegidas al azar
+    con pocos nombres distintos: el caso de los programas generados;
+  - bloques: programas de diferencial.py (sentencias largas y anidadas, con mutaciones)
+    combinados al azar; repiten menos formas.
+
+Cada lote se analiza (léxico y sintáctico, con recuperación de errores) sin memo y con
+una memo nueva compartida por todo el lote, y se verifica que los errores sean los mismos.
+Los tiempos son el mejor de tres.
+"""
+import random
+import sys
+import time
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from diferencial import GeneradorProgramas
+from lenguaje import LENGUAJE_BASE
+from sentencias import MemoSentencias
+
+PLANTILLAS = (
+    "entero {v} = {n};", "flotante {v} = {n}.5;", 'cadena {v} = "Juan Pérez";',
+    "{w} = {w} + 1;", "{w} = {w} * 2 + 3;", "imprimir({w});", "leer({w});",
+    'si ({w} >= 18) {{\n    imprimir("Mayor de edad");\n}} sino {{\n    imprimir("Menor de edad");\n}}',
+    'mientras ({w} < 5) {{\n    imprimir("Contador:");\n    {w} = {w} + 1;\n}}',
+    "para (i = 0; i < 10; i = i + 1) {{\n    imprimir(i);\n}}",
+    # con errores
+    "{w} = {w} + 2.5;", "si ({w}) {{ imprimir({w}); }}", "mientras {w} < 3 {{ leer({w}); }}",
+    "entero {v} = {w}", "imprimir({w})",
+)
+
+
+def lote_plantillas(rng, archivos):
+    programas = []
+    for _ in range(archivos):
+        nombres = ['edad', 'contador', 'total']
+        lineas = ["entero i = 0;", "entero edad = 25;", "entero contador = 0;", "entero total = 0;"]
+        for _ in range(rng.randint(30, 60)):
+            plantilla = rng.choice(PLANTILLAS)
+            if '{v}' in plantilla:
+                nombres.append(f"v{len(nombres)}")
+            lineas.append("    " * rng.randint(0, 1) + plantilla.format(
+                v=nombres[-1], w=rng.choice(nombres[:3]), n=rng.randint(0, 3)))
+        programas.append('\n'.join(lineas) + '\n')
+    return programas
+
+
+def lote_bloques(rng, archivos):
+    generador = GeneradorProgramas(rng, LENGUAJE_BASE)
+    bloques = []
+    for _ in range(120):
+        codigo = generador.programa()
+        bloques.append(generador.mutar(codigo) if rng.random() < 0.2 else codigo)
+    return ['\n'.join(rng.choice(bloques) for _ in range(rng.randint(3, 12))) for _ in range(archivos)]
+
+
+def analizar_todos(programas, memo=None):
+    lexico = AnalizadorLexico(LENGUAJE_BASE, recuperacion=True, memo=memo)
+    sintactico = AnalizadorSintactico(LENGUAJE_BASE, recuperacion=True, memo=memo)
+    resultados = []
+    for codigo in programas:
+        contexto = ContextoAnalisis()
+        tokens, errores = lexico.analizar(codigo, contexto)
+        errores = list(errores) + list(sintactico.analizar(tokens, contexto))
+        resultados.append([(e.linea, e.columna, e.codigo, e.argumentos) for e in errores])
+    return resultados
+
+
+def medir(programas, memo_nueva):
+    mejor = None
+    for _ in range(3):
+        memo = memo_nueva()
+        inicio = time.perf_counter()
+        resultados = analizar_todos(programas, memo)
+        tiempo = time.perf_counter() - inicio
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor, resultados, memo
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    archivos = int(argv[0]) if argv else 2000
+    rng = random.Random(int(argv[1]) if len(argv) > 1 else 0)
+    for nombre, lote in (('plantillas', lote_plantillas), ('bloques', lote_bloques)):
+        programas = lote(rng, archivos)
+        t_sin, esperados, _ = medir(programas, lambda: None)
+        t_con, obtenidos, memo = medir(programas, MemoSentencias)
+        if obtenidos != esperados:
+            print(f"{nombre}: ERRORES DISTINTOS")
+            return 1
+        print(f"{nombre}: {archivos} archivos, {sum(map(len, programas)) / 1e6:.1f} M caracteres; "
+              f"sin memo {t_sin:.2f}s, con memo {t_con:.2f}s "
+              f"({len(memo.sentencias)} formas, "
+              f"{memo.reutilizadas} chequeos reutilizados, {memo.calculadas} calculados)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
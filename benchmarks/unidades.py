@@ -0,0 +1,65 @@
+"""Re-análisis después de editar una función: AnalizadorSintactico contra AnalizadorUnidades.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.unidades [funciones] [procesos]
+
+Arma un programa con muchas funciones, lo analiza una vez para llenar la caché de
+unidades y después edita una función por vez (cambia una sentencia de su cuerpo) y mide
+el análisis completo contra el análisis por unidades. Se verifica además que los errores
+sean los mismos.
+"""
+import sys
+import time
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from unidades import AnalizadorUnidades
+
+
+def generar(funciones, editada=None, version=0):
+    partes = ["entero total = 0;\n"]
+    for f in range(funciones):
+        cuerpo = []
+        for k in range(12):
+            cuerpo.append(f"    entero v{f}_{k} = total + {k};\n"
+                          f"    si (v{f}_{k} > {k * 3}) {{ total = total + v{f}_{k}; }}\n")
+        if f == editada:
+            cuerpo[5] = f"    entero v{f}_5 = total * {version};\n    imprimir(v{f}_5)\n"
+        partes.append(f"funcion f{f}() {{\n{''.join(cuerpo)}    retornar total;\n}}\n")
+    return ''.join(partes)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    funciones = int(argv[0]) if argv else 2000
+    procesos = int(argv[1]) if len(argv) > 1 else 1
+    lexico = AnalizadorLexico()
+    completo = AnalizadorSintactico()
+    por_unidades = AnalizadorUnidades(procesos=procesos)
+
+    tokens, _ = lexico.analizar(generar(funciones))
+    inicio = time.perf_counter()
+    por_unidades.analizar(tokens, ContextoAnalisis())
+    print(f"{funciones} funciones, {len(tokens)} tokens; primer análisis por unidades "
+          f"{time.perf_counter() - inicio:.3f}s")
+
+    tiempos_completo = []
+    tiempos_unidades = []
+    for version, editada in enumerate(range(0, funciones, max(funciones // 10, 1)), 1):
+        tokens, _ = lexico.analizar(generar(funciones, editada, version))
+        inicio = time.perf_counter()
+        esperados = completo.analizar(tokens, ContextoAnalisis())
+        tiempos_completo.append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        obtenidos = por_unidades.analizar(tokens, ContextoAnalisis())
+        tiempos_unidades.append(time.perf_counter() - inicio)
+        if [repr(e) for e in esperados] != [repr(e) for e in obtenidos]:
+            print(f"ERRORES DISTINTOS al editar f{editada}")
+            return 1
+    print(f"por edición: completo {min(tiempos_completo):.3f}s, por unidades "
+          f"{min(tiempos_unidades):.3f}s ({por_unidades.analizadas} unidades re-analizadas, "
+          f"{por_unidades.reutilizadas} de la caché)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
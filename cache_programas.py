@@ -0,0 +1,241 @@
+"""Caché en disco de programas compilados (al estilo de los .pyc).
+
+Cada artefacto se guarda con el hash del código fuente, la versión del bytecode y la
+huella del lenguaje como clave, así una corrida repetida del mismo programa no vuelve
+a pasar por AnalizadorLexico, AnalizadorSintactico ni el compilador.
+
+Formato de un artefacto (.aprg):
+    'APR2' | versión (u16) | tamaño del índice (u32) | crc32 del resto (u32) | índice (marshal) | secciones
+El índice guarda constantes, variables, tipos y la posición de cada función; el código
+de cada función se decodifica recién cuando la máquina virtual la llama. El crc32 se
+verifica antes de pasarle el índice a marshal: con un largo roto adentro, marshal puede
+tardar segundos en reservar memoria antes de fallar.
+"""
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from compilador import VERSION_BYTECODE, Codigo, ProgramaCompilado, analizar_y_compilar
+from lenguaje import LENGUAJE_BASE
+
+MAGIA = b'APR2'
+_CABECERA = struct.Struct('<4sHII')
+EXTENSION = '.aprg'
+
+# Tamaño máximo por defecto de la carpeta de caché
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def _codigo_desde_bytes(nombre, datos, inicio, cantidad):
+    codigo = Codigo(nombre)
+    tam = codigo.instrucciones.itemsize
+    codigo.instrucciones.frombytes(datos[inicio:inicio + 2 * cantidad * tam])
+    inicio += 2 * cantidad * tam
+    codigo.lineas.frombytes(datos[inicio:inicio + cantidad * tam])
+    return codigo
+
+
+class FuncionesPerezosas:
+    """Secuencia de funciones de un artefacto; cada una se decodifica al pedirla."""
+
+    def __init__(self, datos, entradas):
+        self._datos = datos
+        self._entradas = entradas  # [(nombre, inicio, cantidad)]
+        self._cargadas = [None] * len(entradas)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __getitem__(self, indice):
+        codigo = self._cargadas[indice]
+        if codigo is None:
+            nombre, inicio, cantidad = self._entradas[indice]
+            codigo = self._cargadas[indice] = _codigo_desde_bytes(nombre, self._datos, inicio, cantidad)
+        return codigo
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def serializar(programa):
+    """ProgramaCompilado -> bytes en formato .aprg."""
+    secciones = []
+    entradas = []
+    posicion = 0
+    for codigo in [programa.principal] + list(programa.funciones):
+        ins = codigo.instrucciones.tobytes()
+        lin = codigo.lineas.tobytes()
+        entradas.append((codigo.nombre, posicion, len(codigo)))
+        secciones.append(ins)
+        secciones.append(lin)
+        posicion += len(ins) + len(lin)
+    indice = marshal.dumps((list(programa.constantes), list(programa.variables),
+                            list(programa.tipos), dict(programa.indice_funciones), entradas))
+    resto = b''.join([indice] + secciones)
+    return _CABECERA.pack(MAGIA, VERSION_BYTECODE, len(indice), zlib.crc32(resto)) + resto
+
+
+def deserializar(datos):
+    """
+    bytes en formato .aprg -> ProgramaCompilado (las funciones se cargan al usarlas).
+    Un artefacto con otro formato, truncado o con el índice roto levanta ValueError: las
+    secciones tienen que ocupar exactamente los bytes que quedan después del índice.
+    """
+    if len(datos) < _CABECERA.size:
+        raise ValueError("artefacto truncado")
+    magia, version, tam_indice, crc = _CABECERA.unpack_from(datos, 0)
+    if magia != MAGIA or version != VERSION_BYTECODE:
+        raise ValueError("artefacto con formato o versión distinta")
+    inicio_indice = _CABECERA.size
+    if inicio_indice + tam_indice > len(datos):
+        raise ValueError("artefacto truncado")
+    if zlib.crc32(memoryview(datos)[inicio_indice:]) != crc:
+        raise ValueError("artefacto roto (crc32 distinto)")
+    try:
+        indice = marshal.loads(datos[inicio_indice:inicio_indice + tam_indice])
+    except (EOFError, TypeError, MemoryError):  # un índice con el crc32 bien pero mal armado
+        raise ValueError("índice del artefacto roto") from None
+    if not isinstance(indice, tuple) or len(indice) != 5:
+        raise ValueError("índice del artefacto con otra forma")
+    constantes, variables, tipos, indice_funciones, entradas = indice
+    if (not isinstance(constantes, list) or not isinstance(variables, list) or not isinstance(tipos, list)
+            or len(variables) != len(tipos) or not isinstance(indice_funciones, dict)
+            or not isinstance(entradas, list) or not entradas):
+        raise ValueError("índice del artefacto con otra forma")
+    secciones = memoryview(datos)[inicio_indice + tam_indice:]
+    _verificar_entradas(entradas, len(secciones))
+    if any(not isinstance(i, int) or not 0 <= i < len(entradas) - 1 for i in indice_funciones.values()):
+        raise ValueError("índice del artefacto con otra forma")
+    nombre, inicio, cantidad = entradas[0]
+    principal = _codigo_desde_bytes(nombre, secciones, inicio, cantidad)
+    funciones = FuncionesPerezosas(secciones, entradas[1:])
+    return ProgramaCompilado(principal, funciones, indice_funciones, constantes, variables, tipos)
+
+
+def _verificar_entradas(entradas, tam_secciones):
+    """Cada entrada es (nombre, inicio, cantidad) y las secciones van seguidas hasta el final."""
+    tam = array('i').itemsize
+    posicion = 0
+    for entrada in entradas:
+        if not isinstance(entrada, tuple) or len(entrada) != 3:
+            raise ValueError("índice del artefacto con otra forma")
+        nombre, inicio, cantidad = entrada
+        if not isinstance(nombre, str) or not isinstance(inicio, int) or not isinstance(cantidad, int):
+            raise ValueError("índice del artefacto con otra forma")
+        if inicio != posicion or cantidad < 0:
+            raise ValueError("secciones del artefacto desordenadas")
+        posicion += 3 * cantidad * tam  # instrucciones (de a dos) y líneas
+    if posicion != tam_secciones:
+        raise ValueError("artefacto truncado o con bytes de más")
+
+
+class CacheProgramas:
+    """
+    Carpeta de artefactos compilados con escritura atómica y tamaño acotado:
+    al superar max_bytes se borran los artefactos usados hace más tiempo.
+    """
+
+    def __init__(self, directorio, max_bytes=MAX_BYTES, lenguaje=LENGUAJE_BASE, optimizar=False):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.lenguaje = lenguaje
+        self.optimizar = optimizar
+        self.aciertos = 0
+        self.fallos = 0
+
+    def clave(self, codigo):
+        h = hashlib.sha256()
+        # como el 'magic number' de los .pyc: cambiar de compilador o de plataforma invalida la caché
+        h.update(f"{VERSION_BYTECODE}|{self.lenguaje.huella}|{marshal.version}|{sys.byteorder}|"
+                 f"{array('i').itemsize}|{'O' if self.optimizar else ''}|".encode())
+        h.update(codigo.encode('utf-8'))
+        return h.hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:32] + EXTENSION)
+
+    def cargar(self, codigo):
+        """Devuelve el programa compilado desde la caché, o None si no está o está roto (y se borra)."""
+        ruta = self._ruta(self.clave(codigo))
+        try:
+            with open(ruta, 'rb') as f:
+                datos = f.read()
+        except OSError:
+            return None
+        try:
+            programa = deserializar(datos)
+        except (ValueError, EOFError, TypeError, KeyError, IndexError, struct.error):
+            # artefacto roto: se borra, y obtener() lo vuelve a compilar y guardar
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(ruta)  # marca de uso reciente para el desalojo
+        except OSError:
+            pass
+        return programa
+
+    def guardar(self, codigo, programa):
+        """Guarda el artefacto (escritura atómica) y desaloja los más viejos si hace falta."""
+        ruta = self._ruta(self.clave(codigo))
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as f:
+                f.write(serializar(programa))
+            os.replace(temporal, ruta)
+        except OSError:
+            return
+        self._desalojar(conservar=ruta)
+
+    def obtener(self, codigo):
+        """Programa compilado del código: desde la caché o compilándolo (y guardándolo)."""
+        programa = self.cargar(codigo)
+        if programa is not None:
+            self.aciertos += 1
+            return programa
+        self.fallos += 1
+        programa = analizar_y_compilar(codigo, self.lenguaje, self.optimizar)
+        self.guardar(codigo, programa)
+        return programa
+
+    def _desalojar(self, conservar=None):
+        desalojar(self.directorio, EXTENSION, self.max_bytes, conservar)
+
+
+def desalojar(directorio, extension, max_bytes, conservar=None):
+    """Borra los archivos con esa extensión usados hace más tiempo hasta que la carpeta ocupe max_bytes."""
+    try:
+        nombres = [n for n in os.listdir(directorio) if n.endswith(extension)]
+    except OSError:
+        return
+    archivos = []
+    total = 0
+    for nombre in nombres:
+        ruta = os.path.join(directorio, nombre)
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            continue
+        archivos.append((estado.st_mtime, estado.st_size, ruta))
+        total += estado.st_size
+    if total <= max_bytes:
+        return
+    archivos.sort()
+    for _, tam, ruta in archivos:
+        if ruta == conservar:
+            continue
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue
+        total -= tam
+        if total <= max_bytes:
+            break
@@ -0,0 +1,385 @@
+"""Diferencias entre dos versiones de un programa, token por token.
+
+Uso:
+    python comparar.py viejo nuevo [--diagnosticos [--recuperacion]] [--max N]
+
+Se comparan los tokens de AnalizadorLexico sin los comentarios: los cambios de espacios,
+sangría, saltos de línea y comentarios no aparecen. Cada cambio se muestra con su
+ubicación (línea:columna) en las dos versiones y los tokens que salen (-) y entran (+):
+
+    @@ viejo 12:5-12:14 | nuevo 12:5-12:14 @@
+    - edad = 5 ;
+    + edad = 6 ;
+
+Con --diagnosticos también se analizan las dos versiones (léxico y sintáctico, como en
+validar.py y ejecutar.py: sin recuperación, con todos los errores) y se listan los errores
+que desaparecieron (-) y los que aparecieron (+). Con --recuperacion se analizan como en
+el editor, que omite los errores derivados de uno anterior en la misma sentencia: la
+lista es más corta y puede no mostrar un error que cambió. Un error se considera el mismo si tiene el mismo código y argumentos y
+está en un token que no cambió (la línea de 'ya declarada en línea N' no cuenta, porque
+se corre con cualquier línea agregada arriba).
+
+El algoritmo es el de Myers en espacio lineal (el de la "serpiente del medio"): los tokens
+se pasan a números (uno por par tipo y valor) en dos array('i'), y los tramos iguales se
+comparan de a bloques sobre sus bytes, sin recorrerlos token por token. Si dos tramos
+son muy distintos, se deja de buscar la diferencia mínima pasado un costo (COSTO_MINIMO
+o la raíz de la cantidad de tokens) y se corta por el punto más avanzado, y si en total
+se recorrieron PASOS_POR_TOKEN diagonales por token, lo que falta comparar queda como un
+solo cambio: así dos archivos que no se parecen en nada no tardan más que dos parecidos.
+El resultado sigue siendo una diferencia válida, solo que puede no ser la más corta.
+
+Código de salida 0 si los tokens son iguales, 1 si hay cambios y 2 si algún archivo no
+se pudo leer.
+"""
+import argparse
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from math import isqrt
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis, sin_comentarios
+from lenguaje import LENGUAJE_BASE
+
+# Diagonales que se recorren como mínimo antes de cortar una búsqueda cara (ver la ayuda)
+COSTO_MINIMO = 256
+# Diagonales que se recorren en total por cada token de las dos versiones (ver la ayuda)
+PASOS_POR_TOKEN = 20
+# Tokens de cada lado que se muestran por cambio
+MAX_TOKENS_CAMBIO = 30
+
+
+class Cambio:
+    """Tokens [desde_viejo, hasta_viejo) de la versión vieja reemplazados por [desde_nuevo, hasta_nuevo) de la nueva."""
+    __slots__ = ('desde_viejo', 'hasta_viejo', 'desde_nuevo', 'hasta_nuevo')
+
+    def __init__(self, desde_viejo, hasta_viejo, desde_nuevo, hasta_nuevo):
+        self.desde_viejo = desde_viejo
+        self.hasta_viejo = hasta_viejo
+        self.desde_nuevo = desde_nuevo
+        self.hasta_nuevo = hasta_nuevo
+
+    def __repr__(self):
+        return f"Cambio({self.desde_viejo}:{self.hasta_viejo} -> {self.desde_nuevo}:{self.hasta_nuevo})"
+
+
+def internar(viejos, nuevos):
+    """Los tokens de las dos versiones como números: iguales si tienen el mismo tipo y valor."""
+    claves_viejas = list(zip(map(_tipo, viejos), map(_valor, viejos)))
+    claves_nuevas = list(zip(map(_tipo, nuevos), map(_valor, nuevos)))
+    numeros = {clave: i for i, clave in enumerate(dict.fromkeys(claves_viejas + claves_nuevas))}
+    return array('i', map(numeros.__getitem__, claves_viejas)), array('i', map(numeros.__getitem__, claves_nuevas))
+
+
+def _tipo(token):
+    return token.tipo
+
+
+def _valor(token):
+    return token.valor
+
+
+class _Myers:
+    """Una comparación entre dos array('i'); diferencias() devuelve los Cambio en orden."""
+
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+        # los mismos números en bytes: comparar dos rebanadas es un memcmp
+        self.bytes_a = a.tobytes()
+        self.bytes_b = b.tobytes()
+        self.ancho = a.itemsize
+        self.limite = max(COSTO_MINIMO, isqrt(len(a) + len(b)))
+        self.pasos = PASOS_POR_TOKEN * (len(a) + len(b)) + COSTO_MINIMO ** 2
+
+    def iguales_adelante(self, x, y, maximo):
+        """Cuántos tokens iguales hay desde a[x] y b[y] (hasta maximo)."""
+        if maximo <= 0 or self.a[x] != self.b[y]:
+            return 0
+        bytes_a, bytes_b, ancho = self.bytes_a, self.bytes_b, self.ancho
+        iguales, paso = 1, 8
+        # de a bloques que crecen; el que tiene una diferencia se parte a la mitad
+        while iguales < maximo:
+            n = min(paso, maximo - iguales)
+            i, j = (x + iguales) * ancho, (y + iguales) * ancho
+            if bytes_a[i:i + n * ancho] == bytes_b[j:j + n * ancho]:
+                iguales += n
+                paso *= 2
+                continue
+            while n > 1:
+                mitad = n // 2
+                i, j = (x + iguales) * ancho, (y + iguales) * ancho
+                if bytes_a[i:i + mitad * ancho] == bytes_b[j:j + mitad * ancho]:
+                    iguales += mitad
+                    n -= mitad
+                else:
+                    n = mitad
+            break
+        return iguales
+
+    def iguales_atras(self, x, y, maximo):
+        """Cuántos tokens iguales hay terminando en a[x - 1] y b[y - 1] (hasta maximo)."""
+        if maximo <= 0 or self.a[x - 1] != self.b[y - 1]:
+            return 0
+        bytes_a, bytes_b, ancho = self.bytes_a, self.bytes_b, self.ancho
+        iguales, paso = 1, 8
+        while iguales < maximo:
+            n = min(paso, maximo - iguales)
+            i, j = (x - iguales) * ancho, (y - iguales) * ancho
+            if bytes_a[i - n * ancho:i] == bytes_b[j - n * ancho:j]:
+                iguales += n
+                paso *= 2
+                continue
+            while n > 1:
+                mitad = n // 2
+                i, j = (x - iguales) * ancho, (y - iguales) * ancho
+                if bytes_a[i - mitad * ancho:i] == bytes_b[j - mitad * ancho:j]:
+                    iguales += mitad
+                    n -= mitad
+                else:
+                    n = mitad
+            break
+        return iguales
+
+    def medio(self, x0, x1, y0, y1):
+        """
+        La serpiente del medio de a[x0:x1] contra b[y0:y1] (sin comienzo ni final en
+        común): (x, y, u, v) con a[x:u] == b[y:v] en un camino de edición mínimo. Si la
+        búsqueda se corta por cara, una serpiente vacía en otro punto; None si no hay
+        corte o si se terminaron los pasos.
+        """
+        n, m = x1 - x0, y1 - y0
+        delta = n - m
+        impar = delta & 1
+        # adelante[k]: x más avanzado en la diagonal k (x - y = k) desde el comienzo;
+        # atras[k]: lo mismo desde el final, con las dos secuencias dadas vuelta
+        adelante = {1: 0}
+        atras = {1: 0}
+        iguales_adelante, iguales_atras = self.iguales_adelante, self.iguales_atras
+        for d in range((n + m + 1) // 2 + 1):
+            if d > self.limite:
+                return self._corte(adelante, d, n, m, x0, y0)
+            self.pasos -= 2 * d + 2
+            if self.pasos < 0:
+                return None
+            for k in range(-d, d + 1, 2):
+                if k == -d or k != d and adelante[k - 1] < adelante[k + 1]:
+                    x = adelante[k + 1]
+                else:
+                    x = adelante[k - 1] + 1
+                y = x - k
+                antes_x, antes_y = x, y
+                s = iguales_adelante(x0 + x, y0 + y, min(n - x, m - y))
+                x += s
+                adelante[k] = x
+                c = delta - k
+                if impar and -d < c < d and x + atras[c] >= n:
+                    return x0 + antes_x, y0 + antes_y, x0 + x, y0 + y + s
+            for c in range(-d, d + 1, 2):
+                if c == -d or c != d and atras[c - 1] < atras[c + 1]:
+                    x = atras[c + 1]
+                else:
+                    x = atras[c - 1] + 1
+                y = x - c
+                antes_x, antes_y = x, y
+                s = iguales_atras(x1 - x, y1 - y, min(n - x, m - y))
+                x += s
+                atras[c] = x
+                k = delta - c
+                if not impar and -d <= k <= d and x + adelante[k] >= n:
+                    return x1 - x, y1 - y - s, x1 - antes_x, y1 - antes_y
+        raise AssertionError("no se encontró la serpiente del medio")
+
+    @staticmethod
+    def _corte(adelante, d, n, m, x0, y0):
+        """
+        Búsqueda cara: se corta en el punto más avanzado desde el comienzo (dentro de las
+        dos secuencias), o None si no hay uno que deje dos partes más chicas.
+        """
+        mejor = None
+        for k in range(-d + 1, d, 2):
+            x = adelante[k]
+            y = x - k
+            if 0 <= x <= n and 0 <= y <= m and 0 < x + y < n + m and (mejor is None or x + y > sum(mejor)):
+                mejor = (x, y)
+        if mejor is None:
+            return None
+        x, y = mejor
+        return x0 + x, y0 + y, x0 + x, y0 + y
+
+    def diferencias(self):
+        cambios = []
+        pendientes = [(0, len(self.a), 0, len(self.b))]
+        while pendientes:
+            x0, x1, y0, y1 = pendientes.pop()
+            s = self.iguales_adelante(x0, y0, min(x1 - x0, y1 - y0))
+            x0 += s
+            y0 += s
+            s = self.iguales_atras(x1, y1, min(x1 - x0, y1 - y0))
+            x1 -= s
+            y1 -= s
+            if x0 == x1 or y0 == y1:
+                if x0 < x1 or y0 < y1:
+                    ultimo = cambios[-1] if cambios else None
+                    if ultimo is not None and ultimo.hasta_viejo == x0 and ultimo.hasta_nuevo == y0:
+                        ultimo.hasta_viejo, ultimo.hasta_nuevo = x1, y1  # pegado al anterior
+                    else:
+                        cambios.append(Cambio(x0, x1, y0, y1))
+                continue
+            medio = self.medio(x0, x1, y0, y1)
+            if medio is None:  # sin un corte posible o sin pasos: todo el tramo es un cambio
+                cambios.append(Cambio(x0, x1, y0, y1))
+                continue
+            x, y, u, v = medio
+            # primero la parte de adelante, así los cambios salen en orden
+            pendientes.append((u, x1, v, y1))
+            pendientes.append((x0, x, y0, y))
+        return cambios
+
+
+def diferencias(a, b):
+    """Los Cambio que llevan de la secuencia de números a (array('i')) a la b."""
+    return _Myers(a, b).diferencias()
+
+
+def _clave_error(error):
+    if error.codigo == 'T001':  # sin la línea de la declaración anterior
+        return error.codigo, error.argumentos[:1]
+    return error.codigo, error.argumentos
+
+
+class Comparacion:
+    """Los tokens (sin comentarios) de dos versiones de un programa y sus diferencias."""
+
+    def __init__(self, viejo, nuevo, lenguaje=LENGUAJE_BASE, recuperacion=False):
+        self.lenguaje = lenguaje
+        self.codigos = (viejo, nuevo)
+        # recuperacion: analizar como el editor, omitiendo los errores derivados
+        self.recuperacion = recuperacion
+        self.suprimidos = 0  # errores derivados omitidos en las dos versiones
+        lexico = AnalizadorLexico(lenguaje, recuperacion=recuperacion)
+        # de cada versión: (tokens con comentarios, contexto, errores léxicos)
+        self._analisis = []
+        for codigo in self.codigos:
+            contexto = ContextoAnalisis()
+            tokens, errores = lexico.analizar(codigo, contexto)
+            self.suprimidos += errores.suprimidos
+            self._analisis.append((tokens, contexto, errores))
+        self.viejos = list(sin_comentarios(self._analisis[0][0]))
+        self.nuevos = list(sin_comentarios(self._analisis[1][0]))
+        self.cambios = diferencias(*internar(self.viejos, self.nuevos))
+
+    def ubicacion(self, tokens, desde, hasta):
+        """'linea:columna-linea:columna' de tokens[desde:hasta] (un tramo vacío: donde iría)."""
+        if desde == hasta:
+            if desde < len(tokens):
+                token = tokens[desde]
+            elif tokens:
+                ultimo = tokens[-1]
+                return f"{ultimo.linea}:{ultimo.columna + len(ultimo.valor)}"
+            else:
+                return "1:1"
+            return f"{token.linea}:{token.columna}"
+        primero, ultimo = tokens[desde], tokens[hasta - 1]
+        return f"{primero.linea}:{primero.columna}-{ultimo.linea}:{ultimo.columna + len(ultimo.valor)}"
+
+    def nuevo_de(self, i):
+        """Posición en la versión nueva del token i de la vieja; None si cambió."""
+        cambios = self.cambios
+        k = bisect_right(cambios, i, key=_desde_viejo) - 1
+        if k < 0:
+            return i
+        cambio = cambios[k]
+        if i < cambio.hasta_viejo:
+            return None
+        return i - cambio.hasta_viejo + cambio.hasta_nuevo
+
+    def diagnosticos(self):
+        """(desaparecidos, aparecidos): errores de la versión vieja y de la nueva sin par en la otra."""
+        sintactico = AnalizadorSintactico(self.lenguaje, recuperacion=self.recuperacion)
+        errores = []
+        for tokens, contexto, lexicos in self._analisis:
+            sintacticos = sintactico.analizar(tokens, contexto)
+            self.suprimidos += sintacticos.suprimidos
+            errores.append(list(lexicos) + list(sintacticos))
+        viejos, nuevos = errores
+        # Cada error se ubica en el token donde empieza (o el siguiente)
+        posiciones_viejas = [(t.linea, t.columna) for t in self.viejos]
+        posiciones_nuevas = [(t.linea, t.columna) for t in self.nuevos]
+        claves_nuevas = {}
+        for error in nuevos:
+            clave = (_clave_error(error), bisect_left(posiciones_nuevas, (error.linea, error.columna)))
+            claves_nuevas[clave] = claves_nuevas.get(clave, 0) + 1
+        desaparecidos = []
+        for error in viejos:
+            i = bisect_left(posiciones_viejas, (error.linea, error.columna))
+            if i == len(self.viejos):
+                j = len(self.nuevos)  # al final del archivo
+            else:
+                j = self.nuevo_de(i)
+            clave = (_clave_error(error), j)
+            if j is not None and claves_nuevas.get(clave):
+                claves_nuevas[clave] -= 1
+            else:
+                desaparecidos.append(error)
+        aparecidos = []
+        for error in nuevos:
+            clave = (_clave_error(error), bisect_left(posiciones_nuevas, (error.linea, error.columna)))
+            if claves_nuevas.get(clave):
+                claves_nuevas[clave] -= 1
+                aparecidos.append(error)
+        return desaparecidos, aparecidos
+
+
+def _desde_viejo(cambio):
+    return cambio.desde_viejo
+
+
+def _mostrar_tokens(signo, tokens):
+    valores = ' '.join(t.valor for t in tokens[:MAX_TOKENS_CAMBIO])
+    if len(tokens) > MAX_TOKENS_CAMBIO:
+        valores += f" ... ({len(tokens) - MAX_TOKENS_CAMBIO} tokens más)"
+    return f"{signo} {valores}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diferencias token por token entre dos versiones de un programa.")
+    parser.add_argument('viejo', help="versión anterior")
+    parser.add_argument('nuevo', help="versión nueva")
+    parser.add_argument('--diagnosticos', action='store_true',
+                        help="listar también los errores que desaparecieron y los que aparecieron")
+    parser.add_argument('--recuperacion', action='store_true',
+                        help="con --diagnosticos, analizar como el editor (omite los errores derivados)")
+    parser.add_argument('--max', type=int, default=None, help="mostrar como máximo N cambios")
+    args = parser.parse_args(argv)
+
+    codigos = []
+    for ruta in (args.viejo, args.nuevo):
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                codigos.append(f.read())
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"{ruta}: no se pudo leer ({e})", file=sys.stderr)
+            return 2
+
+    comparacion = Comparacion(*codigos, recuperacion=args.recuperacion)
+    viejos, nuevos = comparacion.viejos, comparacion.nuevos
+    for cambio in comparacion.cambios[:args.max]:
+        print(f"@@ {args.viejo} {comparacion.ubicacion(viejos, cambio.desde_viejo, cambio.hasta_viejo)}"
+              f" | {args.nuevo} {comparacion.ubicacion(nuevos, cambio.desde_nuevo, cambio.hasta_nuevo)} @@")
+        if cambio.desde_viejo < cambio.hasta_viejo:
+            print(_mostrar_tokens('-', viejos[cambio.desde_viejo:cambio.hasta_viejo]))
+        if cambio.desde_nuevo < cambio.hasta_nuevo:
+            print(_mostrar_tokens('+', nuevos[cambio.desde_nuevo:cambio.hasta_nuevo]))
+    if args.diagnosticos:
+        desaparecidos, aparecidos = comparacion.diagnosticos()
+        for signo, ruta, errores in (('-', args.viejo, desaparecidos), ('+', args.nuevo, aparecidos)):
+            for error in errores:
+                print(f"{signo} {ruta}:{error.linea}:{error.columna}: [{error.tipo} {error.codigo}] {error.mensaje}")
+        omitidos = f" (con recuperación: {comparacion.suprimidos} errores derivados omitidos)" if args.recuperacion else ""
+        print(f"{len(desaparecidos)} errores desaparecidos, {len(aparecidos)} aparecidos{omitidos}", file=sys.stderr)
+    print(f"{len(comparacion.cambios)} cambios ({len(viejos)} tokens -> {len(nuevos)} tokens)", file=sys.stderr)
+    return 1 if comparacion.cambios else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
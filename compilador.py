@@ -0,0 +1,315 @@
+"""Compilador a bytecode de programas sin errores de análisis.
+
+El bytecode es compacto: cada función (y el programa principal) es un arreglo de
+enteros con pares (operación, argumento), más un arreglo paralelo de líneas para
+los mensajes de error. Las constantes van en una tabla compartida y las variables
+se direccionan por ranura, según la tabla de símbolos del análisis.
+"""
+from array import array
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from arbol import (ErrorCompilacion, construir_arbol, Literal, Variable, Binaria, Unaria,
+                   Llamada, Declaracion, Asignacion, Imprimir, Leer, Si, Mientras, Para,
+                   Funcion, Retornar, SentenciaExpresion, Bloque)
+from lenguaje import LENGUAJE_BASE
+
+# Cambia cuando cambia el formato del bytecode
+VERSION_BYTECODE = 1
+
+# Códigos de operación
+(CARGAR_CONST, CARGAR_VAR, GUARDAR_VAR, SUMAR, RESTAR, MULTIPLICAR, DIVIDIR, MODULO,
+ IGUAL, DISTINTO, MENOR, MAYOR, MENOR_IGUAL, MAYOR_IGUAL, NO, NEGATIVO, A_FLOTANTE,
+ SALTAR, SALTAR_SI_FALSO, IMPRIMIR, LEER, LLAMAR, RETORNAR, DESCARTAR, FIN) = range(25)
+
+NOMBRES_OPERACION = (
+    'CARGAR_CONST', 'CARGAR_VAR', 'GUARDAR_VAR', 'SUMAR', 'RESTAR', 'MULTIPLICAR', 'DIVIDIR',
+    'MODULO', 'IGUAL', 'DISTINTO', 'MENOR', 'MAYOR', 'MENOR_IGUAL', 'MAYOR_IGUAL', 'NO',
+    'NEGATIVO', 'A_FLOTANTE', 'SALTAR', 'SALTAR_SI_FALSO', 'IMPRIMIR', 'LEER', 'LLAMAR',
+    'RETORNAR', 'DESCARTAR', 'FIN'
+)
+
+OPERACIONES_BINARIAS = {
+    '+': SUMAR, '-': RESTAR, '*': MULTIPLICAR, '/': DIVIDIR, '%': MODULO,
+    '==': IGUAL, '!=': DISTINTO, '<': MENOR, '>': MAYOR, '<=': MENOR_IGUAL, '>=': MAYOR_IGUAL,
+}
+
+
+class Codigo:
+    """Bytecode de una función o del programa principal."""
+    __slots__ = ('nombre', 'instrucciones', 'lineas')
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.instrucciones = array('i')  # pares (operación, argumento)
+        self.lineas = array('i')  # línea de origen de cada instrucción
+
+    def __len__(self):
+        return len(self.lineas)
+
+    def emitir(self, operacion, argumento, linea):
+        """Agrega una instrucción y devuelve su posición (para parchar saltos)."""
+        self.instrucciones.append(operacion)
+        self.instrucciones.append(argumento)
+        self.lineas.append(linea)
+        return len(self.lineas) - 1
+
+    def parchar(self, posicion, destino):
+        self.instrucciones[2 * posicion + 1] = destino
+
+    def desensamblar(self):
+        lineas = []
+        for i in range(len(self.lineas)):
+            op = self.instrucciones[2 * i]
+            arg = self.instrucciones[2 * i + 1]
+            lineas.append(f"{i:4d}  L{self.lineas[i]:<4d} {NOMBRES_OPERACION[op]:16s} {arg}")
+        return "\n".join(lineas)
+
+
+class ProgramaCompilado:
+    """Resultado del compilador: código principal, funciones, constantes y ranuras de variables."""
+    __slots__ = ('principal', 'funciones', 'indice_funciones', 'constantes', 'variables', 'tipos')
+
+    def __init__(self, principal, funciones, indice_funciones, constantes, variables, tipos):
+        self.principal = principal
+        self.funciones = funciones  # lista de Codigo; LLAMAR usa el índice
+        self.indice_funciones = indice_funciones  # nombre -> índice
+        self.constantes = constantes
+        self.variables = variables  # nombre de cada ranura
+        self.tipos = tipos  # tipo declarado de cada ranura
+
+    def __repr__(self):
+        return (f"ProgramaCompilado({len(self.principal)} instrucciones, {len(self.funciones)} funciones, "
+                f"{len(self.constantes)} constantes, {len(self.variables)} variables)")
+
+
+class Compilador:
+    """Traduce el árbol del programa a bytecode usando la tabla de símbolos del análisis."""
+
+    def __init__(self, variables_declaradas):
+        # variables_declaradas: {nombre: (tipo, linea)} (ContextoAnalisis.variables_declaradas)
+        self.ranuras = {nombre: i for i, nombre in enumerate(variables_declaradas)}
+        self.variables = list(variables_declaradas)
+        self.tipos = [tipo for tipo, _ in variables_declaradas.values()]
+        self.constantes = []
+        self._indice_constantes = {}
+        self.indice_funciones = {}
+        self.codigo = None
+        self.en_funcion = False
+
+    def compilar(self, programa):
+        """programa: arbol.Programa -> ProgramaCompilado."""
+        self.indice_funciones = {nombre: i for i, nombre in enumerate(programa.funciones)}
+        funciones = []
+        for funcion in programa.funciones.values():
+            self.codigo = Codigo(funcion.nombre)
+            self.en_funcion = True
+            self._bloque(funcion.cuerpo)
+            # retorno implícito
+            self.codigo.emitir(CARGAR_CONST, self._constante(0), funcion.linea)
+            self.codigo.emitir(RETORNAR, 0, funcion.linea)
+            funciones.append(self.codigo)
+
+        self.codigo = Codigo('<principal>')
+        self.en_funcion = False
+        ultima_linea = 0
+        for sentencia in programa.sentencias:
+            self._sentencia(sentencia)
+            ultima_linea = sentencia.linea
+        self.codigo.emitir(FIN, 0, ultima_linea)
+        return ProgramaCompilado(self.codigo, funciones, self.indice_funciones,
+                                 self.constantes, self.variables, self.tipos)
+
+    # --- utilidades ---
+
+    def _constante(self, valor):
+        clave = (type(valor), valor)
+        indice = self._indice_constantes.get(clave)
+        if indice is None:
+            indice = len(self.constantes)
+            self.constantes.append(valor)
+            self._indice_constantes[clave] = indice
+        return indice
+
+    def _ranura(self, nombre, linea):
+        ranura = self.ranuras.get(nombre)
+        if ranura is None:
+            raise ErrorCompilacion(f"variable '{nombre}' no declarada (línea {linea})")
+        return ranura
+
+    def _tipo(self, expresion):
+        """Tipo estático de una expresión, o None si no se conoce (llamadas a funciones)."""
+        if isinstance(expresion, Literal):
+            return expresion.tipo
+        if isinstance(expresion, Variable):
+            return self.tipos[self._ranura(expresion.nombre, expresion.linea)]
+        if isinstance(expresion, Binaria):
+            if expresion.operador in ('+', '-', '*', '/', '%'):
+                izq = self._tipo(expresion.izquierda)
+                der = self._tipo(expresion.derecha)
+                if izq is None or der is None:
+                    return None
+                if izq == 'cadena' or der == 'cadena':
+                    return 'cadena'
+                return 'flotante' if 'flotante' in (izq, der) else 'entero'
+            return 'entero'
+        if isinstance(expresion, Unaria):
+            return 'entero' if expresion.operador == '!' else self._tipo(expresion.operando)
+        return None
+
+    def _guardar(self, nombre, valor, linea):
+        ranura = self._ranura(nombre, linea)
+        self._expresion(valor)
+        # una variable 'flotante' siempre guarda un flotante (ej: flotante x = 2;)
+        if self.tipos[ranura] == 'flotante' and self._tipo(valor) != 'flotante':
+            self.codigo.emitir(A_FLOTANTE, 0, linea)
+        self.codigo.emitir(GUARDAR_VAR, ranura, linea)
+
+    # --- sentencias ---
+
+    def _bloque(self, bloque):
+        for sentencia in bloque.sentencias:
+            self._sentencia(sentencia)
+
+    def _sentencia(self, s):
+        codigo = self.codigo
+        if isinstance(s, Asignacion):
+            self._guardar(s.nombre, s.valor, s.linea)
+        elif isinstance(s, Declaracion):
+            if s.valor is not None:
+                self._guardar(s.nombre, s.valor, s.linea)
+            else:
+                valor_inicial = {'entero': 0, 'flotante': 0.0, 'cadena': ''}[s.tipo]
+                codigo.emitir(CARGAR_CONST, self._constante(valor_inicial), s.linea)
+                codigo.emitir(GUARDAR_VAR, self._ranura(s.nombre, s.linea), s.linea)
+        elif isinstance(s, Imprimir):
+            for argumento in s.argumentos:
+                self._expresion(argumento)
+            codigo.emitir(IMPRIMIR, len(s.argumentos), s.linea)
+        elif isinstance(s, Leer):
+            codigo.emitir(LEER, self._ranura(s.nombre, s.linea), s.linea)
+        elif isinstance(s, Si):
+            self._expresion(s.condicion)
+            salto_falso = codigo.emitir(SALTAR_SI_FALSO, 0, s.linea)
+            self._bloque(s.entonces)
+            if s.sino is not None:
+                salto_fin = codigo.emitir(SALTAR, 0, s.linea)
+                codigo.parchar(salto_falso, len(codigo))
+                self._bloque(s.sino)
+                codigo.parchar(salto_fin, len(codigo))
+            else:
+                codigo.parchar(salto_falso, len(codigo))
+        elif isinstance(s, Mientras):
+            inicio = len(codigo)
+            self._expresion(s.condicion)
+            salto_fin = codigo.emitir(SALTAR_SI_FALSO, 0, s.linea)
+            self._bloque(s.cuerpo)
+            codigo.emitir(SALTAR, inicio, s.linea)
+            codigo.parchar(salto_fin, len(codigo))
+        elif isinstance(s, Para):
+            if s.inicio is not None:
+                self._sentencia(s.inicio)
+            inicio = len(codigo)
+            salto_fin = None
+            if s.condicion is not None:
+                self._expresion(s.condicion)
+                salto_fin = codigo.emitir(SALTAR_SI_FALSO, 0, s.linea)
+            self._bloque(s.cuerpo)
+            if s.paso is not None:
+                self._sentencia(s.paso)
+            codigo.emitir(SALTAR, inicio, s.linea)
+            if salto_fin is not None:
+                codigo.parchar(salto_fin, len(codigo))
+        elif isinstance(s, Retornar):
+            if not self.en_funcion:
+                # 'retornar' fuera de una función termina el programa
+                codigo.emitir(FIN, 0, s.linea)
+                return
+            if s.valor is None:
+                codigo.emitir(CARGAR_CONST, self._constante(0), s.linea)
+            else:
+                self._expresion(s.valor)
+            codigo.emitir(RETORNAR, 0, s.linea)
+        elif isinstance(s, SentenciaExpresion):
+            self._expresion(s.expresion)
+            codigo.emitir(DESCARTAR, 0, s.linea)
+        elif isinstance(s, Bloque):
+            self._bloque(s)
+        elif isinstance(s, Funcion):
+            raise ErrorCompilacion(f"función '{s.nombre}' declarada dentro de un bloque (línea {s.linea})")
+        else:
+            raise ErrorCompilacion(f"sentencia no soportada: {type(s).__name__}")
+
+    # --- expresiones ---
+
+    def _expresion(self, e):
+        codigo = self.codigo
+        if isinstance(e, Literal):
+            codigo.emitir(CARGAR_CONST, self._constante(e.valor), e.linea)
+        elif isinstance(e, Variable):
+            codigo.emitir(CARGAR_VAR, self._ranura(e.nombre, e.linea), e.linea)
+        elif isinstance(e, Binaria):
+            if e.operador in ('&&', '||'):
+                # cortocircuito: el resultado es 1 o 0
+                self._expresion(e.izquierda)
+                if e.operador == '&&':
+                    salto_izq = codigo.emitir(SALTAR_SI_FALSO, 0, e.linea)
+                    self._expresion(e.derecha)
+                    salto_der = codigo.emitir(SALTAR_SI_FALSO, 0, e.linea)
+                    codigo.emitir(CARGAR_CONST, self._constante(1), e.linea)
+                    salto_fin = codigo.emitir(SALTAR, 0, e.linea)
+                    codigo.parchar(salto_izq, len(codigo))
+                    codigo.parchar(salto_der, len(codigo))
+                    codigo.emitir(CARGAR_CONST, self._constante(0), e.linea)
+                else:
+                    salto_der = codigo.emitir(SALTAR_SI_FALSO, 0, e.linea)
+                    codigo.emitir(CARGAR_CONST, self._constante(1), e.linea)
+                    salto_fin = codigo.emitir(SALTAR, 0, e.linea)
+                    codigo.parchar(salto_der, len(codigo))
+                    self._expresion(e.derecha)
+                    codigo.emitir(NO, 0, e.linea)
+                    codigo.emitir(NO, 0, e.linea)
+                codigo.parchar(salto_fin, len(codigo))
+                return
+            self._expresion(e.izquierda)
+            self._expresion(e.derecha)
+            codigo.emitir(OPERACIONES_BINARIAS[e.operador], 0, e.linea)
+        elif isinstance(e, Unaria):
+            self._expresion(e.operando)
+            codigo.emitir(NO if e.operador == '!' else NEGATIVO, 0, e.linea)
+        elif isinstance(e, Llamada):
+            indice = self.indice_funciones.get(e.nombre)
+            if indice is None:
+                raise ErrorCompilacion(f"función '{e.nombre}' no declarada (línea {e.linea})")
+            codigo.emitir(LLAMAR, indice, e.linea)
+        else:
+            raise ErrorCompilacion(f"expresión no soportada: {type(e).__name__}")
+
+
+def compilar(tokens, contexto, optimizar=False):
+    """
+    Compila el resultado de un análisis sin errores (tokens y su ContextoAnalisis).
+    Con optimizar=True pasa antes por el Optimizador; su informe queda en
+    contexto.informe_optimizacion y las variables eliminadas no ocupan ranura.
+    """
+    programa = construir_arbol(tokens)
+    variables = contexto.variables_declaradas
+    if optimizar:
+        # import local: el optimizador usa la aritmética de maquina_virtual, que importa este módulo
+        from optimizador import Optimizador
+        Optimizador().optimizar(programa, contexto)
+        informe = contexto.informe_optimizacion
+        eliminadas = {nombre for nombre, _, _ in informe.variables_eliminadas}
+        variables = {nombre: datos for nombre, datos in variables.items() if nombre not in eliminadas}
+    return Compilador(variables).compilar(programa)
+
+
+def analizar_y_compilar(codigo, lenguaje=LENGUAJE_BASE, optimizar=False, contexto=None):
+    """Analiza el código fuente y lo compila; lanza ErrorCompilacion si tiene errores."""
+    if contexto is None:
+        contexto = ContextoAnalisis()
+    tokens, errores_lexicos = AnalizadorLexico(lenguaje).analizar(codigo, contexto)
+    errores_sintacticos = AnalizadorSintactico(lenguaje).analizar(tokens, contexto)
+    errores = list(errores_lexicos) + list(errores_sintacticos)
+    if errores:
+        raise ErrorCompilacion(f"el programa tiene {len(errores)} errores de análisis", errores)
+    return compilar(tokens, contexto, optimizar)
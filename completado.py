@@ -0,0 +1,133 @@
+"""Completado de nombres en el editor: árbol de prefijos (trie) de palabras e identificadores.
+
+Cada nodo del árbol es un carácter; el camino desde la raíz hasta un nodo marcado forma un
+nombre, y el nodo guarda su clase ('reservada', 'variable', 'funcion'). Las sugerencias
+para un prefijo se buscan bajando por sus caracteres y recorriendo en orden alfabético el
+subárbol de ahí hasta juntar las pedidas, así el costo depende del largo del prefijo y de
+cuántas se muestran, no de cuántos nombres hay.
+
+El árbol no se rearma en cada análisis: actualizar() recibe los nombres declarados de una
+clase, los compara con los de la vez anterior y solo agrega o quita la diferencia.
+"""
+
+# Sugerencias que se muestran como máximo
+MAX_SUGERENCIAS = 12
+
+
+class _Nodo:
+    __slots__ = ('hijos', 'clase', 'orden')
+
+    def __init__(self):
+        self.hijos = {}
+        self.clase = None  # clase del nombre que termina acá, o None
+        self.orden = None  # claves de 'hijos' ordenadas, calculadas al sugerir
+
+
+class TrieNombres:
+    """Nombres con su clase, buscables por prefijo."""
+
+    def __init__(self, reservadas=()):
+        self.raiz = _Nodo()
+        self.cantidad = 0
+        self.declarados = {}  # clase -> nombres que puso actualizar() la última vez
+        for palabra in reservadas:
+            self.agregar(palabra, 'reservada')
+
+    def __len__(self):
+        return self.cantidad
+
+    def __contains__(self, nombre):
+        nodo = self._nodo(nombre)
+        return nodo is not None and nodo.clase is not None
+
+    def _nodo(self, prefijo):
+        nodo = self.raiz
+        for char in prefijo:
+            nodo = nodo.hijos.get(char)
+            if nodo is None:
+                return None
+        return nodo
+
+    def agregar(self, nombre, clase):
+        """Agrega 'nombre' (o cambia su clase si ya estaba)."""
+        nodo = self.raiz
+        for char in nombre:
+            hijo = nodo.hijos.get(char)
+            if hijo is None:
+                hijo = nodo.hijos[char] = _Nodo()
+                nodo.orden = None
+            nodo = hijo
+        if nodo.clase is None:
+            self.cantidad += 1
+        nodo.clase = clase
+
+    def quitar(self, nombre):
+        """Quita 'nombre' y los nodos que quedan sin uso; si no estaba, no hace nada."""
+        camino = []
+        nodo = self.raiz
+        for char in nombre:
+            camino.append((nodo, char))
+            nodo = nodo.hijos.get(char)
+            if nodo is None:
+                return
+        if nodo.clase is None:
+            return
+        nodo.clase = None
+        self.cantidad -= 1
+        for padre, char in reversed(camino):
+            if nodo.hijos or nodo.clase is not None:
+                break
+            del padre.hijos[char]
+            padre.orden = None
+            nodo = padre
+
+    def actualizar(self, clase, nombres):
+        """
+        Deja en el árbol exactamente 'nombres' para la clase (los declarados en el último
+        análisis), agregando y quitando solo lo que cambió desde la llamada anterior. Un
+        nombre que ya tiene otra clase (una palabra reservada, una función con el nombre de
+        una variable) conserva la que tenía.
+        """
+        nuevos = set(nombres)
+        previos = self.declarados.get(clase, set())
+        for nombre in previos - nuevos:
+            nodo = self._nodo(nombre)
+            if nodo is not None and nodo.clase == clase:
+                otra = next((c for c, declarados in self.declarados.items()
+                             if c != clase and nombre in declarados), None)
+                if otra is None:
+                    self.quitar(nombre)
+                else:
+                    nodo.clase = otra
+        for nombre in nuevos - previos:
+            nodo = self._nodo(nombre)
+            if nodo is None or nodo.clase is None:
+                self.agregar(nombre, clase)
+        self.declarados[clase] = nuevos
+
+    def sugerencias(self, prefijo, limite=MAX_SUGERENCIAS):
+        """Hasta 'limite' pares (nombre, clase) que empiezan con 'prefijo', en orden alfabético."""
+        nodo = self._nodo(prefijo)
+        if nodo is None or limite <= 0:
+            return []
+        encontrados = []
+        # Recorrido en profundidad con una pila de iteradores sobre los hijos ordenados
+        pila = [(prefijo, nodo, None)]
+        while pila:
+            texto, nodo, hijos = pila.pop()
+            if hijos is None:
+                if nodo.clase is not None:
+                    encontrados.append((texto, nodo.clase))
+                    if len(encontrados) == limite:
+                        break
+                if not nodo.hijos:
+                    continue
+                if nodo.orden is None:
+                    nodo.orden = sorted(nodo.hijos)
+                hijos = iter(nodo.orden)
+            char = next(hijos, None)
+            if char is None:
+                continue
+            pila.append((texto, nodo, hijos))
+            pila.append((texto + char, nodo.hijos[char], None))
+        return encontrados
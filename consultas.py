@@ -0,0 +1,442 @@
+"""Consultas estructurales sobre los tokens de muchos programas.
+
+Uso:
+    python consultas.py "CONSULTA" ruta [ruta ...] [--extension .txt] [--max N] [--contar]
+
+Una consulta es una secuencia de elementos que tiene que aparecer seguida en los tokens
+(sin comentarios) de un programa:
+
+    palabra        token con ese valor: mientras, x, =, ;, +, 10
+    'texto'        valor exacto entre comillas (para '(' , '|', 'con' y parecidos)
+    TIPO           token de ese tipo: IDENTIFICADOR, LITERAL_ENTERO, OPERADOR, ...
+    @categoria     operador o delimitador de esa categoría del lenguaje (@relacionales,
+                   @logicos, @aritmeticos, @parentesis, ...), @condicion (los operadores
+                   que valen en una condición) o @tipos (las palabras de tipo de dato)
+    _              cualquier token
+    a|b|C          cualquiera de esos
+    ( ... )        grupo entre paréntesis balanceados; lo de adentro se describe con
+    { ... }        restricciones 'con X' / 'sin X' (hay o no hay un token X a cualquier
+                   profundidad) y, si se da, una secuencia que tiene que ocupar todo el grupo
+    [ ... ]        uno o más tokens balanceados de una misma sentencia (no cruza un ';'),
+                   con restricciones 'con X' / 'sin X'
+    ...            cero o más tokens balanceados cualesquiera
+
+Los tramos ([ ] y ...) no cruzan un delimitador que cierre algo abierto antes, así no se
+salen del grupo donde empiezan, y toman lo mínimo que deja coincidir al resto de la
+consulta.
+
+Ejemplos:
+    mientras (sin @condicion)                          condición sin operador relacional ni lógico
+    cadena IDENTIFICADOR = [con LITERAL_ENTERO|LITERAL_FLOTANTE] ;
+    funcion IDENTIFICADOR ( ) {sin retornar}
+    si (...) {...} sino si                             un si-sino-si encadenado
+
+Cada programa se indexa una vez (IndiceTokens): posiciones por valor y por tipo de token
+y el cierre de cada '(' y '{'. Una consulta se compila una vez y por archivo solo se
+prueban las posiciones donde puede empezar: las del elemento más raro entre los primeros
+(los que quedan a distancia fija del comienzo), sacadas del índice. Los archivos a los
+que les falta algún token obligatorio se descartan sin mirarlos.
+"""
+import argparse
+import os
+import re
+import sys
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import merge
+from itertools import groupby
+
+from analizador_sintactico import AnalizadorLexico, sin_comentarios
+from lenguaje import LENGUAJE_BASE
+
+TIPOS_TOKEN = frozenset({'PALABRA_RESERVADA', 'IDENTIFICADOR', 'LITERAL_ENTERO', 'LITERAL_FLOTANTE',
+                         'LITERAL_CADENA', 'OPERADOR', 'DELIMITADOR'})
+APERTURAS = {'(': ')', '{': '}'}
+CIERRES = frozenset(APERTURAS.values())
+# Largo máximo del texto de una coincidencia al mostrarla
+MAX_TEXTO = 80
+
+_PIEZA_CONSULTA = re.compile(r"""\s*(\.\.\.|'[^']*'|"[^"]*"|[\[\](){}]|\|\||\||[^\s\[\](){}|'"]+)""")
+
+
+class ErrorConsulta(ValueError):
+    """La consulta no se puede compilar."""
+
+
+class IndiceTokens:
+    """
+    Índice invertido de los tokens de un programa: posiciones (en orden) de cada valor y
+    de cada tipo, y para cada '(' o '{' la posición de su cierre (-1 si no se cierra).
+    """
+    __slots__ = ('tokens', 'por_valor', 'por_tipo', 'cierres')
+
+    def __init__(self, tokens):
+        tokens = list(sin_comentarios(tokens))
+        por_valor = defaultdict(list)
+        por_tipo = defaultdict(list)
+        cierres = [-1] * len(tokens)
+        abiertos = []
+        for i, token in enumerate(tokens):
+            por_valor[token.valor].append(i)
+            por_tipo[token.tipo].append(i)
+            if token.tipo == 'DELIMITADOR':
+                if token.valor in APERTURAS:
+                    abiertos.append(i)
+                elif token.valor in CIERRES:
+                    # como en verificar_delimitadores: un cierre que no corresponde no cierra nada
+                    if abiertos and APERTURAS[tokens[abiertos[-1]].valor] == token.valor:
+                        cierres[abiertos.pop()] = i
+        self.tokens = tokens
+        self.por_valor = dict(por_valor)
+        self.por_tipo = dict(por_tipo)
+        self.cierres = cierres
+
+
+class _Atomo:
+    """Un token aceptable: por valor, por tipo o cualquiera."""
+    __slots__ = ('valores', 'tipos', 'cualquiera')
+
+    def __init__(self, valores=(), tipos=(), cualquiera=False):
+        self.valores = frozenset(valores)
+        self.tipos = frozenset(tipos)
+        self.cualquiera = cualquiera
+
+    def acepta(self, token):
+        return self.cualquiera or token.valor in self.valores or token.tipo in self.tipos
+
+    def _listas(self, indice):
+        return ([indice.por_valor[v] for v in self.valores if v in indice.por_valor]
+                + [indice.por_tipo[t] for t in self.tipos if t in indice.por_tipo])
+
+    def posiciones(self, indice):
+        """Posiciones del programa con un token aceptable, en orden."""
+        if self.cualquiera:
+            return range(len(indice.tokens))
+        listas = self._listas(indice)
+        if len(listas) == 1:
+            return listas[0]
+        # un token puede estar en más de una lista (por valor y por tipo): cada posición, una vez
+        return [posicion for posicion, _ in groupby(merge(*listas))]
+
+    def aparece(self, indice, inicio, fin):
+        """Si hay un token aceptable en tokens[inicio:fin]."""
+        if self.cualquiera:
+            return inicio < fin
+        for lista in self._listas(indice):
+            k = bisect_left(lista, inicio)
+            if k < len(lista) and lista[k] < fin:
+                return True
+        return False
+
+
+def _cumple(restricciones, indice, inicio, fin):
+    for con, atomo in restricciones:
+        if atomo.aparece(indice, inicio, fin) != con:
+            return False
+    return True
+
+
+class _Token:
+    __slots__ = ('atomo',)
+
+    def __init__(self, atomo):
+        self.atomo = atomo
+
+    def avances(self, indice, i, limite):
+        if i < limite and self.atomo.acepta(indice.tokens[i]):
+            yield i + 1
+
+
+class _Grupo:
+    __slots__ = ('apertura', 'restricciones', 'secuencia')
+
+    def __init__(self, apertura, restricciones, secuencia):
+        self.apertura = apertura
+        self.restricciones = restricciones
+        self.secuencia = secuencia  # elementos que ocupan todo el grupo, o None
+
+    def avances(self, indice, i, limite):
+        if i >= limite or indice.tokens[i].valor != self.apertura:
+            return
+        cierre = indice.cierres[i]
+        if not i < cierre < limite or not _cumple(self.restricciones, indice, i + 1, cierre):
+            return
+        if self.secuencia is None or cierre in _fines(self.secuencia, 0, indice, i + 1, cierre):
+            yield cierre + 1
+
+
+class _Tramo:
+    __slots__ = ('minimo', 'restricciones', 'sentencia')
+
+    def __init__(self, minimo, restricciones, sentencia):
+        self.minimo = minimo
+        self.restricciones = restricciones
+        self.sentencia = sentencia  # si termina antes de un ';'
+
+    def avances(self, indice, i, limite):
+        tokens = indice.tokens
+        if self.minimo == 0 and _cumple(self.restricciones, indice, i, i):
+            yield i
+        j = i
+        while j < limite:
+            token = tokens[j]
+            if token.tipo == 'DELIMITADOR':
+                if token.valor in APERTURAS:
+                    cierre = indice.cierres[j]
+                    if not j < cierre < limite:
+                        return
+                    j = cierre
+                elif token.valor in CIERRES or token.valor == ';' and self.sentencia:
+                    return
+            j += 1
+            if _cumple(self.restricciones, indice, i, j):
+                yield j
+
+
+def _fines(elementos, k, indice, i, limite):
+    """Posiciones donde puede terminar elementos[k:] empezando en i (las más cercanas primero)."""
+    if k == len(elementos):
+        yield i
+        return
+    for j in elementos[k].avances(indice, i, limite):
+        yield from _fines(elementos, k + 1, indice, j, limite)
+
+
+def _clave_categoria(nombre):
+    sin_acentos = unicodedata.normalize('NFD', nombre).encode('ascii', 'ignore').decode()
+    return sin_acentos.lower().replace(' ', '_')
+
+
+class Consulta:
+    """Consulta compilada; buscar() la aplica al índice de un programa."""
+
+    def __init__(self, texto, lenguaje=LENGUAJE_BASE):
+        self.texto = texto
+        self.categorias = {_clave_categoria(n): frozenset(vs) for n, vs in
+                           lenguaje.categorias_operadores + lenguaje.categorias_delimitadores}
+        self.categorias['condicion'] = frozenset(lenguaje.operadores_condicion)
+        self.categorias['tipos'] = frozenset(lenguaje.palabra_de_rol[t] for t in lenguaje.tipos_datos)
+        self._piezas = self._separar(texto)
+        self._pos = 0
+        self.elementos = self._secuencia(final=None)
+        if not self.elementos:
+            raise ErrorConsulta("consulta vacía")
+        # Valores o tipos que tiene que tener un programa para que la consulta pueda coincidir
+        self.obligatorios = [e.atomo for e in self.elementos
+                             if isinstance(e, _Token) and not e.atomo.cualquiera]
+        self.obligatorios += [_Atomo([e.apertura]) for e in self.elementos if isinstance(e, _Grupo)]
+
+    @staticmethod
+    def _separar(texto):
+        piezas = []
+        pos = 0
+        texto = texto.rstrip()
+        while pos < len(texto):
+            m = _PIEZA_CONSULTA.match(texto, pos)
+            if m is None:
+                raise ErrorConsulta(f"no se entiende la consulta desde '{texto[pos:].strip()}'")
+            piezas.append(m.group(1))
+            pos = m.end()
+        return piezas
+
+    def _siguiente(self):
+        return self._piezas[self._pos] if self._pos < len(self._piezas) else None
+
+    def _tomar(self):
+        pieza = self._siguiente()
+        self._pos += 1
+        return pieza
+
+    def _secuencia(self, final):
+        """Elementos hasta 'final' (')', '}' o ']'; None = fin de la consulta)."""
+        elementos = []
+        while True:
+            pieza = self._siguiente()
+            if pieza == final:
+                if final is not None:
+                    self._tomar()
+                return elementos
+            if pieza is None:
+                raise ErrorConsulta(f"falta '{final}' en la consulta")
+            if pieza in (')', '}', ']'):
+                raise ErrorConsulta(f"'{pieza}' sin abrir en la consulta")
+            elementos.append(self._elemento())
+
+    def _cuerpo(self, final):
+        """Restricciones 'con X' / 'sin X' y secuencia opcional de un grupo o tramo."""
+        restricciones = []
+        while self._siguiente() in ('con', 'sin'):
+            con = self._tomar() == 'con'
+            restricciones.append((con, self._atomo()))
+        return restricciones, self._secuencia(final)
+
+    def _elemento(self):
+        pieza = self._siguiente()
+        if pieza == '...':
+            self._tomar()
+            return _Tramo(0, [], False)
+        if pieza in APERTURAS:
+            self._tomar()
+            restricciones, secuencia = self._cuerpo(APERTURAS[pieza])
+            return _Grupo(pieza, restricciones, secuencia or None)
+        if pieza == '[':
+            self._tomar()
+            restricciones, secuencia = self._cuerpo(']')
+            if secuencia:
+                raise ErrorConsulta("un tramo [ ] solo lleva restricciones 'con' / 'sin'")
+            return _Tramo(1, restricciones, True)
+        return _Token(self._atomo())
+
+    def _atomo(self):
+        valores, tipos = set(), set()
+        while True:
+            pieza = self._tomar()
+            if pieza is None or pieza in ('(', ')', '{', '}', '[', ']', '|', '...'):
+                raise ErrorConsulta(f"se esperaba un token en la consulta, no '{pieza or 'fin'}'")
+            if pieza == '_':
+                return _Atomo(cualquiera=True)
+            if pieza[0] in '\'"':
+                valores.add(pieza[1:-1])
+            elif pieza in TIPOS_TOKEN:
+                tipos.add(pieza)
+            elif pieza[0] == '@' and len(pieza) > 1:
+                categoria = self.categorias.get(_clave_categoria(pieza[1:]))
+                if categoria is None:
+                    raise ErrorConsulta(f"categoría desconocida '{pieza}' "
+                                        f"(hay: {', '.join(sorted(self.categorias))})")
+                valores |= categoria
+            else:
+                valores.add(pieza)
+            if self._siguiente() != '|':
+                return _Atomo(valores, tipos)
+            self._tomar()
+
+    def buscar(self, indice):
+        """(inicio, fin) de cada coincidencia en el programa, por posición de token."""
+        for atomo in self.obligatorios:
+            if not atomo._listas(indice):
+                return []
+        # Se ancla en el elemento más raro entre los que están a distancia fija del
+        # comienzo (los tokens sueltos del principio y el grupo que los sigue)
+        candidatas, desplazamiento = range(len(indice.tokens)), 0
+        for k, elemento in enumerate(self.elementos):
+            if isinstance(elemento, _Tramo):
+                break
+            if isinstance(elemento, _Grupo):
+                posiciones = indice.por_valor.get(elemento.apertura, ())
+            elif elemento.atomo.cualquiera:
+                continue
+            else:
+                posiciones = elemento.atomo.posiciones(indice)
+            if len(posiciones) < len(candidatas):
+                candidatas, desplazamiento = posiciones, k
+            if isinstance(elemento, _Grupo):
+                break
+        if desplazamiento:
+            candidatas = [p - desplazamiento for p in candidatas if p >= desplazamiento]
+        limite = len(indice.tokens)
+        encontradas = []
+        for inicio in candidatas:
+            fin = next(_fines(self.elementos, 0, indice, inicio, limite), None)
+            if fin is not None:
+                encontradas.append((inicio, fin))
+        return encontradas
+
+
+class Coincidencia:
+    __slots__ = ('archivo', 'linea', 'columna', 'texto')
+
+    def __init__(self, archivo, linea, columna, texto):
+        self.archivo = archivo
+        self.linea = linea
+        self.columna = columna
+        self.texto = texto
+
+    def __repr__(self):
+        return f"Coincidencia({self.archivo}:{self.linea}:{self.columna}, {self.texto!r})"
+
+
+class Corpus:
+    """Programas indexados para consultar; cada archivo se analiza (léxico) una sola vez."""
+
+    def __init__(self, lenguaje=LENGUAJE_BASE):
+        self.lenguaje = lenguaje
+        self.lexico = AnalizadorLexico(lenguaje)
+        self.indices = {}  # ruta -> IndiceTokens
+
+    def agregar(self, ruta, codigo):
+        tokens, _ = self.lexico.analizar(codigo)
+        self.indices[ruta] = IndiceTokens(tokens)
+
+    def cargar(self, ruta, extension='.txt'):
+        """Indexa un archivo, o los de una carpeta y sus subcarpetas. Devuelve los que no se pudieron leer."""
+        rutas = [ruta]
+        if os.path.isdir(ruta):
+            rutas = [os.path.join(carpeta, nombre)
+                     for carpeta, _, nombres in os.walk(ruta)
+                     for nombre in sorted(nombres) if nombre.endswith(extension)]
+        fallidas = []
+        for archivo in rutas:
+            try:
+                with open(archivo, 'r', encoding='utf-8') as f:
+                    self.agregar(archivo, f.read())
+            except (OSError, UnicodeDecodeError):
+                fallidas.append(archivo)
+        return fallidas
+
+    def buscar(self, consulta, maximo=None):
+        """Coincidencias de la consulta (texto o Consulta) en todos los programas, en orden."""
+        if not isinstance(consulta, Consulta):
+            consulta = Consulta(consulta, self.lenguaje)
+        resultado = []
+        for ruta, indice in self.indices.items():
+            tokens = indice.tokens
+            for inicio, fin in consulta.buscar(indice):
+                texto = ' '.join(t.valor for t in tokens[inicio:fin])
+                if len(texto) > MAX_TEXTO:
+                    texto = texto[:MAX_TEXTO - 3] + '...'
+                resultado.append(Coincidencia(ruta, tokens[inicio].linea, tokens[inicio].columna, texto))
+                if maximo is not None and len(resultado) >= maximo:
+                    return resultado
+        return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas estructurales sobre los tokens de programas.")
+    parser.add_argument('consulta', help="patrón de tokens (ver la ayuda del módulo)")
+    parser.add_argument('rutas', nargs='+', help="archivos o carpetas a consultar")
+    parser.add_argument('--extension', default='.txt',
+                        help="extensión de los programas dentro de las carpetas (por defecto .txt)")
+    parser.add_argument('--max', type=int, default=None, help="mostrar como máximo N coincidencias")
+    parser.add_argument('--contar', action='store_true', help="mostrar solo la cantidad por archivo")
+    args = parser.parse_args(argv)
+
+    try:
+        consulta = Consulta(args.consulta)
+    except ErrorConsulta as e:
+        print(f"consulta inválida: {e}", file=sys.stderr)
+        return 2
+    corpus = Corpus()
+    fallidas = []
+    for ruta in args.rutas:
+        fallidas += corpus.cargar(ruta, args.extension)
+    for ruta in fallidas:
+        print(f"{ruta}: no se pudo leer", file=sys.stderr)
+
+    coincidencias = corpus.buscar(consulta, args.max)
+    if args.contar:
+        por_archivo = defaultdict(int)
+        for c in coincidencias:
+            por_archivo[c.archivo] += 1
+        for ruta, cantidad in por_archivo.items():
+            print(f"{ruta}: {cantidad}")
+    else:
+        for c in coincidencias:
+            print(f"{c.archivo}:{c.linea}:{c.columna}: {c.texto}")
+    print(f"{len(coincidencias)} coincidencias en {len(corpus.indices)} archivos", file=sys.stderr)
+    return 2 if fallidas else (0 if coincidencias else 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
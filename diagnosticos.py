@@ -0,0 +1,104 @@
+"""Catálogo de diagnósticos: código estable -> texto del mensaje.
+
+Los analizadores no arman el texto de cada error: un Error guarda su código (uno de los
+de abajo) y los argumentos del mensaje (el valor de un token, una línea), y el texto se
+arma recién cuando alguien lee Error.mensaje. Así contar o agrupar errores (por código o
+por tipo) no formatea nada, y los códigos sirven para filtrar sin depender del texto.
+
+Los códigos no cambian aunque cambie la redacción. La primera letra indica el tema:
+    L  caracteres, números, cadenas y operadores
+    T  tipos, declaraciones y uso de variables
+    E  estructuras de control (si, sino, mientras, para)
+    S  delimitadores y ';'
+    F  análisis de flujo
+    M  módulos e importaciones (modulos.py)
+    H  herramientas (validar.py, vigilar.py)
+El mismo problema tiene el mismo código aunque lo detecten dos pasadas distintas (el tipo
+del Error, 'lexico' o 'sintactico', sigue diciendo cuál fue).
+
+Para otro idioma se agrega su tabla en MENSAJES con los mismos códigos y se elige con
+usar_idioma(); los códigos que falten se muestran en español.
+"""
+
+MENSAJES = {
+    'es': {
+        'L001': "comentario de bloque sin cerrar",
+        'L002': "cadena literal sin cerrar",
+        'L003': "numero mal formado '{0}' (no se permiten comas dentro de un numero)",
+        'L004': "número mal formado '{0}' (demasiados puntos decimales)",
+        'L005': "token invalido '{0}' - no pertenece al alfabeto",
+        'L006': "secuencia de operadores inválida o no permitida '{0}'",
+        'L007': "carácter '{0}' no pertenece al alfabeto",
+        'L008': "secuencia inválida de operadores '{0}{1}'",
+
+        'T001': "variable '{0}' ya declarada en línea {1}",
+        'T002': "declaración de tipo 'entero' con expresión 'flotante' -> mezcla de tipos no permitida",
+        'T003': "declaración de tipo 'cadena' con expresión numérica -> mezcla de tipos no permitida",
+        'T004': "declaración de '{0}' debe incluir asignación (ej: {0} var = ...;)",
+        'T005': "se esperaba identificador después de '{0}'",
+        'T006': "variable '{0}' no declarada antes de la asignación",
+        'T007': "asignación inválida: variable 'entero' recibe expresión 'flotante'",
+        'T008': "asignación inválida: variable 'cadena' recibe expresión numérica",
+        'T009': "secuencia inválida de operadores cerca de '{0}'",
+        'T010': "uso de identificador '{0}' sin declaración previa (para validar tipos)",
+        'T011': "mezcla de tipo 'cadena' con tipo numérico en la misma expresión",
+        'T012': "función '{0}' ya declarada",
+        'T013': "variable o función '{0}' no declarada",
+        'T014': "variable '{0}' ya declarada en el módulo '{1}'",
+
+        'E001': "estructura '{0}' debe abrir con '(' después de '{0}'",
+        'E002': "estructura '{0}' sin paréntesis de cierre ')'",
+        'E003': "condición vacía en '{0}'",
+        'E004': "condición inválida en '{0}' → falta operador lógico o relacional",
+        'E005': "operador repetido o mal formado en '{0}' → '{1}'",
+        'E006': "estructura '{0}' debe abrir con llave '{{' después de ')'",
+        'E007': "se esperaba '(' después de '{0}'",
+        'E008': "se esperaba '{{' después de ')'",
+        'E009': "estructura '{0}' no debe llevar paréntesis; debe seguir '{{'",
+        'E010': "'{0}' debe ir después de un '{1}' previamente declarado",
+        'E011': "estructura '{0}' debe tener dos ';' en la cabecera",
+        'E012': "se esperaba '{{' después de ')' en '{0}'",
+
+        'S001': "declaración incompleta o sin ';'",
+        'S002': "'{0}' sin '{1}' correspondiente",
+        'S003': "'{0}' sin cerrar",
+        'S004': "falta ';' al final de la declaración",
+        'S005': "falta ';' después de la asignación",
+        'S006': "falta ';' después de '{0}()'",
+
+        'F001': "la variable '{0}' puede usarse sin valor en algún camino",
+        'F002': "la variable '{0}' se usa sin haber recibido un valor",
+        'F003': "el valor asignado a '{0}' nunca se usa",
+        'F004': "código inalcanzable",
+
+        'M001': "se esperaba la ruta del módulo entre comillas y ';' después de '{0}'",
+        'M002': "no se encontró el módulo '{0}'",
+        'M003': "importación circular: {0}",
+        'M004': "no se pudo leer el módulo '{0}' ({1})",
+        'M005': "no se importó '{0}': el análisis de un solo archivo no resuelve 'importar' (usar modulos.py)",
+
+        'H001': "no se pudo leer ({0})",
+        'H002': "no se pudo analizar el flujo: {0}",
+    },
+}
+
+_idioma = 'es'
+
+
+def usar_idioma(idioma):
+    """Idioma de los mensajes de aquí en adelante (una clave de MENSAJES)."""
+    global _idioma
+    if idioma not in MENSAJES:
+        raise ValueError(f"no hay mensajes en '{idioma}'")
+    _idioma = idioma
+
+
+def formatear(codigo, argumentos=(), idioma=None):
+    """
+    Texto del diagnóstico 'codigo' con sus argumentos. Un código que no está en el
+    catálogo se toma como el texto mismo (errores armados a mano, como antes).
+    """
+    plantilla = MENSAJES[idioma or _idioma].get(codigo) or MENSAJES['es'].get(codigo)
+    if plantilla is None:
+        return codigo
+    return plantilla.format(*argumentos)
@@ -0,0 +1,421 @@
+"""Pruebas diferenciales: compara un motor de análisis contra la implementación de referencia.
+
+Uso:
+    python diferencial.py [--referencia ORIGEN] [--candidato ORIGEN] [--casos N]
+                          [--segundos S] [--semilla S] [--modo normal|gui|validar]
+                          [--guardar CARPETA]
+
+Cada ORIGEN es una revisión de git, una carpeta con el código de los analizadores, '.'
+para el árbol de trabajo (el candidato por defecto) u 'original': la primera revisión del
+historial, con los analizadores antes de todas las optimizaciones. Es la referencia por
+defecto, así cada corrida compara contra el comportamiento original y no solo contra la
+revisión anterior:
+
+    python diferencial.py --casos 1000000
+    python diferencial.py --referencia HEAD      # solo lo que cambió desde el último commit
+
+El original tiene otra interfaz (analizar(codigo) sin ContextoAnalisis, tokens sin rol):
+Motor la adapta, y solo se puede usar en el modo normal. Contra el original no se
+cuentan las diferencias intencionales documentadas (ver DIFERENCIAS_INTENCIONALES): se
+quitan de los dos resultados antes de comparar.
+
+Los programas se generan a partir de la gramática (declaraciones, si/sino, mientras,
+para, funciones, expresiones) y se mutan con los casos borde del léxico: números con
+coma ('1,5'), secuencias de operadores ('>>=='), cadenas sin cerrar, escapes, comentarios
+de bloque abiertos, caracteres fuera del alfabeto. Se comparan los tokens (con su rol),
+los errores léxicos y los sintácticos. Cada diferencia se reduce a una entrada mínima que
+la reproduce. Al final se informa la velocidad de cada motor.
+
+Código de salida 0 si no hubo diferencias, 1 si las hubo.
+"""
+import argparse
+import importlib
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import unicodedata
+
+def _modulos_proyecto(carpeta):
+    """Nombres de los módulos de la raíz del proyecto que hay en carpeta."""
+    return {nombre[:-3] for nombre in os.listdir(carpeta) if nombre.endswith('.py')}
+
+
+def cargar_modulo(carpeta, nombre='analizador_sintactico'):
+    """
+    Importa 'nombre' desde 'carpeta' sin mezclarlo con los módulos ya cargados: todos los
+    módulos del proyecto que importa (diagnosticos con los mensajes, lenguaje, lineas,
+    documento...) quedan ligados a su copia y no a los del árbol actual ni de otro motor.
+    """
+    modulos = _modulos_proyecto(carpeta) | _modulos_proyecto(os.path.dirname(os.path.abspath(__file__)))
+    guardados = {n: sys.modules.pop(n) for n in modulos if n in sys.modules}
+    sys.path.insert(0, carpeta)
+    try:
+        return importlib.import_module(nombre)
+    finally:
+        sys.path.remove(carpeta)
+        for n in modulos:
+            sys.modules.pop(n, None)
+        sys.modules.update(guardados)
+
+
+def revision_original():
+    """La primera revisión del historial (los analizadores originales)."""
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    return subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=raiz,
+                          capture_output=True, check=True, text=True).stdout.split()[0]
+
+
+def extraer_revision(revision, destino):
+    """Copia en 'destino' los archivos del proyecto tal como están en una revisión de git."""
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    datos = subprocess.run(['git', 'archive', revision], cwd=raiz,
+                           capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(datos)) as tar:
+        tar.extractall(destino, filter='data')
+    return destino
+
+
+class Motor:
+    """Un par AnalizadorLexico + AnalizadorSintactico de un origen, con su tiempo acumulado."""
+
+    MODOS = {
+        'normal': {},
+        'gui': {'max_errores': 200, 'recuperacion': True},
+        'validar': {'max_errores': 1},
+    }
+
+    def __init__(self, nombre, modulo, modo='normal'):
+        self.nombre = nombre
+        opciones = self.MODOS[modo]
+        self.modulo = modulo
+        # el original: sin lenguaje ni ContextoAnalisis, ni tope de errores ni recuperación
+        self.original = not hasattr(modulo, 'ContextoAnalisis')
+        if self.original:
+            if opciones:
+                raise ValueError(f"{nombre}: el analizador original no tiene el modo '{modo}' "
+                                 "(usar otra --referencia)")
+            self.lexico = modulo.AnalizadorLexico()
+            self.sintactico = modulo.AnalizadorSintactico()
+        else:
+            self.lexico = modulo.AnalizadorLexico(modulo.LENGUAJE_BASE, **opciones)
+            self.sintactico = modulo.AnalizadorSintactico(modulo.LENGUAJE_BASE, **opciones)
+        self.tiempo = 0.0
+
+    @classmethod
+    def desde_origen(cls, origen, modo='normal', temporales=None):
+        if origen == 'original':
+            origen = revision_original()
+        if origen == '.':
+            carpeta = os.path.dirname(os.path.abspath(__file__))
+        elif os.path.isdir(origen):
+            carpeta = os.path.abspath(origen)
+        else:
+            carpeta = tempfile.mkdtemp(prefix='diferencial-')
+            if temporales is not None:
+                temporales.append(carpeta)
+            extraer_revision(origen, carpeta)
+        return cls(origen, cargar_modulo(carpeta), modo)
+
+    def medir(self, codigo):
+        """Como analizar, sumando el tiempo (la reducción de diferencias no se cuenta)."""
+        inicio = time.perf_counter()
+        resultado = self.analizar(codigo)
+        self.tiempo += time.perf_counter() - inicio
+        return resultado
+
+    def analizar(self, codigo):
+        """Resultado comparable: (tokens, errores léxicos, errores sintácticos, omitidos, truncado)."""
+        if self.original:
+            tokens, lexicos = self.lexico.analizar(codigo)
+            sintacticos = self.sintactico.analizar(tokens)
+            # solo conoce el dialecto base, donde el rol de una palabra reservada es la palabra
+            claves = [t.valor if t.tipo == 'PALABRA_RESERVADA' else None for t in tokens]
+        else:
+            contexto = self.modulo.ContextoAnalisis()
+            tokens, lexicos = self.lexico.analizar(codigo, contexto)
+            sintacticos = self.sintactico.analizar(tokens, contexto)
+            claves = [t.clave for t in tokens]
+        return (
+            [(t.tipo, t.valor, t.linea, t.columna, clave) for t, clave in zip(tokens, claves)],
+            [(e.tipo, e.linea, e.columna, e.mensaje) for e in lexicos],
+            [(e.tipo, e.linea, e.columna, e.mensaje) for e in sintacticos],
+            (getattr(lexicos, 'suprimidos', 0), getattr(sintacticos, 'suprimidos', 0)),
+            (getattr(lexicos, 'truncado', False), getattr(sintacticos, 'truncado', False)),
+        )
+
+
+_PARTES = ('tokens', 'errores léxicos', 'errores sintácticos', 'errores omitidos', 'truncado')
+
+
+def _sin_repetidos(errores):
+    vistos = set()
+    return [e for e in errores if not (e in vistos or vistos.add(e))]
+
+
+def _repetidos(codigo, resultado):
+    # la inferencia de tipos memorizada ya no repite un mismo error léxico
+    tokens, lexicos, sintacticos, omitidos, truncado = resultado
+    return tokens, _sin_repetidos(lexicos), sintacticos, omitidos, truncado
+
+
+def _barra_salto(codigo, resultado):
+    # dentro de una cadena, una barra seguida de un salto de línea cuenta como
+    # línea nueva (antes, como una columna más): desde ahí se mueven todas las posiciones
+    if '\\\n' not in codigo and '\\\r' not in codigo:
+        return resultado
+    tokens, lexicos, sintacticos, omitidos, truncado = resultado
+    return ([(tipo, valor, clave) for tipo, valor, _, _, clave in tokens],
+            [(tipo, mensaje) for tipo, _, _, mensaje in lexicos],
+            [(tipo, mensaje) for tipo, _, _, mensaje in sintacticos],
+            omitidos, truncado)
+
+
+def _unicode(codigo, resultado):
+    # los números son solo dígitos ASCII ('²', '٣' eran LITERAL_ENTERO) y un identificador
+    # sigue con marcas combinantes: el caso no se compara
+    for c in codigo:
+        if not c.isascii() and (c.isnumeric() or unicodedata.category(c) in ('Mn', 'Mc')):
+            return None
+    return resultado
+
+
+# Cambios de comportamiento hechos a propósito respecto del analizador original. Cada
+# filtro devuelve el resultado sin la diferencia, o None si el caso no se puede comparar.
+DIFERENCIAS_INTENCIONALES = (_unicode, _repetidos, _barra_salto)
+
+
+def comparable(codigo, resultado, intencionales=False):
+    """
+    El resultado de Motor.analizar listo para comparar: sin las diferencias intencionales si
+    se pide, o None si el caso es una de ellas y no se compara.
+    """
+    if intencionales:
+        for filtro in DIFERENCIAS_INTENCIONALES:
+            resultado = filtro(codigo, resultado)
+            if resultado is None:
+                break
+    return resultado
+
+
+def primera_diferencia(esperado, obtenido):
+    """Descripción de la primera diferencia entre dos resultados de Motor.analizar, o None."""
+    for parte, a, b in zip(_PARTES, esperado, obtenido):
+        if a == b:
+            continue
+        if isinstance(a, list):
+            for i, (x, y) in enumerate(zip(a, b)):
+                if x != y:
+                    return f"{parte}[{i}]: referencia {x!r}, candidato {y!r}"
+            return f"{parte}: referencia tiene {len(a)}, candidato {len(b)}"
+        return f"{parte}: referencia {a!r}, candidato {b!r}"
+    return None
+
+
+class GeneradorProgramas:
+    """Programas al azar según la gramática, con mutaciones que apuntan a los casos borde del léxico."""
+
+    # Casos borde: se insertan en posiciones al azar de un programa bien formado
+    BORDES = ('1,5', '12.34.56', '3var', '1.', '007', '>>==', '===', '=!', '&', '|', '&&&',
+              '"sin cerrar', '"esc\\"x"', '"a\\', "'c'", "'\\n'", '"\\\\"', '/* abierto',
+              '/* a\nb */', '//', '*/', '/', '\t', '\r\n', '\n', '  ', 'ñ', 'Pérez', '²',
+              '٣', '@', '#', '$', '\\', '{', '}', '(', ')', ';', ',', '=')
+    VARIABLES = ('x', 'y', 'z', 'contador', 'total', '_t', 'a1')
+
+    def __init__(self, rng, lenguaje):
+        self.rng = rng
+        self.palabra = lenguaje.palabra_de_rol
+
+    def programa(self):
+        rng = self.rng
+        lineas = [self.sentencia(0) for _ in range(rng.randint(0, 8))]
+        texto = "\n".join(lineas) + ("\n" if rng.random() < 0.8 else "")
+        for _ in range(rng.choice((0, 0, 1, 1, 2, 4))):
+            texto = self.mutar(texto)
+        return texto
+
+    def mutar(self, texto):
+        rng = self.rng
+        i = rng.randint(0, len(texto))
+        j = min(len(texto), i + rng.randint(1, 6))
+        accion = rng.random()
+        if accion < 0.5:
+            return texto[:i] + rng.choice(self.BORDES) + texto[i:]
+        if accion < 0.7:
+            return texto[:i] + texto[j:]
+        if accion < 0.85:
+            return texto[:i] + texto[i:j] + texto[i:]
+        return texto[:i] + rng.choice(self.BORDES) + texto[j:]
+
+    def variable(self):
+        return self.rng.choice(self.VARIABLES)
+
+    def literal(self):
+        rng = self.rng
+        forma = rng.random()
+        if forma < 0.4:
+            return str(rng.randint(0, 999))
+        if forma < 0.6:
+            return f"{rng.randint(0, 99)}.{rng.randint(0, 99)}"
+        if forma < 0.8:
+            return rng.choice(('"hola"', '"a b"', '"esc\\"ape"', "'c'", '""'))
+        return self.palabra[rng.choice(('verdadero', 'falso'))]
+
+    def expresion(self, profundidad=0):
+        rng = self.rng
+        forma = rng.random()
+        if profundidad > 2 or forma < 0.35:
+            return self.variable() if rng.random() < 0.5 else self.literal()
+        if forma < 0.8:
+            operador = rng.choice(('+', '-', '*', '/', '%', '==', '!=', '<', '>', '<=', '>=', '&&', '||'))
+            return f"{self.expresion(profundidad + 1)} {operador} {self.expresion(profundidad + 1)}"
+        if forma < 0.9:
+            return f"({self.expresion(profundidad + 1)})"
+        return f"!{self.expresion(profundidad + 1)}"
+
+    def bloque(self, profundidad):
+        cuerpo = " ".join(self.sentencia(profundidad + 1) for _ in range(self.rng.randint(0, 3)))
+        return "{ " + cuerpo + " }"
+
+    def sentencia(self, profundidad):
+        rng = self.rng
+        p = self.palabra
+        forma = rng.randint(0, 9 if profundidad < 2 else 4)
+        if forma == 0:
+            tipo = p[rng.choice(('entero', 'flotante', 'cadena'))]
+            return f"{tipo} {self.variable()} = {self.expresion()};"
+        if forma == 1:
+            return f"{self.variable()} = {self.expresion()};"
+        if forma == 2:
+            return f"{p['imprimir']}({self.expresion()});"
+        if forma == 3:
+            return f"{p['leer']}({self.variable()});"
+        if forma == 4:
+            return rng.choice(("// comentario", "/* bloque */", f"{p['retornar']} {self.expresion()};"))
+        if forma in (5, 6):
+            texto = f"{p['si']} ({self.expresion()}) {self.bloque(profundidad)}"
+            if rng.random() < 0.5:
+                texto += f" {p['sino']} {self.bloque(profundidad)}"
+            return texto
+        if forma == 7:
+            return f"{p['mientras']} ({self.expresion()}) {self.bloque(profundidad)}"
+        if forma == 8:
+            v = self.variable()
+            return (f"{p['para']} ({v} = 0; {v} < {self.expresion()}; {v} = {v} + 1) "
+                    f"{self.bloque(profundidad)}")
+        return f"{p['funcion']} f{rng.randint(0, 3)}() {self.bloque(profundidad)}"
+
+
+def minimizar(codigo, falla, max_intentos=5000):
+    """
+    Reduce 'codigo' mientras falla(codigo) siga siendo verdadero (delta debugging):
+    se prueba quitar trozos cada vez más chicos, primero líneas y después caracteres.
+    """
+    intentos = 0
+    for separador in ("\n", None):
+        partes = codigo.split("\n") if separador else list(codigo)
+        unir = separador.join if separador else "".join
+        n = 2
+        while len(partes) >= 2 and intentos < max_intentos:
+            tam = max(1, len(partes) // n)
+            reducido = False
+            for inicio in range(0, len(partes), tam):
+                resto = partes[:inicio] + partes[inicio + tam:]
+                intentos += 1
+                if falla(unir(resto)):
+                    partes = resto
+                    n = max(n - 1, 2)
+                    reducido = True
+                    break
+            if not reducido:
+                if tam == 1:
+                    break
+                n = min(n * 2, len(partes))
+        codigo = unir(partes)
+    return codigo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara un motor de análisis contra la referencia.")
+    parser.add_argument('--referencia', default='original',
+                        help="revisión de git, carpeta, '.' u 'original' (por defecto 'original')")
+    parser.add_argument('--candidato', default='.',
+                        help="revisión de git, carpeta o '.' (por defecto el árbol de trabajo)")
+    parser.add_argument('--casos', type=int, default=100000, help="programas a generar")
+    parser.add_argument('--segundos', type=float, help="detenerse después de este tiempo")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--modo', choices=sorted(Motor.MODOS), default='normal',
+                        help="configuración de los analizadores (tope de errores, recuperación)")
+    parser.add_argument('--guardar', metavar='CARPETA', help="guardar cada diferencia reducida")
+    parser.add_argument('--max-diferencias', type=int, default=10,
+                        help="detenerse después de tantas diferencias distintas")
+    args = parser.parse_args(argv)
+
+    temporales = []
+    try:
+        referencia = Motor.desde_origen(args.referencia, args.modo, temporales)
+        candidato = Motor.desde_origen(args.candidato, args.modo, temporales)
+    except (subprocess.CalledProcessError, ImportError, ValueError) as e:
+        print(f"no se pudo cargar un motor: {e}", file=sys.stderr)
+        return 2
+    if referencia.original and candidato.original:
+        print("los dos motores son el analizador original", file=sys.stderr)
+        return 2
+
+    intencionales = referencia.original or candidato.original
+    resultado = lambda motor, codigo, medir=False: comparable(
+        codigo, (motor.medir if medir else motor.analizar)(codigo), intencionales)
+    lenguaje = (candidato if referencia.original else referencia).modulo.LENGUAJE_BASE
+    generador = GeneradorProgramas(random.Random(args.semilla), lenguaje)
+    difiere = lambda codigo: resultado(referencia, codigo) != resultado(candidato, codigo)
+    diferencias = {}
+    casos = caracteres = omitidos = 0
+    limite = time.monotonic() + args.segundos if args.segundos else None
+    try:
+        while casos < args.casos and len(diferencias) < args.max_diferencias:
+            if limite is not None and time.monotonic() > limite:
+                break
+            codigo = generador.programa()
+            casos += 1
+            caracteres += len(codigo)
+            esperado = resultado(referencia, codigo, medir=True)
+            obtenido = resultado(candidato, codigo, medir=True)
+            if esperado is None:
+                omitidos += 1
+            if esperado == obtenido:
+                continue
+            minimo = minimizar(codigo, difiere)
+            if minimo in diferencias:
+                continue
+            diferencias[minimo] = primera_diferencia(resultado(referencia, minimo), resultado(candidato, minimo))
+            print(f"diferencia {len(diferencias)} (caso {casos}): {minimo!r}\n    {diferencias[minimo]}")
+            if args.guardar:
+                os.makedirs(args.guardar, exist_ok=True)
+                with open(os.path.join(args.guardar, f"diferencia_{len(diferencias)}.txt"), 'w',
+                          encoding='utf-8', newline='') as f:
+                    f.write(minimo)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for carpeta in temporales:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+    print(f"{casos} casos, {caracteres / 1e6:.1f} M caracteres, {len(diferencias)} diferencias")
+    if omitidos:
+        print(f"  {omitidos} casos sin comparar (diferencias intencionales con el original)")
+    for motor in (referencia, candidato):
+        if motor.tiempo:
+            print(f"  {motor.nombre:>12}: {casos / motor.tiempo:10.0f} casos/s  "
+                  f"{caracteres / motor.tiempo / 1e6:6.2f} M caracteres/s")
+    if referencia.tiempo and candidato.tiempo:
+        print(f"  candidato {referencia.tiempo / candidato.tiempo:.2f}x la velocidad de la referencia")
+    return 1 if diferencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Documento del editor guardado como tabla de piezas.
+
+El texto no se guarda como un único str: es una lista de piezas (buffer, inicio, fin) que
+apuntan a tramos de cadenas que nunca se modifican (el contenido cargado y lo que se fue
+escribiendo). Insertar o borrar parte a lo sumo dos piezas y reemplaza las del medio; no
+se copia el resto del texto, así que el costo de una edición depende de la cantidad de
+piezas y no del tamaño del archivo. Lo que se escribe de a una tecla se va juntando en la
+pieza anterior mientras esta sea chica, para que las piezas no crezcan con cada tecla.
+
+Junto con las piezas se mantiene el IndiceLineas del texto (IndiceLineas.editar), que
+convierte los índices de Tk ("línea.col") en posiciones y al revés.
+
+Para leer:
+    len(doc), doc[a:b]       tramo como str, copiando solo ese tramo
+    doc.trozos(a, b)         los pedazos del tramo, sin juntarlos
+    doc.linea(n)             una línea, sin el salto final
+    doc.texto()              todo el texto en un str (se arma una vez por versión)
+    doc.escribir(archivo)    guarda pieza por pieza, sin armar el texto completo
+"""
+from bisect import bisect_right
+from itertools import accumulate
+
+from lineas import IndiceLineas
+
+# Una pieza escrita se sigue extendiendo mientras tenga menos de esto (en caracteres)
+MAX_PIEZA_ESCRITA = 4096
+# escribir() manda al archivo de a tramos de este tamaño
+TAMANIO_ESCRITURA = 1 << 20
+
+
+class Documento:
+    """Texto editable como tabla de piezas, con su índice de líneas al día."""
+
+    def __init__(self, texto=''):
+        self.piezas = [(texto, 0, len(texto))] if texto else []
+        self.finales = [len(texto)] if texto else []  # posición donde termina cada pieza
+        self.lineas = IndiceLineas(texto)
+        self.version = 0  # cambia con cada edición
+        self._texto = texto  # texto completo de la versión actual, o None
+
+    def __len__(self):
+        return self.finales[-1] if self.finales else 0
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(len(self))
+            if paso != 1:
+                return self.texto()[indice]
+            return ''.join(self.trozos(inicio, fin))
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("posición fuera del documento")
+        i = bisect_right(self.finales, indice)
+        buffer, inicio, _ = self.piezas[i]
+        return buffer[inicio + indice - (self.finales[i - 1] if i else 0)]
+
+    def trozos(self, inicio=0, fin=None):
+        """Los pedazos de texto entre inicio y fin, en orden, sin juntarlos."""
+        fin = len(self) if fin is None else min(fin, len(self))
+        if inicio >= fin:
+            return
+        i = bisect_right(self.finales, inicio)
+        comienzo = self.finales[i - 1] if i else 0
+        while comienzo < fin:
+            buffer, desde, hasta = self.piezas[i]
+            a = desde + max(inicio - comienzo, 0)
+            b = hasta - max(self.finales[i] - fin, 0)
+            yield buffer if a == 0 and b == len(buffer) else buffer[a:b]
+            comienzo = self.finales[i]
+            i += 1
+
+    def linea(self, numero):
+        """Texto de la línea 'numero' (desde 1), sin el salto de línea."""
+        inicio = self.lineas.desplazamiento(numero)
+        if numero < len(self.lineas):
+            return self[inicio:self.lineas.desplazamiento(numero + 1) - 1]
+        return self[inicio:]
+
+    def texto(self):
+        """Todo el documento como un str. Se arma una vez por versión y se reutiliza."""
+        if self._texto is None:
+            self._texto = ''.join(self.trozos())
+        return self._texto
+
+    def escribir(self, archivo):
+        """Escribe el documento en un archivo de texto abierto, pieza por pieza."""
+        for trozo in self.trozos():
+            for inicio in range(0, len(trozo), TAMANIO_ESCRITURA):
+                archivo.write(trozo[inicio:inicio + TAMANIO_ESCRITURA])
+
+    def _partir(self, posicion):
+        """Índice de la pieza que empieza en 'posicion', partiendo una pieza si hace falta."""
+        i = bisect_right(self.finales, posicion)
+        if i == len(self.piezas):
+            return i
+        comienzo = self.finales[i - 1] if i else 0
+        if posicion == comienzo:
+            return i
+        buffer, desde, hasta = self.piezas[i]
+        corte = desde + posicion - comienzo
+        self.piezas[i:i + 1] = [(buffer, desde, corte), (buffer, corte, hasta)]
+        self.finales.insert(i, posicion)
+        return i + 1
+
+    def editar(self, inicio, fin, texto=''):
+        """Reemplaza el tramo [inicio, fin) por 'texto' (insertar: inicio == fin; borrar: texto vacío)."""
+        largo = len(self)
+        if not 0 <= inicio <= fin <= largo:
+            raise IndexError(f"tramo {inicio}:{fin} fuera del documento ({largo} caracteres)")
+        if inicio == fin and not texto:
+            return
+        i = self._partir(inicio)
+        j = self._partir(fin)
+        nuevas = []
+        if texto:
+            pieza = texto
+            anterior = self.piezas[i - 1] if i else None
+            if anterior is not None and anterior[2] - anterior[1] + len(texto) <= MAX_PIEZA_ESCRITA:
+                # Se sigue escribiendo después de una pieza chica: se la extiende
+                i -= 1
+                pieza = anterior[0][anterior[1]:anterior[2]] + texto
+            nuevas.append((pieza, 0, len(pieza)))
+        self.piezas[i:j] = nuevas
+        comienzo = self.finales[i - 1] if i else 0
+        self.finales[i:] = accumulate((hasta - desde for _, desde, hasta in self.piezas[i:]),
+                                      initial=comienzo)
+        del self.finales[i]
+        self.lineas.editar(inicio, fin, texto)
+        self.version += 1
+        self._texto = None
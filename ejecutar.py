@@ -0,0 +1,67 @@
+"""Ejecuta programas en la máquina virtual, reutilizando el bytecode ya compilado.
+
+Uso:
+    python ejecutar.py programa.txt [--cache DIR] [--sin-cache] [-O] [--informe]
+
+Como los .pyc, el bytecode se guarda por defecto en __pycache__ junto al programa;
+si el código no cambió, la siguiente corrida no vuelve a analizarlo ni compilarlo.
+"""
+import argparse
+import os
+import sys
+
+from analizador_sintactico import ContextoAnalisis
+from arbol import ErrorCompilacion
+from cache_programas import CacheProgramas
+from compilador import analizar_y_compilar
+from maquina_virtual import MaquinaVirtual, ErrorEjecucion
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta un programa en la máquina virtual.")
+    parser.add_argument('archivo', help="archivo de código a ejecutar")
+    parser.add_argument('--cache', metavar='DIR',
+                        help="carpeta de bytecode (por defecto __pycache__ junto al programa)")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="analizar y compilar siempre, sin leer ni escribir la caché")
+    parser.add_argument('-O', '--optimizar', action='store_true',
+                        help="plegar constantes y quitar ramas muertas y variables sin uso")
+    parser.add_argument('--informe', action='store_true',
+                        help="optimizar y mostrar lo eliminado (compila sin usar la caché)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.archivo, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"{args.archivo}: no se pudo leer ({e})", file=sys.stderr)
+        return 2
+
+    try:
+        if args.informe:
+            contexto = ContextoAnalisis()
+            programa = analizar_y_compilar(codigo, optimizar=True, contexto=contexto)
+            print(contexto.informe_optimizacion, file=sys.stderr)
+        elif args.sin_cache:
+            programa = analizar_y_compilar(codigo, optimizar=args.optimizar)
+        else:
+            directorio = args.cache or os.path.join(
+                os.path.dirname(os.path.abspath(args.archivo)), '__pycache__')
+            programa = CacheProgramas(directorio, optimizar=args.optimizar).obtener(codigo)
+    except ErrorCompilacion as e:
+        print(f"{args.archivo}: {e}", file=sys.stderr)
+        for error in e.errores:
+            print(f"{args.archivo}:{error.linea}:{error.columna}: [{error.tipo} {error.codigo}] {error.mensaje}",
+                  file=sys.stderr)
+        return 1
+
+    try:
+        MaquinaVirtual().ejecutar(programa)
+    except ErrorEjecucion as e:
+        print(f"{args.archivo}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
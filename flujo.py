@@ -0,0 +1,494 @@
+"""Grafo de flujo de control y análisis de flujo de datos sobre el árbol del programa.
+
+Los chequeos de analizador_sintactico.py siguen el orden del texto: una variable está
+"declarada" si aparece declarada en cualquier parte del archivo. Aquí se arma un grafo
+de bloques básicos por función (y otro para el programa principal) a partir de
+si/sino/mientras/para/retornar, y sobre él se resuelven problemas de flujo de datos
+con un algoritmo de lista de trabajo:
+
+    asignacion_definida    variables con valor en todos los caminos (adelante, intersección)
+    asignacion_posible     variables con valor en algún camino      (adelante, unión)
+    variables_vivas        variables que se leen después            (atrás, unión)
+
+Los conjuntos son enteros de Python usados como bits (bit i = variable i), así la unión,
+la intersección y la resta son una sola operación por bloque.
+"""
+import gc
+from collections import deque
+from contextlib import contextmanager
+
+from analizador_sintactico import Error
+from arbol import (construir_arbol, Literal, Variable, Binaria, Unaria, Llamada, Declaracion,
+                   Asignacion, Imprimir, Leer, Si, Mientras, Para, Retornar, SentenciaExpresion,
+                   Bloque)
+
+PRINCIPAL = '<principal>'
+
+
+class BloqueBasico:
+    """Secuencia de elementos sin saltos: sentencias simples y condiciones (expresiones)."""
+    __slots__ = ('indice', 'elementos', 'sucesores', 'predecesores')
+
+    def __init__(self, indice):
+        self.indice = indice
+        self.elementos = []
+        self.sucesores = []  # índices de bloque (sin referencias cruzadas entre objetos)
+        self.predecesores = []
+
+    def __repr__(self):
+        return (f"BloqueBasico({self.indice}, {len(self.elementos)} elementos, "
+                f"-> {self.sucesores})")
+
+
+class GrafoFlujo:
+    """Grafo de bloques básicos de una función o del programa principal."""
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.bloques = []
+        self.entrada = self.nuevo_bloque()
+        self.salida = self.nuevo_bloque()
+        self._orden = None
+
+    def nuevo_bloque(self):
+        bloque = BloqueBasico(len(self.bloques))
+        self.bloques.append(bloque)
+        return bloque
+
+    @staticmethod
+    def conectar(origen, destino):
+        origen.sucesores.append(destino.indice)
+        destino.predecesores.append(origen.indice)
+
+    def orden(self):
+        """Bloques alcanzables desde la entrada, en orden posterior inverso (DFS iterativo)."""
+        if self._orden is None:
+            bloques = self.bloques
+            visitados = {self.entrada.indice}
+            posterior = []
+            pila = [(self.entrada, iter(self.entrada.sucesores))]
+            while pila:
+                bloque, sucesores = pila[-1]
+                for sucesor in sucesores:
+                    if sucesor not in visitados:
+                        visitados.add(sucesor)
+                        pila.append((bloques[sucesor], iter(bloques[sucesor].sucesores)))
+                        break
+                else:
+                    pila.pop()
+                    posterior.append(bloque)
+            posterior.reverse()
+            self._orden = posterior
+        return self._orden
+
+    def __repr__(self):
+        return f"GrafoFlujo({self.nombre!r}, {len(self.bloques)} bloques)"
+
+
+class _ConstructorGrafo:
+    def __init__(self, nombre):
+        self.grafo = GrafoFlujo(nombre)
+        self.actual = self.grafo.nuevo_bloque()
+        self.grafo.conectar(self.grafo.entrada, self.actual)
+
+    def construir(self, sentencias):
+        self.sentencias(sentencias)
+        self.grafo.conectar(self.actual, self.grafo.salida)
+        return self.grafo
+
+    def _siguiente(self, *origenes):
+        bloque = self.grafo.nuevo_bloque()
+        for origen in origenes:
+            self.grafo.conectar(origen, bloque)
+        self.actual = bloque
+        return bloque
+
+    def sentencias(self, sentencias):
+        for s in sentencias:
+            self.sentencia(s)
+
+    def sentencia(self, s):
+        grafo = self.grafo
+        if isinstance(s, Bloque):
+            self.sentencias(s.sentencias)
+        elif isinstance(s, Si):
+            self.actual.elementos.append(s.condicion)
+            condicion = self.actual
+            self._siguiente(condicion)
+            self.sentencias(s.entonces.sentencias)
+            fin_entonces = self.actual
+            if s.sino is not None:
+                self._siguiente(condicion)
+                self.sentencias(s.sino.sentencias)
+                self._siguiente(fin_entonces, self.actual)
+            else:
+                self._siguiente(fin_entonces, condicion)
+        elif isinstance(s, Mientras):
+            cabecera = self._siguiente(self.actual)
+            cabecera.elementos.append(s.condicion)
+            self._siguiente(cabecera)
+            self.sentencias(s.cuerpo.sentencias)
+            grafo.conectar(self.actual, cabecera)
+            self._siguiente(cabecera)
+        elif isinstance(s, Para):
+            if s.inicio is not None:
+                self.sentencia(s.inicio)
+            cabecera = self._siguiente(self.actual)
+            if s.condicion is not None:
+                cabecera.elementos.append(s.condicion)
+            self._siguiente(cabecera)
+            self.sentencias(s.cuerpo.sentencias)
+            if s.paso is not None:
+                self.sentencia(s.paso)
+            grafo.conectar(self.actual, cabecera)
+            # sin condición el ciclo solo termina con 'retornar'
+            self._siguiente(*((cabecera,) if s.condicion is not None else ()))
+        elif isinstance(s, Retornar):
+            self.actual.elementos.append(s)
+            grafo.conectar(self.actual, grafo.salida)
+            self._siguiente()  # lo que sigue es inalcanzable
+        else:
+            self.actual.elementos.append(s)
+
+
+def construir_grafos(programa):
+    """arbol.Programa -> {nombre: GrafoFlujo}; el programa principal va como PRINCIPAL."""
+    grafos = {nombre: _ConstructorGrafo(nombre).construir(funcion.cuerpo.sentencias)
+              for nombre, funcion in programa.funciones.items()}
+    grafos[PRINCIPAL] = _ConstructorGrafo(PRINCIPAL).construir(programa.sentencias)
+    return grafos
+
+
+# --- Marco de flujo de datos ---
+
+def resolver(grafo, genera, mata, adelante=True, interseccion=False, frontera=0, universo=0):
+    """
+    Resuelve un problema de flujo de datos 'sal = genera | (ent & ~mata)' por lista de trabajo.
+    genera/mata: un conjunto (entero) por bloque, indexados por BloqueBasico.indice.
+    Devuelve (entrada, salida), listas de conjuntos por bloque en el sentido del análisis
+    (para un análisis hacia atrás 'entrada' es el valor al final del bloque).
+    Los bloques inalcanzables quedan con el valor inicial.
+    """
+    cantidad = len(grafo.bloques)
+    inicial = universo if interseccion else 0
+    entrada = [inicial] * cantidad
+    salida = [inicial] * cantidad
+    orden = grafo.orden() if adelante else grafo.orden()[::-1]
+    bloques = grafo.bloques
+    if adelante:
+        inicio = grafo.entrada
+        previos_de = [b.predecesores for b in bloques]
+        siguientes_de = [b.sucesores for b in bloques]
+    else:
+        inicio = grafo.salida
+        previos_de = [b.sucesores for b in bloques]
+        siguientes_de = [b.predecesores for b in bloques]
+    alcanzables = {b.indice for b in orden}
+
+    pendientes = deque(orden)
+    en_lista = [False] * cantidad
+    for b in orden:
+        en_lista[b.indice] = True
+    while pendientes:
+        bloque = pendientes.popleft()
+        i = bloque.indice
+        en_lista[i] = False
+        if bloque is inicio:
+            valor = frontera
+        else:
+            previos = [salida[p] for p in previos_de[i] if p in alcanzables]
+            if not previos:
+                valor = inicial
+            elif interseccion:
+                valor = universo
+                for v in previos:
+                    valor &= v
+            else:
+                valor = 0
+                for v in previos:
+                    valor |= v
+        entrada[i] = valor
+        nuevo = genera[i] | (valor & ~mata[i])
+        if nuevo != salida[i]:
+            salida[i] = nuevo
+            for j in siguientes_de[i]:
+                if not en_lista[j] and j in alcanzables:
+                    en_lista[j] = True
+                    pendientes.append(bloques[j])
+    return entrada, salida
+
+
+class InfoVariables:
+    """
+    Bits de cada variable y lo que lee y escribe cada elemento de los bloques.
+    Las llamadas a funciones leen y escriben (posiblemente) las variables globales que
+    toca la función, incluyendo lo que tocan las funciones a las que llama.
+    """
+
+    def __init__(self, programa, variables_declaradas):
+        self.bits = {nombre: 1 << i for i, nombre in enumerate(variables_declaradas)}
+        self.nombres = list(variables_declaradas)
+        self.universo = (1 << len(self.nombres)) - 1
+        self.lee_funcion = {}
+        self.escribe_funcion = {}
+        self._resumir_funciones(programa)
+
+    def _resumir_funciones(self, programa):
+        directas = {}
+        for nombre, funcion in programa.funciones.items():
+            lee = escribe = 0
+            llamadas = set()
+            pila = list(funcion.cuerpo.sentencias)
+            while pila:
+                s = pila.pop()
+                if isinstance(s, Bloque):
+                    pila.extend(s.sentencias)
+                    continue
+                if isinstance(s, Si):
+                    pila.append(s.entonces)
+                    if s.sino is not None:
+                        pila.append(s.sino)
+                elif isinstance(s, (Mientras, Para)):
+                    pila.append(s.cuerpo)
+                    if isinstance(s, Para):
+                        pila.extend(p for p in (s.inicio, s.paso) if p is not None)
+                if isinstance(s, (Si, Mientras, Para)) and s.condicion is not None:
+                    lee |= self._bits_lectura(s.condicion, llamadas)
+                for expresion in _expresiones(s):
+                    lee |= self._bits_lectura(expresion, llamadas)
+                if isinstance(s, (Declaracion, Asignacion, Leer)):
+                    escribe |= self.bits.get(s.nombre, 0)
+            directas[nombre] = (lee, escribe, llamadas)
+        # cierre transitivo sobre el grafo de llamadas
+        self.lee_funcion = {n: d[0] for n, d in directas.items()}
+        self.escribe_funcion = {n: d[1] for n, d in directas.items()}
+        cambio = True
+        while cambio:
+            cambio = False
+            for nombre, (_, _, llamadas) in directas.items():
+                lee = self.lee_funcion[nombre]
+                escribe = self.escribe_funcion[nombre]
+                for llamada in llamadas:
+                    lee |= self.lee_funcion.get(llamada, 0)
+                    escribe |= self.escribe_funcion.get(llamada, 0)
+                if lee != self.lee_funcion[nombre] or escribe != self.escribe_funcion[nombre]:
+                    self.lee_funcion[nombre] = lee
+                    self.escribe_funcion[nombre] = escribe
+                    cambio = True
+
+    def _bits_lectura(self, e, llamadas):
+        bits = 0
+        pila = [e]
+        while pila:
+            e = pila.pop()
+            if isinstance(e, Variable):
+                bits |= self.bits.get(e.nombre, 0)
+            elif isinstance(e, Binaria):
+                pila.append(e.izquierda)
+                pila.append(e.derecha)
+            elif isinstance(e, Unaria):
+                pila.append(e.operando)
+            elif isinstance(e, Llamada):
+                llamadas.add(e.nombre)
+        return bits
+
+    def efecto(self, elemento):
+        """(lee, escribe, escribe_posiblemente) de un elemento de un bloque."""
+        llamadas = set()
+        lee = 0
+        for expresion in _expresiones(elemento):
+            lee |= self._bits_lectura(expresion, llamadas)
+        posible = 0
+        for llamada in llamadas:
+            lee |= self.lee_funcion.get(llamada, 0)
+            posible |= self.escribe_funcion.get(llamada, 0)
+        escribe = 0
+        if isinstance(elemento, (Declaracion, Asignacion, Leer)):
+            escribe = self.bits.get(elemento.nombre, 0)
+        return lee, escribe, posible
+
+
+def _expresiones(elemento):
+    """Expresiones que evalúa un elemento (sin entrar a bloques anidados)."""
+    if isinstance(elemento, (Declaracion, Asignacion, Retornar)):
+        return () if elemento.valor is None else (elemento.valor,)
+    if isinstance(elemento, Imprimir):
+        return elemento.argumentos
+    if isinstance(elemento, SentenciaExpresion):
+        return (elemento.expresion,)
+    if isinstance(elemento, (Leer, Si, Mientras, Para, Bloque)):
+        return ()
+    return (elemento,)  # condición de si/mientras/para
+
+
+def _variables_leidas(expresion):
+    """Nodos Variable de una expresión, de izquierda a derecha."""
+    resultado = []
+    pila = [expresion]
+    while pila:
+        e = pila.pop()
+        if isinstance(e, Variable):
+            resultado.append(e)
+        elif isinstance(e, Binaria):
+            pila.append(e.derecha)
+            pila.append(e.izquierda)
+        elif isinstance(e, Unaria):
+            pila.append(e.operando)
+    return resultado
+
+
+# --- Análisis ---
+
+class EfectosBloques:
+    """Efecto de cada bloque de un grafo: lo que escribe y lo que lee antes de escribirlo."""
+
+    def __init__(self, grafo, info):
+        cantidad = len(grafo.bloques)
+        self.efectos = [None] * cantidad  # por bloque: [(lee, escribe, posible)] por elemento
+        self.escribe = [0] * cantidad  # seguro o posible (para asignación definida)
+        self.escribe_seguro = [0] * cantidad  # solo sentencias (para variables vivas)
+        self.usa = [0] * cantidad  # leídas antes de escribirse en el bloque
+        for bloque in grafo.bloques:
+            efectos = [info.efecto(e) for e in bloque.elementos]
+            escribe = escribe_seguro = usa = 0
+            for lee, seguro, posible in efectos:
+                usa |= lee & ~escribe_seguro
+                escribe_seguro |= seguro
+                escribe |= seguro | posible
+            i = bloque.indice
+            self.efectos[i] = efectos
+            self.escribe[i] = escribe
+            self.escribe_seguro[i] = escribe_seguro
+            self.usa[i] = usa
+
+
+def _frontera(grafo, info):
+    # una función puede llamarse cuando cualquier variable global ya tiene valor
+    return 0 if grafo.nombre == PRINCIPAL else info.universo
+
+
+def asignacion_definida(grafo, info, efectos):
+    """Variables con valor asignado en todos los caminos, al entrar a cada bloque."""
+    nada = [0] * len(grafo.bloques)
+    entrada, _ = resolver(grafo, efectos.escribe, nada, adelante=True, interseccion=True,
+                          frontera=_frontera(grafo, info), universo=info.universo)
+    return entrada
+
+
+def asignacion_posible(grafo, info, efectos):
+    """Variables con valor asignado en al menos un camino, al entrar a cada bloque."""
+    nada = [0] * len(grafo.bloques)
+    entrada, _ = resolver(grafo, efectos.escribe, nada, adelante=True,
+                          frontera=_frontera(grafo, info), universo=info.universo)
+    return entrada
+
+
+def variables_vivas(grafo, info, efectos):
+    """Variables que pueden leerse más adelante, al salir de cada bloque."""
+    # al terminar una función, quien la llamó puede leer cualquier variable global
+    salida, _ = resolver(grafo, efectos.usa, efectos.escribe_seguro, adelante=False,
+                         frontera=_frontera(grafo, info), universo=info.universo)
+    return salida
+
+
+# --- Diagnósticos ---
+
+@contextmanager
+def _sin_recolector_ciclos():
+    """
+    Pausa el recolector de ciclos: el análisis crea cientos de miles de objetos de vida
+    corta y, con un árbol grande en memoria, cada pasada del recolector lo recorre entero
+    (el tiempo deja de ser lineal). Los grafos no forman ciclos (las aristas son índices),
+    así que todo se libera por conteo de referencias igual.
+    """
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+
+
+def diagnosticar(programa, variables_declaradas):
+    """
+    Advertencias que dependen del flujo: usos sin valor, valores asignados que nunca se
+    leen y código inalcanzable. Devuelve una lista de Error con tipo 'flujo', ordenada.
+    """
+    advertencias = []
+    with _sin_recolector_ciclos():
+        info = InfoVariables(programa, variables_declaradas)
+        for grafo in construir_grafos(programa).values():
+            efectos = EfectosBloques(grafo, info)
+            _usos_sin_valor(grafo, info, efectos, advertencias)
+            _asignaciones_muertas(grafo, info, efectos, advertencias)
+            _inalcanzable(grafo, advertencias)
+    advertencias.sort(key=lambda e: (e.linea, e.columna))
+    return advertencias
+
+
+def _usos_sin_valor(grafo, info, efectos, advertencias):
+    if grafo.nombre != PRINCIPAL:
+        return
+    definidas = asignacion_definida(grafo, info, efectos)
+    posibles = asignacion_posible(grafo, info, efectos)
+    for bloque in grafo.orden():
+        i = bloque.indice
+        definida = definidas[i]
+        posible = posibles[i]
+        for elemento, (_, seguro, escribe_posible) in zip(bloque.elementos, efectos.efectos[i]):
+            # las llamadas de la misma sentencia pueden dar valor antes de la lectura
+            definida |= escribe_posible
+            posible |= escribe_posible
+            for expresion in _expresiones(elemento):
+                for variable in _variables_leidas(expresion):
+                    bit = info.bits.get(variable.nombre, 0)
+                    if not bit or definida & bit:
+                        continue
+                    advertencias.append(Error(variable.linea, variable.columna,
+                                              'F001' if posible & bit else 'F002', 'flujo',
+                                              variable.nombre))
+                    definida |= bit  # una advertencia por variable en cada camino
+            definida |= seguro
+            posible |= seguro
+
+
+def _asignaciones_muertas(grafo, info, efectos, advertencias):
+    vivas = variables_vivas(grafo, info, efectos)
+    for bloque in grafo.orden():
+        i = bloque.indice
+        viva = vivas[i]
+        for elemento, (lee, seguro, _) in zip(reversed(bloque.elementos), reversed(efectos.efectos[i])):
+            # 'entero x = 0;' es la forma habitual de inicializar: no se reporta
+            if (seguro and not viva & seguro and isinstance(elemento, (Declaracion, Asignacion))
+                    and elemento.valor is not None
+                    and not (isinstance(elemento, Declaracion) and isinstance(elemento.valor, Literal))):
+                advertencias.append(Error(elemento.linea, elemento.columna, 'F003', 'flujo',
+                                          elemento.nombre))
+            viva = (viva & ~seguro) | lee
+
+
+def _inalcanzable(grafo, advertencias):
+    alcanzables = {b.indice for b in grafo.orden()}
+    vistos = set()
+    for bloque in grafo.bloques:
+        if bloque.indice in alcanzables or bloque.indice in vistos or bloque.predecesores:
+            continue
+        # primera sentencia de la región inalcanzable que empieza en este bloque
+        primera = None
+        pila = [bloque]
+        while pila:
+            b = pila.pop()
+            if b.indice in vistos or b.indice in alcanzables:
+                continue
+            vistos.add(b.indice)
+            if b.elementos and (primera is None or b.elementos[0].linea < primera.linea):
+                primera = b.elementos[0]
+            pila.extend(grafo.bloques[j] for j in b.sucesores)
+        if primera is not None:
+            advertencias.append(Error(primera.linea, getattr(primera, 'columna', 1), 'F004', 'flujo'))
+
+
+def analizar_flujo(tokens, contexto):
+    """Diagnósticos de flujo de un análisis sin errores (tokens y su ContextoAnalisis)."""
+    return diagnosticar(construir_arbol(tokens), contexto.variables_declaradas)
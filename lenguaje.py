@@ -0,0 +1,220 @@
+"""Definición del lenguaje (alfabeto y reglas) compartida por los analizadores.
+
+El lenguaje se describe en un archivo de gramática JSON (ver gramaticas/base.json)
+que se compila una sola vez en tablas para el léxico y el sintáctico. La forma
+compilada se guarda en disco (junto al archivo, en __pycache__) con el hash del
+archivo como clave, así cambiar de dialecto no vuelve a compilar nada.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+# Roles que el analizador sintáctico conoce. Cada dialecto asigna una palabra a cada rol.
+ROLES = (
+    'si', 'sino', 'mientras', 'para', 'entero', 'flotante',
+    'cadena', 'retornar', 'funcion', 'verdadero', 'falso',
+    'imprimir', 'leer', 'importar'
+)
+# Roles que un dialecto puede no definir (sin esa palabra, no hay esa construcción)
+ROLES_OPCIONALES = ('importar',)
+
+# Delimitadores que usan las reglas estructurales; todo dialecto debe incluirlos
+DELIMITADORES_ESTRUCTURALES = ('(', ')', '{', '}', ';')
+
+# Cambia cuando cambia el formato de las tablas compiladas (invalida la caché en disco)
+VERSION_TABLAS = 2
+
+RUTA_GRAMATICA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   'gramaticas', 'base.json')
+
+
+class Lenguaje:
+    """
+    Alfabeto y reglas del lenguaje, precalculados una sola vez.
+    Es inmutable: los analizadores lo comparten sin copiarlo, incluso entre hilos.
+    """
+
+    __slots__ = ('nombre', 'palabras_reservadas', 'rol_de_palabra', 'palabra_de_rol',
+                 'operadores', 'operadores_simples', 'operador_chars', 'delimitadores',
+                 'tipos_datos', 'estructuras_control', 'llamadas', 'booleanos',
+                 'operadores_condicion', 'grupos_palabras', 'categorias_operadores',
+                 'categorias_delimitadores', 'huella')
+
+    def __init__(self, nombre, palabras, operadores, delimitadores, tipos_datos,
+                 estructuras_control, llamadas, booleanos, operadores_condicion,
+                 grupos_palabras=(), categorias_operadores=(), categorias_delimitadores=()):
+        asignar = object.__setattr__
+        asignar(self, 'nombre', nombre)
+        # Tabla léxica: palabra escrita -> rol (los roles son los de ROLES)
+        asignar(self, 'rol_de_palabra', dict(palabras))
+        asignar(self, 'palabra_de_rol', {rol: palabra for palabra, rol in palabras.items()})
+        asignar(self, 'palabras_reservadas', frozenset(palabras))
+        asignar(self, 'operadores', frozenset(operadores))
+        # operadores de un solo carácter (para descomponer secuencias como '>>==')
+        asignar(self, 'operadores_simples', frozenset(o for o in operadores if len(o) == 1))
+        # caracteres que pueden formar operadores
+        asignar(self, 'operador_chars', frozenset(''.join(operadores)))
+        asignar(self, 'delimitadores', frozenset(delimitadores))
+        # Tablas sintácticas (por rol)
+        asignar(self, 'tipos_datos', frozenset(tipos_datos))
+        asignar(self, 'estructuras_control', frozenset(estructuras_control))
+        asignar(self, 'llamadas', frozenset(llamadas))
+        asignar(self, 'booleanos', frozenset(booleanos))
+        asignar(self, 'operadores_condicion', tuple(operadores_condicion))
+        # Identifica el lenguaje por su contenido (para cachés de artefactos compilados)
+        contenido = repr((sorted(palabras.items()), sorted(operadores), sorted(delimitadores),
+                          sorted(tipos_datos), sorted(estructuras_control), sorted(llamadas),
+                          sorted(booleanos), list(operadores_condicion)))
+        asignar(self, 'huella', hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16])
+        # Solo para mostrar la referencia del alfabeto
+        asignar(self, 'grupos_palabras', tuple(tuple(g) for g in grupos_palabras))
+        asignar(self, 'categorias_operadores',
+                tuple((n, tuple(ops)) for n, ops in categorias_operadores))
+        asignar(self, 'categorias_delimitadores',
+                tuple((n, tuple(ds)) for n, ds in categorias_delimitadores))
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("Lenguaje es inmutable")
+
+    def __delattr__(self, nombre):
+        raise AttributeError("Lenguaje es inmutable")
+
+    def __getstate__(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __setstate__(self, estado):
+        for campo, valor in estado.items():
+            object.__setattr__(self, campo, valor)
+
+    def __repr__(self):
+        return (f"Lenguaje({self.nombre!r}, {len(self.palabras_reservadas)} palabras, "
+                f"{len(self.operadores)} operadores, {len(self.delimitadores)} delimitadores)")
+
+    def referencia(self):
+        """Texto del alfabeto (palabras, operadores, delimitadores) para la pestaña Referencia."""
+        lineas = [" PALABRAS RESERVADAS (solo estas son válidas):"]
+        for grupo in self.grupos_palabras:
+            lineas.append("   • " + ", ".join(grupo))
+        lineas.append("")
+        lineas.append(" OPERADORES:")
+        for nombre, ops in self.categorias_operadores:
+            lineas.append(f"   • {nombre}: " + ", ".join(ops))
+        lineas.append("")
+        lineas.append(" DELIMITADORES:")
+        for nombre, ds in self.categorias_delimitadores:
+            lineas.append(f"   • {nombre}: " + " ".join(ds))
+        return "\n".join(lineas)
+
+
+def compilar_gramatica(definicion):
+    """Compila la definición (dict leído del JSON) en un Lenguaje con sus tablas."""
+    palabras = {}
+    grupos = []
+    for grupo in definicion['palabras_reservadas']:
+        grupos.append(list(grupo.values()))
+        for rol, palabra in grupo.items():
+            if rol not in ROLES:
+                raise ValueError(f"rol desconocido '{rol}' en la gramática")
+            if palabra in palabras:
+                raise ValueError(f"palabra reservada '{palabra}' repetida en la gramática")
+            palabras[palabra] = rol
+    faltantes = set(ROLES) - set(ROLES_OPCIONALES) - set(palabras.values())
+    if faltantes:
+        raise ValueError(f"la gramática no define los roles: {', '.join(sorted(faltantes))}")
+
+    categorias_operadores = list(definicion['operadores'].items())
+    operadores = [op for _, ops in categorias_operadores for op in ops]
+    if any(len(op) > 2 for op in operadores):
+        raise ValueError("los operadores deben tener uno o dos caracteres")
+
+    categorias_delimitadores = list(definicion['delimitadores'].items())
+    delimitadores = [d for _, ds in categorias_delimitadores for d in ds]
+    if any(len(d) != 1 for d in delimitadores):
+        raise ValueError("los delimitadores deben tener un solo carácter")
+    for d in DELIMITADORES_ESTRUCTURALES:
+        if d not in delimitadores:
+            raise ValueError(f"la gramática debe incluir el delimitador '{d}'")
+
+    reglas = definicion['reglas']
+    for regla in ('tipos_datos', 'estructuras_control', 'llamadas', 'booleanos'):
+        for rol in reglas[regla]:
+            if rol not in ROLES:
+                raise ValueError(f"rol desconocido '{rol}' en la regla '{regla}'")
+    for op in reglas['operadores_condicion']:
+        if op not in operadores:
+            raise ValueError(f"operador de condición '{op}' no pertenece al alfabeto")
+
+    return Lenguaje(
+        nombre=definicion.get('nombre', ''),
+        palabras=palabras,
+        operadores=operadores,
+        delimitadores=delimitadores,
+        tipos_datos=reglas['tipos_datos'],
+        estructuras_control=reglas['estructuras_control'],
+        llamadas=reglas['llamadas'],
+        booleanos=reglas['booleanos'],
+        operadores_condicion=reglas['operadores_condicion'],
+        grupos_palabras=grupos,
+        categorias_operadores=categorias_operadores,
+        categorias_delimitadores=categorias_delimitadores,
+    )
+
+
+# Lenguajes ya cargados en este proceso, por hash del archivo
+_lenguajes_cargados = {}
+
+
+def _ruta_cache(ruta, clave):
+    carpeta = os.path.join(os.path.dirname(os.path.abspath(ruta)), '__pycache__')
+    base = os.path.splitext(os.path.basename(ruta))[0]
+    return os.path.join(carpeta, f"{base}.{clave[:16]}.gramatica")
+
+
+def cargar_lenguaje(ruta):
+    """
+    Carga un archivo de gramática y devuelve su Lenguaje compilado.
+    Usa la forma compilada en disco si el hash del archivo coincide; si no, compila y la guarda.
+    """
+    with open(ruta, 'rb') as f:
+        contenido = f.read()
+    clave = hashlib.sha256(contenido + f"|v{VERSION_TABLAS}".encode()).hexdigest()
+    if clave in _lenguajes_cargados:
+        return _lenguajes_cargados[clave]
+
+    ruta_cache = _ruta_cache(ruta, clave)
+    lenguaje = None
+    try:
+        with open(ruta_cache, 'rb') as f:
+            lenguaje = pickle.load(f)
+    except Exception:
+        # un pickle truncado o de otra versión puede fallar con casi cualquier excepción
+        # (ValueError, TypeError, ImportError, IndexError...): se vuelve a compilar el JSON
+        # y se reemplaza
+        lenguaje = None
+
+    if not isinstance(lenguaje, Lenguaje):
+        lenguaje = compilar_gramatica(json.loads(contenido.decode('utf-8')))
+        # Escritura atómica; si la carpeta no es escribible se sigue sin caché
+        try:
+            os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+            temporal = f"{ruta_cache}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as f:
+                pickle.dump(lenguaje, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, ruta_cache)
+            # las versiones anteriores del mismo archivo ya no sirven
+            prefijo = os.path.basename(ruta_cache).split('.')[0] + '.'
+            carpeta = os.path.dirname(ruta_cache)
+            for nombre in os.listdir(carpeta):
+                if (nombre.startswith(prefijo) and nombre.endswith('.gramatica')
+                        and nombre != os.path.basename(ruta_cache)):
+                    os.remove(os.path.join(carpeta, nombre))
+        except OSError:
+            pass
+
+    _lenguajes_cargados[clave] = lenguaje
+    return lenguaje
+
+
+# ALFABETO del lenguaje del proyecto (solo estas palabras/símbolos son válidos)
+LENGUAJE_BASE = cargar_lenguaje(RUTA_GRAMATICA_BASE)
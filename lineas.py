@@ -0,0 +1,94 @@
+"""Índice de inicios de línea de un texto: convierte posiciones absolutas en (línea, columna)
+y al revés sin recorrer el texto.
+
+Se arma una vez por texto (el análisis léxico lo arma mientras recorre el código y lo deja
+en ContextoAnalisis.lineas) y se actualiza con cada edición en lugar de volver a armarlo:
+
+    desplazamiento(linea, columna)   O(1)
+    posicion(desplazamiento)         O(log n), búsqueda binaria sobre los inicios
+    editar(inicio, fin, texto)       proporcional a las líneas entre esta edición y la anterior
+
+Para que editar no tenga que correr todas las líneas siguientes, el índice tiene un hueco
+en el lugar de la última edición, como un buffer con hueco: 'inicios' guarda las líneas
+anteriores al hueco y 'siguientes' las posteriores, sin el corrimiento acumulado
+('corrimiento') de las ediciones hechas antes que ellas. Editar en el mismo lugar solo
+cambia el corrimiento; editar en otro lado mueve el hueco hasta ahí.
+
+Las líneas y columnas empiezan en 1, como en Token y Error. Los índices de Tk ("línea.col")
+tienen la columna desde 0; indice_tk y desde_tk hacen esa conversión.
+"""
+from array import array
+from bisect import bisect_right
+
+
+class IndiceLineas:
+    """Posición (en caracteres) del comienzo de cada línea de un texto."""
+    __slots__ = ('inicios', 'siguientes', 'corrimiento')
+
+    def __init__(self, texto=''):
+        self.inicios = array('i', [0])
+        self.siguientes = array('i')
+        self.corrimiento = 0
+        agregar = self.inicios.append
+        salto = texto.find('\n')
+        while salto != -1:
+            agregar(salto + 1)
+            salto = texto.find('\n', salto + 1)
+
+    def __len__(self):
+        return len(self.inicios) + len(self.siguientes)
+
+    def desplazamiento(self, linea, columna=1):
+        """Posición absoluta de (linea, columna); IndexError si la línea no existe."""
+        if linea < 1:
+            raise IndexError(f"línea {linea} fuera del texto")
+        if linea <= len(self.inicios):
+            return self.inicios[linea - 1] + columna - 1
+        return self.siguientes[linea - 1 - len(self.inicios)] + self.corrimiento + columna - 1
+
+    def posicion(self, desplazamiento):
+        """(linea, columna) de una posición absoluta."""
+        siguientes = self.siguientes
+        if siguientes and desplazamiento >= siguientes[0] + self.corrimiento:
+            relativo = desplazamiento - self.corrimiento
+            k = bisect_right(siguientes, relativo)
+            return len(self.inicios) + k, relativo - siguientes[k - 1] + 1
+        linea = bisect_right(self.inicios, desplazamiento)
+        return linea, desplazamiento - self.inicios[linea - 1] + 1
+
+    def indice_tk(self, desplazamiento):
+        linea, columna = self.posicion(desplazamiento)
+        return f"{linea}.{columna - 1}"
+
+    def desde_tk(self, indice):
+        linea, columna = str(indice).split('.')
+        return self.desplazamiento(int(linea), int(columna) + 1)
+
+    def _mover_hueco(self, posicion):
+        """Deja en 'inicios' exactamente las líneas que empiezan en 'posicion' o antes."""
+        inicios, siguientes, corrimiento = self.inicios, self.siguientes, self.corrimiento
+        if inicios[-1] > posicion:
+            k = bisect_right(inicios, posicion)
+            siguientes[:0] = array('i', (x - corrimiento for x in inicios[k:]))
+            del inicios[k:]
+        elif siguientes and siguientes[0] + corrimiento <= posicion:
+            k = bisect_right(siguientes, posicion - corrimiento)
+            inicios.extend(x + corrimiento for x in siguientes[:k])
+            del siguientes[:k]
+
+    def editar(self, inicio, fin, texto):
+        """
+        Actualiza el índice después de reemplazar texto[inicio:fin] por 'texto': se quitan
+        las líneas que empezaban dentro del tramo borrado, se agregan las del texto nuevo
+        y las siguientes quedan corridas (a través de 'corrimiento', sin tocarlas).
+        """
+        self._mover_hueco(inicio)
+        siguientes = self.siguientes
+        if siguientes and siguientes[0] + self.corrimiento <= fin:
+            del siguientes[:bisect_right(siguientes, fin - self.corrimiento)]
+        agregar = self.inicios.append
+        salto = texto.find('\n')
+        while salto != -1:
+            agregar(inicio + salto + 1)
+            salto = texto.find('\n', salto + 1)
+        self.corrimiento += len(texto) - (fin - inicio)
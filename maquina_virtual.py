@@ -0,0 +1,180 @@
+"""Máquina virtual que ejecuta el bytecode de compilador.py.
+
+La entrada y la salida son intercambiables: 'entrada' es una función sin argumentos
+que devuelve una línea de texto (por defecto input) y 'salida' recibe el texto de
+cada 'imprimir' (por defecto print).
+"""
+from compilador import (CARGAR_CONST, CARGAR_VAR, GUARDAR_VAR, SUMAR, RESTAR, MULTIPLICAR,
+                        DIVIDIR, MODULO, IGUAL, DISTINTO, MENOR, MAYOR, MENOR_IGUAL,
+                        MAYOR_IGUAL, NO, NEGATIVO, A_FLOTANTE, SALTAR, SALTAR_SI_FALSO,
+                        IMPRIMIR, LEER, LLAMAR, RETORNAR, DESCARTAR, FIN)
+
+# Profundidad máxima de llamadas a funciones
+MAX_LLAMADAS = 10000
+
+
+class ErrorEjecucion(Exception):
+    """Error al ejecutar el programa (división entre cero, lectura inválida, etc.)."""
+    def __init__(self, mensaje, linea=None):
+        super().__init__(mensaje if linea is None else f"línea {linea}: {mensaje}")
+        self.linea = linea
+
+
+def _formatear(valor):
+    return valor if isinstance(valor, str) else str(valor)
+
+
+def _dividir(a, b):
+    if type(a) is int and type(b) is int:
+        # división entera truncada hacia cero (como en C)
+        cociente = abs(a) // abs(b)
+        return cociente if (a < 0) == (b < 0) else -cociente
+    return a / b
+
+
+def _modulo(a, b):
+    if type(a) is int and type(b) is int:
+        return a - b * _dividir(a, b)
+    return a - b * int(a / b)
+
+
+def _decodificar(codigo):
+    """Pares (operación, argumento) en una lista: indexar tuplas es lo más rápido del bucle."""
+    ins = codigo.instrucciones
+    return list(zip(ins[0::2], ins[1::2]))
+
+
+class MaquinaVirtual:
+    def __init__(self, entrada=input, salida=print):
+        self.entrada = entrada
+        self.salida = salida
+        self.operaciones = 0  # instrucciones ejecutadas en la última corrida
+
+    def ejecutar(self, programa):
+        """Ejecuta un ProgramaCompilado y devuelve los valores finales de las variables."""
+        constantes = programa.constantes
+        tipos = programa.tipos
+        # las funciones se decodifican (y, desde la caché, se cargan) al llamarlas por primera vez
+        funciones = [None] * len(programa.funciones)
+        lineas_funciones = [None] * len(programa.funciones)
+        variables = [None] * len(programa.variables)
+        entrada = self.entrada
+        salida = self.salida
+
+        codigo = _decodificar(programa.principal)
+        lineas = programa.principal.lineas
+        llamadas = []  # marcos guardados: (codigo, lineas, pc)
+        pila = []
+        apilar = pila.append
+        desapilar = pila.pop
+        pc = 0
+        operaciones = 0
+        try:
+            while True:
+                op, arg = codigo[pc]
+                pc += 1
+                operaciones += 1
+                if op == CARGAR_VAR:
+                    apilar(variables[arg])
+                elif op == CARGAR_CONST:
+                    apilar(constantes[arg])
+                elif op == GUARDAR_VAR:
+                    variables[arg] = desapilar()
+                elif op == SALTAR_SI_FALSO:
+                    if not desapilar():
+                        pc = arg
+                elif op == SALTAR:
+                    pc = arg
+                elif op == SUMAR:
+                    b = desapilar()
+                    pila[-1] = pila[-1] + b
+                elif op == RESTAR:
+                    b = desapilar()
+                    pila[-1] = pila[-1] - b
+                elif op == MENOR:
+                    b = desapilar()
+                    pila[-1] = 1 if pila[-1] < b else 0
+                elif op == MAYOR:
+                    b = desapilar()
+                    pila[-1] = 1 if pila[-1] > b else 0
+                elif op == MENOR_IGUAL:
+                    b = desapilar()
+                    pila[-1] = 1 if pila[-1] <= b else 0
+                elif op == MAYOR_IGUAL:
+                    b = desapilar()
+                    pila[-1] = 1 if pila[-1] >= b else 0
+                elif op == IGUAL:
+                    b = desapilar()
+                    pila[-1] = 1 if pila[-1] == b else 0
+                elif op == DISTINTO:
+                    b = desapilar()
+                    pila[-1] = 1 if pila[-1] != b else 0
+                elif op == MULTIPLICAR:
+                    b = desapilar()
+                    pila[-1] = pila[-1] * b
+                elif op == DIVIDIR:
+                    b = desapilar()
+                    if b == 0:
+                        raise ErrorEjecucion("división entre cero", lineas[pc - 1])
+                    pila[-1] = _dividir(pila[-1], b)
+                elif op == MODULO:
+                    b = desapilar()
+                    if b == 0:
+                        raise ErrorEjecucion("módulo entre cero", lineas[pc - 1])
+                    pila[-1] = _modulo(pila[-1], b)
+                elif op == NO:
+                    pila[-1] = 0 if pila[-1] else 1
+                elif op == NEGATIVO:
+                    pila[-1] = -pila[-1]
+                elif op == A_FLOTANTE:
+                    try:
+                        pila[-1] = float(pila[-1])
+                    except ValueError:
+                        raise ErrorEjecucion(f"'{pila[-1]}' no es un valor de tipo 'flotante'", lineas[pc - 1])
+                elif op == IMPRIMIR:
+                    if arg:
+                        valores = pila[-arg:]
+                        del pila[-arg:]
+                        salida(' '.join(map(_formatear, valores)))
+                    else:
+                        salida('')
+                elif op == LEER:
+                    try:
+                        texto = entrada()
+                    except EOFError:
+                        raise ErrorEjecucion("se terminó la entrada", lineas[pc - 1])
+                    tipo = tipos[arg]
+                    try:
+                        if tipo == 'entero':
+                            variables[arg] = int(texto.strip())
+                        elif tipo == 'flotante':
+                            variables[arg] = float(texto.strip())
+                        else:
+                            variables[arg] = texto
+                    except ValueError:
+                        raise ErrorEjecucion(f"'{texto}' no es un valor de tipo '{tipo}'", lineas[pc - 1])
+                elif op == LLAMAR:
+                    if len(llamadas) >= MAX_LLAMADAS:
+                        raise ErrorEjecucion("demasiadas llamadas anidadas", lineas[pc - 1])
+                    llamadas.append((codigo, lineas, pc))
+                    codigo = funciones[arg]
+                    if codigo is None:
+                        funcion = programa.funciones[arg]
+                        codigo = funciones[arg] = _decodificar(funcion)
+                        lineas_funciones[arg] = funcion.lineas
+                    lineas = lineas_funciones[arg]
+                    pc = 0
+                elif op == RETORNAR:
+                    codigo, lineas, pc = llamadas.pop()
+                elif op == DESCARTAR:
+                    desapilar()
+                elif op == FIN:
+                    break
+                else:
+                    raise ErrorEjecucion(f"operación desconocida {op}", lineas[pc - 1])
+        except TypeError as e:
+            raise ErrorEjecucion(f"operación con tipos incompatibles ({e})", lineas[pc - 1])
+        finally:
+            self.operaciones = operaciones
+
+        return dict(zip(programa.variables, variables))
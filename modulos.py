@@ -0,0 +1,373 @@
+"""Programas de varios archivos: 'importar' y el análisis de un proyecto por módulos.
+
+Un programa puede usar lo declarado en otro archivo con
+
+    importar "util.txt";
+
+(la ruta es relativa a la carpeta del archivo que importa). Las variables y funciones
+que declara un módulo, más las que él importó, quedan declaradas en el que lo importa:
+esa tabla de símbolos exportados se carga en el ContextoAnalisis antes de analizarlo, así
+la ven los chequeos de tipos del léxico y verificar_uso_variables. Declarar de nuevo una
+variable importada es el error T014; si dos módulos importados exportan el mismo nombre,
+vale el del primero. Las herramientas de un solo archivo (validar, ejecutar, el editor)
+no resuelven importaciones: ahí cada 'importar' es el error M005, y uno mal formado es
+M001 en los dos casos.
+
+Proyecto arma el grafo de módulos desde los archivos pedidos siguiendo las importaciones
+(la que cierra un ciclo es el error M003 y no se sigue; sin recursión, así una cadena
+larga de importaciones no llega al límite de Python) y los analiza en orden
+topológico, por niveles: un módulo solo importa de niveles anteriores, así los de un
+mismo nivel se analizan a la vez, repartidos entre procesos hijos (con procesos > 1,
+donde hay fork). Cada módulo se analiza una sola vez por corrida aunque lo importen
+muchos.
+
+Con una carpeta de caché, el resultado de cada módulo (sus errores y lo que declara) se
+guarda con el hash de su código y de la tabla que importa como clave (no depende de la
+raíz: el mismo archivo pedido desde otra carpeta usa la misma entrada). En la próxima
+corrida un módulo se vuelve a analizar solo si cambió su código o lo que exporta alguno
+de sus importados: editar el cuerpo de una función compartida sin cambiar declaraciones
+no vuelve a analizar a los que la importan.
+
+Uso:
+    python modulos.py archivo [archivo ...] [--procesos N] [--cache CARPETA] [--silencioso]
+
+Código de salida 0 si ningún módulo tiene errores, 1 si alguno tiene y 2 si alguno de los
+archivos pedidos no se pudo leer.
+"""
+import argparse
+import gc
+import hashlib
+import marshal
+import os
+import sys
+
+from analizador_sintactico import (AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis, Error,
+                                   _en_proceso_hijo, _resultado_hijo, sin_comentarios)
+from cache_programas import desalojar
+from lenguaje import LENGUAJE_BASE
+
+# Cambia cuando cambia lo que se guarda de cada módulo (invalida la caché en disco)
+VERSION_CACHE = 2
+EXTENSION = '.amod'
+# Tamaño máximo por defecto de la carpeta de caché
+MAX_BYTES = 16 * 1024 * 1024
+
+
+class Modulo:
+    """Un archivo del proyecto; 'errores' y 'exportados' quedan después de analizarlo."""
+    __slots__ = ('ruta', 'nombre', 'codigo', 'importaciones', 'errores_carga', 'errores', 'exportados')
+
+    def __init__(self, ruta, nombre, codigo):
+        self.ruta = ruta  # absoluta: identifica al módulo
+        self.nombre = nombre  # relativa a la raíz del proyecto, para los mensajes
+        self.codigo = codigo
+        self.importaciones = []  # rutas de los módulos que importa, en orden (sin repetir)
+        self.errores_carga = []  # M002..M004 de sus sentencias 'importar'
+        self.errores = None
+        self.exportados = None  # nombre -> (clase, tipo, línea, ruta del módulo donde se declaró)
+
+    def __repr__(self):
+        return f"Modulo({self.nombre}, {len(self.importaciones)} importaciones)"
+
+
+def importaciones(tokens):
+    """
+    [(ruta escrita, token 'importar')] de las sentencias 'importar "ruta";' de los tokens
+    (sin comentarios). Las mal formadas se saltean: son el error M001 del análisis sintáctico.
+    """
+    encontradas = []
+    for i, token in enumerate(tokens):
+        if (token.clave == 'importar' and i + 2 < len(tokens)
+                and tokens[i + 1].tipo == 'LITERAL_CADENA' and tokens[i + 2].valor == ';'):
+            encontradas.append((tokens[i + 1].valor[1:-1], token))
+    return encontradas
+
+
+def analizar_modulo(lexico, sintactico, codigo, importados):
+    """
+    (errores, declarados) del código con los símbolos importados ya declarados: los
+    errores léxicos y sintácticos, y lo que declara el módulo mismo como
+    nombre -> (clase, tipo, línea, None).
+    """
+    contexto = ContextoAnalisis()
+    contexto.importaciones_resueltas = True
+    for nombre, (clase, tipo, linea, _) in importados.items():
+        if clase == 'variable':
+            contexto.contexto_tipos[nombre] = (tipo, linea)
+            contexto.variables_declaradas[nombre] = (tipo, linea)
+        else:
+            contexto.funciones_declaradas[nombre] = linea
+    tokens, lexicos = lexico.analizar(codigo, contexto)
+    errores = list(lexicos) + list(sintactico.analizar(tokens, contexto))
+    for error in errores:
+        # la primera declaración es la importada (se cargó antes): la línea sería de otro archivo
+        if error.codigo == 'T001' and error.argumentos[0] in importados:
+            nombre = error.argumentos[0]
+            error.codigo = 'T014'
+            error.argumentos = (nombre, importados[nombre][3])
+    declarados = {}
+    for nombre, (tipo, linea) in contexto.variables_declaradas.items():
+        if nombre not in importados:
+            declarados[nombre] = ('variable', tipo, linea, None)
+    for nombre, linea in contexto.funciones_declaradas.items():
+        if nombre not in importados:
+            declarados[nombre] = ('funcion', None, linea, None)
+    return errores, declarados
+
+
+class Proyecto:
+    """Módulos cargados desde uno o más archivos, con sus importaciones, y su análisis."""
+
+    def __init__(self, lenguaje=LENGUAJE_BASE, procesos=1, cache=None, raiz=None, max_bytes=MAX_BYTES):
+        self.lenguaje = lenguaje
+        # procesos > 1: los módulos de cada nivel se reparten entre procesos hijos (donde hay fork)
+        self.procesos = procesos if hasattr(os, 'fork') else 1
+        self.cache = cache  # carpeta de la caché en disco, o None
+        self.max_bytes = max_bytes
+        self.raiz = os.path.abspath(raiz or os.getcwd())
+        self.lexico = AnalizadorLexico(lenguaje)
+        self.sintactico = AnalizadorSintactico(lenguaje)
+        self.modulos = {}  # ruta absoluta -> Modulo, en el orden en que se encontraron
+        self.analizados = 0  # módulos analizados en las corridas de analizar()
+        self.reutilizados = 0  # módulos que salieron de la caché
+
+    def cargar(self, ruta):
+        """
+        Lee el archivo y, siguiendo sus importaciones, los módulos que usa; devuelve su
+        Modulo. Si el archivo no se puede leer se levanta la excepción (OSError o
+        UnicodeDecodeError); un módulo importado que no se puede leer es un error del que
+        lo importa.
+        """
+        ruta = os.path.abspath(ruta)
+        modulo = self.modulos.get(ruta)
+        if modulo is None:
+            modulo = self.modulos[ruta] = self._leer(ruta)
+            self._seguir(modulo)
+        return modulo
+
+    def _leer(self, ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+        return Modulo(ruta, os.path.relpath(ruta, self.raiz), codigo)
+
+    def _importaciones(self, modulo):
+        palabra = self.lenguaje.palabra_de_rol.get('importar')
+        if palabra is None or palabra not in modulo.codigo:
+            return []  # sin la palabra no hay importaciones: no hace falta separar tokens
+        return importaciones(sin_comentarios(self.lexico.tokenizar(modulo.codigo)))
+
+    def _seguir(self, inicial):
+        """
+        Carga en profundidad los módulos que importa inicial, con una pila explícita: cada
+        elemento es un módulo del camino actual y las importaciones que le faltan recorrer.
+        """
+        camino = [inicial.ruta]
+        en_camino = {inicial.ruta}
+        pila = [(inicial, iter(self._importaciones(inicial)))]
+        while pila:
+            modulo, pendientes = pila[-1]
+            siguiente = next(pendientes, None)
+            if siguiente is None:
+                pila.pop()
+                en_camino.discard(camino.pop())
+                continue
+            escrita, token = siguiente
+            ruta = os.path.normpath(os.path.join(os.path.dirname(modulo.ruta), escrita))
+            if ruta in en_camino:
+                ciclo = [self.modulos[r].nombre for r in camino[camino.index(ruta):]] + [self.modulos[ruta].nombre]
+                modulo.errores_carga.append(Error(token.linea, token.columna, 'M003', 'modulo', ' -> '.join(ciclo)))
+                continue
+            if ruta not in self.modulos:
+                try:
+                    importado = self._leer(ruta)
+                except FileNotFoundError:
+                    modulo.errores_carga.append(Error(token.linea, token.columna, 'M002', 'modulo', escrita))
+                    continue
+                except (OSError, UnicodeDecodeError) as e:
+                    modulo.errores_carga.append(Error(token.linea, token.columna, 'M004', 'modulo', escrita, e))
+                    continue
+                self.modulos[ruta] = importado
+                camino.append(ruta)
+                en_camino.add(ruta)
+                pila.append((importado, iter(self._importaciones(importado))))
+            if ruta not in modulo.importaciones:
+                modulo.importaciones.append(ruta)
+
+    def niveles(self):
+        """Los módulos en orden topológico, por niveles: cada uno importa solo de niveles anteriores."""
+        nivel = {}
+        for ruta in self.modulos:
+            # recorrido en profundidad sin recursión (los ciclos ya se cortaron al cargar)
+            pila = [ruta]
+            while pila:
+                actual = pila[-1]
+                if actual in nivel:
+                    pila.pop()
+                    continue
+                faltan = [r for r in self.modulos[actual].importaciones if r not in nivel]
+                if faltan:
+                    pila.extend(faltan)
+                    continue
+                pila.pop()
+                nivel[actual] = 1 + max((nivel[r] for r in self.modulos[actual].importaciones), default=-1)
+        niveles = [[] for _ in range(max(nivel.values(), default=-1) + 1)]
+        for ruta, n in nivel.items():
+            niveles[n].append(self.modulos[ruta])
+        return niveles
+
+    def importados(self, modulo):
+        """Tabla de símbolos que ve modulo: lo que exportan sus importados, en orden."""
+        importados = {}
+        for ruta in modulo.importaciones:
+            for nombre, simbolo in self.modulos[ruta].exportados.items():
+                importados.setdefault(nombre, simbolo)
+        return importados
+
+    def analizar(self):
+        """Analiza los módulos cargados que falten, nivel por nivel."""
+        for nivel in self.niveles():
+            pendientes = []
+            for modulo in nivel:
+                if modulo.errores is not None:
+                    continue
+                importados = self.importados(modulo)
+                clave = self._clave(modulo, importados)
+                guardado = self._cargar_cache(clave)
+                if guardado is not None:
+                    self._completar(modulo, importados, *guardado)
+                    self.reutilizados += 1
+                else:
+                    pendientes.append((modulo, importados, clave))
+            for (modulo, importados, clave), (errores, declarados) in zip(pendientes, self._repartir(pendientes)):
+                self._guardar_cache(clave, errores, declarados)
+                self._completar(modulo, importados, errores, declarados)
+                self.analizados += 1
+
+    def _completar(self, modulo, importados, errores, declarados):
+        for error in errores:
+            if error.codigo == 'T014':  # el origen se guarda como ruta absoluta: va el nombre
+                nombre, origen = error.argumentos
+                if origen in self.modulos:
+                    error.argumentos = (nombre, self.modulos[origen].nombre)
+        modulo.errores = sorted(modulo.errores_carga, key=lambda e: (e.linea, e.columna)) + errores
+        exportados = dict(importados)
+        for nombre, (clase, tipo, linea, _) in declarados.items():
+            exportados[nombre] = (clase, tipo, linea, modulo.ruta)
+        modulo.exportados = exportados
+
+    def _repartir(self, pendientes):
+        """[(errores, declarados)] de cada pendiente, en orden; con procesos > 1, en procesos hijos."""
+        def correr(grupo):
+            return [analizar_modulo(self.lexico, self.sintactico, modulo.codigo, importados)
+                    for modulo, importados, _ in grupo]
+
+        procesos = min(self.procesos, len(pendientes))
+        if procesos <= 1:
+            return correr(pendientes)
+        # Un grupo por proceso, repartidos de a uno (los módulos de un nivel pueden ser de
+        # tamaños muy distintos); el último lo corre este mismo proceso
+        grupos = [pendientes[k::procesos] for k in range(procesos)]
+        gc.freeze()
+        try:
+            hijos = [(grupo, _en_proceso_hijo(lambda grupo=grupo: correr(grupo))) for grupo in grupos[:-1]]
+        finally:
+            gc.unfreeze()
+        resultados = [None] * len(pendientes)
+        resultados[procesos - 1::procesos] = correr(grupos[-1])
+        for k, (grupo, (pid, lectura)) in enumerate(hijos):
+            recibido = _resultado_hijo(pid, lectura)
+            resultados[k::procesos] = recibido if recibido is not None else correr(grupo)
+        return resultados
+
+    # --- Caché en disco ---
+
+    def _clave(self, modulo, importados):
+        # sin el nombre del módulo, que depende de la raíz; los orígenes de la tabla
+        # importada son rutas absolutas
+        h = hashlib.sha256()
+        h.update(f"{VERSION_CACHE}|{self.lenguaje.huella}|{marshal.version}|".encode())
+        h.update(modulo.codigo.encode('utf-8'))
+        # repr y no marshal: marshal no da los mismos bytes para tablas iguales armadas distinto
+        h.update(repr(list(importados.items())).encode('utf-8'))
+        return h.hexdigest()
+
+    def _ruta_cache(self, clave):
+        return os.path.join(self.cache, clave[:32] + EXTENSION)
+
+    def _cargar_cache(self, clave):
+        """(errores, declarados) guardados con la clave, o None."""
+        if self.cache is None:
+            return None
+        ruta = self._ruta_cache(clave)
+        try:
+            with open(ruta, 'rb') as f:
+                errores, declarados = marshal.loads(f.read())
+        except (OSError, ValueError, EOFError, TypeError, MemoryError):
+            return None
+        try:
+            os.utime(ruta)  # marca de uso reciente para el desalojo
+        except OSError:
+            pass
+        return [Error(linea, columna, codigo, tipo, *argumentos)
+                for linea, columna, codigo, tipo, argumentos in errores], declarados
+
+    def _guardar_cache(self, clave, errores, declarados):
+        if self.cache is None:
+            return
+        ruta = self._ruta_cache(clave)
+        try:
+            datos = marshal.dumps(([(e.linea, e.columna, e.codigo, e.tipo, e.argumentos) for e in errores],
+                                   declarados))
+        except ValueError:  # un argumento que marshal no sabe guardar: se sigue sin caché
+            return
+        try:
+            os.makedirs(self.cache, exist_ok=True)
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        except OSError:
+            return
+        desalojar(self.cache, EXTENSION, self.max_bytes, conservar=ruta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análisis de programas de varios archivos (con 'importar').")
+    parser.add_argument('archivos', nargs='+', help="archivos de código a analizar (con los módulos que importan)")
+    parser.add_argument('--procesos', type=int, default=1,
+                        help="procesos para los módulos de un mismo nivel (por defecto 1)")
+    parser.add_argument('--cache', default=None,
+                        help="carpeta donde guardar el resultado de cada módulo entre corridas")
+    parser.add_argument('--silencioso', action='store_true', help="no mostrar nada; solo el código de salida")
+    args = parser.parse_args(argv)
+
+    # los nombres de los módulos, relativos a la carpeta que contiene a todos los pedidos
+    raiz = os.path.commonpath([os.path.dirname(os.path.abspath(ruta)) for ruta in args.archivos])
+    proyecto = Proyecto(procesos=args.procesos, cache=args.cache, raiz=raiz)
+    salida = 0
+    for ruta in args.archivos:
+        try:
+            proyecto.cargar(ruta)
+        except (OSError, UnicodeDecodeError) as e:
+            if not args.silencioso:
+                print(f"{ruta}: no se pudo leer ({e})", file=sys.stderr)
+            salida = 2
+    proyecto.analizar()
+
+    for modulo in proyecto.modulos.values():
+        if modulo.errores:
+            salida = max(salida, 1)
+        if args.silencioso:
+            continue
+        if not modulo.errores:
+            print(f"{modulo.nombre}: OK")
+        for error in modulo.errores:
+            print(f"{modulo.nombre}:{error.linea}:{error.columna}: [{error.tipo} {error.codigo}] {error.mensaje}")
+    if not args.silencioso:
+        print(f"{len(proyecto.modulos)} módulos: {proyecto.analizados} analizados, "
+              f"{proyecto.reutilizados} desde la caché", file=sys.stderr)
+    return salida
+
+
+if __name__ == "__main__":
+    sys.exit(main())
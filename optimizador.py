@@ -0,0 +1,425 @@
+"""Pasada de optimización sobre el árbol de un programa sin errores de análisis.
+
+Hace tres cosas, en este orden:
+  1. Plegado de constantes: '2 * 3 + 4' -> 10. Solo se pliega lo que da exactamente el
+     mismo valor que calcularía la máquina virtual (la división entre cero se deja).
+  2. Ramas muertas: 'si'/'mientras'/'para' con condición constante.
+  3. Variables sin uso: declaraciones y asignaciones de variables que nunca se leen.
+     Se basa en los datos del análisis (ContextoAnalisis.variables_declaradas y usos_variables)
+     y en las lecturas que quedan en el árbol después de los pasos 1 y 2.
+
+Lo eliminado queda en un InformeOptimizacion.
+"""
+from arbol import (PRECEDENCIA, Literal, Variable, Binaria, Unaria, Llamada, Declaracion,
+                   Asignacion, Imprimir, Leer, Si, Mientras, Para, Retornar,
+                   SentenciaExpresion, Bloque)
+from maquina_virtual import _dividir, _modulo
+
+_ARITMETICAS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': _dividir,
+    '%': _modulo,
+}
+
+_COMPARACIONES = {
+    '==': lambda a, b: a == b, '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b, '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b, '>=': lambda a, b: a >= b,
+}
+
+_TIPO_DE_VALOR = {int: 'entero', float: 'flotante', str: 'cadena'}
+
+
+def texto_expresion(e, precedencia=0):
+    """Expresión como código fuente (para el informe)."""
+    if isinstance(e, Literal):
+        if e.tipo == 'cadena':
+            return '"' + e.valor.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        return repr(e.valor)
+    if isinstance(e, Variable):
+        return e.nombre
+    if isinstance(e, Llamada):
+        return f"{e.nombre}()"
+    if isinstance(e, Unaria):
+        return e.operador + texto_expresion(e.operando, max(PRECEDENCIA.values()) + 1)
+    propia = PRECEDENCIA[e.operador]
+    texto = (f"{texto_expresion(e.izquierda, propia)} {e.operador} "
+             f"{texto_expresion(e.derecha, propia + 1)}")
+    return f"({texto})" if propia < precedencia else texto
+
+
+class InformeOptimizacion:
+    """Lo que eliminó o simplificó una pasada del Optimizador."""
+
+    def __init__(self):
+        self.plegados = []  # (linea, expresión original, resultado)
+        self.ramas_eliminadas = []  # (linea, descripción)
+        self.variables_eliminadas = []  # (nombre, linea_declaracion, motivo)
+        self.sentencias_eliminadas = 0
+
+    def __bool__(self):
+        return bool(self.plegados or self.ramas_eliminadas or self.variables_eliminadas)
+
+    def lineas(self):
+        lineas = []
+        for linea, antes, despues in self.plegados:
+            lineas.append(f"línea {linea}: '{antes}' -> '{despues}'")
+        for linea, descripcion in self.ramas_eliminadas:
+            lineas.append(f"línea {linea}: {descripcion}")
+        for nombre, linea, motivo in self.variables_eliminadas:
+            lineas.append(f"línea {linea}: variable '{nombre}' eliminada ({motivo})")
+        return lineas
+
+    def __str__(self):
+        resumen = (f"{len(self.plegados)} expresiones plegadas, "
+                   f"{len(self.ramas_eliminadas)} ramas eliminadas, "
+                   f"{len(self.variables_eliminadas)} variables eliminadas, "
+                   f"{self.sentencias_eliminadas} sentencias eliminadas")
+        return "\n".join([resumen] + self.lineas())
+
+
+class Optimizador:
+    """
+    Optimiza un arbol.Programa en el lugar. Como los analizadores, no guarda estado
+    propio: lo de cada corrida (tipos de variables, usos, informe) viene del contexto.
+    """
+
+    def optimizar(self, programa, contexto):
+        """Optimiza el programa y deja el informe en contexto.informe_optimizacion."""
+        informe = InformeOptimizacion()
+        corrida = _Corrida(contexto.variables_declaradas, informe)
+
+        for funcion in programa.funciones.values():
+            corrida.bloque(funcion.cuerpo)
+        programa.sentencias = corrida.sentencias(programa.sentencias)
+
+        corrida.eliminar_variables(programa, contexto.usos_variables)
+        contexto.informe_optimizacion = informe
+        return programa
+
+
+class _Corrida:
+    def __init__(self, variables_declaradas, informe):
+        self.variables_declaradas = variables_declaradas
+        self.informe = informe
+
+    # --- plegado de constantes ---
+
+    def expresion(self, e):
+        """Pliega la expresión y anota el cambio en el informe."""
+        nueva = self.plegar(e)
+        if nueva is not e:
+            self.informe.plegados.append((e.linea, texto_expresion(e), texto_expresion(nueva)))
+        return nueva
+
+    def plegar(self, e):
+        """Devuelve la expresión simplificada (la misma si no cambia; nunca modifica e)."""
+        if isinstance(e, Binaria):
+            izquierda = self.plegar(e.izquierda)
+            derecha = self.plegar(e.derecha)
+            constante_izq = isinstance(izquierda, Literal)
+            constante_der = isinstance(derecha, Literal)
+            if e.operador in ('&&', '||'):
+                # el cortocircuito decide con el operando izquierdo solo
+                if constante_izq:
+                    if e.operador == '&&' and not izquierda.valor:
+                        return Literal(0, 'entero', e.linea)
+                    if e.operador == '||' and izquierda.valor:
+                        return Literal(1, 'entero', e.linea)
+                    if constante_der:
+                        return Literal(1 if derecha.valor else 0, 'entero', e.linea)
+            elif constante_izq and constante_der:
+                valor = self._calcular(e.operador, izquierda.valor, derecha.valor)
+                if valor is not None:
+                    return Literal(valor, _TIPO_DE_VALOR[type(valor)], e.linea)
+            if izquierda is e.izquierda and derecha is e.derecha:
+                return e
+            return Binaria(e.operador, izquierda, derecha, e.linea)
+        if isinstance(e, Unaria):
+            operando = self.plegar(e.operando)
+            if isinstance(operando, Literal):
+                if e.operador == '!':
+                    return Literal(0 if operando.valor else 1, 'entero', e.linea)
+                if operando.tipo != 'cadena':
+                    return Literal(-operando.valor, operando.tipo, e.linea)
+            if operando is e.operando:
+                return e
+            return Unaria(e.operador, operando, e.linea)
+        return e
+
+    @staticmethod
+    def _calcular(operador, a, b):
+        """Valor de 'a operador b' como en la máquina virtual, o None si allá sería un error."""
+        if operador in _COMPARACIONES:
+            try:
+                return 1 if _COMPARACIONES[operador](a, b) else 0
+            except TypeError:
+                return None
+        if operador in ('/', '%') and not b:
+            return None  # se deja para que la máquina virtual reporte la división entre cero
+        try:
+            return _ARITMETICAS[operador](a, b)
+        except TypeError:
+            return None
+
+    # --- sentencias y ramas muertas ---
+
+    def bloque(self, bloque):
+        bloque.sentencias = self.sentencias(bloque.sentencias)
+        return bloque
+
+    def sentencias(self, sentencias):
+        resultado = []
+        for s in sentencias:
+            nueva = self.sentencia(s)
+            if nueva is None:
+                self.informe.sentencias_eliminadas += 1
+            else:
+                resultado.append(nueva)
+        return resultado
+
+    def sentencia(self, s):
+        """Optimiza una sentencia; devuelve la que la reemplaza o None si se elimina."""
+        if isinstance(s, (Declaracion, Asignacion)):
+            if s.valor is not None:
+                s.valor = self.expresion(s.valor)
+        elif isinstance(s, Imprimir):
+            s.argumentos = [self.expresion(a) for a in s.argumentos]
+        elif isinstance(s, Retornar):
+            if s.valor is not None:
+                s.valor = self.expresion(s.valor)
+        elif isinstance(s, SentenciaExpresion):
+            s.expresion = self.expresion(s.expresion)
+        elif isinstance(s, Bloque):
+            self.bloque(s)
+        elif isinstance(s, Si):
+            s.condicion = self.expresion(s.condicion)
+            if isinstance(s.condicion, Literal):
+                if s.condicion.valor:
+                    if s.sino is not None:
+                        self.informe.ramas_eliminadas.append(
+                            (s.linea, "condición siempre verdadera: se eliminó el bloque 'sino'"))
+                    else:
+                        self.informe.ramas_eliminadas.append(
+                            (s.linea, "condición siempre verdadera: se quitó el 'si'"))
+                    return self.bloque(s.entonces)
+                if s.sino is not None:
+                    self.informe.ramas_eliminadas.append(
+                        (s.linea, "condición siempre falsa: se eliminó el bloque 'si'"))
+                    return self.bloque(s.sino)
+                self.informe.ramas_eliminadas.append(
+                    (s.linea, "condición siempre falsa: se eliminó el 'si'"))
+                return None
+            self.bloque(s.entonces)
+            if s.sino is not None:
+                self.bloque(s.sino)
+        elif isinstance(s, Mientras):
+            s.condicion = self.expresion(s.condicion)
+            if isinstance(s.condicion, Literal) and not s.condicion.valor:
+                self.informe.ramas_eliminadas.append(
+                    (s.linea, "condición siempre falsa: se eliminó el 'mientras'"))
+                return None
+            self.bloque(s.cuerpo)
+        elif isinstance(s, Para):
+            if s.inicio is not None:
+                s.inicio = self.sentencia(s.inicio)
+            if s.condicion is not None:
+                s.condicion = self.expresion(s.condicion)
+                if isinstance(s.condicion, Literal) and not s.condicion.valor:
+                    self.informe.ramas_eliminadas.append(
+                        (s.linea, "condición siempre falsa: se eliminó el 'para' (queda su inicialización)"))
+                    return s.inicio
+            if s.paso is not None:
+                s.paso = self.sentencia(s.paso)
+            self.bloque(s.cuerpo)
+        return s
+
+    # --- variables sin uso ---
+
+    def eliminar_variables(self, programa, usos_variables):
+        """Quita las escrituras a variables que nunca se leen, hasta que no quede ninguna."""
+        eliminadas = set()
+        while True:
+            lecturas = {}
+            leidas_por_entrada = set()
+            escrituras = {}
+            for s in self._todas(programa):
+                _contar_lecturas(s, lecturas, leidas_por_entrada, escrituras)
+            nuevas = [nombre for nombre in self.variables_declaradas
+                      if nombre not in eliminadas and nombre not in lecturas
+                      and nombre not in leidas_por_entrada
+                      and all(self._se_puede_quitar(e) for e in escrituras.get(nombre, ()))]
+            if not nuevas:
+                return
+            eliminadas.update(nuevas)
+            for nombre in nuevas:
+                linea = self.variables_declaradas[nombre][1]
+                motivo = ("declarada y nunca usada" if not usos_variables.get(nombre)
+                          else "se asigna pero nunca se lee")
+                self.informe.variables_eliminadas.append((nombre, linea, motivo))
+            for funcion in programa.funciones.values():
+                self._sin_escrituras(funcion.cuerpo, eliminadas)
+            programa.sentencias = self._filtrar(programa.sentencias, eliminadas)
+
+    @staticmethod
+    def _todas(programa):
+        for funcion in programa.funciones.values():
+            yield funcion.cuerpo
+        yield from programa.sentencias
+
+    def _sin_escrituras(self, bloque, eliminadas):
+        bloque.sentencias = self._filtrar(bloque.sentencias, eliminadas)
+
+    def _filtrar(self, sentencias, eliminadas):
+        resultado = []
+        for s in sentencias:
+            nueva = self._quitar_escritura(s, eliminadas)
+            if nueva is None:
+                self.informe.sentencias_eliminadas += 1
+            else:
+                resultado.append(nueva)
+        return resultado
+
+    def _quitar_escritura(self, s, eliminadas):
+        if isinstance(s, (Declaracion, Asignacion)):
+            if s.nombre not in eliminadas:
+                return s
+            if s.valor is None or self._sin_efectos(s.valor):
+                return None
+            # el valor puede llamar a una función o fallar: se evalúa y se descarta
+            return SentenciaExpresion(s.valor, s.linea)
+        if isinstance(s, Bloque):
+            self._sin_escrituras(s, eliminadas)
+        elif isinstance(s, Si):
+            self._sin_escrituras(s.entonces, eliminadas)
+            if s.sino is not None:
+                self._sin_escrituras(s.sino, eliminadas)
+        elif isinstance(s, Mientras):
+            self._sin_escrituras(s.cuerpo, eliminadas)
+        elif isinstance(s, Para):
+            if s.inicio is not None:
+                s.inicio = self._quitar_escritura(s.inicio, eliminadas)
+            if s.paso is not None:
+                s.paso = self._quitar_escritura(s.paso, eliminadas)
+            self._sin_escrituras(s.cuerpo, eliminadas)
+        return s
+
+    def _se_puede_quitar(self, escritura):
+        """True si la escritura se puede borrar (o cambiar por su valor descartado) sin efectos visibles."""
+        valor = escritura.valor
+        if valor is None:
+            return True
+        if _lee(valor, escritura.nombre):
+            # al quitar la variable, el valor no podría evaluarse solo: tiene que poder borrarse
+            return self._sin_efectos(valor)
+        if self.variables_declaradas[escritura.nombre][0] == 'flotante':
+            # guardar en un 'flotante' convierte el valor, y eso falla con una cadena o con una
+            # variable sin valor: solo se quita si la conversión no puede fallar
+            if isinstance(valor, Variable):
+                declarada = self.variables_declaradas.get(valor.nombre)
+                return declarada is not None and declarada[0] == 'flotante'
+            return _tipo(valor, self.variables_declaradas) in ('entero', 'flotante')
+        return True
+
+    def _sin_efectos(self, e):
+        """
+        True si evaluar la expresión no puede llamar a una función ni fallar. Una variable
+        declarada en una rama que no se ejecutó no tiene valor, así que la aritmética y las
+        comparaciones de orden con variables pueden fallar y no se consideran sin efectos.
+        """
+        if isinstance(e, (Literal, Variable)):
+            return True
+        if isinstance(e, Unaria):
+            return e.operador == '!' and self._sin_efectos(e.operando)
+        if isinstance(e, Binaria):
+            return (e.operador in ('&&', '||', '==', '!=')
+                    and self._sin_efectos(e.izquierda) and self._sin_efectos(e.derecha))
+        return False
+
+
+def _contar_lecturas(nodo, lecturas, leidas_por_entrada, escrituras):
+    """
+    Cuenta las variables que se leen en una sentencia o expresión (recursivo) y junta
+    las escrituras de cada una (nombre -> declaraciones y asignaciones). Leer una variable
+    en su propia asignación ('x = x + 1') no cuenta como lectura.
+    """
+    if isinstance(nodo, Variable):
+        lecturas[nodo.nombre] = lecturas.get(nodo.nombre, 0) + 1
+    elif isinstance(nodo, Binaria):
+        _contar_lecturas(nodo.izquierda, lecturas, leidas_por_entrada, escrituras)
+        _contar_lecturas(nodo.derecha, lecturas, leidas_por_entrada, escrituras)
+    elif isinstance(nodo, Unaria):
+        _contar_lecturas(nodo.operando, lecturas, leidas_por_entrada, escrituras)
+    elif isinstance(nodo, (Declaracion, Asignacion)):
+        escrituras.setdefault(nodo.nombre, []).append(nodo)
+        if nodo.valor is not None:
+            propias = {}
+            _contar_lecturas(nodo.valor, propias, leidas_por_entrada, escrituras)
+            propias.pop(nodo.nombre, None)
+            for nombre, cantidad in propias.items():
+                lecturas[nombre] = lecturas.get(nombre, 0) + cantidad
+    elif isinstance(nodo, Retornar):
+        if nodo.valor is not None:
+            _contar_lecturas(nodo.valor, lecturas, leidas_por_entrada, escrituras)
+    elif isinstance(nodo, Imprimir):
+        for argumento in nodo.argumentos:
+            _contar_lecturas(argumento, lecturas, leidas_por_entrada, escrituras)
+    elif isinstance(nodo, Leer):
+        # 'leer' consume entrada: la variable se conserva aunque no se lea después
+        leidas_por_entrada.add(nodo.nombre)
+    elif isinstance(nodo, SentenciaExpresion):
+        _contar_lecturas(nodo.expresion, lecturas, leidas_por_entrada, escrituras)
+    elif isinstance(nodo, Bloque):
+        for s in nodo.sentencias:
+            _contar_lecturas(s, lecturas, leidas_por_entrada, escrituras)
+    elif isinstance(nodo, Si):
+        _contar_lecturas(nodo.condicion, lecturas, leidas_por_entrada, escrituras)
+        _contar_lecturas(nodo.entonces, lecturas, leidas_por_entrada, escrituras)
+        if nodo.sino is not None:
+            _contar_lecturas(nodo.sino, lecturas, leidas_por_entrada, escrituras)
+    elif isinstance(nodo, Mientras):
+        _contar_lecturas(nodo.condicion, lecturas, leidas_por_entrada, escrituras)
+        _contar_lecturas(nodo.cuerpo, lecturas, leidas_por_entrada, escrituras)
+    elif isinstance(nodo, Para):
+        for parte in (nodo.inicio, nodo.condicion, nodo.paso, nodo.cuerpo):
+            if parte is not None:
+                _contar_lecturas(parte, lecturas, leidas_por_entrada, escrituras)
+
+
+def _lee(e, nombre):
+    if isinstance(e, Variable):
+        return e.nombre == nombre
+    if isinstance(e, Binaria):
+        return _lee(e.izquierda, nombre) or _lee(e.derecha, nombre)
+    if isinstance(e, Unaria):
+        return _lee(e.operando, nombre)
+    return False
+
+
+def _tipo(e, variables_declaradas):
+    """Tipo estático de la expresión como lo ve el compilador, o None si no se conoce (llamadas)."""
+    if isinstance(e, Literal):
+        return e.tipo
+    if isinstance(e, Variable):
+        declarada = variables_declaradas.get(e.nombre)
+        return declarada[0] if declarada is not None else None
+    if isinstance(e, Binaria):
+        if e.operador in ('+', '-', '*', '/', '%'):
+            tipos = (_tipo(e.izquierda, variables_declaradas), _tipo(e.derecha, variables_declaradas))
+            if None in tipos:
+                return None
+            if 'cadena' in tipos:
+                return 'cadena'
+            return 'flotante' if 'flotante' in tipos else 'entero'
+        return 'entero'
+    if isinstance(e, Unaria):
+        return 'entero' if e.operador == '!' else _tipo(e.operando, variables_declaradas)
+    return None
+
+
+def optimizar(programa, contexto):
+    """Optimiza el árbol (en el lugar) y devuelve el InformeOptimizacion."""
+    Optimizador().optimizar(programa, contexto)
+    return contexto.informe_optimizacion
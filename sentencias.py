@@ -0,0 +1,406 @@
+"""Memo de los chequeos por sentencia, compartida entre los archivos de una corrida.
+
+Los programas generados repiten las mismas sentencias y bloques miles de veces (el mismo
+'si (edad >= 18) {...} sino {...}', el mismo 'mientras'). Con una MemoSentencias pasada a
+AnalizadorLexico y AnalizadorSintactico, cada programa se parte en sentencias de nivel
+superior (hasta un ';' fuera de llaves y paréntesis, o hasta la '}' que cierra el bloque,
+con todo lo anidado adentro) y los chequeos locales de cada una se hacen una sola vez por
+forma distinta:
+
+  - léxico: las cuatro pasadas de chequeo (declaraciones con sus tipos, estructuras de
+    control, asignaciones con los tipos de sus expresiones, secuencias de operadores);
+  - sintáctico: los chequeos de AnalizadorSintactico.POR_TRAMO (uso de variables,
+    estructuras, puntos y coma). Delimitadores y declaraciones miran el programa entero
+    y se siguen haciendo como siempre.
+
+La clave de una sentencia es la secuencia de valores de sus tokens (el valor determina el
+tipo del token), sin líneas ni columnas: la misma sentencia con otra sangría o en otra
+línea es la misma. El resultado se guarda por entorno: el tipo (o ausencia) de cada
+identificador de la sentencia en ese punto del análisis y lo poco que los chequeos miran
+fuera de ella (si ya apareció un 'si' antes, a cuántos tokens quedó el último 'para').
+Los errores se guardan como (posición del token dentro de la sentencia, código, tipo,
+argumentos) y se rearman con la línea y columna de la copia que se está analizando.
+
+Solo se guardan sentencias cerradas: terminan en ';' o '}', sus paréntesis y llaves se
+cierran adentro y (para los chequeos sintácticos) antes de cada '}' hay un ';', '{' o
+'}'. Así ninguna búsqueda de los chequeos (el ')' de una condición, el ';' de una
+declaración) sale de la sentencia. Las demás se chequean en el lugar, sobre el programa
+entero, como sin memo. Los errores llegan al recolector en el mismo orden que sin memo,
+así el resultado es idéntico (con un tope de errores, como en unidades.py, el contexto
+puede quedar con más declaraciones y usos que sin memo: cada sentencia se chequea entera
+antes de pasar sus errores).
+
+La memo guarda como máximo max_sentencias formas (las del léxico y el sintáctico juntas)
+y descarta las usadas hace más tiempo. Es de un solo lenguaje.
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import compress, count
+from operator import attrgetter
+
+from analizador_sintactico import ContextoAnalisis, Error, Expresion, InferenciaTipos
+
+# Formas de sentencia guardadas
+MAX_SENTENCIAS = 50_000
+# Entornos guardados por forma y chequeo (la misma sentencia con otros tipos en sus nombres)
+MAX_ENTORNOS = 128
+
+_VALOR = attrgetter('valor')
+_MARCAS = frozenset((';', '{', '}', '(', ')'))
+_FINES = frozenset((';', '{', '}'))
+
+
+def dividir_sentencias(valores):
+    """(inicio, fin) de las sentencias de nivel superior, en orden y cubriendo todo el programa."""
+    sentencias = []
+    inicio = 0
+    llaves = 0
+    parentesis = 0
+    for i in compress(count(), map(_MARCAS.__contains__, valores)):
+        valor = valores[i]
+        if valor == '(':
+            parentesis += 1
+        elif valor == ')':
+            parentesis = max(parentesis - 1, 0)
+        elif valor == '{':
+            llaves += 1
+            parentesis = 0
+        elif valor == '}':
+            llaves = max(llaves - 1, 0)
+            parentesis = 0
+            if not llaves:
+                sentencias.append((inicio, i + 1))
+                inicio = i + 1
+        elif not llaves and not parentesis:  # ';'
+            sentencias.append((inicio, i + 1))
+            inicio = i + 1
+    if inicio < len(valores):
+        sentencias.append((inicio, len(valores)))
+    return sentencias
+
+
+def _cerrada(valores, llamadas=None):
+    """
+    Si los chequeos de la sentencia no miran tokens de afuera (ver la ayuda del módulo).
+    Con 'llamadas' (los chequeos sintácticos) además cada '}' tiene que seguir a un ';', '{'
+    o '}' y cada palabra de llamada tiene que seguir con '('.
+    """
+    if valores[-1] != ';' and valores[-1] != '}':
+        return False
+    parentesis = llaves = 0
+    anterior = None
+    for k, valor in enumerate(valores):
+        if valor == '(':
+            parentesis += 1
+        elif valor == ')':
+            parentesis -= 1
+            if parentesis < 0:
+                return False
+        elif valor == '{':
+            llaves += 1
+        elif valor == '}':
+            llaves -= 1
+            if llaves < 0 or llamadas is not None and anterior not in _FINES:
+                return False
+        elif llamadas and valor in llamadas and valores[k + 1] != '(':
+            return False
+        anterior = valor
+    return not parentesis and not llaves
+
+
+def _relativos(errores, tokens, inicio, fin):
+    """Errores como (posición en la sentencia, código, tipo, argumentos), o None si alguno no cae en un token."""
+    if not errores:
+        return ()
+    posiciones = {(t.linea, t.columna): k for k, t in enumerate(tokens[inicio:fin])}
+    relativos = []
+    for e in errores:
+        k = posiciones.get((e.linea, e.columna))
+        if k is None:
+            return None
+        relativos.append((k, e.codigo, e.tipo, e.argumentos))
+    return tuple(relativos)
+
+
+def _guardar(resultados, entorno, resultado):
+    """resultados[entorno] = resultado, descartando el entorno más viejo si ya hay MAX_ENTORNOS."""
+    if len(resultados) >= MAX_ENTORNOS:
+        del resultados[next(iter(resultados))]
+    resultados[entorno] = resultado
+
+
+def _rearmar(relativos, tokens, inicio):
+    errores = []
+    for k, codigo, tipo, argumentos in relativos:
+        token = tokens[inicio + k]
+        errores.append(Error(token.linea, token.columna, codigo, tipo, *argumentos))
+    return errores
+
+
+class _Sentencia:
+    """Una forma de sentencia: sus identificadores, si es cerrada y los resultados por entorno."""
+    __slots__ = ('nombres', 'cerrada', 'cerrada_sintactico', 'resultados', 'chequeos')
+
+    def __init__(self, nombres, cerrada):
+        self.nombres = nombres
+        self.cerrada = cerrada
+        self.cerrada_sintactico = None  # se calcula la primera vez que la ve el sintáctico
+        self.resultados = {}  # de las pasadas del léxico
+        self.chequeos = {}  # de los chequeos sintácticos
+
+
+class MemoSentencias:
+    """Resultados de los chequeos por forma de sentencia; se comparte entre análisis."""
+
+    def __init__(self, max_sentencias=MAX_SENTENCIAS):
+        self.max_sentencias = max_sentencias
+        self.sentencias = OrderedDict()  # valores de la sentencia -> _Sentencia
+        self.lenguaje = None
+        self._division = None  # (tokens, valores, sentencias, formas) de la última lista dividida
+        self.reutilizadas = 0  # chequeos de una sentencia que salieron de la memo
+        self.calculadas = 0
+
+    def _usar(self, lenguaje):
+        if self.lenguaje is None:
+            self.lenguaje = lenguaje
+        elif self.lenguaje is not lenguaje:
+            raise ValueError("una MemoSentencias sirve para un solo lenguaje")
+
+    def _dividir(self, tokens):
+        """
+        (valores, sentencias, formas) de los tokens, con la _Sentencia de cada sentencia.
+        Sin comentarios el sintáctico recibe la misma lista que acaba de ver el léxico, y la
+        división se reutiliza.
+        """
+        if self._division is not None and self._division[0] is tokens:
+            return self._division[1:]
+        valores = tuple(map(_VALOR, tokens))
+        sentencias = dividir_sentencias(valores)
+        tabla = self.sentencias
+        formas = []
+        for inicio, fin in sentencias:
+            clave = valores[inicio:fin]
+            forma = tabla.get(clave)
+            if forma is None:
+                nombres = tuple(dict.fromkeys(t.valor for t in tokens[inicio:fin] if t.tipo == 'IDENTIFICADOR'))
+                forma = tabla[clave] = _Sentencia(nombres, _cerrada(clave))
+                if len(tabla) > self.max_sentencias:
+                    tabla.popitem(last=False)
+            else:
+                tabla.move_to_end(clave)
+            formas.append(forma)
+        self._division = (tokens, valores, sentencias, formas)
+        return valores, sentencias, formas
+
+    # --- Léxico ---
+
+    def pasadas_lexico(self, lexico, tokens, contexto, errores):
+        """Las pasadas de chequeo de AnalizadorLexico, con los errores en el mismo orden."""
+        self._usar(lexico.lenguaje)
+        valores, sentencias, formas = self._dividir(tokens)
+        motor = InferenciaTipos(tokens, contexto, lexico.booleanos)
+        contexto_tipos = contexto.contexto_tipos
+        expresiones = contexto.expresiones
+        # nombre -> tipo: contexto_tipos sin las líneas (puede traer declaraciones de un
+        # análisis anterior), para armar los entornos
+        tipos = {nombre: tipo for nombre, (tipo, _) in contexto_tipos.items()}
+        palabra_si = lexico.lenguaje.palabra_de_rol.get('si')
+        primer_si = valores.index(palabra_si) if palabra_si in valores else len(valores)
+
+        # Pasada 1 (declaraciones), sentencia por sentencia. De cada sentencia queda su forma
+        # y el resultado guardado de la pasada (que tiene adentro los de las pasadas 2 a 4,
+        # porque dependen de las expresiones que infirió), o None si no se usó la memo
+        previas = []
+        posicion = 0  # donde sigue la pasada (una sentencia sin cerrar puede saltar más allá)
+        for (inicio, fin), forma in zip(sentencias, formas):
+            if posicion != inicio or not forma.cerrada:
+                if posicion < fin:
+                    posicion = lexico.pasada_declaraciones(tokens, contexto, motor, errores,
+                                                           max(posicion, inicio), fin)
+                    tipos = {nombre: tipo for nombre, (tipo, _) in contexto_tipos.items()}
+                previas.append(None)
+                continue
+            entorno = tuple(map(tipos.get, forma.nombres))
+            previa = forma.resultados.get(entorno)
+            posicion = fin
+            if previa is None:
+                self.calculadas += 1
+                previa, encontrados = self._declaraciones(lexico, tokens, contexto, motor, forma, inicio, fin)
+                for nombre in forma.nombres:
+                    if nombre not in tipos and nombre in contexto_tipos:
+                        tipos[nombre] = contexto_tipos[nombre][0]
+                for error in encontrados:
+                    errores.append(error)
+                if previa is not None:
+                    _guardar(forma.resultados, entorno, previa)
+                previas.append((forma, previa))
+                continue
+            self.reutilizadas += 1
+            declaradas, inferidas, relativos, _ = previa
+            for k, tipo in declaradas:
+                token = tokens[inicio + k]
+                contexto_tipos[token.valor] = (tipo, token.linea)
+                tipos[token.valor] = tipo
+            for desde, hasta, tipo, completa, mezcla in inferidas:
+                expresiones[inicio + desde] = Expresion(inicio + desde, inicio + hasta, tipo, completa,
+                                                        None if mezcla is None else inicio + mezcla)
+            if relativos:
+                for error in _rearmar(relativos, tokens, inicio):
+                    if error.codigo == 'T001':
+                        error.argumentos += (contexto_tipos[error.argumentos[0]][1],)
+                    errores.append(error)
+            previas.append((forma, previa))
+
+        # Pasadas 2 a 4, con los tipos ya completos; los errores se juntan por pasada
+        por_pasada = ([], [], [])
+        estructuras, asignaciones, operadores = por_pasada
+        posicion = 0  # la pasada 3 también salta sentencias
+        for (inicio, fin), datos in zip(sentencias, previas):
+            if datos is None or datos[1] is None or posicion != inicio:
+                lexico.pasada_estructuras(tokens, motor, estructuras, inicio, fin, primer_si < inicio)
+                if posicion < fin:
+                    posicion = lexico.pasada_asignaciones(tokens, contexto, motor, asignaciones,
+                                                          max(posicion, inicio), fin)
+                lexico.pasada_operadores(tokens, operadores, inicio, fin)
+                continue
+            forma, previa = datos
+            # 'sino' busca un 'si' en todo lo anterior
+            resultados = previa[3][primer_si < inicio]
+            entorno = tuple(map(tipos.get, forma.nombres))
+            resultado = resultados.get(entorno)
+            if resultado is None:
+                self.calculadas += 1
+                listas = ([], [], [])
+                lexico.pasada_estructuras(tokens, motor, listas[0], inicio, fin, primer_si < inicio)
+                posicion = lexico.pasada_asignaciones(tokens, contexto, motor, listas[1], inicio, fin)
+                lexico.pasada_operadores(tokens, listas[2], inicio, fin)
+                for lista, encontrados in zip(por_pasada, listas):
+                    lista.extend(encontrados)
+                resultado = tuple(_relativos(lista, tokens, inicio, fin) for lista in listas)
+                if posicion == fin and None not in resultado:
+                    _guardar(resultados, entorno, resultado if any(resultado) else ())
+                continue
+            self.reutilizadas += 1
+            posicion = fin
+            if resultado:
+                for lista, relativos in zip(por_pasada, resultado):
+                    lista.extend(_rearmar(relativos, tokens, inicio))
+
+        for lista in por_pasada:
+            for error in lista:
+                errores.append(error)
+
+    @staticmethod
+    def _declaraciones(lexico, tokens, contexto, motor, forma, inicio, fin):
+        """
+        Pasada 1 de una sentencia cerrada: (resultado, errores), con el resultado como
+        (declaradas, inferidas, errores relativos, resultados de las pasadas 2 a 4 sin y con
+        un 'si' antes), con posiciones relativas a la sentencia; None si no se puede guardar.
+        """
+        contexto_tipos = contexto.contexto_tipos
+        previos = {n for n in forma.nombres if n in contexto_tipos}
+        encontrados = []
+        # En una sentencia cerrada la pasada termina justo en fin: ninguna expresión sigue
+        # después de su ';' o '}'
+        lexico.pasada_declaraciones(tokens, contexto, motor, encontrados, inicio, fin)
+        declaradas = []
+        for nombre in forma.nombres:
+            if nombre in previos or nombre not in contexto_tipos:
+                continue
+            tipo, linea = contexto_tipos[nombre]
+            # El token declarado: el nombre después de una palabra de tipo (si hay uno solo)
+            candidatos = [k for k in range(inicio + 1, fin)
+                          if tokens[k].valor == nombre and tokens[k - 1].clave in lexico.tipos_datos]
+            if len(candidatos) != 1 or tokens[candidatos[0]].linea != linea:
+                return None, encontrados
+            declaradas.append((candidatos[0] - inicio, tipo))
+        relativos = _relativos(encontrados, tokens, inicio, fin)
+        if relativos is None:
+            return None, encontrados
+        # T001 lleva la línea de la declaración anterior, que no es parte del entorno: se
+        # guarda solo el nombre y la línea se vuelve a buscar al reutilizar
+        relativos = tuple((k, codigo, tipo, argumentos[:1] if codigo == 'T001' else argumentos)
+                          for k, codigo, tipo, argumentos in relativos)
+        expresiones = contexto.expresiones
+        inferidas = []
+        for p in range(inicio, fin):
+            nodo = expresiones.get(p)
+            if nodo is not None:
+                inferidas.append((p - inicio, nodo.fin - inicio, nodo.tipo, nodo.completa,
+                                  None if nodo.mezcla is None else nodo.mezcla - inicio))
+        inferidas = tuple(inferidas)
+        return (tuple(declaradas), inferidas, relativos, ({}, {})), encontrados
+
+    # --- Sintáctico ---
+
+    def chequeos_sintactico(self, sintactico, tokens, contexto, errores):
+        """
+        Los chequeos de AnalizadorSintactico.analizar sobre los tokens sin comentarios, con
+        los errores en el mismo orden. Los que no van por tramo (delimitadores,
+        declaraciones) son los primeros de orden_chequeos() y corren sobre todo el programa.
+        """
+        self._usar(sintactico.lenguaje)
+        if not isinstance(tokens, list):
+            tokens = list(tokens)  # una VistaTokens: se copia una vez en lugar de indirección por token
+        orden = sintactico.orden_chequeos()
+        por_tramo = {nombre: [] for nombre in sintactico.POR_TRAMO}
+        for nombre in orden:
+            if nombre not in por_tramo:
+                sintactico._chequear(nombre, tokens, contexto, errores)
+
+        palabra_de_rol = sintactico.lenguaje.palabra_de_rol
+        llamadas = frozenset(palabra_de_rol[rol] for rol in sintactico.llamadas if rol in palabra_de_rol)
+        valores, sentencias, formas = self._dividir(tokens)
+        palabra_para = palabra_de_rol.get('para')
+        paras = list(compress(count(), map(palabra_para.__eq__, valores))) if palabra_para else []
+        variables = contexto.variables_declaradas
+        funciones = contexto.funciones_declaradas
+        usos = contexto.usos_variables
+        # Lo único que miran de un nombre: si es variable (1), función (2) o ninguna
+        clases = dict.fromkeys(funciones, 2)
+        clases.update(dict.fromkeys(variables, 1))
+        for (inicio, fin), forma in zip(sentencias, formas):
+            if forma.cerrada_sintactico is None:
+                forma.cerrada_sintactico = forma.cerrada and _cerrada(valores[inicio:fin], llamadas)
+            if not forma.cerrada_sintactico:
+                self._por_tramo(sintactico, tokens, contexto, por_tramo, inicio, fin)
+                continue
+            # verificar_puntos_coma mira si hubo un 'para' en los 15 tokens anteriores
+            k = bisect_left(paras, inicio)
+            para = inicio - paras[k - 1] if k and inicio - paras[k - 1] <= 15 else None
+            entorno = (para, tuple(map(clases.get, forma.nombres)))
+            resultado = forma.chequeos.get(entorno)
+            if resultado is None:
+                self.calculadas += 1
+                # Con sus propios usos, para poder guardarlos
+                propio = ContextoAnalisis()
+                propio.variables_declaradas = variables
+                propio.funciones_declaradas = funciones
+                encontrados = self._por_tramo(sintactico, tokens, propio,
+                                              {nombre: [] for nombre in por_tramo}, inicio, fin)
+                relativos = tuple(_relativos(encontrados[nombre], tokens, inicio, fin) for nombre in por_tramo)
+                resultado = (relativos if any(relativos) else (), tuple(propio.usos_variables.items()))
+                if None not in relativos:
+                    _guardar(forma.chequeos, entorno, resultado)
+                for nombre, lista in encontrados.items():
+                    por_tramo[nombre].extend(lista)
+            else:
+                self.reutilizadas += 1
+                if resultado[0]:
+                    for nombre, relativos in zip(por_tramo, resultado[0]):
+                        por_tramo[nombre].extend(_rearmar(relativos, tokens, inicio))
+            for nombre, veces in resultado[1]:
+                usos[nombre] = usos.get(nombre, 0) + veces
+
+        for nombre in orden:
+            for error in por_tramo.get(nombre, ()):
+                errores.append(error)
+
+    @staticmethod
+    def _por_tramo(sintactico, tokens, contexto, listas, inicio, fin):
+        for nombre in sintactico.POR_TRAMO:
+            if nombre in sintactico.CON_CONTEXTO:
+                getattr(sintactico, nombre)(tokens, contexto, listas[nombre], inicio, fin)
+            else:
+                getattr(sintactico, nombre)(tokens, listas[nombre], inicio, fin)
+        return listas
@@ -0,0 +1,50 @@
+"""Índice de líneas de ArchivoGrande (archivo_grande.py), también mientras otro hilo lo extiende."""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import archivo_grande
+from archivo_grande import ArchivoGrande
+
+
+class TestIndice(unittest.TestCase):
+    def setUp(self):
+        carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, carpeta)
+        self.lineas = [f'entero v{i} = {i};{" " * (i % 7)}\n' for i in range(2000)]
+        self.ruta = os.path.join(carpeta, 'grande.txt')
+        with open(self.ruta, 'w', encoding='utf-8') as f:
+            f.writelines(self.lineas)
+
+    def abrir(self):
+        archivo = ArchivoGrande(self.ruta)
+        self.addCleanup(archivo.cerrar)
+        return archivo
+
+    def test_indice_por_bloques(self):
+        # bloques chicos: los cortes caen en medio de las líneas
+        with mock.patch.object(archivo_grande, 'BLOQUE_INDICE', 37):
+            archivo = self.abrir()
+            self.assertEqual(archivo.lineas(1000, 3), ''.join(self.lineas[999:1002]))
+            self.assertFalse(archivo.completo)
+            archivo.indexar()
+        self.assertTrue(archivo.completo)
+        self.assertEqual(archivo.total_lineas(), len(self.lineas) + 1)  # la vacía después del último salto
+        self.assertEqual(archivo.linea_de_byte(len(self.lineas[0])), 2)
+
+    def test_lectura_mientras_se_indexa(self):
+        with mock.patch.object(archivo_grande, 'BLOQUE_INDICE', 64):
+            archivo = self.abrir()
+            hilo = threading.Thread(target=archivo.indexar)
+            hilo.start()
+            for desde in range(1, len(self.lineas), 97):
+                self.assertEqual(archivo.lineas(desde, 5), ''.join(self.lineas[desde - 1:desde + 4]))
+            hilo.join()
+        self.assertTrue(archivo.completo)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Artefactos .aprg (cache_programas.py): ida y vuelta, artefactos rotos y desalojo."""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import zlib
+
+from cache_programas import _CABECERA, EXTENSION, CacheProgramas, deserializar, serializar
+from compilador import analizar_y_compilar
+from maquina_virtual import MaquinaVirtual
+
+PROGRAMA = '''entero total = 0;
+funcion sumar() {
+    total = total + 2;
+}
+funcion nunca() {
+    imprimir("no se llama");
+}
+entero i = 0;
+mientras (i < 5) {
+    sumar();
+    i = i + 1;
+}
+cadena nombre = "fin";
+flotante f = 1;
+imprimir(nombre, total, f);
+'''
+
+
+def ejecutar(programa):
+    salida = []
+    variables = MaquinaVirtual(salida=salida.append).ejecutar(programa)
+    return salida, variables
+
+
+class TestArtefactos(unittest.TestCase):
+    def test_ida_y_vuelta(self):
+        programa = analizar_y_compilar(PROGRAMA)
+        cargado = deserializar(serializar(programa))
+        for campo in ('constantes', 'variables', 'tipos', 'indice_funciones'):
+            self.assertEqual(list(getattr(cargado, campo)), list(getattr(programa, campo)), campo)
+        for original, leido in zip([programa.principal] + list(programa.funciones),
+                                   [cargado.principal] + list(cargado.funciones)):
+            self.assertEqual((leido.nombre, leido.instrucciones, leido.lineas),
+                             (original.nombre, original.instrucciones, original.lineas))
+        self.assertEqual(ejecutar(cargado), ejecutar(programa))
+
+    def test_artefactos_rotos(self):
+        datos = serializar(analizar_y_compilar(PROGRAMA))
+        rotos = [datos[:n] for n in (0, 3, 10, len(datos) // 2, len(datos) - 1)]
+        rotos += [datos + b'\0', b'XXXX' + datos[4:], datos[:4] + b'\xff\xff' + datos[6:]]
+        # bytes cambiados dentro del índice, con y sin el crc32 recalculado (el índice mal
+        # armado tiene que dar ValueError también cuando el crc32 coincide)
+        inicio = _CABECERA.size
+        for k in range(inicio, inicio + 40):
+            roto = datos[:k] + bytes([datos[k] ^ 0xff]) + datos[k + 1:]
+            rotos.append(roto)
+            magia, version, tam_indice, _ = _CABECERA.unpack_from(roto)
+            rotos.append(_CABECERA.pack(magia, version, tam_indice, zlib.crc32(roto[inicio:])) + roto[inicio:])
+        for roto in rotos:
+            with self.subTest(largo=len(roto)):
+                try:
+                    programa = deserializar(roto)
+                except ValueError:
+                    continue
+                # si el índice cambiado sigue siendo válido, el programa tiene que poder leerse entero
+                list(programa.funciones)
+
+
+class TestCacheProgramas(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.carpeta)
+
+    def artefactos(self):
+        return sorted(n for n in os.listdir(self.carpeta) if n.endswith(EXTENSION))
+
+    def test_acierto_y_fallo(self):
+        cache = CacheProgramas(self.carpeta)
+        primero = cache.obtener(PROGRAMA)
+        segundo = CacheProgramas(self.carpeta).obtener(PROGRAMA)
+        self.assertEqual((cache.aciertos, cache.fallos), (0, 1))
+        self.assertEqual(ejecutar(segundo), ejecutar(primero))
+        self.assertEqual(len(self.artefactos()), 1)
+
+    def test_artefacto_roto_se_borra_y_se_rehace(self):
+        cache = CacheProgramas(self.carpeta)
+        cache.obtener(PROGRAMA)
+        (nombre,) = self.artefactos()
+        ruta = os.path.join(self.carpeta, nombre)
+        with open(ruta, 'r+b') as f:
+            f.truncate(os.path.getsize(ruta) // 2)
+        self.assertIsNone(cache.cargar(PROGRAMA))
+        self.assertFalse(os.path.exists(ruta))
+        programa = cache.obtener(PROGRAMA)
+        self.assertEqual(ejecutar(programa)[0], ['fin 10 1.0'])
+        self.assertIsNotNone(cache.cargar(PROGRAMA))
+
+    def test_desalojo_de_los_mas_viejos(self):
+        codigos = [PROGRAMA.replace('"fin"', f'"fin {i}"') for i in range(4)]
+        tam = len(serializar(analizar_y_compilar(codigos[0])))
+        cache = CacheProgramas(self.carpeta, max_bytes=2 * tam + tam // 2)
+        for i, codigo in enumerate(codigos):
+            cache.obtener(codigo)
+            ruta = cache._ruta(cache.clave(codigo))
+            os.utime(ruta, (time.time() - 100 + i, time.time() - 100 + i))
+        self.assertEqual(len(self.artefactos()), 2)
+        self.assertIsNone(cache.cargar(codigos[0]))
+        self.assertIsNotNone(cache.cargar(codigos[3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Diferencias token por token (comparar.py): el algoritmo, los diagnósticos y la línea de comandos."""
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from array import array
+from unittest import mock
+
+import comparar
+from comparar import Comparacion, diferencias
+
+VIEJO = 'entero edad = 5;\n// un comentario\nimprimir(edad);\n'
+NUEVO = 'entero   edad = 6; /* otro */\nimprimir(edad);\nentero x = y + z;\n'
+
+
+def aplicar(a, b, cambios):
+    """Rearma b desde a con los cambios; falla si no están en orden o se pisan."""
+    resultado, x = [], 0
+    for cambio in cambios:
+        assert x <= cambio.desde_viejo < cambio.hasta_viejo or cambio.desde_viejo == cambio.hasta_viejo >= x
+        resultado += a[x:cambio.desde_viejo] + b[cambio.desde_nuevo:cambio.hasta_nuevo]
+        x = cambio.hasta_viejo
+    return resultado + a[x:]
+
+
+def costo(cambios):
+    return sum(c.hasta_viejo - c.desde_viejo + c.hasta_nuevo - c.desde_nuevo for c in cambios)
+
+
+def costo_minimo(a, b):
+    """Inserciones más borrados de la diferencia más corta (por la subsecuencia común más larga)."""
+    fila = [0] * (len(b) + 1)
+    for x in a:
+        anterior = 0
+        for j, y in enumerate(b):
+            anterior, fila[j + 1] = fila[j + 1], anterior + 1 if x == y else max(fila[j + 1], fila[j])
+    return len(a) + len(b) - 2 * fila[-1]
+
+
+class TestDiferencias(unittest.TestCase):
+    def test_validas_y_minimas(self):
+        azar = random.Random(0)
+        for _ in range(500):
+            a = array('i', (azar.randrange(4) for _ in range(azar.randint(0, 40))))
+            b = array('i', (azar.randrange(4) for _ in range(azar.randint(0, 40))))
+            cambios = diferencias(a, b)
+            self.assertEqual(aplicar(list(a), list(b), cambios), list(b))
+            self.assertEqual(costo(cambios), costo_minimo(a, b))
+
+    def test_muy_distintas_con_corte(self):
+        # con un costo mínimo chico la búsqueda se corta, pero la diferencia sigue siendo válida
+        azar = random.Random(1)
+        a = array('i', (azar.randrange(50) for _ in range(3000)))
+        b = array('i', (azar.randrange(50) for _ in range(3000)))
+        for costo_minimo_, pasos in ((8, comparar.PASOS_POR_TOKEN), (8, 1)):
+            with self.subTest(costo_minimo=costo_minimo_, pasos=pasos):
+                with mock.patch.multiple(comparar, COSTO_MINIMO=costo_minimo_, PASOS_POR_TOKEN=pasos):
+                    cambios = diferencias(a, b)
+                self.assertEqual(aplicar(list(a), list(b), cambios), list(b))
+
+
+class TestComparacion(unittest.TestCase):
+    def test_sin_espacios_ni_comentarios(self):
+        comparacion = Comparacion(VIEJO, NUEVO)
+        cambios = [(comparacion.ubicacion(comparacion.viejos, c.desde_viejo, c.hasta_viejo),
+                    comparacion.ubicacion(comparacion.nuevos, c.desde_nuevo, c.hasta_nuevo))
+                   for c in comparacion.cambios]
+        # el ';' de 'imprimir(edad);' queda del lado de la sentencia agregada (es igual de corta)
+        self.assertEqual(cambios, [('1:15-1:16', '1:17-1:18'), ('3:15', '2:15-3:17')])
+        self.assertEqual(Comparacion(VIEJO, '\n' + VIEJO.replace('// un comentario', '')).cambios, [])
+
+    def test_diagnosticos(self):
+        # sin recuperación (el valor por omisión) salen todos, como en validar.py
+        comparacion = Comparacion(VIEJO, NUEVO)
+        desaparecidos, aparecidos = comparacion.diagnosticos()
+        self.assertEqual(desaparecidos, [])
+        self.assertEqual([(e.codigo, e.linea) for e in aparecidos],
+                         [('T010', 3), ('T010', 3), ('T013', 3), ('T013', 3)])
+        self.assertEqual(comparacion.suprimidos, 0)
+        # con recuperación, solo el primero de la sentencia
+        comparacion = Comparacion(VIEJO, NUEVO, recuperacion=True)
+        self.assertEqual([(e.codigo, e.linea) for e in comparacion.diagnosticos()[1]], [('T010', 3)])
+        self.assertEqual(comparacion.suprimidos, 3)
+
+    def test_error_corrido_es_el_mismo(self):
+        codigo = 'entero x = 1;\nentero x = 2;\n'
+        comparacion = Comparacion(codigo, 'entero y = 0;\n\n' + codigo)
+        self.assertEqual(comparacion.diagnosticos(), ([], []))
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.carpeta)
+
+    def archivo(self, nombre, contenido):
+        ruta = os.path.join(self.carpeta, nombre)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(contenido)
+        return ruta
+
+    def correr(self, *argv):
+        salida, errores = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(salida), contextlib.redirect_stderr(errores):
+            codigo = comparar.main(list(argv))
+        return codigo, salida.getvalue(), errores.getvalue()
+
+    def test_codigos_de_salida(self):
+        viejo, nuevo = self.archivo('viejo.txt', VIEJO), self.archivo('nuevo.txt', NUEVO)
+        codigo, salida, _ = self.correr(viejo, nuevo, '--max', '1')
+        self.assertEqual(codigo, 1)
+        self.assertEqual(salida.splitlines(), [f'@@ {viejo} 1:15-1:16 | {nuevo} 1:17-1:18 @@', '- 5', '+ 6'])
+        self.assertEqual(self.correr(viejo, viejo)[0], 0)
+        self.assertEqual(self.correr(viejo, os.path.join(self.carpeta, 'no_existe.txt'))[0], 2)
+
+    def test_diagnosticos(self):
+        viejo, nuevo = self.archivo('viejo.txt', VIEJO), self.archivo('nuevo.txt', NUEVO)
+        _, salida, errores = self.correr(viejo, nuevo, '--diagnosticos', '--recuperacion')
+        self.assertEqual(sum(linea.startswith(f'+ {nuevo}:3:') for linea in salida.splitlines()), 1)
+        self.assertIn('0 errores desaparecidos, 1 aparecidos (con recuperación: 3 errores derivados omitidos)', errores)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Árbol de prefijos del completado (completado.py): altas, bajas y actualizaciones por diferencia."""
+import random
+import unittest
+
+from completado import TrieNombres
+
+
+def nombres(trie, prefijo='', limite=1000):
+    return [nombre for nombre, _ in trie.sugerencias(prefijo, limite)]
+
+
+class TestTrieNombres(unittest.TestCase):
+    def test_agregar_y_quitar(self):
+        trie = TrieNombres()
+        for nombre in ('suma', 'sumar', 'sumatoria', 'resta'):
+            trie.agregar(nombre, 'variable')
+        trie.agregar('suma', 'funcion')  # solo cambia la clase
+        self.assertEqual(len(trie), 4)
+        self.assertEqual(trie.sugerencias('sum'),
+                         [('suma', 'funcion'), ('sumar', 'variable'), ('sumatoria', 'variable')])
+        trie.quitar('suma')
+        trie.quitar('sum')  # prefijo de otros, pero no un nombre
+        trie.quitar('nada')
+        self.assertEqual(len(trie), 3)
+        self.assertNotIn('suma', trie)
+        self.assertNotIn('sum', trie)
+        self.assertIn('sumar', trie)
+        trie.quitar('sumatoria')
+        # los nodos que quedan sin uso se podan, los del camino a 'sumar' no
+        self.assertIsNone(trie._nodo('sumat'))
+        self.assertIsNotNone(trie._nodo('sumar'))
+        trie.quitar('sumar')
+        trie.quitar('resta')
+        self.assertEqual((len(trie), trie.raiz.hijos), (0, {}))
+
+    def test_sugerencias_en_orden_y_con_limite(self):
+        trie = TrieNombres(('si', 'sino', 'mientras'))
+        trie.actualizar('variable', ['sa', 'sb', 'sz', 's'])
+        self.assertEqual(nombres(trie, 's'), ['s', 'sa', 'sb', 'si', 'sino', 'sz'])
+        self.assertEqual(nombres(trie, 's', 3), ['s', 'sa', 'sb'])
+        self.assertEqual(trie.sugerencias('s', 0), [])
+        self.assertEqual(trie.sugerencias('x'), [])
+        # un hijo nuevo después de sugerir invalida el orden guardado
+        trie.agregar('sc', 'variable')
+        self.assertEqual(nombres(trie, 's', 4), ['s', 'sa', 'sb', 'sc'])
+
+    def test_actualizar_por_diferencia(self):
+        trie = TrieNombres(('si',))
+        trie.actualizar('variable', ['a', 'b', 'si'])
+        trie.actualizar('funcion', ['b', 'f'])
+        # la reservada y la variable ya declarada conservan su clase
+        self.assertEqual(trie.sugerencias(''), [('a', 'variable'), ('b', 'variable'),
+                                                ('f', 'funcion'), ('si', 'reservada')])
+        trie.actualizar('variable', ['a'])
+        # 'b' sigue declarada como función; 'si' sigue siendo reservada
+        self.assertEqual(trie.sugerencias(''), [('a', 'variable'), ('b', 'funcion'),
+                                                ('f', 'funcion'), ('si', 'reservada')])
+        trie.actualizar('funcion', [])
+        trie.actualizar('variable', [])
+        self.assertEqual(trie.sugerencias(''), [('si', 'reservada')])
+        self.assertEqual(len(trie), 1)
+
+    def test_al_azar_contra_lista(self):
+        azar = random.Random(0)
+        trie = TrieNombres()
+        esperado = {}
+        for _ in range(3000):
+            nombre = ''.join(azar.choice('abc') for _ in range(azar.randint(1, 4)))
+            if azar.random() < 0.4:
+                trie.quitar(nombre)
+                esperado.pop(nombre, None)
+            else:
+                clase = azar.choice(('variable', 'funcion'))
+                trie.agregar(nombre, clase)
+                esperado[nombre] = clase
+            prefijo = nombre[:azar.randint(0, len(nombre))]
+            limite = azar.randint(1, 6)
+            self.assertEqual(trie.sugerencias(prefijo, limite),
+                             sorted((n, c) for n, c in esperado.items() if n.startswith(prefijo))[:limite])
+        self.assertEqual(len(trie), len(esperado))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Consultas estructurales sobre tokens (consultas.py)."""
+import unittest
+
+from consultas import Consulta, Corpus, ErrorConsulta
+
+PROGRAMA = '''entero contador = 0;
+cadena nombre = "x";
+mientras (contador) {
+    contador = contador + 1;
+}
+mientras (contador < 10) {
+    si (contador == 3) { imprimir(nombre); } sino si (contador == 4) { imprimir(1); }
+    contador = contador + 1;
+}
+funcion vacia() {
+    imprimir("sin retorno");
+}
+funcion uno() {
+    retornar 1;
+}
+'''
+
+
+class TestConsultas(unittest.TestCase):
+    def setUp(self):
+        self.corpus = Corpus()
+        self.corpus.agregar('programa.txt', PROGRAMA)
+
+    def lineas(self, consulta):
+        return [c.linea for c in self.corpus.buscar(consulta)]
+
+    def test_valor_y_tipo_en_una_alternativa(self):
+        # 'contador' es un valor y también un IDENTIFICADOR: cada token cuenta una vez
+        identificadores = self.corpus.buscar('IDENTIFICADOR')
+        alternativa = self.corpus.buscar('contador|IDENTIFICADOR')
+        self.assertEqual([(c.linea, c.columna) for c in alternativa],
+                         [(c.linea, c.columna) for c in identificadores])
+        self.assertEqual(len(self.corpus.buscar('contador|IDENTIFICADOR =')), 4)
+
+    def test_grupo_sin_condicion(self):
+        self.assertEqual(self.lineas('mientras (sin @condicion)'), [3])
+
+    def test_funcion_sin_retornar(self):
+        self.assertEqual(self.lineas('funcion IDENTIFICADOR ( ) {sin retornar}'), [10])
+
+    def test_si_sino_si(self):
+        self.assertEqual(self.lineas('si (...) {...} sino si'), [7])
+
+    def test_tramo_no_cruza_la_sentencia(self):
+        self.assertEqual(self.lineas('cadena IDENTIFICADOR = [con LITERAL_CADENA] ;'), [2])
+        self.assertEqual(self.lineas('entero IDENTIFICADOR = [con LITERAL_CADENA] ;'), [])
+
+    def test_consulta_mal_formada(self):
+        with self.assertRaises(ErrorConsulta):
+            Consulta('mientras ( contador')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""El arnés diferencial contra el analizador original (la primera revisión del historial)."""
+import random
+import shutil
+import unittest
+
+from diferencial import GeneradorProgramas, Motor, comparable
+from lenguaje import LENGUAJE_BASE
+
+CASOS = (
+    'entero x = 1;\nmientras (x < 3) { x = x + 1; }\n',
+    # la declaración y la asignación repetían el mismo error léxico
+    'entero a = b;\n',
+    # barra y salto de línea dentro de una cadena: cambian las líneas desde ahí
+    'cadena s = "a\\\nb";\nentero x = ;\n',
+    # '²' era un LITERAL_ENTERO
+    'entero x = ²;\n',
+)
+
+
+class TestContraOriginal(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temporales = []
+        cls.original = Motor.desde_origen('original', temporales=cls.temporales)
+        cls.actual = Motor.desde_origen('.')
+
+    @classmethod
+    def tearDownClass(cls):
+        for carpeta in cls.temporales:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+    def comparar(self, codigo):
+        return (comparable(codigo, self.original.analizar(codigo), intencionales=True),
+                comparable(codigo, self.actual.analizar(codigo), intencionales=True))
+
+    def test_adaptador(self):
+        self.assertTrue(self.original.original)
+        self.assertFalse(self.actual.original)
+        tokens = self.original.analizar('mientras (x) { }')[0]
+        self.assertEqual(tokens[0], ('PALABRA_RESERVADA', 'mientras', 1, 1, 'mientras'))
+        self.assertEqual(tokens[2][4], None)
+        with self.assertRaises(ValueError):
+            Motor('original', self.original.modulo, 'gui')
+
+    def test_diferencias_intencionales(self):
+        for codigo in CASOS:
+            with self.subTest(codigo=codigo):
+                original, actual = self.comparar(codigo)
+                self.assertEqual(original, actual)
+        # sin los filtros, los tres últimos casos difieren
+        for codigo in CASOS[1:]:
+            with self.subTest(codigo=codigo):
+                self.assertNotEqual(self.original.analizar(codigo), self.actual.analizar(codigo))
+
+    def test_programas_generados(self):
+        generador = GeneradorProgramas(random.Random(0), LENGUAJE_BASE)
+        for _ in range(300):
+            codigo = generador.programa()
+            with self.subTest(codigo=codigo):
+                original, actual = self.comparar(codigo)
+                self.assertEqual(original, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
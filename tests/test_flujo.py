@@ -0,0 +1,66 @@
+"""Diagnósticos de flujo (flujo.py, F001-F004) y el emparejamiento de 'sino' con un 'si' previo."""
+import unittest
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from flujo import analizar_flujo
+from sentencias import MemoSentencias
+
+
+def analizar(codigo, memo=None):
+    contexto = ContextoAnalisis()
+    tokens, lexicos = AnalizadorLexico(memo=memo).analizar(codigo, contexto)
+    errores = list(lexicos) + list(AnalizadorSintactico(memo=memo).analizar(tokens, contexto))
+    return tokens, contexto, errores
+
+
+def advertencias(codigo):
+    tokens, contexto, errores = analizar(codigo)
+    assert not errores, errores
+    return [(e.linea, e.codigo, e.argumentos) for e in analizar_flujo(tokens, contexto)]
+
+
+class TestFlujo(unittest.TestCase):
+    def test_sin_advertencias(self):
+        self.assertEqual(advertencias('entero x = 1;\nmientras (x < 3) { x = x + 1; }\nimprimir(x);\n'), [])
+
+    def test_valor_en_algun_camino(self):
+        codigo = 'entero n = 0;\nleer(n);\nsi (n > 1) { entero k = 2; }\nimprimir(k);\n'
+        self.assertEqual(advertencias(codigo), [(4, 'F001', ('k',))])
+
+    def test_sin_valor_en_ningun_camino(self):
+        codigo = 'entero n = 0;\nsi (n > 1) { imprimir(k); }\nentero k = 2;\nimprimir(k);\n'
+        self.assertEqual(advertencias(codigo), [(2, 'F002', ('k',))])
+
+    def test_valor_que_nunca_se_lee(self):
+        codigo = 'entero x = 0;\nx = 5;\nx = 6;\nimprimir(x);\n'
+        self.assertEqual(advertencias(codigo), [(2, 'F003', ('x',))])
+
+    def test_codigo_inalcanzable(self):
+        codigo = 'funcion f() {\n    retornar 1;\n    imprimir("nunca");\n}\nf();\n'
+        self.assertEqual(advertencias(codigo), [(3, 'F004', ())])
+
+    def test_llamada_da_valor(self):
+        codigo = ('entero total = 0;\nfuncion cargar() {\n    total = 5;\n}\n'
+                  'cargar();\nimprimir(total);\n')
+        self.assertEqual(advertencias(codigo), [])
+
+
+class TestSino(unittest.TestCase):
+    CASOS = (
+        ('sino { }\n', [1]),
+        ('sino { }\nsino { }\nsino { }\n', [1, 2, 3]),
+        ('entero x = 1;\nsi (x > 0) { x = 2; } sino { x = 3; }\nsino { }\n', []),
+        ('entero x = 1;\nsino { }\nsi (x > 0) { x = 2; } sino { x = 3; }\n', [2]),
+    )
+
+    def test_sino_sin_si_previo(self):
+        memo = MemoSentencias()
+        for codigo, lineas in self.CASOS:
+            for usar_memo in (None, memo, memo):
+                with self.subTest(codigo=codigo, memo=usar_memo is not None):
+                    _, _, errores = analizar(codigo, usar_memo)
+                    self.assertEqual([e.linea for e in errores if e.codigo == 'E010'], lineas)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Chequeos de tipos de expresiones del léxico contra la salida del analizador original.
+
+Cada caso tiene los errores léxicos que daba la versión anterior a InferenciaTipos, como
+(línea, columna, mensaje). La inferencia memorizada solo puede quitar las repeticiones
+exactas de un mismo error; todo lo demás tiene que seguir igual y en el mismo orden.
+"""
+import unittest
+
+from analizador_sintactico import AnalizadorLexico, ContextoAnalisis
+from lenguaje import LENGUAJE_BASE
+
+NO_DECLARADO = "uso de identificador '{}' sin declaración previa (para validar tipos)"
+MEZCLA = "mezcla de tipo 'cadena' con tipo numérico en la misma expresión"
+ENTERO_FLOTANTE = "asignación inválida: variable 'entero' recibe expresión 'flotante'"
+CADENA_NUMERICA = "asignación inválida: variable 'cadena' recibe expresión numérica"
+
+CASOS = [
+    # se declaran después: al volver a inferir en la pasada de asignaciones, 'y' es
+    # cadena y 'contador' flotante
+    ('cadena z=y contador{cadena y flotante contador',
+     [(1, 10, NO_DECLARADO.format('y')),
+      (1, 12, NO_DECLARADO.format('contador')),
+      (1, 28, "declaración de 'cadena' debe incluir asignación (ej: cadena var = ...;)"),
+      (1, 39, "declaración de 'flotante' debe incluir asignación (ej: flotante var = ...;)"),
+      (1, 10, MEZCLA)]),
+    ('entero r = 2.5;',
+     [(1, 1, "declaración de tipo 'entero' con expresión 'flotante' -> mezcla de tipos no permitida"),
+      (1, 8, ENTERO_FLOTANTE)]),
+    ('cadena s = 4;',
+     [(1, 1, "declaración de tipo 'cadena' con expresión numérica -> mezcla de tipos no permitida"),
+      (1, 8, CADENA_NUMERICA)]),
+    ('entero a = b + 1;\nentero b = 2;',
+     [(1, 12, NO_DECLARADO.format('b'))]),
+    ('entero x = 1;\nx = "a" + 1;\nx = x + 1.5;',
+     [(2, 5, MEZCLA), (3, 1, ENTERO_FLOTANTE)]),
+    ('entero n = m;\nflotante m = 1.5;\nn = m;',
+     [(1, 12, NO_DECLARADO.format('m')), (1, 8, ENTERO_FLOTANTE), (3, 1, ENTERO_FLOTANTE)]),
+    # la declaración y la asignación inferían la misma expresión dos veces
+    ('entero a = b;',
+     [(1, 12, NO_DECLARADO.format('b')), (1, 12, NO_DECLARADO.format('b'))]),
+    ('entero a = 1 * * 2;',
+     [(1, 16, "secuencia inválida de operadores cerca de '*'"),
+      (1, 16, "secuencia inválida de operadores cerca de '*'"),
+      (1, 16, "secuencia inválida de operadores '**'")]),
+]
+
+
+def sin_repetidos(errores):
+    vistos = set()
+    return [e for e in errores if not (e in vistos or vistos.add(e))]
+
+
+class TestInferencia(unittest.TestCase):
+    def test_errores_como_el_analizador_original(self):
+        lexico = AnalizadorLexico(LENGUAJE_BASE)
+        for codigo, originales in CASOS:
+            with self.subTest(codigo=codigo):
+                _, errores = lexico.analizar(codigo, ContextoAnalisis())
+                obtenidos = [(e.linea, e.columna, e.mensaje) for e in errores]
+                self.assertEqual(obtenidos, sin_repetidos(originales))
+
+
+if __name__ == '__main__':
+    unittest.main()
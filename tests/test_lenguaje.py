@@ -0,0 +1,56 @@
+"""Carga de la gramática compilada en disco (lenguaje.cargar_lenguaje) con cachés rotas."""
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import lenguaje
+from lenguaje import RUTA_GRAMATICA_BASE, Lenguaje, cargar_lenguaje
+
+# Contenidos de una caché rota: cada uno hace fallar a pickle.load de otra forma
+ROTOS = (
+    b'',  # EOFError
+    b'basura que no es un pickle',  # UnpicklingError
+    b"cno_existe\nX\n.",  # ImportError
+    b"cbuiltins\nint\n(S'x'\ntR.",  # ValueError
+    b"cbuiltins\nint\n(S'x'\nS'y'\nS'z'\ntR.",  # TypeError
+    b'\x80\x05X\x02\x00\x00\x00\xff\xfe.',  # UnicodeDecodeError
+    pickle.dumps(['no es un Lenguaje']),
+)
+
+
+class TestCacheGramatica(unittest.TestCase):
+    def setUp(self):
+        carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, carpeta)
+        self.ruta = os.path.join(carpeta, 'base.json')
+        shutil.copyfile(RUTA_GRAMATICA_BASE, self.ruta)
+        # sin los ya cargados en este proceso, así se lee la caché del disco
+        parche = mock.patch.dict(lenguaje._lenguajes_cargados, clear=True)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_cache_rota(self):
+        esperado = cargar_lenguaje(self.ruta)
+        carpeta_cache = os.path.join(os.path.dirname(self.ruta), '__pycache__')
+        (nombre,) = os.listdir(carpeta_cache)
+        ruta_cache = os.path.join(carpeta_cache, nombre)
+        with open(ruta_cache, 'rb') as f:
+            truncado = f.read()[:-20]
+        for contenido in ROTOS + (truncado,):
+            with self.subTest(contenido=contenido):
+                lenguaje._lenguajes_cargados.clear()
+                with open(ruta_cache, 'wb') as f:
+                    f.write(contenido)
+                cargado = cargar_lenguaje(self.ruta)
+                self.assertIsInstance(cargado, Lenguaje)
+                self.assertEqual(cargado.huella, esperado.huella)
+                # se reemplazó por una caché que sirve
+                with open(ruta_cache, 'rb') as f:
+                    self.assertIsInstance(pickle.load(f), Lenguaje)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Reglas Unicode del análisis léxico (identificadores y números fuera de ASCII)."""
+import unittest
+
+from analizador_sintactico import AnalizadorLexico
+
+# (código, tokens esperados [(tipo, valor)], errores esperados [(columna, parte del mensaje)])
+CASOS_UNICODE = (
+    ('²', [], [(1, "'²' no pertenece")]),
+    ('٣', [], [(1, "'٣' no pertenece")]),
+    ('１２', [], [(1, "'１' no pertenece"), (2, "'２' no pertenece")]),
+    ('12٣', [('LITERAL_ENTERO', '12')], [(3, "'٣' no pertenece")]),
+    ('x²', [('IDENTIFICADOR', 'x')], [(2, "'²' no pertenece")]),
+    ('Ⅻ', [], [(1, "'Ⅻ' no pertenece")]),
+    ('x٣', [('IDENTIFICADOR', 'x٣')], []),
+    ('año', [('IDENTIFICADOR', 'año')], []),
+    ('P\u00e9rez', [('IDENTIFICADOR', 'P\u00e9rez')], []),
+    ('Pe\u0301rez', [('IDENTIFICADOR', 'Pe\u0301rez')], []),  # acento como marca combinante
+    ('ǅx', [('IDENTIFICADOR', 'ǅx')], []),
+    ('straße_2', [('IDENTIFICADOR', 'straße_2')], []),
+    ('3é', [], [(1, "token invalido '3'")]),
+    ('"Juan Pérez ²"', [('LITERAL_CADENA', '"Juan Pérez ²"')], []),
+    ('// número ٣', [('COMENTARIO', '// número ٣')], []),
+)
+
+
+class TestLexicoUnicode(unittest.TestCase):
+    def test_casos(self):
+        analizador = AnalizadorLexico()
+        for codigo, esperados, errores_esperados in CASOS_UNICODE:
+            with self.subTest(codigo=codigo):
+                tokens, errores = analizador.analizar(codigo)
+                self.assertEqual([(t.tipo, t.valor) for t in tokens], esperados)
+                self.assertEqual(len(errores), len(errores_esperados), list(errores))
+                for error, (columna, parte) in zip(errores, errores_esperados):
+                    self.assertEqual(error.columna, columna)
+                    self.assertIn(parte, error.mensaje)
+
+    def test_tabla_de_clases_no_crece(self):
+        # un analizador compartido (editor, vigilar, validar --memo) ve código de todo tipo
+        analizador = AnalizadorLexico()
+        antes = len(analizador.clases)
+        analizador.analizar(''.join(map(chr, range(0x4e00, 0x5e00))) + ' ²٣Ⅻ')
+        self.assertEqual(len(analizador.clases), antes)
+
+
+if __name__ == '__main__':
+    unittest.main()
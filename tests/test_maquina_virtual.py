@@ -0,0 +1,61 @@
+"""Compilación a bytecode (compilador.py) y ejecución en la máquina virtual."""
+import unittest
+
+from arbol import ErrorCompilacion
+from compilador import analizar_y_compilar
+from maquina_virtual import ErrorEjecucion, MaquinaVirtual
+
+
+def correr(codigo, entradas=(), optimizar=False):
+    """(líneas impresas, variables finales) de ejecutar el código."""
+    salida = []
+    pendientes = iter(entradas)
+    maquina = MaquinaVirtual(entrada=lambda: next(pendientes), salida=salida.append)
+    variables = maquina.ejecutar(analizar_y_compilar(codigo, optimizar=optimizar))
+    return salida, variables
+
+
+class TestEjecucion(unittest.TestCase):
+    def test_bucle_y_condicion(self):
+        codigo = ('entero contador = 0;\nentero suma = 0;\n'
+                  'mientras (contador < 10) {\n'
+                  '    si (contador % 3 == 0) { suma = suma + contador; } sino { suma = suma - 1; }\n'
+                  '    contador = contador + 1;\n}\n'
+                  'imprimir("suma:", suma);\n')
+        salida, variables = correr(codigo)
+        self.assertEqual(salida, ['suma: 12'])
+        self.assertEqual(variables['contador'], 10)
+
+    def test_division_entera_truncada_hacia_cero(self):
+        _, variables = correr('entero m = 0 - 7;\nentero a = m / 2;\nentero b = m % 2;\n')
+        self.assertEqual((variables['a'], variables['b']), (-3, -1))
+
+    def test_flotante_guarda_flotante(self):
+        _, variables = correr('flotante x = 2;\n')
+        self.assertIs(type(variables['x']), float)
+
+    def test_leer(self):
+        salida, _ = correr('entero n = 0;\nleer(n);\nimprimir(n + 1);\n', entradas=['41'])
+        self.assertEqual(salida, ['42'])
+
+    def test_programa_con_errores_no_compila(self):
+        with self.assertRaises(ErrorCompilacion) as contexto:
+            analizar_y_compilar('entero a = b;\n')
+        self.assertTrue(contexto.exception.errores)
+
+    def test_division_entre_cero(self):
+        with self.assertRaises(ErrorEjecucion) as contexto:
+            correr('entero a = 0;\nentero b = 1 / a;\n')
+        self.assertEqual(contexto.exception.linea, 2)
+
+    def test_cadena_en_flotante(self):
+        # el análisis lo acepta; antes salía un ValueError de float() sin la línea
+        for codigo in ('flotante y = "hola";\nimprimir(y);\n', 'cadena s = "a";\nflotante y = 0.5;\ny = s;\n'):
+            with self.subTest(codigo=codigo):
+                with self.assertRaises(ErrorEjecucion) as contexto:
+                    correr(codigo)
+                self.assertIn("no es un valor de tipo 'flotante'", str(contexto.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""'importar': el análisis de un solo archivo y el de un proyecto (modulos.Proyecto)."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis
+from modulos import Proyecto
+
+
+def escribir(carpeta, nombre, codigo):
+    ruta = os.path.join(carpeta, nombre)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(codigo)
+    return ruta
+
+
+class TestArchivoSolo(unittest.TestCase):
+    def test_importar_sin_resolver(self):
+        contexto = ContextoAnalisis()
+        tokens, lexicos = AnalizadorLexico().analizar('importar falta;\nimportar "util.txt";\n', contexto)
+        errores = list(lexicos) + list(AnalizadorSintactico().analizar(tokens, contexto))
+        # una ruta mal escrita es un solo M001, sin el T013 de 'falta'
+        self.assertEqual([(e.linea, e.codigo) for e in errores], [(1, 'M001'), (2, 'M005')])
+
+
+class TestProyecto(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.carpeta)
+
+    def test_cadena_larga_de_importaciones(self):
+        n = 3000  # más que el límite de recursión por defecto
+        for i in range(n):
+            siguiente = f'importar "m{i + 1}.txt";\n' if i < n - 1 else ''
+            escribir(self.carpeta, f'm{i}.txt', siguiente + f'entero v{i} = {i};\n')
+        proyecto = Proyecto(raiz=self.carpeta)
+        proyecto.cargar(os.path.join(self.carpeta, 'm0.txt'))
+        self.assertEqual(len(proyecto.modulos), n)
+        self.assertEqual(len(proyecto.niveles()), n)
+
+    def test_cache_desde_otra_raiz(self):
+        escribir(self.carpeta, 'lib/util.txt', 'entero base = 1;\n')
+        principal = escribir(self.carpeta, 'lib/main.txt', 'importar "util.txt";\nentero base = 2;\n')
+        cache = os.path.join(self.carpeta, 'cache')
+        for raiz, nombre in ((self.carpeta, 'lib/util.txt'), (os.path.join(self.carpeta, 'lib'), 'util.txt')):
+            proyecto = Proyecto(cache=cache, raiz=raiz)
+            modulo = proyecto.cargar(principal)
+            proyecto.analizar()
+            self.assertEqual({e.argumentos for e in modulo.errores if e.codigo == 'T014'}, {('base', nombre)})
+        self.assertEqual((proyecto.analizados, proyecto.reutilizados), (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""La pasada de optimización (-O): lo que quita y que la ejecución dé lo mismo que sin ella."""
+import random
+import unittest
+
+from analizador_sintactico import ContextoAnalisis
+from arbol import ErrorCompilacion
+from compilador import analizar_y_compilar
+from diferencial import GeneradorProgramas
+from lenguaje import LENGUAJE_BASE
+from maquina_virtual import ErrorEjecucion, MaquinaVirtual
+
+# Guardar en un 'flotante' convierte el valor: si falla sin -O, tiene que fallar con -O
+CASOS = (
+    'flotante y = "a b";\n',
+    'cadena s = "a";\nflotante y = s + "b";\n',
+    'flotante y = "a" + "b";\n',
+    'entero n = 0;\nsi (n > 1) { entero k = 2; }\nflotante y = k;\n',
+    'flotante y = 1 + 2;\nimprimir("fin");\n',
+    'entero a = 5;\nflotante y = a * 2;\nimprimir(a);\n',
+)
+
+
+def ejecutar(programa):
+    salida = []
+    try:
+        MaquinaVirtual(entrada=lambda: '1', salida=salida.append).ejecutar(programa)
+    except ErrorEjecucion as e:
+        salida.append(f"error: {e}")
+    return salida
+
+
+class TestOptimizador(unittest.TestCase):
+    def assertMismaEjecucion(self, codigo):
+        self.assertEqual(ejecutar(analizar_y_compilar(codigo, optimizar=True)),
+                         ejecutar(analizar_y_compilar(codigo)), codigo)
+
+    def test_conversion_a_flotante_que_falla(self):
+        for codigo in CASOS:
+            with self.subTest(codigo=codigo):
+                self.assertMismaEjecucion(codigo)
+
+    def test_quita_lo_que_no_puede_fallar(self):
+        contexto = ContextoAnalisis()
+        analizar_y_compilar('flotante y = 1 + 2;\nentero n = 3;\nimprimir("fin");\n',
+                            optimizar=True, contexto=contexto)
+        informe = contexto.informe_optimizacion
+        self.assertEqual({nombre for nombre, _, _ in informe.variables_eliminadas}, {'y', 'n'})
+        self.assertEqual(len(informe.plegados), 1)
+
+    def test_programas_generados(self):
+        generador = GeneradorProgramas(random.Random(0), LENGUAJE_BASE)
+        validos = 0
+        while validos < 200:
+            codigo = generador.programa()
+            try:
+                programa = analizar_y_compilar(codigo)
+            except ErrorCompilacion:
+                continue
+            validos += 1
+            with self.subTest(codigo=codigo):
+                self.assertEqual(ejecutar(analizar_y_compilar(codigo, optimizar=True)), ejecutar(programa))
+
+
+if __name__ == '__main__':
+    unittest.main()
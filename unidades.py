@@ -0,0 +1,260 @@
+"""Análisis sintáctico por unidades, con caché de resultados por unidad.
+
+El programa se parte en unidades: cada 'funcion' (desde la palabra 'funcion' hasta la '}'
+que cierra su cuerpo) y cada tramo de código de nivel superior entre funciones. Cada unidad
+se analiza por separado y su resultado se guarda con las líneas relativas al primer token
+de la unidad; si en el próximo análisis la unidad no cambió, se reutiliza aunque se haya
+movido (por ejemplo, porque se editó la función de arriba). Por unidad se guardan:
+
+  - sus declaraciones (AnalizadorSintactico.declaraciones) y el balance de sus
+    delimitadores (balance_delimitadores); con los de todas las unidades, en orden, se
+    arma el contexto y se detectan las repetidas y los delimitadores sin pareja;
+  - los errores de los chequeos de AnalizadorSintactico.POR_TRAMO y sus usos_variables.
+
+El contenido y el borde de la unidad forman la clave de la caché. El contenido es el tipo,
+valor, línea relativa y columna de cada token. El borde son el token anterior, el último
+'para' de los 15 anteriores y los 31 tokens siguientes, que son los que miran las ventanas
+de verificar_puntos_coma. Los chequeos por tramo dependen además de la firma: para cada
+identificador de la unidad, si es variable declarada, función declarada o ninguna. Si una
+declaración en otra parte cambia la firma, solo se repiten esos chequeos. Una unidad con
+paréntesis sin cerrar no se guarda, porque verificar_estructuras podría buscar el ')' en
+cualquier parte del resto del programa.
+
+Los errores se pasan al recolector en el mismo orden que AnalizadorSintactico (por
+chequeo y, dentro de cada chequeo, por posición), así el resultado es el mismo. Con
+procesos > 1 las unidades que hay que analizar se reparten entre procesos hijos.
+"""
+import gc
+from itertools import repeat
+from operator import attrgetter, sub
+
+from analizador_sintactico import (AnalizadorSintactico, ContextoAnalisis, Error, LimiteErrores,
+                                   RecolectorErrores, _en_proceso_hijo, _resultado_hijo,
+                                   sin_comentarios)
+from lenguaje import LENGUAJE_BASE
+
+_TIPO_VALOR_COLUMNA = attrgetter('tipo', 'valor', 'columna')
+_TIPO_VALOR = attrgetter('tipo', 'valor')
+_LINEA = attrgetter('linea')
+_LLAVES = frozenset(('{', '}'))
+
+
+class Unidad:
+    """Tramo [inicio, fin) de la lista de tokens (sin comentarios); nombre None si es de nivel superior."""
+    __slots__ = ('nombre', 'inicio', 'fin')
+
+    def __init__(self, nombre, inicio, fin):
+        self.nombre = nombre
+        self.inicio = inicio
+        self.fin = fin
+
+    def __repr__(self):
+        return f"Unidad({self.nombre or '<global>'}, {self.inicio}:{self.fin})"
+
+
+class ResultadoUnidad:
+    """Lo analizado de una unidad, con las líneas relativas a su primer token."""
+    __slots__ = ('declaraciones', 'balance', 'nombres', 'firma', 'errores', 'usos')
+
+    def __init__(self, declaraciones, balance, nombres):
+        self.declaraciones = declaraciones
+        self.balance = balance
+        self.nombres = nombres  # identificadores de la unidad, en orden de aparición
+        self.firma = None  # estado de cada nombre cuando se corrieron los chequeos (ver _firma)
+        self.errores = None  # chequeo de POR_TRAMO -> [(línea relativa, columna, código, tipo, argumentos)]
+        self.usos = None  # usos_variables de la unidad
+
+    @property
+    def cerrada(self):
+        """Si todos sus paréntesis se cierran adentro (solo entonces se guarda en la caché)."""
+        sin_apertura, parentesis, _ = self.balance
+        return not parentesis and all(valor != ')' for valor, _, _ in sin_apertura)
+
+
+def dividir_unidades(tokens):
+    """Unidades del programa, en orden y cubriendo todos los tokens."""
+    # Solo importan las llaves y la palabra 'funcion': se recorren sus posiciones
+    marcas = [i for i, token in enumerate(tokens) if token.valor in _LLAVES or token.clave == 'funcion']
+    unidades = []
+    tlen = len(tokens)
+    cantidad = len(marcas)
+    inicio = 0  # comienzo del tramo de nivel superior actual
+    nivel = 0
+    m = 0
+    while m < cantidad:
+        i = marcas[m]
+        token = tokens[i]
+        m += 1
+        if token.clave != 'funcion':
+            nivel = nivel + 1 if token.valor == '{' else max(nivel - 1, 0)
+            continue
+        if nivel:
+            continue
+        if i > inicio:
+            unidades.append(Unidad(None, inicio, i))
+        nombre = tokens[i + 1].valor if i + 1 < tlen and tokens[i + 1].tipo == 'IDENTIFICADOR' else ''
+        # La función termina en la '}' que cierra su primera '{'; si antes aparece otra
+        # 'funcion', termina ahí, y si la '{' no se cierra, al final del programa
+        while m < cantidad and tokens[marcas[m]].valor == '}':
+            m += 1
+        fin = tlen
+        if m < cantidad and tokens[marcas[m]].valor != '{':
+            fin = marcas[m]
+        elif m < cantidad:
+            profundidad = 0
+            while m < cantidad:
+                valor = tokens[marcas[m]].valor
+                m += 1
+                if valor == '{':
+                    profundidad += 1
+                elif valor == '}':
+                    profundidad -= 1
+                    if profundidad == 0:
+                        fin = marcas[m - 1] + 1
+                        break
+        unidades.append(Unidad(nombre, i, fin))
+        inicio = fin
+    if inicio < tlen:
+        unidades.append(Unidad(None, inicio, tlen))
+    return unidades
+
+
+class AnalizadorUnidades:
+    """
+    Mismo resultado que AnalizadorSintactico.analizar, pero guardando entre una llamada y la
+    siguiente lo analizado de cada unidad. Pensado para re-analizar el mismo programa
+    después de cada edición (el editor): solo se vuelven a analizar las unidades que cambiaron.
+    """
+
+    def __init__(self, lenguaje=LENGUAJE_BASE, max_errores=None, recuperacion=False, procesos=1):
+        self.sintactico = AnalizadorSintactico(lenguaje, max_errores, recuperacion, procesos)
+        self.cache = {}  # clave -> ResultadoUnidad, de las unidades del último análisis
+        self.reutilizadas = 0  # unidades del último análisis cuyos chequeos salieron de la caché
+        self.analizadas = 0
+
+    def analizar(self, tokens, contexto=None):
+        sintactico = self.sintactico
+        tokens = sin_comentarios(tokens)
+        if contexto is None:
+            contexto = ContextoAnalisis()
+        errores = RecolectorErrores(contexto, sintactico.max_errores, sintactico.recuperacion)
+        errores.sincronizar(tokens)
+
+        unidades = dividir_unidades(tokens)
+        claves = [self._clave(tokens, unidad) for unidad in unidades]
+        por_unidad = [self.cache.get(clave) for clave in claves]
+        nuevas = [k for k, resultado in enumerate(por_unidad) if resultado is None]
+        for k, resultado in zip(nuevas, self._repartir(self._resumir, tokens, [unidades[k] for k in nuevas])):
+            por_unidad[k] = resultado
+        self.cache = {clave: resultado for clave, resultado in zip(claves, por_unidad) if resultado.cerrada}
+
+        # Lo que mira el programa entero sale de unir los resultados de las unidades
+        resultados = {nombre: [] for nombre, _ in sintactico.CHEQUEOS}
+        bases = [tokens[unidad.inicio].linea for unidad in unidades]
+        sintactico.unir_delimitadores([r.balance for r in por_unidad], resultados['verificar_delimitadores'], bases)
+        for resultado, base in zip(por_unidad, bases):
+            sintactico.registrar_declaraciones(resultado.declaraciones, contexto,
+                                               resultados['recolectar_declaraciones'], base)
+
+        # Chequeos por tramo: se repiten en las unidades nuevas y en las que cambió la firma
+        pendientes = [k for k, resultado in enumerate(por_unidad)
+                      if resultado.firma is None or resultado.firma != self._firma(resultado.nombres, contexto)]
+        for k, (encontrados, usos) in zip(pendientes, self._repartir(
+                self._chequear, tokens, [unidades[k] for k in pendientes], contexto)):
+            resultado = por_unidad[k]
+            resultado.errores = encontrados
+            resultado.usos = usos
+            resultado.firma = self._firma(resultado.nombres, contexto)
+        self.analizadas = len(pendientes)
+        self.reutilizadas = len(unidades) - len(pendientes)
+
+        usos_variables = contexto.usos_variables
+        for resultado, base in zip(por_unidad, bases):
+            for nombre, encontrados in resultado.errores.items():
+                resultados[nombre].extend(Error(base + linea, columna, codigo, tipo, *argumentos)
+                                          for linea, columna, codigo, tipo, argumentos in encontrados)
+            for nombre, usos in resultado.usos.items():
+                usos_variables[nombre] = usos_variables.get(nombre, 0) + usos
+
+        try:
+            for nombre in sintactico.orden_chequeos():
+                for error in resultados[nombre]:
+                    errores.append(error)
+        except LimiteErrores:
+            pass
+        return errores
+
+    def _clave(self, tokens, unidad):
+        inicio, fin = unidad.inicio, unidad.fin
+        tramo = tokens[inicio:fin]
+        base = tramo[0].linea
+        contenido = hash((tuple(map(_TIPO_VALOR_COLUMNA, tramo)),
+                          tuple(map(sub, map(_LINEA, tramo), repeat(base)))))
+        ultimo_para = None
+        for k in range(max(inicio - 15, 0), inicio):
+            if tokens[k].clave == 'para':
+                ultimo_para = inicio - k
+        siguientes = tokens[fin:fin + 31]
+        borde = (tokens[inicio - 1].clave if inicio else None, ultimo_para,
+                 tuple(map(_TIPO_VALOR, siguientes)),
+                 (siguientes[0].linea - base, siguientes[0].columna) if siguientes else None)
+        return contenido, hash(borde), fin - inicio
+
+    @staticmethod
+    def _firma(nombres, contexto):
+        variables = contexto.variables_declaradas
+        funciones = contexto.funciones_declaradas
+        return bytes(1 if nombre in variables else 2 if nombre in funciones else 0 for nombre in nombres)
+
+    def _repartir(self, funcion, tokens, unidades, *argumentos):
+        """[funcion(tokens, unidad, *argumentos)] en orden; con procesos > 1, repartidas en procesos hijos."""
+        procesos = min(self.sintactico.procesos, len(unidades))
+        if procesos <= 1:
+            return [funcion(tokens, unidad, *argumentos) for unidad in unidades]
+
+        def correr(grupo):
+            return [funcion(tokens, unidad, *argumentos) for unidad in grupo]
+
+        # Tramos contiguos de unidades por proceso; el último lo corre este mismo proceso
+        tamanio = -(-len(unidades) // procesos)
+        grupos = [unidades[k:k + tamanio] for k in range(0, len(unidades), tamanio)]
+        gc.freeze()
+        try:
+            hijos = [(grupo, _en_proceso_hijo(lambda grupo=grupo: correr(grupo))) for grupo in grupos[:-1]]
+        finally:
+            gc.unfreeze()
+        ultimo = correr(grupos[-1])
+        resultados = []
+        for grupo, (pid, lectura) in hijos:
+            recibido = _resultado_hijo(pid, lectura)
+            resultados.extend(recibido if recibido is not None else correr(grupo))
+        resultados.extend(ultimo)
+        return resultados
+
+    def _resumir(self, tokens, unidad):
+        """ResultadoUnidad con lo que no depende del resto del programa."""
+        sintactico = self.sintactico
+        inicio, fin = unidad.inicio, unidad.fin
+        base = tokens[inicio].linea
+        nombres = tuple(dict.fromkeys(t.valor for t in tokens[inicio:fin] if t.tipo == 'IDENTIFICADOR'))
+        return ResultadoUnidad(sintactico.declaraciones(tokens, inicio, fin, base),
+                               sintactico.balance_delimitadores(tokens, inicio, fin, base), nombres)
+
+    def _chequear(self, tokens, unidad, contexto):
+        """(errores por chequeo, usos_variables) de los chequeos por tramo de la unidad."""
+        sintactico = self.sintactico
+        inicio, fin = unidad.inicio, unidad.fin
+        base = tokens[inicio].linea
+        # Contexto propio para juntar los usos de la unidad; las declaraciones son las del programa
+        propio = ContextoAnalisis()
+        propio.variables_declaradas = contexto.variables_declaradas
+        propio.funciones_declaradas = contexto.funciones_declaradas
+        encontrados = {}
+        for nombre in sintactico.POR_TRAMO:
+            lista = []
+            if nombre in sintactico.CON_CONTEXTO:
+                getattr(sintactico, nombre)(tokens, propio, lista, inicio, fin)
+            else:
+                getattr(sintactico, nombre)(tokens, lista, inicio, fin)
+            encontrados[nombre] = [(e.linea - base, e.columna, e.codigo, e.tipo, e.argumentos) for e in lista]
+        return encontrados, propio.usos_variables
@@ -0,0 +1,123 @@
+"""Validación rápida ("fail fast") de programas, pensada para CI.
+
+Se detiene en el primer error (o en los primeros N) y devuelve solo el veredicto
+y los errores encontrados hasta ese punto, sin lista de tokens ni reporte completo.
+
+Uso:
+    python validar.py [--max-errores N] [--silencioso] [--flujo] [--procesos N] [--memo]
+                      archivo [archivo ...]
+
+Con --flujo, los programas sin errores pasan además por el análisis de flujo
+(flujo.py) y sus advertencias también cuentan como errores. Con --procesos N, en archivos
+grandes los chequeos que solo leen tokens corren en procesos aparte (ver
+AnalizadorSintactico.procesos y benchmarks/chequeos.py). Con --memo, los chequeos de las
+sentencias que se repiten entre archivos se hacen una sola vez (ver sentencias.py y
+benchmarks/sentencias.py).
+
+Código de salida 0 si todos los archivos son válidos, 1 si alguno tiene errores
+y 2 si alguno no se pudo leer.
+"""
+import argparse
+import sys
+
+from analizador_sintactico import AnalizadorLexico, AnalizadorSintactico, ContextoAnalisis, Error
+from arbol import ErrorCompilacion
+from flujo import analizar_flujo
+from lenguaje import LENGUAJE_BASE
+from sentencias import MemoSentencias
+
+
+class ResultadoValidacion:
+    """Resultado mínimo: si el código es válido y los primeros errores encontrados."""
+    __slots__ = ('valido', 'errores')
+
+    def __init__(self, valido, errores):
+        self.valido = valido
+        self.errores = errores
+
+    def __bool__(self):
+        return self.valido
+
+    def __repr__(self):
+        return f"ResultadoValidacion({'válido' if self.valido else 'inválido'}, {len(self.errores)} errores)"
+
+
+class Validador:
+    """Analizadores configurados para detenerse en el primer error (o en los primeros N)."""
+
+    def __init__(self, max_errores=1, lenguaje=LENGUAJE_BASE, flujo=False, procesos=1, memo=None):
+        if max_errores < 1:
+            raise ValueError("max_errores debe ser al menos 1")
+        self.max_errores = max_errores
+        self.flujo = flujo
+        self.procesos = procesos
+        self.memo = memo  # MemoSentencias compartida entre las validaciones, o None
+        self.analizador_lexico = AnalizadorLexico(lenguaje, max_errores, memo=memo)
+        self.lenguaje = lenguaje
+
+    def validar(self, codigo):
+        tokens, errores = self.analizador_lexico.analizar(codigo)
+        errores = list(errores)
+        restantes = self.max_errores - len(errores)
+        # Si el léxico ya alcanzó el tope, el sintáctico no cambia el veredicto
+        if restantes > 0:
+            contexto = ContextoAnalisis()
+            analizador = AnalizadorSintactico(self.lenguaje, restantes, procesos=self.procesos, memo=self.memo)
+            errores.extend(analizador.analizar(tokens, contexto))
+            if self.flujo and not errores:
+                try:
+                    errores.extend(analizar_flujo(tokens, contexto)[:self.max_errores])
+                except ErrorCompilacion as e:
+                    # el programa pasa el análisis pero usa algo que el árbol no representa
+                    errores.append(Error(0, 0, 'H002', 'flujo', e))
+        return ResultadoValidacion(not errores, errores)
+
+
+def validar(codigo, max_errores=1, lenguaje=LENGUAJE_BASE, flujo=False):
+    """Valida el código deteniéndose en cuanto encuentra max_errores errores."""
+    return Validador(max_errores, lenguaje, flujo).validar(codigo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validación rápida de programas (para CI).")
+    parser.add_argument('archivos', nargs='+', help="archivos de código a validar")
+    parser.add_argument('--max-errores', type=int, default=1,
+                        help="errores a reportar por archivo antes de detenerse (por defecto 1)")
+    parser.add_argument('--silencioso', action='store_true',
+                        help="no mostrar nada; solo el código de salida")
+    parser.add_argument('--flujo', action='store_true',
+                        help="reportar también usos sin valor, asignaciones sin uso y código inalcanzable")
+    parser.add_argument('--procesos', type=int, default=1,
+                        help="procesos para los chequeos independientes de cada archivo (por defecto 1)")
+    parser.add_argument('--memo', action='store_true',
+                        help="chequear una sola vez las sentencias repetidas entre archivos")
+    args = parser.parse_args(argv)
+
+    validador = Validador(args.max_errores, flujo=args.flujo, procesos=args.procesos,
+                          memo=MemoSentencias() if args.memo else None)
+    salida = 0
+    for ruta in args.archivos:
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                codigo = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            if not args.silencioso:
+                print(f"{ruta}: no se pudo leer ({e})", file=sys.stderr)
+            salida = 2
+            continue
+
+        resultado = validador.validar(codigo)
+        if resultado.valido:
+            if not args.silencioso:
+                print(f"{ruta}: OK")
+            continue
+
+        salida = max(salida, 1)
+        if not args.silencioso:
+            for error in resultado.errores:
+                print(f"{ruta}:{error.linea}:{error.columna}: [{error.tipo} {error.codigo}] {error.mensaje}")
+    return salida
+
+
+if __name__ == "__main__":
+    sys.exit(main())
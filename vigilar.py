@@ -0,0 +1,205 @@
+"""Modo vigilancia: mantiene validados todos los programas de una carpeta mientras se editan.
+
+Uso:
+    python vigilar.py carpeta [--extension .txt] [--intervalo S] [--espera S]
+                      [--max-errores N] [--flujo] [--una-vez]
+
+Recorre la carpeta (y sus subcarpetas) cada 'intervalo' segundos mirando solo el tamaño y
+la fecha de modificación de cada archivo; se vuelven a analizar únicamente los que
+cambiaron. Un archivo que se sigue escribiendo no se analiza hasta que queda quieto
+'espera' segundos, así una ráfaga de guardados cuesta un solo análisis. Si el contenido
+es el mismo que la última vez (se guardó sin cambios, se tocó la fecha) se reutiliza el
+resultado anterior; si cambió, las sentencias que siguen igual (en ese archivo o en otros)
+no se vuelven a chequear (ver sentencias.py).
+
+Se muestran los errores de cada archivo que cambia y una línea de resumen con el total de
+la carpeta. Con --una-vez se valida todo una sola vez y el código de salida es el de
+validar.py (0 todo válido, 1 con errores, 2 algún archivo no se pudo leer).
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+from analizador_sintactico import Error
+from lenguaje import LENGUAJE_BASE
+from sentencias import MemoSentencias
+from validar import ResultadoValidacion, Validador
+
+
+class EstadoArchivo:
+    """Lo que se sabe de un archivo vigilado: su última versión analizada y el resultado."""
+    __slots__ = ('firma', 'huella', 'resultado')
+
+    def __init__(self, firma, huella, resultado):
+        self.firma = firma  # (tamaño, fecha de modificación en ns)
+        self.huella = huella  # hash del contenido analizado
+        self.resultado = resultado
+
+
+class EspacioTrabajo:
+    """
+    Resultados de validación de todos los programas de una carpeta, al día con el disco.
+    actualizar() hace una pasada: stat de cada archivo y análisis solo de los cambiados.
+    """
+
+    def __init__(self, directorio, extension='.txt', espera=0.5, max_errores=20,
+                 lenguaje=LENGUAJE_BASE, flujo=False):
+        self.directorio = directorio
+        self.extension = extension
+        self.espera = espera
+        self.validador = Validador(max_errores, lenguaje, flujo, memo=MemoSentencias())
+        self.archivos = {}  # ruta -> EstadoArchivo
+        self.pendientes = {}  # ruta -> (firma vista, momento en que se vio por primera vez)
+        self.analizados = 0  # análisis hechos (sin contar los resultados reutilizados)
+        self.pasadas = 0
+
+    def escanear(self):
+        """{ruta: (tamaño, fecha de modificación)} de los programas de la carpeta."""
+        firmas = {}
+        carpetas = [self.directorio]
+        while carpetas:
+            carpeta = carpetas.pop()
+            try:
+                entradas = os.scandir(carpeta)
+            except OSError:
+                continue
+            with entradas:
+                for entrada in entradas:
+                    try:
+                        if entrada.is_dir(follow_symlinks=False):
+                            if not entrada.name.startswith(('.', '__pycache__')):
+                                carpetas.append(entrada.path)
+                        elif entrada.name.endswith(self.extension):
+                            estado = entrada.stat()
+                            firmas[entrada.path] = (estado.st_size, estado.st_mtime_ns)
+                    except OSError:  # se borró mientras se recorría
+                        continue
+        return firmas
+
+    def actualizar(self, ahora=None):
+        """
+        Una pasada de vigilancia. Devuelve [(ruta, resultado)] de los archivos cuyo
+        resultado se actualizó; resultado es None si el archivo se borró.
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        firmas = self.escanear()
+        cambios = []
+
+        for ruta in list(self.archivos):
+            if ruta not in firmas:
+                del self.archivos[ruta]
+                self.pendientes.pop(ruta, None)
+                cambios.append((ruta, None))
+        for ruta in list(self.pendientes):
+            if ruta not in firmas:
+                del self.pendientes[ruta]
+
+        for ruta, firma in firmas.items():
+            conocido = self.archivos.get(ruta)
+            if conocido is not None and conocido.firma == firma:
+                self.pendientes.pop(ruta, None)
+                continue
+            if self.pasadas:
+                # Ráfaga de escrituras: se espera a que la firma no cambie durante 'espera'
+                vista = self.pendientes.get(ruta)
+                if vista is None or vista[0] != firma:
+                    vista = self.pendientes[ruta] = (firma, ahora)
+                if ahora - vista[1] < self.espera:
+                    continue
+                del self.pendientes[ruta]
+            resultado = self._analizar(ruta, firma, conocido)
+            if conocido is None or resultado is not conocido.resultado:
+                cambios.append((ruta, resultado))
+        self.pasadas += 1
+        return cambios
+
+    def _analizar(self, ruta, firma, conocido):
+        try:
+            with open(ruta, 'rb') as f:
+                datos = f.read()
+            codigo = datos.decode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            resultado = ResultadoValidacion(False, [Error(0, 0, 'H001', 'lectura', e)])
+            self.archivos[ruta] = EstadoArchivo(firma, None, resultado)
+            return resultado
+        huella = hashlib.blake2b(datos, digest_size=16).digest()
+        if conocido is not None and conocido.huella == huella:
+            conocido.firma = firma  # mismo contenido: solo cambió la fecha
+            return conocido.resultado
+        resultado = self.validador.validar(codigo)
+        self.analizados += 1
+        self.archivos[ruta] = EstadoArchivo(firma, huella, resultado)
+        return resultado
+
+    def errores(self):
+        """{ruta: errores} de los archivos con errores."""
+        return {ruta: estado.resultado.errores for ruta, estado in sorted(self.archivos.items())
+                if not estado.resultado.valido}
+
+    def resumen(self):
+        """(archivos, con errores, errores en total)"""
+        con_errores = [e.resultado for e in self.archivos.values() if not e.resultado.valido]
+        return len(self.archivos), len(con_errores), sum(len(r.errores) for r in con_errores)
+
+    def vigilar(self, intervalo=1.0, al_cambiar=None):
+        """Repite actualizar() cada 'intervalo' segundos hasta Ctrl+C."""
+        try:
+            while True:
+                cambios = self.actualizar()
+                if cambios and al_cambiar is not None:
+                    al_cambiar(cambios)
+                time.sleep(intervalo)
+        except KeyboardInterrupt:
+            pass
+
+
+def _mostrar(espacio, cambios):
+    for ruta, resultado in cambios:
+        nombre = os.path.relpath(ruta, espacio.directorio)
+        if resultado is None:
+            print(f"{nombre}: borrado")
+        elif resultado.valido:
+            print(f"{nombre}: OK")
+        else:
+            for error in resultado.errores:
+                print(f"{nombre}:{error.linea}:{error.columna}: [{error.tipo} {error.codigo}] {error.mensaje}")
+    archivos, con_errores, errores = espacio.resumen()
+    print(f"-- {time.strftime('%H:%M:%S')}  {archivos} archivos, {con_errores} con errores "
+          f"({errores} errores)", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valida los programas de una carpeta a medida que cambian.")
+    parser.add_argument('carpeta', help="carpeta a vigilar (se incluyen las subcarpetas)")
+    parser.add_argument('--extension', default='.txt', help="extensión de los programas (por defecto .txt)")
+    parser.add_argument('--intervalo', type=float, default=1.0,
+                        help="segundos entre dos revisiones de la carpeta (por defecto 1)")
+    parser.add_argument('--espera', type=float, default=0.5,
+                        help="segundos que un archivo debe quedar sin cambios antes de analizarlo")
+    parser.add_argument('--max-errores', type=int, default=20,
+                        help="errores a guardar por archivo (por defecto 20)")
+    parser.add_argument('--flujo', action='store_true',
+                        help="incluir las advertencias del análisis de flujo")
+    parser.add_argument('--una-vez', action='store_true',
+                        help="validar todo una vez y salir")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.carpeta):
+        print(f"{args.carpeta}: no es una carpeta", file=sys.stderr)
+        return 2
+    espacio = EspacioTrabajo(args.carpeta, args.extension, args.espera, args.max_errores,
+                             flujo=args.flujo)
+    cambios = espacio.actualizar()
+    _mostrar(espacio, [c for c in cambios if not (c[1] and c[1].valido)])
+    if args.una_vez:
+        if any(e.tipo == 'lectura' for errores in espacio.errores().values() for e in errores):
+            return 2
+        return 1 if espacio.resumen()[1] else 0
+    espacio.vigilar(args.intervalo, lambda cambios: _mostrar(espacio, cambios))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())